@@ -11,6 +11,7 @@ import atexit
 import signal
 from typing import Dict, Any
 
+from aicoder.core import tracing
 from aicoder.core.config import Config
 from aicoder.core.stats import Stats
 from aicoder.core.message_history import MessageHistory
@@ -33,8 +34,10 @@ from aicoder.core.session_manager import SessionManager  # noqa: E402
 from aicoder.core.prompt_builder import PromptBuilder  # noqa: E402
 from aicoder.core.socket_server import SocketServer  # noqa: E402
 from aicoder.core.plugin_system import PluginSystem  # noqa: E402
+from aicoder.core.startup_stage import StartupStage  # noqa: E402
 from aicoder.utils.log import LogUtils  # noqa: E402
 from aicoder.utils.stdin_utils import read_stdin_as_string  # noqa: E402
+from aicoder.utils import startup_profile  # noqa: E402
 
 
 class AICoder:
@@ -60,6 +63,9 @@ class AICoder:
         # Plugin system (ultra-fast)
         self.plugin_system = PluginSystem(plugins_dir=".aicoder/plugins")
         self.context_bar.set_plugin_system(self.plugin_system)
+        if Config.trace_enabled():
+            tracing.enable()
+            self.plugin_system.set_tracing(True)
 
         # Extracted components (need to be initialized after core services)
         self.tool_executor = ToolExecutor(self.tool_manager, self.message_history, self.plugin_system)
@@ -78,6 +84,9 @@ class AICoder:
         # Socket server for external control
         self.socket_server = SocketServer(self)
 
+        # Startup work deferred until after the first prompt is shown
+        self.startup = StartupStage()
+
         # Hooks
         self.notify_hooks = None
 
@@ -118,6 +127,7 @@ class AICoder:
     def initialize(self) -> None:
         """Initialize AI Coder components"""
         Config.validate_config()
+        startup_profile.mark("config")
 
         # Set up streaming client with message history (TS calls setApiClient on messageHistory)
         self.message_history.set_api_client(self.streaming_client)
@@ -126,8 +136,10 @@ class AICoder:
         # Set app reference so plugins can access components directly via ctx.app
         self.plugin_system.set_app(self)
         self.tool_manager.set_plugin_system(self.plugin_system)
+        self.tool_manager.set_message_history(self.message_history)
         self.message_history.set_plugin_system(self.plugin_system)
         self.streaming_client.set_plugin_system(self.plugin_system)
+        self.stream_processor.set_plugin_system(self.plugin_system)
 
         self.plugin_system.load_plugins()
 
@@ -155,7 +167,26 @@ class AICoder:
             self.command_handler.registry.register_simple_command(
                 cmd_name, cmd_data["fn"], cmd_data.get("description")
             )
+        startup_profile.mark("plugins")
 
+        # Register auto-save if enabled
+        self.register_auto_save()
+        
+        # Setup signal handlers for graceful shutdown
+        self._setup_signal_handlers()
+        startup_profile.mark("setup")
+
+        # Everything below isn't needed to show the prompt: it runs in the
+        # background and must finish before the first message/API request
+        self.startup.add("prompt", self._build_initial_prompt)
+        self.startup.add("socket", self.socket_server.start)
+        self.startup.add("hooks", lambda: self.plugin_system.fire("on_background_startup"))
+        self.startup.add("plugins", self.plugin_system.load_deferred_plugins)
+        self.startup.start()
+        startup_profile.mark("stage")
+
+    def _build_initial_prompt(self) -> None:
+        """Tool tokens and system prompt, after all plugins are loaded"""
         # Calculate tool tokens once at startup (after all plugins loaded)
         self._calculate_tool_tokens()
 
@@ -165,15 +196,6 @@ class AICoder:
         # Update stats to include tool tokens (estimate_context adds _tools_tokens)
         self.message_history.estimate_context()
 
-        # Start socket server for external control
-        self.socket_server.start()
-
-        # Register auto-save if enabled
-        self.register_auto_save()
-        
-        # Setup signal handlers for graceful shutdown
-        self._setup_signal_handlers()
-
     def _calculate_tool_tokens(self) -> None:
         """Calculate tool definition tokens once at startup"""
         from aicoder.core.token_estimator import set_tool_tokens, _estimate_weighted_tokens
@@ -238,6 +260,9 @@ class AICoder:
                 if not user_input.strip():
                     continue
 
+                # The system prompt must be in place before anything else
+                self.startup.wait()
+
                 # Apply plugin transformations (aliases, snippets, etc.)
                 user_input = self.plugin_system.call_hooks_with_return("after_user_prompt", user_input) or user_input
 
@@ -285,6 +310,7 @@ class AICoder:
 
         try:
             user_input = read_stdin_as_string()
+            self.startup.wait()
             if Config.debug():
                 LogUtils.debug(f"*** got stdin input: {repr(user_input[:50])}")
             if not user_input:
@@ -355,6 +381,7 @@ class AICoder:
         Config.set_yolo_mode(True)
         LogUtils.success("YOLO mode auto-enabled (socket-only mode)")
 
+        self.startup.wait()
         Config.print_startup_info()
         LogUtils.success("Socket-only mode. Use socket commands to control AI Coder.")
 
@@ -460,6 +487,8 @@ class AICoder:
 
     def shutdown(self) -> None:
         """Clean shutdown"""
+        # Don't let a still-starting socket server outlive the stop below
+        self.startup.wait(timeout=2)
         self.socket_server.stop()
         self.input_handler.close()
 
@@ -10,8 +10,10 @@ import time
 import itertools
 from typing import List, Generator, Optional, Dict, Any
 
+from aicoder.core import tracing
 from aicoder.core.config import Config
 from aicoder.core.markdown_colorizer import MarkdownColorizer
+from aicoder.core.stats import RequestTimings
 from aicoder.utils.log import LogUtils, warn as log_warn, debug as log_debug
 from aicoder.utils.http_utils import fetch, Response
 from aicoder.utils.file_utils import rotate_debug_log
@@ -26,6 +28,7 @@ class AnthropicClient:
         self.tool_manager = tool_manager
         self.message_history = message_history
         self._plugin_system = None
+        self._request_timings: Optional[RequestTimings] = None
 
     def set_plugin_system(self, plugin_system) -> None:
         self._plugin_system = plugin_system
@@ -56,7 +59,7 @@ class AnthropicClient:
         if self.stats:
             self.stats.increment_api_requests()
 
-        max_retries = Config.effective_max_retries()
+        max_retries = Config.snapshot().max_retries
         max_tokens = Config.max_tokens() if Config.max_tokens() else 8192
 
         for attempt_num in range(1, max_retries + 1) if max_retries > 0 else itertools.count(1):
@@ -64,7 +67,8 @@ class AnthropicClient:
                 if attempt_num > 1:
                     self._wait_for_retry(attempt_num)
 
-                request_data = self._prepare_request_data(messages, max_tokens, send_tools, stream)
+                with tracing.span("build_payload", attempt=attempt_num):
+                    request_data = self._prepare_request_data(messages, max_tokens, send_tools, stream)
                 endpoint = Config.api_endpoint()
                 headers = self._build_headers()
 
@@ -84,15 +88,22 @@ class AnthropicClient:
                     except Exception as e:
                         log_debug(f"*** Failed to save request payload: {e}")
 
-                response = fetch(
-                    endpoint,
-                    {
-                        "method": "POST",
-                        "headers": headers,
-                        "body": json.dumps(request_data),
-                        "timeout": Config.total_timeout(),
-                    },
-                )
+                with tracing.span("serialize_payload") as payload_span:
+                    body = json.dumps(request_data)
+                    payload_span.set(bytes=len(body))
+                self._request_timings = RequestTimings()
+                with tracing.span("http_request", attempt=attempt_num) as request_span:
+                    response = fetch(
+                        endpoint,
+                        {
+                            "method": "POST",
+                            "headers": headers,
+                            "body": body,
+                            "timeout": Config.total_timeout(),
+                            "timings": self._request_timings,
+                        },
+                    )
+                    request_span.set(status=response.status)
 
                 if not response.ok():
                     error_msg = f"HTTP {response.status}: {response.reason}"
@@ -121,7 +132,7 @@ class AnthropicClient:
                         status = int(error_msg.split()[1])
                     except (IndexError, ValueError):
                         pass
-                retryable = Config.retry_status_codes()
+                retryable = Config.snapshot().retry_status_codes
                 if status != 0 and status not in retryable:
                     LogUtils.warn(f"Not retrying HTTP {status} (not in retryable codes: {sorted(retryable)})")
                     if throw_on_error:
@@ -292,8 +303,11 @@ class AnthropicClient:
         event_data = ""
         line_count = 0
         resp_log = None
+        # Bound once: the loop below runs per SSE line
+        debug = Config.snapshot().debug
+        timings = self._request_timings
 
-        if Config.debug():
+        if debug:
             log_debug("*** SSE streaming loop started")
             try:
                 debug_dir = os.path.join(os.getcwd(), ".aicoder")
@@ -310,7 +324,7 @@ class AnthropicClient:
           while True:
             line_bytes = response.readline()
             if not line_bytes:
-                if Config.debug():
+                if debug:
                     log_debug(f"*** SSE stream ended after {line_count} lines")
                 break
             
@@ -321,7 +335,7 @@ class AnthropicClient:
                 resp_log.write(line_bytes.decode("utf-8", errors="replace"))
                 resp_log.flush()
 
-            if Config.debug():
+            if debug:
                 log_debug(f"*** SSE raw line {line_count}: {repr(line_bytes)}")
 
             # Blank line = end of event block
@@ -339,9 +353,11 @@ class AnthropicClient:
                         try:
                             data = json.loads(data_str)
                             dtype = data.get("type", "")
+                            if timings is not None:
+                                timings.chunk()
 
                             # Log every raw SSE event in debug mode
-                            if Config.debug():
+                            if debug:
                                 log_debug(f"*** SSE event: {json.dumps(data)}")
 
                             # Capture usage from message_start event
@@ -357,6 +373,9 @@ class AnthropicClient:
                                 current_tool_name = data.get("name") or content_block.get("name")
                                 current_tool_input = ""
                                 if current_block_type == "tool_use":
+                                    if timings is not None:
+                                        timings.mark("first_token")
+                                        timings.mark("first_tool_call")
                                     init_input = content_block.get("input", {})
                                     if init_input:
                                         current_tool_input = json.dumps(init_input)
@@ -368,6 +387,8 @@ class AnthropicClient:
                                 if delta_type == "thinking_delta":
                                     thinking = delta.get("thinking", "")
                                     accumulated_reasoning += thinking
+                                    if timings is not None:
+                                        timings.mark("first_token")
                                     if not thinking_printed:
                                         _show_thinking()
                                     yield {
@@ -378,12 +399,15 @@ class AnthropicClient:
                                 elif delta_type == "signature_delta":
                                     # Capture signature for thinking block (required for multi-turn)
                                     self._thinking_signature = delta.get("signature", "")
-                                    if Config.debug():
+                                    if debug:
                                         log_debug(f"*** Captured thinking signature: {self._thinking_signature[:20]}...")
                                     
                                 elif delta_type == "text_delta":
                                     _clear_thinking()
                                     text = delta.get("text", "")
+                                    if timings is not None:
+                                        timings.mark("first_token")
+                                        timings.mark("first_content")
                                     full_content += text
                                     yield {
                                         "choices": [{"delta": {"content": text}}],
@@ -447,6 +471,11 @@ class AnthropicClient:
             log_debug(f"*** streaming stats: increment_api_success, add_api_time")
             self.stats.increment_api_success()
             self.stats.add_api_time(time.time() - start_time)
+            if timings is not None:
+                output = (message_usage or {}).get("output_tokens") or 0
+                summary = self.stats.record_request_timings(timings, output)
+                if debug:
+                    log_debug(f"*** Request timings: {summary}")
             # Update token stats from accumulated usage
             if message_usage:
                 input_tokens = message_usage.get("input_tokens") or 0
@@ -514,6 +543,15 @@ class AnthropicClient:
             self.stats.add_api_time(time.time() - start_time)
             # Update token stats from usage
             usage = data.get("usage")
+            timings = self._request_timings
+            if timings is not None:
+                # The whole body arrived at once
+                timings.mark("first_token")
+                if full_content:
+                    timings.mark("first_content")
+                if accumulated_tool_calls:
+                    timings.mark("first_tool_call")
+                self.stats.record_request_timings(timings, (usage or {}).get("output_tokens") or 0)
             if usage:
                 input_tokens = usage.get("input_tokens") or 0
                 output_tokens = usage.get("output_tokens") or 0
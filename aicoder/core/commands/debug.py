@@ -50,6 +50,10 @@ class DebugCommand(BaseCommand):
         if action in ["rebuild-prompt", "rp", "reload-prompt"]:
             return self._rebuild_prompt()
 
+        # Handle request latency breakdown
+        if action in ["latency", "lat"]:
+            return self._show_latency()
+
         # Handle fix-tools (extreme repair of broken tool chains)
         if action in ["fix-tools", "ft"]:
             return self._fix_tools()
@@ -88,6 +92,7 @@ class DebugCommand(BaseCommand):
             ("rebuild-prompt", "Re-read all files and rebuild system prompt (rp, reload-prompt)"),
             ("breakpoint",     "Trigger Python breakpoint() (bp, break, b)"),
             ("fix-tools",      "Extreme repair: drop user msgs between tool calls/results + orphan tool results (ft)"),
+            ("latency",        "Request latency: TTFT, tokens/sec, chunk gaps, last request phases (lat)"),
             ("help",           "Show this help message"),
         ]
         pad = max(len(n) for n, _ in subcmds) + 1
@@ -130,6 +135,33 @@ class DebugCommand(BaseCommand):
         """Show current debug status"""
         return self._show_help()
 
+    def _show_latency(self) -> CommandResult:
+        """Show request latency histograms and the last request's phases"""
+        stats = self.context.stats
+        lines = stats.format_latency()
+        if not lines:
+            LogUtils.info("No completed API requests yet")
+            return CommandResult(should_quit=False, run_api_call=False)
+
+        c = Config.colors
+        LogUtils.print(f"{c['bold']}Request Latency{c['reset']}")
+        for line in lines:
+            LogUtils.print(line)
+
+        last = stats.last_request_timings
+        if last:
+            LogUtils.print(f"{c['bold']}Last request phases:{c['reset']}")
+            previous = 0.0
+            for phase, ms in last["phases_ms"].items():
+                LogUtils.print(f"  {phase:<16} {ms:>9.1f} ms  {c['dim']}(+{ms - previous:.1f}){c['reset']}")
+                previous = max(previous, ms)
+            speed = last["tokens_per_sec"]
+            LogUtils.print(
+                f"  {last['chunks']} chunks, gap p50 {last['gap_p50_ms']:.1f}ms / p99 {last['gap_p99_ms']:.1f}ms"
+                + (f", {speed:.1f} tok/s" if speed is not None else "")
+            )
+        return CommandResult(should_quit=False, run_api_call=False)
+
     def _rebuild_prompt(self) -> CommandResult:
         """Rebuild the system prompt from scratch"""
         LogUtils.warn("[*] Rebuilding system prompt...")
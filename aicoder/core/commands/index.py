@@ -0,0 +1,74 @@
+"""
+Index command implementation
+"""
+
+import time
+from typing import List
+from .base import BaseCommand, CommandResult
+from aicoder.core.config import Config
+from aicoder.utils.log import LogUtils
+
+
+class IndexCommand(BaseCommand):
+    """Show or rebuild the grep trigram index"""
+
+    def __init__(self, context):
+        super().__init__(context)
+        self._name = "index"
+        self._description = "Grep trigram index: status | rebuild"
+
+    def get_name(self) -> str:
+        """Command name"""
+        return self._name
+
+    def get_description(self) -> str:
+        """Command description"""
+        return self._description
+
+    def execute(self, args: List[str] = None) -> CommandResult:
+        """Execute index command"""
+        action = args[0].lower() if args else "status"
+
+        if action == "rebuild":
+            from aicoder.core.trigram_index import get_index  # Lazy: index is opt-in
+
+            index = get_index(create=True)
+            index.refresh_async(rebuild=True)
+            LogUtils.success("[*] Rebuilding grep index in the background (see /index status)")
+            if not Config.grep_index_enabled():
+                LogUtils.dim("Note: grep only uses the index when AICODER_GREP_INDEX=1")
+        elif action == "status":
+            self._show_status()
+        else:
+            LogUtils.dim("Usage: /index [status|rebuild]")
+
+        return CommandResult(should_quit=False, run_api_call=False)
+
+    def _show_status(self) -> None:
+        """Print index size and hit metrics"""
+        from aicoder.core.trigram_index import get_index
+
+        index = get_index(create=True)
+        s = index.status()
+        enabled = "enabled" if Config.grep_index_enabled() else "disabled (AICODER_GREP_INDEX=1 to enable)"
+
+        LogUtils.print(f"Grep index: {enabled}", color="cyan")
+        LogUtils.print(f"  Root: {s['root']}")
+        if s["building"]:
+            LogUtils.print("  State: building...")
+        if s["last_refresh"]:
+            age = time.time() - s["last_refresh"]
+            LogUtils.print(
+                f"  Files: {s['files']:,} ({s['indexed_files']:,} indexed), trigrams: {s['trigrams']:,}, "
+                f"on disk: {s['disk_bytes'] / 1024:.0f} KB"
+            )
+            LogUtils.print(f"  Last refresh: {age:.0f}s ago ({s['last_refresh_seconds']:.2f}s)")
+        else:
+            LogUtils.print("  Not built yet (/index rebuild)")
+
+        LogUtils.print(
+            f"  Queries: {s['queries']}, index hits: {s['hits']}, "
+            f"stale fallbacks: {s['stale_fallbacks']}, pattern fallbacks: {s['pattern_fallbacks']}"
+        )
+        if s["hits"]:
+            LogUtils.print(f"  Last query: {s['last_candidates']:,} of {s['last_total']:,} files scanned")
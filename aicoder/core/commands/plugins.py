@@ -0,0 +1,86 @@
+"""
+Plugins command implementation
+"""
+
+from typing import List
+from .base import BaseCommand, CommandResult
+from aicoder.utils.log import LogUtils
+
+
+class PluginsCommand(BaseCommand):
+    """List plugins and profile their hooks"""
+
+    def __init__(self, context):
+        super().__init__(context)
+        self._name = "plugins"
+        self._description = "List plugins, or profile hooks: profile [on|off|reset]"
+
+    def get_name(self) -> str:
+        """Command name"""
+        return self._name
+
+    def get_description(self) -> str:
+        """Command description"""
+        return self._description
+
+    def execute(self, args: List[str] = None) -> CommandResult:
+        """Execute plugins command"""
+        plugin_system = self.context.command_handler.plugin_system if self.context.command_handler else None
+        if not plugin_system:
+            LogUtils.error("Plugin system not available")
+            return CommandResult(should_quit=False, run_api_call=False)
+
+        args = args or []
+        if not args:
+            self._show_plugins(plugin_system)
+        elif args[0].lower() == "profile":
+            action = args[1].lower() if len(args) > 1 else "report"
+            if action == "on":
+                plugin_system.set_profiling(True)
+                LogUtils.success("[*] Hook profiling enabled")
+            elif action == "off":
+                plugin_system.set_profiling(False)
+                LogUtils.success("[*] Hook profiling disabled")
+            elif action == "reset":
+                plugin_system.reset_profile()
+                LogUtils.success("[*] Hook timings cleared")
+            elif action == "report":
+                self._show_profile(plugin_system)
+            else:
+                LogUtils.dim("Usage: /plugins profile [on|off|reset]")
+        else:
+            LogUtils.dim("Usage: /plugins [profile [on|off|reset]]")
+
+        return CommandResult(should_quit=False, run_api_call=False)
+
+    def _show_plugins(self, plugin_system) -> None:
+        """Print loaded and deferred plugins"""
+        LogUtils.print(f"Loaded plugins ({len(plugin_system.plugins)}):", color="cyan")
+        for name in plugin_system.plugins:
+            LogUtils.print(f"  {name}")
+        if plugin_system.deferred_plugins:
+            LogUtils.print(f"Deferred plugins ({len(plugin_system.deferred_plugins)}):", color="cyan")
+            for name, (_, commands, _) in plugin_system.deferred_plugins.items():
+                LogUtils.print(f"  {name} (/{', /'.join(commands)})")
+
+    def _show_profile(self, plugin_system) -> None:
+        """Print hook timings table"""
+        state = "on" if plugin_system.profiling else "off (/plugins profile on)"
+        LogUtils.print(f"Hook profiling: {state}", color="cyan")
+        if plugin_system.slow_hook_ns:
+            LogUtils.dim(f"Slow hook warning above {plugin_system.slow_hook_ns / 1_000_000:g}ms")
+
+        rows = plugin_system.profile_report()
+        if not rows:
+            LogUtils.print("  No hook calls recorded")
+            return
+
+        LogUtils.print(
+            f"  {'event':<32} {'plugin':<20} {'count':>7} {'total ms':>10} "
+            f"{'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}"
+        )
+        for row in rows:
+            LogUtils.print(
+                f"  {row['event']:<32} {row['plugin']:<20} {row['count']:>7} {row['total_ms']:>10.2f} "
+                f"{row['p50_ms']:>8.3f} {row['p99_ms']:>8.3f} {row['max_ms']:>8.3f}"
+            )
@@ -0,0 +1,113 @@
+"""
+Profile command implementation
+"""
+
+from typing import List
+from .base import BaseCommand, CommandResult
+from aicoder.core.config import Config
+from aicoder.utils.log import LogUtils
+
+USAGE = "Usage: /profile start [hz|turn] | stop | report [N]"
+
+
+class ProfileCommand(BaseCommand):
+    """Sample the live session or cProfile one turn"""
+
+    def __init__(self, context):
+        super().__init__(context)
+        self._name = "profile"
+        self._description = "Profile the session: start [hz|turn], stop, report [N]"
+
+    def get_name(self) -> str:
+        """Command name"""
+        return self._name
+
+    def get_description(self) -> str:
+        """Command description"""
+        return self._description
+
+    def execute(self, args: List[str] = None) -> CommandResult:
+        """Execute profile command"""
+        from aicoder.core import profiler  # Lazy: cProfile/pstats only once /profile is used
+
+        args = args or []
+        action = args[0].lower() if args else "status"
+        try:
+            if action == "start":
+                self._start(args[1].lower() if len(args) > 1 else "")
+            elif action == "stop":
+                self._stop()
+            elif action == "report":
+                self._report(int(args[1]) if len(args) > 1 else profiler.DEFAULT_TOP)
+            elif action == "status":
+                self._status()
+            else:
+                LogUtils.dim(USAGE)
+        except (RuntimeError, ValueError) as e:
+            LogUtils.warn(f"[!] {e}")
+
+        return CommandResult(should_quit=False, run_api_call=False)
+
+    def _start(self, mode: str) -> None:
+        """Start sampling, or arm cProfile for the next turn"""
+        from aicoder.core import profiler
+
+        if mode == "turn":
+            profiler.arm_turn()
+            LogUtils.success("[*] cProfile armed for the next AI turn")
+            return
+        hz = float(mode) if mode else Config.profile_hz()
+        profiler.start(hz)
+        LogUtils.success(f"[*] Sampling profiler started at {hz:g} Hz (/profile stop to finish)")
+
+    def _stop(self) -> None:
+        """Stop sampling and print where the output went"""
+        from aicoder.core import profiler
+
+        result = profiler.stop()
+        if result is None:
+            LogUtils.print("Profiler not sampling (turn profiles finish on their own)")
+            return
+        LogUtils.success(
+            f"[*] {result['samples']} samples over {result['duration_s']:.1f}s "
+            f"(sampler overhead {result['overhead_pct']:.2f}%)"
+        )
+        self._show_files(result["files"])
+
+    def _report(self, top: int) -> None:
+        """Print the top-N report of the running or last profile"""
+        from aicoder.core import profiler
+
+        lines = profiler.report(top)
+        if not lines:
+            LogUtils.print("No profile yet (/profile start)")
+            return
+        for line in lines:
+            LogUtils.print(line)
+        last = profiler.last_run()
+        if last and not profiler.running():
+            self._show_files(last["files"])
+
+    def _status(self) -> None:
+        """Print whether the profiler runs"""
+        from aicoder.core import profiler
+
+        state = profiler.status()
+        if not state["running"]:
+            LogUtils.print("Profiler: off", color="cyan")
+            LogUtils.dim(USAGE)
+        elif state["mode"] == "turn":
+            when = "profiling this turn" if state["in_turn"] else "armed for the next turn"
+            LogUtils.print(f"Profiler: cProfile {when}", color="cyan")
+        else:
+            LogUtils.print(
+                f"Profiler: sampling at {state['hz']:g} Hz, {state['samples']} samples "
+                f"in {state['duration_s']:.1f}s", color="cyan"
+            )
+
+    def _show_files(self, files: dict) -> None:
+        """Print output file paths"""
+        for kind, path in files.items():
+            LogUtils.print(f"  {kind}: {path}", color="cyan")
+        if "collapsed" in files:
+            LogUtils.dim(f"  Flamegraph: flamegraph.pl {files['collapsed']} > flame.svg (or load it in speedscope)")
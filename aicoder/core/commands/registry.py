@@ -79,6 +79,10 @@ class CommandRegistry:
         from .debug import DebugCommand
         from .thinking import ThinkingCommand
         from .context_size import ContextSizeCommand
+        from .index import IndexCommand
+        from .plugins import PluginsCommand
+        from .trace import TraceCommand
+        from .profile import ProfileCommand
 
         thinking_cmd = ThinkingCommand(self.context)
         commands = [
@@ -98,6 +102,10 @@ class CommandRegistry:
             DebugCommand(self.context),
             thinking_cmd,
             ContextSizeCommand(self.context),
+            IndexCommand(self.context),
+            PluginsCommand(self.context),
+            TraceCommand(self.context),
+            ProfileCommand(self.context),
         ]
 
         for command in commands:
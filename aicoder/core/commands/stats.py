@@ -5,6 +5,7 @@ Stats command implementation
 from typing import List
 from .base import BaseCommand, CommandResult
 from aicoder.core.config import Config
+from aicoder.utils import startup_profile
 from aicoder.utils.log import LogUtils
 
 
@@ -28,6 +29,12 @@ class StatsCommand(BaseCommand):
         """Show session statistics"""
         self.context.stats.print_stats()
 
+        milestones = startup_profile.milestones_ms()
+        if "time_to_prompt" in milestones:
+            ready = milestones.get("time_to_ready")
+            ready_str = f", {ready / 1000:.2f}s to ready" if ready is not None else ", still starting"
+            LogUtils.print(f"Startup: {milestones['time_to_prompt'] / 1000:.2f}s to prompt{ready_str}")
+
         # Let plugins contribute their own stats lines
         plugin_system = self.context.command_handler.plugin_system if self.context.command_handler else None
         if plugin_system:
@@ -0,0 +1,69 @@
+"""
+Trace command implementation
+"""
+
+from typing import List
+from .base import BaseCommand, CommandResult
+from aicoder.core import tracing
+from aicoder.utils.log import LogUtils
+
+
+class TraceCommand(BaseCommand):
+    """Toggle turn tracing and show the last trace"""
+
+    def __init__(self, context):
+        super().__init__(context)
+        self._name = "trace"
+        self._description = "Trace AI turns to .aicoder/traces: on|off|last"
+
+    def get_name(self) -> str:
+        """Command name"""
+        return self._name
+
+    def get_description(self) -> str:
+        """Command description"""
+        return self._description
+
+    def execute(self, args: List[str] = None) -> CommandResult:
+        """Execute trace command"""
+        action = args[0].lower() if args else ""
+        if action in ("on", "off"):
+            self._set_tracing(action == "on")
+        elif action == "last":
+            self._show_last()
+        elif not action:
+            state = "on" if tracing.enabled() else "off"
+            LogUtils.print(f"Turn tracing: {state}", color="cyan")
+            LogUtils.dim("Usage: /trace on|off|last")
+        else:
+            LogUtils.dim("Usage: /trace on|off|last")
+
+        return CommandResult(should_quit=False, run_api_call=False)
+
+    def _set_tracing(self, enabled: bool) -> None:
+        """Toggle span recording, including per-hook spans"""
+        if enabled:
+            tracing.enable()
+        else:
+            tracing.disable()
+        plugin_system = self.context.command_handler.plugin_system if self.context.command_handler else None
+        if plugin_system:
+            plugin_system.set_tracing(enabled)
+        if enabled:
+            LogUtils.success(f"[*] Turn tracing enabled (writing to {tracing.TRACE_DIR}/)")
+        else:
+            LogUtils.success("[*] Turn tracing disabled")
+
+    def _show_last(self) -> None:
+        """Print the span tree of the last traced turn"""
+        last = tracing.last_turn()
+        if last is None:
+            hint = "" if tracing.enabled() else " (/trace on)"
+            LogUtils.print(f"No traced turn yet{hint}")
+            return
+
+        for line in tracing.format_last():
+            LogUtils.print(f"  {line}")
+        if last["path"]:
+            LogUtils.print(f"Trace: {last['path']}", color="cyan")
+            LogUtils.dim(f"Open in chrome://tracing or Perfetto after: jq -s . {last['path']} > trace.json")
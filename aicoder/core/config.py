@@ -5,10 +5,56 @@ Configuration module for AI Coder
 
 import os
 import sys
-from typing import Any, Dict, List, Optional, Set
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Optional, Set
 from aicoder.utils.log import LogUtils
 
 
+class ConfigSnapshot:
+    """
+    Parsed settings read on hot paths (per request, chunk or tool) - simple class instead of dataclass.
+    Built once by Config.snapshot() and immutable; Config.invalidate() drops it.
+    """
+
+    __slots__ = (
+        "debug",
+        "max_retries",
+        "max_backoff",
+        "retry_status_codes",
+        "total_timeout",
+        "tools_allow",
+        "tools_deny",
+        "http_headers",
+        "reasoning_field",
+        "possible_reasoning_fields",
+        "reasoning_fields",
+    )
+
+    def __init__(self):
+        reasoning_field = Config.get_reasoning_field()
+        possible_fields = tuple(Config.get_possible_reasoning_fields())
+        tools_allow = Config.tools_allow()
+        values = {
+            "debug": Config.debug(),
+            "max_retries": Config.effective_max_retries(),
+            "max_backoff": Config.effective_max_backoff(),
+            "retry_status_codes": frozenset(Config.retry_status_codes()),
+            "total_timeout": Config.total_timeout(),
+            "tools_allow": frozenset(tools_allow) if tools_allow is not None else None,
+            "tools_deny": frozenset(Config.tools_deny()),
+            "http_headers": MappingProxyType(Config.http_headers()),
+            "reasoning_field": reasoning_field,
+            "possible_reasoning_fields": possible_fields,
+            # Fields to read from deltas/messages: the override alone, or the guess list
+            "reasoning_fields": (reasoning_field,) if reasoning_field else possible_fields,
+        }
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ConfigSnapshot is immutable; change the setting and call Config.invalidate()")
+
+
 class Config:
     """
     Configuration module for AI Coder
@@ -41,6 +87,67 @@ class Config:
     # After this, only runtime state is used (env var ignored)
     _yolo_mode = os.environ.get("YOLO_MODE") == "1"
 
+    # Cached ConfigSnapshot and callbacks run when it is invalidated
+    _snapshot: Optional[ConfigSnapshot] = None
+    _change_listeners: List[Callable[[], None]] = []
+
+    @staticmethod
+    def snapshot() -> ConfigSnapshot:
+        """
+        Get parsed hot-path settings, built on first use after invalidation.
+        Bind it once per request/loop and read attributes instead of calling getters.
+
+        """
+        snap = Config._snapshot
+        if snap is None:
+            snap = Config._snapshot = ConfigSnapshot()
+        return snap
+
+    @staticmethod
+    def invalidate() -> None:
+        """
+        Drop the cached snapshot and notify change listeners.
+        Call after changing os.environ directly (or use set_env).
+
+        """
+        Config._snapshot = None
+        for callback in list(Config._change_listeners):
+            try:
+                callback()
+            except Exception as e:
+                LogUtils.error(f"[!] Config change listener failed: {e}")
+
+    @staticmethod
+    def on_change(callback: Callable[[], None]) -> None:
+        """
+        Register a callback run (with no arguments) whenever config is invalidated
+
+        """
+        Config._change_listeners.append(callback)
+
+    @staticmethod
+    def remove_change_listener(callback: Callable[[], None]) -> None:
+        """
+        Unregister a callback added with on_change
+
+        """
+        if callback in Config._change_listeners:
+            Config._change_listeners.remove(callback)
+
+    @staticmethod
+    def set_env(values: Dict[str, Optional[str]]) -> None:
+        """
+        Set environment variables (None removes one) and invalidate once.
+        Plugins should use this instead of writing os.environ directly.
+
+        """
+        for name, value in values.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = str(value)
+        Config.invalidate()
+
     @staticmethod
     def yolo_mode() -> bool:
         """
@@ -456,6 +563,7 @@ class Config:
     def set_runtime_max_retries(cls, value: int | None) -> None:
         """Set runtime max retry override"""
         cls._runtime_max_retries = value
+        cls.invalidate()
 
     @staticmethod
     def max_backoff() -> int:
@@ -473,6 +581,7 @@ class Config:
     def set_runtime_max_backoff(cls, value: int | None) -> None:
         """Set runtime max backoff override"""
         cls._runtime_max_backoff = value
+        cls.invalidate()
 
     @staticmethod
     def retry_status_codes() -> set:
@@ -611,6 +720,63 @@ class Config:
         """
         return os.environ.get("TOOLS_NOT_FOUND_RELIST", "1") != "0"
 
+    @staticmethod
+    def staged_startup() -> bool:
+        """
+        Check if non-essential startup work (system prompt build, socket
+        server, deferred plugins, background hooks) runs after the first
+        prompt is shown (AICODER_STAGED_STARTUP=0 to run it all up front).
+        """
+        return os.environ.get("AICODER_STAGED_STARTUP", "1") != "0"
+
+    @staticmethod
+    def hook_profiling() -> bool:
+        """
+        Check if plugin hook timing starts enabled (AICODER_HOOK_PROFILE=1).
+        Can be toggled at runtime with /plugins profile on|off.
+        """
+        return os.environ.get("AICODER_HOOK_PROFILE") == "1"
+
+    @staticmethod
+    def trace_enabled() -> bool:
+        """
+        Check if turn tracing starts enabled (AICODER_TRACE=1). Traces are written
+        to .aicoder/traces/; toggle at runtime with /trace on|off.
+        """
+        return os.environ.get("AICODER_TRACE") == "1"
+
+    @staticmethod
+    def profile_hz() -> float:
+        """
+        Get the default sampling rate of /profile start in samples per second
+        (AICODER_PROFILE_HZ, default 100).
+        """
+        try:
+            hz = float(os.environ.get("AICODER_PROFILE_HZ", "100"))
+        except ValueError:
+            return 100.0
+        return hz if hz > 0 else 100.0
+
+    @staticmethod
+    def hook_slow_ms() -> float:
+        """
+        Get threshold in ms above which a single plugin hook call logs a warning
+        (AICODER_HOOK_SLOW_MS, default 0 = off).
+        """
+        try:
+            return float(os.environ.get("AICODER_HOOK_SLOW_MS", "0"))
+        except ValueError:
+            return 0.0
+
+    @staticmethod
+    def lazy_plugins() -> bool:
+        """
+        Check if command-only plugins may be imported on first use instead of
+        at startup (default on; AICODER_LAZY_PLUGINS=0 loads everything eagerly).
+        What each plugin registers is cached in .aicoder/plugin_manifest.json.
+        """
+        return os.environ.get("AICODER_LAZY_PLUGINS", "1") != "0"
+
     @staticmethod
     def plugins_allow() -> Optional[Set[str]]:
         """
@@ -784,6 +950,7 @@ class Config:
     def set_runtime_total_timeout(cls, value: int | None) -> None:
         """Set runtime total timeout override (None to restore env default)."""
         cls._runtime_total_timeout = value
+        cls.invalidate()
 
     @staticmethod
     def total_timeout_extension() -> int:
@@ -901,6 +1068,14 @@ class Config:
         """
         return int(os.environ.get("DEFAULT_READ_LIMIT", "150"))
 
+    @staticmethod
+    def read_batch_max_lines() -> int:
+        """
+        Get total line budget for a multi-file read_file call (split across files)
+
+        """
+        return int(os.environ.get("READ_BATCH_MAX_LINES", "1000"))
+
     @staticmethod
     def default_grep_max_results() -> int:
         """
@@ -909,6 +1084,32 @@ class Config:
         """
         return int(os.environ.get("DEFAULT_GREP_MAX_RESULTS", "500"))
 
+    @staticmethod
+    def default_list_max_files() -> int:
+        """
+        Get default max entries shown by list_directory (LIST_MAX_FILES)
+
+        """
+        return int(os.environ.get("LIST_MAX_FILES", "100"))
+
+    @staticmethod
+    def grep_engine() -> str:
+        """
+        Get grep engine from AICODER_GREP_ENGINE: "auto" (ripgrep when
+        installed, builtin Python search otherwise), "rg" or "python".
+        Only the Python engine's results are cached between searches.
+        """
+        engine = os.environ.get("AICODER_GREP_ENGINE", "auto").strip().lower()
+        return engine if engine in ("auto", "rg", "python") else "auto"
+
+    @staticmethod
+    def grep_index_enabled() -> bool:
+        """
+        Check if the on-disk trigram index (.aicoder/index/) narrows grep
+        candidates (AICODER_GREP_INDEX=1)
+        """
+        return os.environ.get("AICODER_GREP_INDEX") == "1"
+
     @staticmethod
     def default_shell_timeout() -> int:
         """
@@ -926,6 +1127,34 @@ class Config:
         """
         return os.environ.get("AICODER_SHELL_PREPEND_CMD", "").strip()
 
+    @staticmethod
+    def shell_capture_bytes() -> int:
+        """
+        Get bytes of shell output kept per stream (stdout/stderr) from SHELL_CAPTURE_BYTES.
+        Half is taken from the start of the output and half from the end; the
+        middle is dropped while reading. Defaults to 40% of MAX_TOOL_RESULT_SIZE
+        so both streams fit in a tool result.
+        """
+        default = Config.max_tool_result_size() * 2 // 5
+        return int(os.environ.get("SHELL_CAPTURE_BYTES", str(default)))
+
+    @staticmethod
+    def shell_spill_output() -> bool:
+        """
+        Check if truncated shell output should be saved in full to a temp file
+        (AICODER_SHELL_SPILL=1) so the AI can page through it with read_file.
+        """
+        return os.environ.get("AICODER_SHELL_SPILL") == "1"
+
+    @staticmethod
+    def persistent_shell() -> bool:
+        """
+        Check if run_shell_command should reuse one long-lived bash per session
+        (AICODER_PERSISTENT_SHELL=1). Saves a process spawn per command and keeps
+        cd/export/venv state between commands. live_output calls still use bash -c.
+        """
+        return os.environ.get("AICODER_PERSISTENT_SHELL") == "1"
+
     # Default directories to ignore when listing files
     DEFAULT_IGNORE_DIRS = [
         '.git',
@@ -1000,6 +1229,7 @@ class Config:
 
         """
         cls._debug_enabled = enabled
+        cls.invalidate()
 
     # No fallbacks - use only configured provider
     @staticmethod
@@ -1120,6 +1350,7 @@ class Config:
         Config._sandbox_disabled = os.environ.get("MINI_SANDBOX") == "0"
         Config._detail_mode = os.environ.get("DETAIL") == "1"
         Config._debug_enabled = os.environ.get("DEBUG") == "1"
+        Config.invalidate()
 
     @staticmethod
     def in_tmux() -> bool:
@@ -3,35 +3,67 @@ File Access Tracker - Enforces read-before-edit safety rule
 Class-based implementation
 """
 
-from typing import Set
+from typing import Dict, Optional, Set, Tuple
 
 
 class FileAccessTracker:
     """Tracks which files have been read to enforce safety"""
-    
+
     _read_files: Set[str] = set()  # Class variable
-    
+
+    # path -> {(offset, limit): (fingerprint, result_hash, result_len)}
+    # Lets read_file recognize a repeated read of an unchanged range
+    _snapshots: Dict[str, Dict[Tuple[int, int], Tuple[str, str, int]]] = {}
+    _unchanged_hits = 0
+    _tokens_saved = 0
+
     @classmethod
     def record_read(cls, path: str) -> None:
         """Record that a file has been read"""
         cls._read_files.add(path)
-    
+
     @classmethod
     def was_file_read(cls, path: str) -> bool:
         """Check if a file was previously read in this session"""
         return path in cls._read_files
-    
+
+    @classmethod
+    def record_snapshot(
+        cls, path: str, offset: int, limit: int, fingerprint: str, result_hash: str, result_len: int
+    ) -> None:
+        """Record the content fingerprint and result served for a read range"""
+        cls._snapshots.setdefault(path, {})[(offset, limit)] = (fingerprint, result_hash, result_len)
+
+    @classmethod
+    def get_snapshot(cls, path: str, offset: int, limit: int) -> Optional[Tuple[str, str, int]]:
+        """Get (fingerprint, result_hash, result_len) of a previous read of this range"""
+        return cls._snapshots.get(path, {}).get((offset, limit))
+
+    @classmethod
+    def record_unchanged_hit(cls, tokens_saved: int) -> None:
+        """Count a re-read answered with an "unchanged" result"""
+        cls._unchanged_hits += 1
+        cls._tokens_saved += max(0, tokens_saved)
+
+    @classmethod
+    def get_unchanged_stats(cls) -> Tuple[int, int]:
+        """Get (hits, estimated tokens saved) for unchanged re-reads"""
+        return cls._unchanged_hits, cls._tokens_saved
+
     @classmethod
     def clear_state(cls) -> None:
         """Clear all read files - useful for testing"""
         cls._read_files.clear()
-    
+        cls._snapshots.clear()
+        cls._unchanged_hits = 0
+        cls._tokens_saved = 0
+
     @classmethod
     def get_all_read_files(cls) -> Set[str]:
         """Get all files that have been read - useful for testing"""
         return cls._read_files.copy()
-    
+
     @classmethod
     def get_read_count(cls) -> int:
         """Get count of read files - useful for testing"""
-        return len(cls._read_files)
\ No newline at end of file
+        return len(cls._read_files)
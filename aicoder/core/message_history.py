@@ -2,10 +2,12 @@
 
 """
 
+import itertools
 import json
 import os
+import threading
 import time
-from typing import List, Optional, TYPE_CHECKING, Dict, Any
+from typing import List, Optional, TYPE_CHECKING, Dict, Any, Tuple
 
 
 
@@ -38,10 +40,25 @@ class MessageHistory:
         self.initial_system_prompt: Optional[Dict[str, Any]] = None
         self.is_compacting = False
         self._plugin_system = None
+        self._on_user_message = None
+        self._on_assistant_message = None
+        self._on_tool_result = None
+        self._on_message_changed = None
+        # Sequence numbers for cursor reads: id(message) -> (seq, message).
+        # Holding the message keeps its id from being reused while mapped.
+        self._seqs: Dict[int, Tuple[int, Dict[str, Any]]] = {}
+        self._seq_counter = itertools.count(1)
+        self._seq_lock = threading.Lock()  # Socket readers vs each other
+        self.last_seq = 0
 
     def set_plugin_system(self, plugin_system) -> None:
-        """Set plugin system for hooks"""
+        """Set plugin system for hooks, binding the per-message dispatchers"""
         self._plugin_system = plugin_system
+        if plugin_system:
+            self._on_user_message = plugin_system.dispatcher("after_user_message_added")
+            self._on_assistant_message = plugin_system.dispatcher("after_assistant_message_added")
+            self._on_tool_result = plugin_system.dispatcher("after_tool_results_added")
+            self._on_message_changed = plugin_system.dispatcher("after_message_changed")
 
     def set_api_client(self, api_client: "StreamingClient") -> None:
         """Set API client for compaction"""
@@ -100,8 +117,7 @@ class MessageHistory:
         for msg in self.messages:
             if msg["role"] == "system":
                 msg["content"] = content
-                from .token_estimator import cache_message
-                cache_message(msg)
+                self._message_changed(msg)
                 break
         self.initial_system_prompt = self.messages[0] if self.messages and self.messages[0].get("role") == "system" else None
         self.estimate_context()
@@ -125,7 +141,7 @@ class MessageHistory:
 
         # Call plugin hooks
         if self._plugin_system:
-            self._plugin_system.call_hooks("after_user_message_added", message)
+            self._on_user_message.fire(message)
 
     def insert_user_message_at_appropriate_position(self, content: str) -> None:
         """
@@ -161,12 +177,13 @@ class MessageHistory:
         assistant_message = {"role": "assistant", "content": message.get("content"), "tool_calls": message.get("tool_calls")}
 
         # Preserve reasoning field
-        override = Config.get_reasoning_field()
+        cfg = Config.snapshot()
+        override = cfg.reasoning_field
         if override:
             if message.get(override):
                 assistant_message[override] = message[override]
         else:
-            for field in Config.get_possible_reasoning_fields():
+            for field in cfg.possible_reasoning_fields:
                 if message.get(field):
                     assistant_message[field] = message[field]
                     break
@@ -185,7 +202,7 @@ class MessageHistory:
 
         # Call plugin hooks
         if self._plugin_system:
-            self._plugin_system.call_hooks("after_assistant_message_added", assistant_message)
+            self._on_assistant_message.fire(assistant_message)
 
         # Append to session output file if configured
         output_file = Config.session_output_file()
@@ -244,11 +261,19 @@ class MessageHistory:
             
             # Call plugin hooks for each tool message
             if self._plugin_system:
-                self._plugin_system.call_hooks("after_tool_results_added", tool_message)
+                self._on_tool_result.fire(tool_message)
         
         # Update context size estimate
         self.estimate_context()
 
+    def _message_changed(self, message: Dict[str, Any]) -> None:
+        """Refresh caches of a message edited in place and tell plugins"""
+        # Update the token cache for this modified message
+        from .token_estimator import cache_message
+        cache_message(message)
+        if self._plugin_system:
+            self._on_message_changed.fire(message)
+
     def _find_tool_insert_position(self, tool_call_id: str) -> int:
         """Find the correct insertion position for a tool result.
         
@@ -319,6 +344,34 @@ class MessageHistory:
         """Get all messages"""
         return self.messages.copy()
 
+    def get_messages_with_seq(self) -> List[Tuple[int, Dict[str, Any]]]:
+        """
+        (seq, message) for every message, in history order.
+
+        A message gets the next sequence number the first time it is read
+        here and keeps it while it stays in the history (compaction and
+        reloads keep the seqs of retained messages), so every message added
+        since a reader's last call has a seq above the last_seq it saw.
+        Safe to call from other threads while the agent edits the history.
+        """
+        with self._seq_lock:
+            seqs = self._seqs
+            pairs = []
+            for msg in list(self.messages):  # The agent thread may insert meanwhile
+                entry = seqs.get(id(msg))
+                if entry is None or entry[1] is not msg:
+                    entry = seqs[id(msg)] = (next(self._seq_counter), msg)
+                    self.last_seq = entry[0]
+                pairs.append(entry)
+            # Forget messages that left the history
+            if len(seqs) != len(pairs):
+                self._seqs = {id(msg): (seq, msg) for seq, msg in pairs}
+        return pairs
+
+    def get_messages_since(self, seq: int) -> List[Tuple[int, Dict[str, Any]]]:
+        """(seq, message) for messages with a seq above seq, in history order"""
+        return [pair for pair in self.get_messages_with_seq() if pair[0] > seq]
+
     def get_chat_messages(self) -> List[Dict[str, Any]]:
         """Get chat messages (excluding system messages)"""
         return [msg for msg in self.messages if msg.get("role") != "system"]
@@ -563,9 +616,7 @@ class MessageHistory:
                         PRUNE_PROTECTION_THRESHOLD,
                     ):
                         self.messages[message_index]["content"] = PRUNED_TOOL_MESSAGE
-                        # Update the token cache for this modified message
-                        from .token_estimator import cache_message
-                        cache_message(self.messages[message_index])
+                        self._message_changed(self.messages[message_index])
                         pruned_count += 1
 
         self.estimate_context()
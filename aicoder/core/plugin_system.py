@@ -10,18 +10,23 @@ Design principles:
 - Closure state: Plugin state in closures, no complex state mgmt
 - Direct access: Plugins get ctx.app for direct component access
 - Elegant indirections: Only registration methods (register_tool, etc.) are bridged
+- Lazy commands: a manifest cache (.aicoder/plugin_manifest.json) records what
+  each plugin registers; command-only plugins are imported on first use
 """
 
+import json
 import os
 import sys
 import time
 import importlib.util
 import threading
 import subprocess
-from typing import Any, Callable, Dict, List, Optional, Set, TYPE_CHECKING
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, TYPE_CHECKING
 from aicoder.utils.log import LogUtils
 from pathlib import Path
 
+from aicoder.core import tracing
 from aicoder.core.config import Config
 
 if TYPE_CHECKING:
@@ -102,6 +107,70 @@ class PluginContext:
             self._register_completer_fn(completer)
 
 
+class HookTiming:
+    """Timing samples for one (event, plugin) pair - simple class instead of dataclass"""
+
+    __slots__ = ("count", "total_ns", "max_ns", "samples")
+
+    # Percentiles come from the most recent calls only, so memory is bounded
+    MAX_SAMPLES = 1024
+
+    def __init__(self):
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.samples: deque = deque(maxlen=self.MAX_SAMPLES)
+
+    def add(self, elapsed_ns: int) -> None:
+        """Record one call"""
+        self.count += 1
+        self.total_ns += elapsed_ns
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+        self.samples.append(elapsed_ns)
+
+    def percentile(self, pct: float) -> int:
+        """Nearest-rank percentile of the recent samples, in ns"""
+        return _nearest_rank(sorted(self.samples), pct)
+
+
+def _nearest_rank(ordered: List[int], pct: float) -> int:
+    """Nearest-rank percentile of already sorted samples (0 when empty)"""
+    if not ordered:
+        return 0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def _no_hooks(*args, **kwargs) -> None:
+    """Dispatch target for events without handlers"""
+    return None
+
+
+def _no_hooks_chain(value: Any, *args, **kwargs) -> Any:
+    """Chained dispatch target for events without handlers"""
+    return value
+
+
+class HookDispatcher:
+    """
+    Compiled handlers for one event - simple class instead of dataclass.
+
+    fire() calls every hook and discards results, call() returns the list
+    of results (or None) like call_hooks, chain() passes a value through
+    like call_hooks_with_return. The plugin system swaps these in place
+    when hooks are registered or profiling changes, so call sites can bind
+    a dispatcher once. An unbound dispatcher does nothing.
+    """
+
+    __slots__ = ("event", "fire", "call", "chain")
+
+    def __init__(self, event: str):
+        self.event = event
+        self.fire: Callable[..., None] = _no_hooks
+        self.call: Callable[..., Any] = _no_hooks
+        self.chain: Callable[..., Any] = _no_hooks_chain
+
+
 class PluginSystem:
     """
     Ultra-fast plugin loader — 3-tier priority
@@ -117,8 +186,10 @@ class PluginSystem:
     """
 
     def __init__(self, plugins_dir: str = ".aicoder/plugins",
-                 global_plugins_dir: Optional[str] = None):
+                 global_plugins_dir: Optional[str] = None,
+                 manifest_path: str = ".aicoder/plugin_manifest.json"):
         self.plugins_dir = plugins_dir
+        self.manifest_path = manifest_path
         self.global_plugins_dir = global_plugins_dir or os.path.expanduser("~/.config/aicoder-v3/plugins")
         # Bundled plugins dir is always relative to package, not CWD
         self.bundled_plugins_dir = os.path.join(
@@ -132,6 +203,27 @@ class PluginSystem:
         self.hooks: Dict[str, List[Callable]] = {}
         self.cleanup_handlers: List[Callable] = []
 
+        # Lazy loading: plugin path -> manifest record, name -> (path, commands)
+        self._manifest: Dict[str, Dict[str, Any]] = {}
+        self._manifest_dirty = False
+        self._recording: Optional[Dict[str, Any]] = None
+        self.deferred_plugins: Dict[str, tuple] = {}  # name -> (path, commands, source)
+        self._deferred_lock = threading.Lock()  # Stubs vs background preload
+
+        # Compiled per-event dispatch, rebuilt on registration/profiling changes
+        self._dispatchers: Dict[str, HookDispatcher] = {}
+
+        # Hook profiling: off by default so dispatch stays a plain loop
+        self.hook_timings: Dict[Tuple[str, str], HookTiming] = {}
+        self._timings_lock = threading.Lock()  # Agent thread records, socket thread reports
+        self._hook_owners: Dict[int, str] = {}
+        self.profiling = False
+        self.tracing = False
+        self.slow_hook_ns = 0
+        self._timed = False
+        self.set_profiling(Config.hook_profiling())
+        self.set_slow_hook_ms(Config.hook_slow_ms())
+
         # Context object with registration callbacks
         self.context = PluginContext()
         self.context._register_tool_fn = self._register_tool
@@ -158,11 +250,14 @@ class PluginSystem:
         generate_preview: Optional[Callable] = None,
     ) -> None:
         """Internal: register a tool (filtered by TOOLS_ALLOW and TOOLS_DENY)"""
-        allowed = Config.tools_allow()
+        if self._recording is not None:
+            self._recording["tools"].append(name)
+        cfg = Config.snapshot()
+        allowed = cfg.tools_allow
         if allowed is not None and name not in allowed:
             return  # Skip this tool - not in allowed list
 
-        denied = Config.tools_deny()
+        denied = cfg.tools_deny
         if name in denied:
             return  # Skip this tool - in deny list
 
@@ -179,16 +274,46 @@ class PluginSystem:
         self, name: str, handler: Callable, description: Optional[str]
     ) -> None:
         """Internal: register a command"""
+        if self._recording is not None:
+            self._recording["commands"][name] = description
         self.commands[name] = {"fn": handler, "description": description}
 
     def _register_hook(self, event_name: str, handler: Callable) -> None:
         """Internal: register an event hook"""
+        if self._recording is not None:
+            self._recording["hooks"].append(event_name)
         if event_name not in self.hooks:
             self.hooks[event_name] = []
         self.hooks[event_name].append(handler)
+        if event_name in self._dispatchers:
+            self._compile(self._dispatchers[event_name])
+
+    def add_hook(self, event_name: str, handler: Callable) -> None:
+        """Register a hook from core code (not a plugin), e.g. socket subscriptions"""
+        # Copy-on-write: the socket thread calls this while the agent thread may
+        # be iterating the current list in a timed dispatch
+        self.hooks[event_name] = self.hooks.get(event_name, []) + [handler]
+        if event_name in self._dispatchers:
+            self._compile(self._dispatchers[event_name])
+
+    def remove_hook(self, event_name: str, handler: Callable) -> None:
+        """Unregister a hook added with add_hook or register_hook"""
+        hooks = self.hooks.get(event_name)
+        if not hooks or handler not in hooks:
+            return
+        hooks = list(hooks)  # Copy-on-write, as in add_hook
+        hooks.remove(handler)
+        if hooks:
+            self.hooks[event_name] = hooks
+        else:
+            del self.hooks[event_name]
+        if event_name in self._dispatchers:
+            self._compile(self._dispatchers[event_name])
 
     def _register_completer(self, completer: Callable) -> None:
         """Internal: register a completer function"""
+        if self._recording is not None:
+            self._recording["completers"] += 1
         if self._app and self._app.input_handler:
             self._app.input_handler.register_completer(completer)
 
@@ -230,15 +355,21 @@ class PluginSystem:
         - Same name in higher-priority dir overrides lower (no duplicate loading)
         """
         total_start = time.perf_counter()
+        self._load_manifest()
 
         self._load_plugins_from_dir(self.plugins_dir, "local")
         self._load_plugins_from_dir(self.global_plugins_dir, "global")
         self._load_plugins_from_dir(self.bundled_plugins_dir, "bundled")
 
+        self._save_manifest()
+
         # Debug timing
-        if Config.debug() and self.plugins:
+        if Config.debug() and (self.plugins or self.deferred_plugins):
             total_dt = time.perf_counter() - total_start
-            print(f"[+] Plugins loaded in {total_dt:.3f}s ({len(self.plugins)} plugins)")
+            print(
+                f"[+] Plugins loaded in {total_dt:.3f}s ({len(self.plugins)} plugins, "
+                f"{len(self.deferred_plugins)} deferred until first command use)"
+            )
 
     def _load_plugins_from_dir(self, dir_path: str, source: str) -> None:
         """Load plugins from a single directory, skipping already-loaded names"""
@@ -252,16 +383,20 @@ class PluginSystem:
             if plugin_name in self.loaded_plugin_names:
                 continue  # Already loaded from higher-priority source
 
-            t0 = time.perf_counter()
-            self._load_single_plugin(plugin_path, plugin_name)
-            dt = time.perf_counter() - t0
+            if self._defer_plugin(plugin_path, plugin_name, source):
+                if Config.debug():
+                    commands = ", ".join(self.deferred_plugins[plugin_name][1])
+                    print(f"[+] Deferred plugin: {plugin_name} (commands: {commands})")
+                continue
 
-            if Config.debug():
-                print(f"[+] Loaded plugin: {plugin_name} ({dt:.3f}s)")
+            self._load_single_plugin(plugin_path, plugin_name, source)
 
-    def _load_single_plugin(self, plugin_path: str, plugin_name: str) -> None:
-        """Load a single plugin file"""
+    def _load_single_plugin(self, plugin_path: str, plugin_name: str, source: str = "local") -> None:
+        """Load a single plugin file, recording what it registers in the manifest"""
+        record = {"hooks": [], "commands": {}, "tools": [], "completers": 0}
+        self._recording = record
         try:
+            t0 = time.perf_counter()
             # Fast import using importlib
             spec = importlib.util.spec_from_file_location(
                 f"plugin_{plugin_name}", plugin_path
@@ -270,6 +405,7 @@ class PluginSystem:
 
             # Execute module
             spec.loader.exec_module(module)
+            t1 = time.perf_counter()
 
             # Call create_plugin(context) if exists (duck typing)
             if hasattr(module, "create_plugin"):
@@ -283,8 +419,117 @@ class PluginSystem:
                 if result and isinstance(result, dict) and "cleanup" in result:
                     self.cleanup_handlers.append(result["cleanup"])
 
+                # Bundled plugins may be deferred unless they opt out;
+                # local/global ones only when they opt in
+                record["lazy"] = bool(getattr(module, "LAZY_LOAD", source == "bundled"))
+                record["returns"] = result is not None
+                self._remember(plugin_path, record)
+
+            if Config.debug():
+                t2 = time.perf_counter()
+                print(f"[+] Loaded plugin: {plugin_name} ({t2 - t0:.3f}s: import {t1 - t0:.3f}s, create {t2 - t1:.3f}s)")
+
         except Exception as e:
             LogUtils.error(f"[!] Failed to load plugin {plugin_path}: {e}")
+        finally:
+            self._recording = None
+
+    # ==================== Lazy loading ====================
+
+    def _load_manifest(self) -> None:
+        """Read the manifest cache (missing or corrupt = empty)"""
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self._manifest = data.get("plugins", {}) if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            self._manifest = {}
+
+    def _save_manifest(self) -> None:
+        """Write the manifest cache if any plugin was (re)recorded"""
+        if not self._manifest_dirty:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.manifest_path) or ".", exist_ok=True)
+            tmp = self.manifest_path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"version": 1, "plugins": self._manifest}, f, indent=1)
+            os.replace(tmp, self.manifest_path)
+            self._manifest_dirty = False
+        except OSError:
+            pass  # Cache only: next startup just loads eagerly again
+
+    def _remember(self, plugin_path: str, record: Dict[str, Any]) -> None:
+        """Store what a plugin registered, keyed by its path and file stamp"""
+        try:
+            st = os.stat(plugin_path)
+        except OSError:
+            return
+        record["mtime_ns"] = st.st_mtime_ns
+        record["size"] = st.st_size
+        if self._manifest.get(plugin_path) != record:
+            self._manifest[plugin_path] = record
+            self._manifest_dirty = True
+
+    def _defer_plugin(self, plugin_path: str, plugin_name: str, source: str) -> bool:
+        """
+        Register stubs instead of importing when the manifest (for this exact
+        file) says the plugin only registers commands and has no other
+        registrations or return value. Returns True if deferred.
+        """
+        if not Config.lazy_plugins():
+            return False
+        record = self._manifest.get(plugin_path)
+        if not record or not record.get("lazy") or not record.get("commands"):
+            return False
+        if record.get("hooks") or record.get("tools") or record.get("completers") or record.get("returns"):
+            return False
+        try:
+            st = os.stat(plugin_path)
+        except OSError:
+            return False
+        if st.st_mtime_ns != record.get("mtime_ns") or st.st_size != record.get("size"):
+            return False
+
+        commands = list(record["commands"])
+        for command_name, description in record["commands"].items():
+            self.commands[command_name] = {
+                "fn": self._deferred_command(plugin_name, command_name),
+                "description": description,
+            }
+        self.deferred_plugins[plugin_name] = (plugin_path, commands, source)
+        self.loaded_plugin_names.add(plugin_name)
+        return True
+
+    def _deferred_command(self, plugin_name: str, command_name: str) -> Callable:
+        """Stub handler that imports the plugin on first call, then delegates"""
+        stub = None
+
+        def run_deferred(*args, **kwargs):
+            self.load_deferred_plugin(plugin_name)  # No-op once loaded
+            entry = self.commands.get(command_name)
+            if not entry or entry["fn"] is stub:
+                LogUtils.error(f"[!] Plugin {plugin_name} no longer provides command {command_name}")
+                return None
+            return entry["fn"](*args, **kwargs)
+
+        stub = run_deferred
+        return run_deferred
+
+    def load_deferred_plugin(self, plugin_name: str) -> None:
+        """Import a deferred plugin now (its commands replace the stubs)"""
+        with self._deferred_lock:
+            if plugin_name not in self.deferred_plugins:
+                return  # Already loaded by another thread
+            plugin_path, _, source = self.deferred_plugins.pop(plugin_name)
+            self.loaded_plugin_names.discard(plugin_name)
+            self._load_single_plugin(plugin_path, plugin_name, source)
+            self._save_manifest()
+
+    def load_deferred_plugins(self) -> None:
+        """Import every deferred plugin (background startup, after the prompt)"""
+        for plugin_name in list(self.deferred_plugins):
+            self.load_deferred_plugin(plugin_name)
 
     def get_plugin_tools(self) -> Dict[str, Dict]:
         """Get all tools from plugins"""
@@ -294,20 +539,73 @@ class PluginSystem:
         """Get all commands from plugins"""
         return self.commands.copy()
 
-    def call_hooks(self, event_name: str, *args, **kwargs) -> Any:
-        """Call all hooks for an event"""
-        if event_name not in self.hooks:
-            return None
+    def dispatcher(self, event_name: str) -> HookDispatcher:
+        """Get the compiled dispatcher for an event (stays valid as hooks change)"""
+        dispatcher = self._dispatchers.get(event_name)
+        if dispatcher is None:
+            dispatcher = self._dispatchers[event_name] = HookDispatcher(event_name)
+            self._compile(dispatcher)
+        return dispatcher
+
+    def _compile(self, dispatcher: HookDispatcher) -> None:
+        """Build the fire/call/chain functions for an event's current hooks"""
+        event_name = dispatcher.event
+        hooks = tuple(self.hooks.get(event_name, ()))
+        if not hooks:
+            dispatcher.fire = dispatcher.call = _no_hooks
+            dispatcher.chain = _no_hooks_chain
+            return
 
-        results = []
-        for hook in self.hooks[event_name]:
-            try:
-                result = hook(*args, **kwargs)
-                results.append(result)
-            except Exception as e:
-                LogUtils.error(f"[!] Hook {event_name} failed: {e}")
+        if self._timed:
+            def fire(*args, **kwargs):
+                self._call_hooks_timed(event_name, args, kwargs)
 
-        return results if results else None
+            def call(*args, **kwargs):
+                return self._call_hooks_timed(event_name, args, kwargs)
+
+            def chain(value, *args, **kwargs):
+                return self._call_hooks_with_return_timed(event_name, value, args, kwargs)
+
+            dispatcher.fire, dispatcher.call, dispatcher.chain = fire, call, chain
+            return
+
+        def fire(*args, **kwargs):
+            for hook in hooks:
+                try:
+                    hook(*args, **kwargs)
+                except Exception as e:
+                    LogUtils.error(f"[!] Hook {event_name} failed: {e}")
+
+        def call(*args, **kwargs):
+            results = []
+            for hook in hooks:
+                try:
+                    results.append(hook(*args, **kwargs))
+                except Exception as e:
+                    LogUtils.error(f"[!] Hook {event_name} failed: {e}")
+            return results if results else None
+
+        def chain(value, *args, **kwargs):
+            for hook in hooks:
+                try:
+                    result = hook(value, *args, **kwargs)
+                    if result is not None:
+                        value = result
+                except Exception as e:
+                    LogUtils.error(f"[!] Hook {event_name} failed: {e}")
+            return value
+
+        dispatcher.fire, dispatcher.call, dispatcher.chain = fire, call, chain
+
+    def call_hooks(self, event_name: str, *args, **kwargs) -> Any:
+        """Call all hooks for an event, returning their results or None"""
+        dispatcher = self._dispatchers.get(event_name) or self.dispatcher(event_name)
+        return dispatcher.call(*args, **kwargs)
+
+    def fire(self, event_name: str, *args, **kwargs) -> None:
+        """Call all hooks for an event without collecting results"""
+        dispatcher = self._dispatchers.get(event_name) or self.dispatcher(event_name)
+        dispatcher.fire(*args, **kwargs)
 
     def call_hooks_with_return(self, event_name: str, value: Any, *args, **kwargs) -> Any:
         """
@@ -316,20 +614,118 @@ class PluginSystem:
         Each hook receives the value and returns transformed value (or original).
         The last hook's result is returned.
         """
-        if event_name not in self.hooks:
-            return value
+        dispatcher = self._dispatchers.get(event_name) or self.dispatcher(event_name)
+        return dispatcher.chain(value, *args, **kwargs)
+
+    # ==================== Hook profiling ====================
+
+    def set_profiling(self, enabled: bool) -> None:
+        """Turn per-hook timing on or off (recorded timings are kept)"""
+        self.profiling = enabled
+        self._set_timed()
+
+    def set_tracing(self, enabled: bool) -> None:
+        """Record each hook call as a span of the active turn trace"""
+        self.tracing = enabled
+        self._set_timed()
+
+    def set_slow_hook_ms(self, ms: float) -> None:
+        """Warn when a single hook call takes longer than ms (0 = off)"""
+        self.slow_hook_ns = int(ms * 1_000_000) if ms and ms > 0 else 0
+        self._set_timed()
+
+    def _set_timed(self) -> None:
+        """Recompile dispatchers when switching between timed and plain loops"""
+        timed = self.profiling or self.tracing or self.slow_hook_ns > 0
+        if timed != self._timed:
+            self._timed = timed
+            for dispatcher in self._dispatchers.values():
+                self._compile(dispatcher)
+
+    def reset_profile(self) -> None:
+        """Drop recorded hook timings"""
+        with self._timings_lock:
+            self.hook_timings.clear()
+
+    def _hook_owner(self, hook: Callable) -> str:
+        """Plugin name owning a hook (plugin modules are named plugin_<name>)"""
+        owner = self._hook_owners.get(id(hook))
+        if owner is None:
+            target = getattr(hook, "func", hook)  # functools.partial
+            module = getattr(target, "__module__", None) or "?"
+            owner = module[len("plugin_"):] if module.startswith("plugin_") else module
+            self._hook_owners[id(hook)] = owner
+        return owner
+
+    def _record_hook(self, event_name: str, hook: Callable, start_ns: int, elapsed_ns: int) -> None:
+        """Store one timing, trace it and warn if it crossed the slow threshold"""
+        if self.tracing:
+            tracing.record(f"hook:{event_name}", start_ns, elapsed_ns, plugin=self._hook_owner(hook))
+        if self.profiling:
+            key = (event_name, self._hook_owner(hook))
+            with self._timings_lock:
+                timing = self.hook_timings.get(key)
+                if timing is None:
+                    timing = self.hook_timings[key] = HookTiming()
+                timing.add(elapsed_ns)
+        if self.slow_hook_ns and elapsed_ns > self.slow_hook_ns:
+            LogUtils.warn(
+                f"[!] Slow hook {event_name} ({self._hook_owner(hook)}): {elapsed_ns / 1_000_000:.1f}ms"
+            )
 
+    def _call_hooks_timed(self, event_name: str, args: tuple, kwargs: dict) -> Any:
+        """call_hooks with per-hook timing"""
+        results = []
+        clock = time.perf_counter_ns
+        for hook in self.hooks.get(event_name, ()):
+            t0 = clock()
+            try:
+                results.append(hook(*args, **kwargs))
+            except Exception as e:
+                LogUtils.error(f"[!] Hook {event_name} failed: {e}")
+            self._record_hook(event_name, hook, t0, clock() - t0)
+
+        return results if results else None
+
+    def _call_hooks_with_return_timed(self, event_name: str, value: Any, args: tuple, kwargs: dict) -> Any:
+        """call_hooks_with_return with per-hook timing"""
         current_value = value
-        for hook in self.hooks[event_name]:
+        clock = time.perf_counter_ns
+        for hook in self.hooks.get(event_name, ()):
+            t0 = clock()
             try:
                 result = hook(current_value, *args, **kwargs)
                 if result is not None:
                     current_value = result
             except Exception as e:
                 LogUtils.error(f"[!] Hook {event_name} failed: {e}")
+            self._record_hook(event_name, hook, t0, clock() - t0)
 
         return current_value
 
+    def profile_report(self) -> List[Dict[str, Any]]:
+        """Hook timings per (event, plugin), slowest total first, in ms"""
+        # Copy under the lock, sort outside it: the agent thread keeps recording
+        with self._timings_lock:
+            snapshot = [
+                (key, timing.count, timing.total_ns, timing.max_ns, list(timing.samples))
+                for key, timing in self.hook_timings.items()
+            ]
+        rows = []
+        for (event_name, plugin), count, total_ns, max_ns, samples in snapshot:
+            samples.sort()
+            rows.append({
+                "event": event_name,
+                "plugin": plugin,
+                "count": count,
+                "total_ms": total_ns / 1_000_000,
+                "p50_ms": _nearest_rank(samples, 50) / 1_000_000,
+                "p99_ms": _nearest_rank(samples, 99) / 1_000_000,
+                "max_ms": max_ns / 1_000_000,
+            })
+        rows.sort(key=lambda r: r["total_ms"], reverse=True)
+        return rows
+
     def cleanup(self) -> None:
         """Cleanup all plugins"""
         for cleanup_fn in self.cleanup_handlers:
@@ -0,0 +1,327 @@
+"""
+On-demand profiler for a live session
+Stateless module functions with module-level profiler state
+
+Sampling mode walks sys._current_frames() from a daemon thread at a fixed rate
+and counts whole stacks, so it sees every thread without restarting the
+session. Stopping writes collapsed stacks (one "thread;outer;...;leaf count"
+line per stack, the input of flamegraph.pl and speedscope) and a top-N report
+to .aicoder/profiles/. Turn mode instead runs cProfile around exactly the next
+AI turn, on the thread that runs it.
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+PROFILE_DIR = ".aicoder/profiles"
+DEFAULT_TOP = 20
+# Frames kept per sampled stack (outermost frames beyond this are dropped)
+MAX_DEPTH = 128
+MAX_HZ = 1000
+
+
+class _Sampler:
+    """Background thread counting the stacks of every other thread"""
+
+    __slots__ = (
+        "hz", "stacks", "samples", "started", "stopped", "busy",
+        "_labels", "_thread_names", "_stop", "_thread", "_lock",
+    )
+
+    def __init__(self, hz: float):
+        self.hz = hz
+        # (thread id, code ids outermost first) -> samples
+        self.stacks: Dict[Tuple[int, Tuple[int, ...]], int] = {}
+        self.samples = 0
+        self.started = 0.0
+        self.stopped = 0.0
+        self.busy = 0.0  # Seconds spent sampling, for the overhead estimate
+        # id(code) -> (code, label); holding the code keeps its id from being reused
+        self._labels: Dict[int, Tuple[Any, str]] = {}
+        self._thread_names: Dict[int, str] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()  # sample() vs report() from other threads
+
+    def start(self) -> None:
+        """Start sampling on a daemon thread"""
+        self.started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="aicoder-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling and wait for the thread to exit"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self.stopped = time.perf_counter()
+
+    def _run(self) -> None:
+        """Sample every 1/hz seconds; a late sample doesn't cause a burst"""
+        own = threading.get_ident()
+        interval = 1.0 / self.hz
+        clock = time.perf_counter
+        next_at = clock()
+        while not self._stop.wait(max(0.0, next_at - clock())):
+            t0 = clock()
+            self.sample(own)
+            done = clock()
+            self.busy += done - t0
+            next_at += interval
+            if next_at < done:
+                next_at = done + interval
+
+    def sample(self, skip_tid: int) -> None:
+        """Count the current stack of every thread except skip_tid"""
+        labels = self._labels
+        stacks = self.stacks
+        with self._lock:  # report() snapshots stacks from another thread
+            for tid, frame in sys._current_frames().items():
+                if tid == skip_tid:
+                    continue
+                codes = []
+                while frame is not None and len(codes) < MAX_DEPTH:
+                    code = frame.f_code
+                    code_id = id(code)
+                    if code_id not in labels:
+                        name = getattr(code, "co_qualname", code.co_name)
+                        labels[code_id] = (code, f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    codes.append(code_id)
+                    frame = frame.f_back
+                codes.reverse()
+                key = (tid, tuple(codes))
+                stacks[key] = stacks.get(key, 0) + 1
+                if tid not in self._thread_names:
+                    self._thread_names.update((t.ident, t.name) for t in threading.enumerate())
+                    self._thread_names.setdefault(tid, str(tid))  # Started without threading
+        self.samples += 1
+
+    def elapsed(self) -> float:
+        """Seconds sampled so far"""
+        return (self.stopped or time.perf_counter()) - self.started
+
+    def labelled(self) -> List[Tuple[List[str], int]]:
+        """Stacks as frame labels, thread name first, with their counts"""
+        labels = self._labels  # Only grows, and reading existing keys is safe
+        with self._lock:
+            names = dict(self._thread_names)
+            stacks = list(self.stacks.items())
+        return [
+            ([names.get(tid, str(tid))] + [labels[code_id][1] for code_id in codes], count)
+            for (tid, codes), count in stacks
+        ]
+
+
+# Module-level state: the running sampler, whether the next turn runs under
+# cProfile, and the result of the last finished run
+_sampler: Optional[_Sampler] = None
+_turn_armed = False
+_turn_running = False
+_last: Optional[Dict[str, Any]] = None
+_last_sampler: Optional[_Sampler] = None  # Kept so report() can use another top-N
+
+
+class _NoTurn:
+    """Shared no-op context while no turn profile is armed"""
+
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+_NO_TURN = _NoTurn()
+
+
+class _TurnProfile:
+    """cProfile around one turn, saved and reported on exit"""
+
+    __slots__ = ("profile", "started")
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+        self.started = 0.0
+
+    def __enter__(self) -> None:
+        global _turn_armed, _turn_running
+        _turn_armed = False
+        try:
+            self.profile.enable()
+        except ValueError:
+            self.profile = None  # Another profiler (debugger, coverage) is active
+            return
+        _turn_running = True
+        self.started = time.perf_counter()
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        global _turn_running, _last
+        if self.profile is None:
+            return False
+        self.profile.disable()
+        _turn_running = False
+        duration = time.perf_counter() - self.started
+
+        stream = io.StringIO()
+        pstats.Stats(self.profile, stream=stream).sort_stats("cumulative").print_stats(DEFAULT_TOP)
+        report = stream.getvalue().strip().splitlines()
+        _last = {"mode": "turn", "duration_s": round(duration, 3), "report": report, "files": {}}
+        stem = _output_stem()
+        try:
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            self.profile.dump_stats(stem + ".prof")
+            _last["files"]["pstats"] = stem + ".prof"
+            _write(stem + ".txt", "\n".join(report) + "\n")
+            _last["files"]["report"] = stem + ".txt"
+        except OSError:
+            pass  # The report stays available through report()
+        return False
+
+
+def start(hz: float) -> None:
+    """Start sampling all threads at hz samples per second"""
+    global _sampler
+    if running():
+        raise RuntimeError("Profiler already running (/profile stop first)")
+    if not 0 < hz <= MAX_HZ:
+        raise ValueError(f"Sampling rate must be between 0 and {MAX_HZ} Hz")
+    _sampler = _Sampler(hz)
+    _sampler.start()
+
+
+def arm_turn() -> None:
+    """Run cProfile around the next AI turn"""
+    global _turn_armed
+    if running():
+        raise RuntimeError("Profiler already running (/profile stop first)")
+    _turn_armed = True
+
+
+def turn():
+    """Context manager for an AI turn: profiles it if turn mode is armed"""
+    if not _turn_armed or _turn_running:
+        return _NO_TURN
+    return _TurnProfile()
+
+
+def running() -> bool:
+    """Whether a sampler runs or a turn profile is armed or in progress"""
+    return _sampler is not None or _turn_armed or _turn_running
+
+
+def stop() -> Optional[Dict[str, Any]]:
+    """
+    Stop sampling and write the collapsed stacks and report; disarms turn mode.
+    Returns the summary of the finished run, or None if nothing was sampling.
+    """
+    global _sampler, _turn_armed, _last, _last_sampler
+    _turn_armed = False
+    sampler, _sampler = _sampler, None
+    if sampler is None:
+        return None
+    sampler.stop()
+
+    _last_sampler = sampler
+    _last = _summary(sampler)
+    _last["report"] = _format_report(sampler, DEFAULT_TOP)
+    collapsed = "".join(f"{';'.join(frames)} {count}\n" for frames, count in sorted(sampler.labelled()))
+    stem = _output_stem()
+    try:
+        _write(stem + ".collapsed", collapsed)
+        _last["files"]["collapsed"] = stem + ".collapsed"
+        _write(stem + ".txt", "\n".join(_last["report"]) + "\n")
+        _last["files"]["report"] = stem + ".txt"
+    except OSError:
+        pass  # The report stays available through report()
+    return last_run()
+
+
+def status() -> Dict[str, Any]:
+    """Current mode and, while sampling, its progress"""
+    if _sampler is not None:
+        return {"running": True, "mode": "sample", **_summary(_sampler)}
+    if _turn_armed or _turn_running:
+        return {"running": True, "mode": "turn", "in_turn": _turn_running}
+    return {"running": False}
+
+
+def report(top: int = DEFAULT_TOP) -> List[str]:
+    """Top-N report of the running sampler, else of the last finished run"""
+    if _sampler is not None:
+        return _format_report(_sampler, top)
+    if _last is None:
+        return []
+    if _last["mode"] == "sample" and _last_sampler is not None:
+        return _format_report(_last_sampler, top)
+    return _last["report"]
+
+
+def last_run() -> Optional[Dict[str, Any]]:
+    """Summary of the last finished run (mode, files, ...), or None"""
+    if _last is None:
+        return None
+    return {key: value for key, value in _last.items() if key != "report"}
+
+
+def _summary(sampler: _Sampler) -> Dict[str, Any]:
+    """Sample counts, rate and the sampler's own cost"""
+    elapsed = sampler.elapsed()
+    return {
+        "mode": "sample",
+        "hz": sampler.hz,
+        "samples": sampler.samples,
+        "duration_s": round(elapsed, 3),
+        "overhead_pct": round(sampler.busy / elapsed * 100, 2) if elapsed > 0 else 0.0,
+        "files": {},
+    }
+
+
+def _format_report(sampler: _Sampler, top: int) -> List[str]:
+    """Per-thread sample counts, then functions by self and total samples"""
+    stacks = sampler.labelled()
+    self_counts: Dict[str, int] = {}
+    total_counts: Dict[str, int] = {}
+    thread_counts: Dict[str, int] = {}
+    for frames, count in stacks:
+        thread_counts[frames[0]] = thread_counts.get(frames[0], 0) + count
+        if len(frames) > 1:
+            self_counts[frames[-1]] = self_counts.get(frames[-1], 0) + count
+        for label in set(frames[1:]):  # Recursion counts once per stack
+            total_counts[label] = total_counts.get(label, 0) + count
+
+    summary = _summary(sampler)
+    total = sum(thread_counts.values()) or 1
+    lines = [
+        f"{summary['samples']} samples over {summary['duration_s']:.1f}s at {sampler.hz:g} Hz "
+        f"(sampler overhead {summary['overhead_pct']:.2f}%)",
+        "Threads: " + ", ".join(
+            f"{name} {count}" for name, count in sorted(thread_counts.items(), key=lambda i: -i[1])
+        ),
+        f"{'self %':>7} {'total %':>8} {'self':>7} {'total':>7}  function",
+    ]
+    for label, count in sorted(self_counts.items(), key=lambda i: -i[1])[:top]:
+        lines.append(
+            f"{count / total * 100:>7.1f} {total_counts[label] / total * 100:>8.1f} "
+            f"{count:>7} {total_counts[label]:>7}  {label}"
+        )
+    return lines
+
+
+def _output_stem() -> str:
+    """Path under PROFILE_DIR, without extension, for a finished run"""
+    return os.path.join(PROFILE_DIR, f"profile-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}")
+
+
+def _write(path: str, text: str) -> None:
+    """Write text, creating PROFILE_DIR"""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
@@ -4,12 +4,21 @@ Extracted from AICoder class for better separation of concerns
 """
 
 import json
+import sys
+from contextlib import nullcontext
 from typing import Dict, Any, List
 
+from aicoder.core import tracing
 from aicoder.core.config import Config
 from aicoder.utils.log import LogUtils
 
 
+def _profile_turn():
+    """Profiler context for a turn, without importing the profiler before /profile has"""
+    profiler = sys.modules.get("aicoder.core.profiler")
+    return profiler.turn() if profiler else nullcontext()
+
+
 class SessionManager:
     """Handles the main AI session processing workflow"""
 
@@ -31,40 +40,67 @@ class SessionManager:
         if Config.debug():
             LogUtils.debug("*** process_with_ai called")
 
-        # Ensure all tool calls have corresponding responses before making API call
-        self._ensure_tool_calls_have_responses()
+        with tracing.turn("process_with_ai") as turn, _profile_turn():
+            # Background startup (system prompt, socket, plugins) must be done first
+            with tracing.span("startup_wait"):
+                self.app.startup.wait()
 
-        self.is_processing = True
+            # Ensure all tool calls have corresponding responses before making API call
+            self._ensure_tool_calls_have_responses()
 
-        try:
-            preparation = self._prepare_for_processing()
-            if Config.debug():
-                LogUtils.debug(
-                    f"*** prepare_for_processing returned should_continue={preparation.get('should_continue')}"
-                )
-            if not preparation["should_continue"]:
-                return
-
-            self.streaming_client.reset_colorizer()
-
-            streaming_result = self._stream_response(preparation["messages"])
-            if not streaming_result["should_continue"]:
-                return
-
-            has_tool_calls, status = self._validate_and_process_tool_calls(
-                streaming_result["full_response"],
-                streaming_result.get("reasoning_content", ""),
-                streaming_result.get("reasoning_field"),
-                streaming_result["accumulated_tool_calls"],
-                streaming_result.get("thinking_signature", ""),
-            )
+            self.is_processing = True
+            if self.plugin_system:
+                self.plugin_system.fire("on_processing_start")
+
+            try:
+                with tracing.span("prepare"):
+                    preparation = self._prepare_for_processing()
+                if Config.debug():
+                    LogUtils.debug(
+                        f"*** prepare_for_processing returned should_continue={preparation.get('should_continue')}"
+                    )
+                if not preparation["should_continue"]:
+                    return
 
-            self._handle_post_processing(has_tool_calls, status)
+                self.streaming_client.reset_colorizer()
 
-        except Exception as e:
-            self._handle_processing_error(e)
-        finally:
-            self.is_processing = False
+                with tracing.span("stream_response", messages=len(preparation["messages"])) as stream_span:
+                    streaming_result = self._stream_response(preparation["messages"])
+                    if tracing.active():
+                        stream_span.set(**self._timing_attrs())
+                if not streaming_result["should_continue"]:
+                    return
+
+                with tracing.span("tool_calls") as tools_span:
+                    has_tool_calls, status = self._validate_and_process_tool_calls(
+                        streaming_result["full_response"],
+                        streaming_result.get("reasoning_content", ""),
+                        streaming_result.get("reasoning_field"),
+                        streaming_result["accumulated_tool_calls"],
+                        streaming_result.get("thinking_signature", ""),
+                    )
+                    tools_span.set(status=status)
+                turn.set(status=status)
+
+                self._handle_post_processing(has_tool_calls, status)
+
+            except Exception as e:
+                self._handle_processing_error(e)
+            finally:
+                self.is_processing = False
+                if self.plugin_system:
+                    self.plugin_system.fire("on_processing_stop")
+
+    def _timing_attrs(self) -> Dict[str, Any]:
+        """Network phases of the last request for the stream_response span"""
+        timings = self.stats.last_request_timings
+        if not timings:
+            return {}
+        attrs = {f"{phase}_ms": ms for phase, ms in timings.get("phases_ms", {}).items()}
+        for key in ("ttft_ms", "tokens_per_sec", "chunks"):
+            if timings.get(key) is not None:
+                attrs[key] = timings[key]
+        return attrs
 
     def _prepare_for_processing(self) -> Dict[str, Any]:
         """Prepare for AI processing"""
@@ -72,11 +108,13 @@ class SessionManager:
         if Config.auto_compact_enabled():
             current_size = self.stats.current_prompt_size or 0
             if current_size > Config.context_size():
-                self._force_compaction()
+                with tracing.span("compaction", prompt_tokens=current_size):
+                    self._force_compaction()
 
         # Show context bar before AI response
         LogUtils.print()
-        self.context_bar.print_context_bar(self.stats, self.message_history)
+        with tracing.span("context_bar"):
+            self.context_bar.print_context_bar(self.stats, self.message_history)
         
         # Call plugin hook before AI processing starts
         if self.plugin_system:
@@ -158,7 +196,7 @@ class SessionManager:
 
         # Add reasoning with the provider's field name for continuity
         if reasoning_content and reasoning_field:
-            field = Config.get_reasoning_field() or reasoning_field
+            field = Config.snapshot().reasoning_field or reasoning_field
             assistant_message[field] = reasoning_content
             if thinking_signature:
                 assistant_message["thinking_signature"] = thinking_signature
@@ -185,7 +223,8 @@ class SessionManager:
                         self.app.set_next_prompt(result)
 
         if has_tool_calls and self.is_processing and self.message_history.should_auto_compact():
-            self._perform_auto_compaction()
+            with tracing.span("auto_compaction"):
+                self._perform_auto_compaction()
 
         # Continue processing only when appropriate
         if self.is_processing:
@@ -206,7 +245,7 @@ class SessionManager:
 
     def _handle_empty_response(self, full_response: str, reasoning_content: str, reasoning_field: str, thinking_signature: str = "") -> str:
         """Handle empty/no-tool response from AI. Returns status: 'text_content' or 'empty_content'."""
-        field = Config.get_reasoning_field() or reasoning_field
+        field = Config.snapshot().reasoning_field or reasoning_field
 
         if full_response and full_response.strip() != "":
             # AI provided text response but no tools
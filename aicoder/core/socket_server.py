@@ -7,14 +7,16 @@ import os
 import sys
 import json
 import socket
+import selectors
 import threading
-import fcntl
-import select
 import subprocess
 import signal
 import time
 import base64
-from typing import Optional, Dict, Any, List
+import itertools
+from collections import deque
+from functools import partial
+from typing import Optional, Dict, Any, Callable, Deque, FrozenSet, Iterator, List, Tuple, Union
 
 from aicoder.core.config import Config
 from aicoder.utils.log import LogUtils, LogOptions
@@ -38,6 +40,27 @@ ERR_INTERNAL = 1301
 
 # Limits
 MAX_INJECT_TEXT_SIZE = 10 * 1024 * 1024  # 10MB
+MAX_LINE_SIZE = 16 * 1024 * 1024  # Base64 of MAX_INJECT_TEXT_SIZE plus command
+MAX_CLIENTS = 256
+LISTEN_BACKLOG = 64
+RECV_SIZE = 65536
+ONE_SHOT_TIMEOUT = 3.0  # Seconds a one-shot client has to send its command
+SWEEP_INTERVAL = 1.0  # How often idle one-shot clients are checked
+SUBSCRIBER_QUEUE_SIZE = 1000  # Events buffered per subscriber before dropping
+STREAM_THRESHOLD = 1024 * 1024  # Responses estimated above this are streamed
+STREAM_CHUNK_SIZE = 65536  # Bytes serialized per streamed chunk
+STREAM_CHUNKS_PER_FLUSH = 16  # Chunks sent to one client before serving others
+
+# Plugin-system events available to `subscribe`, with the names given to
+# their hook arguments in the event's "data"
+STREAM_EVENTS: Dict[str, Tuple[str, ...]] = {
+    "on_processing_start": (),
+    "on_processing_stop": (),
+    "on_stream_delta": ("kind", "text"),
+    "after_assistant_message_added": ("message",),
+    "after_tool_results_added": ("message",),
+    "after_usage_data": ("usage",),
+}
 
 
 def response(data=None, error_code=None, error_msg=None):
@@ -63,10 +86,131 @@ def response(data=None, error_code=None, error_msg=None):
     })
 
 
+class ChunkedResponse:
+    """
+    Success response whose records are serialized one at a time - simple
+    class instead of dataclass. The server sends it in STREAM_CHUNK_SIZE
+    pieces as the client reads, instead of building one string up front.
+    """
+
+    __slots__ = ("data", "key", "records", "request_id")
+
+    def __init__(self, data: Dict[str, Any], key: str, records: List[Any]):
+        self.data = data  # Other fields of the response's "data"
+        self.key = key  # Field of "data" holding the records
+        self.records = records
+        self.request_id = None
+
+    def chunks(self) -> Iterator[str]:
+        """The response line (without newline) in pieces of about STREAM_CHUNK_SIZE"""
+        head = "{"
+        if self.request_id is not None:
+            head += '"id": ' + json.dumps(self.request_id) + ", "
+        parts = [head + '"status": "success", "data": {' + json.dumps(self.key) + ": ["]
+        size = len(parts[0])
+        for i, record in enumerate(self.records):
+            text = json.dumps(record, default=str)
+            parts.append(", " + text if i else text)
+            size += len(text)
+            if size >= STREAM_CHUNK_SIZE:
+                yield "".join(parts)
+                parts = []
+                size = 0
+        rest = json.dumps(self.data)[1:]  # Remaining fields, "}" of data included
+        parts.append("]" + (", " + rest if self.data else "}") + "}")
+        yield "".join(parts)
+
+    def __str__(self) -> str:
+        return "".join(self.chunks())
+
+
+def _content_length(content: Any) -> int:
+    """Characters of text in message content (string or content parts)"""
+    if isinstance(content, str):
+        return len(content)
+    if isinstance(content, list):
+        return sum(len(part.get("text") or "") for part in content if isinstance(part, dict))
+    return 0
+
+
+def _project(message: Dict[str, Any], fields: Optional[List[str]], index: int, seq: Optional[int]) -> Dict[str, Any]:
+    """One message as a response record, limited to fields when given"""
+    if fields is None:
+        record = {"seq": seq, "index": index}
+        record.update(message)
+        return record
+    record = {}
+    for name in fields:
+        if name == "seq":
+            record["seq"] = seq
+        elif name == "index":
+            record["index"] = index
+        elif name == "length":
+            record["length"] = _content_length(message.get("content"))
+        elif name in message:
+            record[name] = message[name]
+    return record
+
+
+def _approx_size(value: Any) -> int:
+    """Rough serialized size: string lengths plus a little per item"""
+    if isinstance(value, str):
+        return len(value) + 2
+    if isinstance(value, dict):
+        return sum(len(k) + _approx_size(v) + 4 for k, v in value.items()) + 2
+    if isinstance(value, list):
+        return sum(_approx_size(v) + 2 for v in value) + 2
+    return 8
+
+
+def _records_response(records: List[Any], data: Dict[str, Any]) -> Union[str, ChunkedResponse]:
+    """Success response listing records under "messages"; streamed when large"""
+    size = 0
+    for record in records:
+        size += _approx_size(record)
+        if size > STREAM_THRESHOLD:
+            return ChunkedResponse(data, "messages", records)
+    return response({"messages": records, **data})
+
+
+class EventSubscription:
+    """Bounded event queue of one subscribed client - simple class instead of dataclass"""
+
+    __slots__ = ("events", "queue", "dropped", "reported")
+
+    def __init__(self, events: FrozenSet[str]):
+        self.events = events
+        self.queue: Deque[str] = deque()  # Serialized event lines
+        self.dropped = 0  # Events lost to a full queue
+        self.reported = 0  # Drops already announced to the client
+
+
+class SocketClient:
+    """One connected client - simple class instead of dataclass"""
+
+    __slots__ = (
+        "sock", "inbuf", "outq", "events", "persistent", "closing", "handled", "last_active", "subscription",
+    )
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.inbuf = bytearray()
+        # Pending output, sent in order; streamed responses are iterators of chunks
+        self.outq: Deque[Union[memoryview, Iterator[memoryview]]] = deque()
+        self.events = selectors.EVENT_READ
+        self.persistent = False  # Set by the first JSON request
+        self.closing = False  # Close once outq drains
+        self.handled = False  # At least one command answered
+        self.last_active = time.monotonic()
+        self.subscription: Optional[EventSubscription] = None
+
+
 class SocketServer:
     """
-    Simple Unix socket server for controlling AI Coder
-    One client at a time, simple request-response
+    Unix socket server for controlling AI Coder
+    One selector thread serves every client. Plain text commands get one
+    response and the connection closes (one-shot); JSON requests keep the
+    connection open for pipelined NDJSON request/response with ids.
     """
 
     def __init__(self, aicoder_instance):
@@ -76,6 +220,16 @@ class SocketServer:
         self.server_thread: Optional[threading.Thread] = None
         self.is_running = False
         self.lock = threading.Lock()
+        self.clients: Dict[socket.socket, SocketClient] = {}
+        self._selector: Optional[selectors.BaseSelector] = None
+        self._wake_r: Optional[socket.socket] = None
+        self._wake_w: Optional[socket.socket] = None
+        self._wake_pending = False
+        # Event subscriptions: published from agent threads, delivered by the loop
+        self._subscribers: Tuple[EventSubscription, ...] = ()
+        self._event_lock = threading.Lock()
+        self._event_handlers: Dict[str, Callable] = {}
+        self._event_seq = itertools.count(1)
 
     def start(self) -> None:
         """Start the socket server"""
@@ -122,11 +276,20 @@ class SocketServer:
             # Create Unix socket
             self.server_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
             self.server_socket.bind(self.socket_path)
-            self.server_socket.listen(1)
+            self.server_socket.listen(LISTEN_BACKLOG)
+            self.server_socket.setblocking(False)
 
             # Owner only permissions
             os.chmod(self.socket_path, 0o600)
 
+            # Selector over the listener, clients and a wakeup pair for stop()
+            self._wake_r, self._wake_w = socket.socketpair()
+            self._wake_r.setblocking(False)
+            self._wake_w.setblocking(False)
+            self._selector = selectors.DefaultSelector()
+            self._selector.register(self.server_socket, selectors.EVENT_READ, "accept")
+            self._selector.register(self._wake_r, selectors.EVENT_READ, "wake")
+
             self.is_running = True
 
             # Start server thread
@@ -154,18 +317,15 @@ class SocketServer:
     def stop(self) -> None:
         """Stop the socket server"""
         self.is_running = False
-
-        if self.server_socket:
-            try:
-                self.server_socket.close()
-            except Exception:
-                pass
-            self.server_socket = None
+        self._wake()
 
         if self.server_thread:
             self.server_thread.join(timeout=1.0)
             self.server_thread = None
 
+        # Normally closed by the server loop on exit
+        self._close_all()
+
         # Clean up socket file
         if self.socket_path and os.path.exists(self.socket_path):
             try:
@@ -173,90 +333,292 @@ class SocketServer:
             except Exception:
                 pass
 
-    def _server_loop(self) -> None:
-        """Main server loop"""
-        while self.is_running:
+    def _wake(self) -> None:
+        """Interrupt select() in the server thread"""
+        if self._wake_w:
             try:
-                self.server_socket.settimeout(0.5)
-
+                self._wake_w.send(b"\0")
+            except OSError:
+                pass  # Buffer full means a wakeup is already pending
+
+    def _close_all(self) -> None:
+        """Close clients, listener, selector and wakeup pair"""
+        for client in list(self.clients.values()):
+            self._close_client(client)
+        for sock in (self.server_socket, self._wake_r, self._wake_w):
+            if sock:
                 try:
-                    client_socket, _ = self.server_socket.accept()
-                except socket.timeout:
-                    continue
-
-
-
-                # Handle client
-                self._handle_client(client_socket)
-
-            except Exception as e:
-                if self.is_running and Config.debug():
-                    LogUtils.warn(f"[Socket] Error: {e}")
+                    sock.close()
+                except Exception:
+                    pass
+        self.server_socket = None
+        self._wake_r = self._wake_w = None
+        if self._selector:
+            try:
+                self._selector.close()
+            except Exception:
+                pass
+            self._selector = None
 
-    def _handle_client(self, client_socket: socket.socket) -> None:
-        """Handle one client connection"""
+    def _server_loop(self) -> None:
+        """Main server loop: one select() over every socket"""
+        selector = self._selector
+        last_sweep = time.monotonic()
         try:
-            # Read command
-            command = self._read_line(client_socket, timeout=3.0)
+            while self.is_running:
+                try:
+                    events = selector.select(timeout=SWEEP_INTERVAL)
+                except (OSError, ValueError):
+                    break  # Selector closed by stop()
+
+                for key, mask in events:
+                    if key.data == "accept":
+                        self._accept()
+                    elif key.data == "wake":
+                        self._wake_pending = False
+                        self._drain_wake()
+                        self._deliver_events()
+                    else:
+                        client = key.data
+                        if mask & selectors.EVENT_READ:
+                            self._on_readable(client)
+                        if mask & selectors.EVENT_WRITE and client.sock in self.clients:
+                            self._flush(client)
+
+                now = time.monotonic()
+                if now - last_sweep >= SWEEP_INTERVAL:
+                    last_sweep = now
+                    self._sweep_idle(now)
+        except Exception as e:
+            if self.is_running and Config.debug():
+                LogUtils.warn(f"[Socket] Error: {e}")
+        finally:
+            self._close_all()
 
-            if not command:
-                self._send_line(client_socket, response(None, error_code=ERR_INTERNAL, error_msg="Empty command"))
-                client_socket.close()
+    def _accept(self) -> None:
+        """Accept every pending connection"""
+        while True:
+            try:
+                sock, _ = self.server_socket.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as e:
+                if self.is_running and Config.debug():
+                    LogUtils.warn(f"[Socket] Accept error: {e}")
                 return
 
-            if Config.debug():
-                LogUtils.debug(f"[Socket] Cmd: {command}")
-
-            # Execute
-            resp = self._execute_command(command)
+            if len(self.clients) >= MAX_CLIENTS:
+                try:
+                    sock.sendall((response(None, error_code=ERR_INTERNAL, error_msg="Too many clients") + "\n").encode("utf-8"))
+                finally:
+                    sock.close()
+                continue
 
-            # Send response
-            self._send_line(client_socket, resp)
+            sock.setblocking(False)
+            client = SocketClient(sock)
+            self.clients[sock] = client
+            self._selector.register(sock, selectors.EVENT_READ, client)
 
-        except socket.timeout:
-            self._send_line(client_socket, response(None, error_code=ERR_INTERNAL, error_msg="Timeout"))
-        except Exception as e:
-            self._send_line(client_socket, response(None, error_code=ERR_INTERNAL, error_msg=str(e)))
-        finally:
-            try:
-                client_socket.close()
-            except Exception:
+    def _drain_wake(self) -> None:
+        """Discard wakeup bytes"""
+        try:
+            while self._wake_r.recv(4096):
                 pass
+        except (BlockingIOError, InterruptedError, OSError):
+            pass
 
-    def _read_line(self, sock: socket.socket, timeout: float) -> Optional[str]:
-        """Read one line with timeout"""
-        sock.settimeout(timeout)
-        data = b""
-
+    def _on_readable(self, client: SocketClient) -> None:
+        """Read what's available and answer every complete line"""
         try:
-            while True:
-                chunk = sock.recv(1024)
-                if not chunk:
-                    break
-                data += chunk
-                # Check if we have complete line
-                if b"\n" in data:
-                    line, _, _ = data.partition(b"\n")
-                    return line.decode("utf-8").strip()
+            chunk = client.sock.recv(RECV_SIZE)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            self._close_client(client)
+            return
 
-            return data.decode("utf-8").strip() if data else None
+        if not chunk:
+            # Peer is done sending; a one-shot client may omit the final newline
+            if client.inbuf.strip() and not client.closing:
+                self._handle_line(client, bytes(client.inbuf))
+            elif not client.handled:
+                self._queue(client, response(None, error_code=ERR_INTERNAL, error_msg="Empty command"))
+            client.inbuf.clear()
+            client.closing = True
+            self._flush(client)
+            return
 
-        except socket.timeout:
-            return None
-        except Exception as e:
+        client.last_active = time.monotonic()
+        if client.closing:
+            return  # One-shot client already answered; ignore the rest
+        client.inbuf += chunk
+
+        start = 0
+        while not client.closing:
+            end = client.inbuf.find(b"\n", start)
+            if end < 0:
+                break
+            self._handle_line(client, bytes(client.inbuf[start:end]))
+            start = end + 1
+        del client.inbuf[:start]
+
+        if len(client.inbuf) > MAX_LINE_SIZE:
+            client.inbuf.clear()
+            self._queue(client, response(None, error_code=ERR_INVALID_ARG, error_msg="Request line too long"))
+            client.closing = True
+
+        self._flush(client)
+
+    def _handle_line(self, client: SocketClient, raw: bytes) -> None:
+        """Execute one request line and queue its response"""
+        try:
+            line = raw.decode("utf-8").strip()
+        except UnicodeDecodeError:
+            line = None
+
+        if line and line.startswith("{"):
+            client.persistent = True
+            resp = self._execute_request(line, client)
+        elif line is None:
+            resp = response(None, error_code=ERR_INVALID_ARG, error_msg="Invalid UTF-8 encoding")
+        elif not line:
+            if client.persistent:
+                return  # Blank lines between NDJSON requests are ignored
+            resp = response(None, error_code=ERR_INTERNAL, error_msg="Empty command")
+        else:
             if Config.debug():
-                LogUtils.warn(f"[Socket] Read error: {e}")
-            return None
+                LogUtils.debug(f"[Socket] Cmd: {line[:200]}")
+            resp = self._execute_command(line, client)
+
+        client.handled = True
+        if not client.persistent:
+            client.closing = True
+        self._queue(client, resp)
 
-    def _send_line(self, sock: socket.socket, line: str) -> None:
-        """Send one line"""
+    def _execute_request(self, line: str, client: Optional[SocketClient] = None) -> Union[str, ChunkedResponse]:
+        """Execute a JSON request {"id": ..., "cmd": "...", "args": "..."}; echo its id"""
         try:
-            sock.sendall((line + "\n").encode("utf-8"))
-        except Exception as e:
+            request = json.loads(line)
+        except json.JSONDecodeError:
+            request = None
+        if not isinstance(request, dict):
+            return response(None, error_code=ERR_INVALID_ARG, error_msg="Invalid JSON request")
+
+        command = request.get("cmd")
+        if not isinstance(command, str) or not command.strip():
+            resp = response(None, error_code=ERR_MISSING_ARG, error_msg="Missing cmd")
+        else:
+            args = request.get("args")
+            if args is not None:
+                command = f"{command} {args}"
             if Config.debug():
-                LogUtils.warn(f"[Socket] Send error: {e}")
+                LogUtils.debug(f"[Socket] Request {request.get('id')}: {command[:200]}")
+            resp = self._execute_command(command, client)
+
+        request_id = request.get("id")
+        if request_id is None:
+            return resp
+        if isinstance(resp, ChunkedResponse):
+            resp.request_id = request_id
+            return resp
+        # Responses are JSON objects: splice the id in front instead of re-encoding
+        return '{"id": ' + json.dumps(request_id) + ", " + resp[1:]
+
+    def _queue(self, client: SocketClient, line: Union[str, ChunkedResponse]) -> None:
+        """Append one response line to the client's output (streamed ones lazily)"""
+        if isinstance(line, ChunkedResponse):
+            client.outq.append(self._encode_chunks(line))
+            return
+        client.outq.append(memoryview((line + "\n").encode("utf-8")))
+
+    @staticmethod
+    def _encode_chunks(resp: ChunkedResponse) -> Iterator[memoryview]:
+        """Encoded pieces of a streamed response line, newline last"""
+        for chunk in resp.chunks():
+            yield memoryview(chunk.encode("utf-8"))
+        yield memoryview(b"\n")
+
+    def _flush(self, client: SocketClient) -> None:
+        """Send queued output without blocking; watch for writability if some is left"""
+        outq = client.outq
+        chunk_budget = STREAM_CHUNKS_PER_FLUSH
+        while True:
+            blocked = False
+            while outq:
+                if type(outq[0]) is not memoryview:
+                    # Streamed response: serialize its next chunk, but leave
+                    # the rest for later loop turns so other clients get served
+                    if not chunk_budget:
+                        blocked = True
+                        break
+                    chunk_budget -= 1
+                    try:
+                        chunk = next(outq[0], None)
+                    except Exception as e:
+                        LogUtils.error(f"[Socket] Streamed response failed: {e}")
+                        self._close_client(client)
+                        return
+                    if chunk is None:
+                        outq.popleft()
+                        continue
+                    outq.appendleft(chunk)
+                try:
+                    sent = client.sock.send(outq[0])
+                except (BlockingIOError, InterruptedError):
+                    blocked = True
+                    break
+                except OSError as e:
+                    if Config.debug():
+                        LogUtils.warn(f"[Socket] Send error: {e}")
+                    self._close_client(client)
+                    return
+                if sent < len(outq[0]):
+                    outq[0] = outq[0][sent:]
+                    blocked = True
+                    break
+                outq.popleft()
+            # Subscribers refill only once the socket has taken everything,
+            # so a slow reader backs up into its bounded event queue
+            if blocked or not self._pump_events(client):
+                break
+
+        if not outq and client.closing:
+            self._close_client(client)
+            return
+
+        events = selectors.EVENT_READ | selectors.EVENT_WRITE if outq else selectors.EVENT_READ
+        if events != client.events:
+            client.events = events
+            self._selector.modify(client.sock, events, client)
+
+    def _sweep_idle(self, now: float) -> None:
+        """Time out one-shot clients that never finish a command line"""
+        for client in list(self.clients.values()):
+            if client.persistent or client.closing or client.handled:
+                continue
+            if now - client.last_active > ONE_SHOT_TIMEOUT:
+                client.inbuf.clear()
+                client.closing = True
+                self._queue(client, response(None, error_code=ERR_INTERNAL, error_msg="Timeout"))
+                self._flush(client)
+
+    def _close_client(self, client: SocketClient) -> None:
+        """Unregister and close a client"""
+        if self.clients.pop(client.sock, None) is None:
+            return
+        if client.subscription:
+            self._unsubscribe(client)
+        if self._selector:
+            try:
+                self._selector.unregister(client.sock)
+            except (KeyError, ValueError):
+                pass
+        try:
+            client.sock.close()
+        except Exception:
+            pass
 
-    def _execute_command(self, command: str) -> str:
+    def _execute_command(self, command: str, client: Optional[SocketClient] = None) -> Union[str, ChunkedResponse]:
         """Execute a command and return response"""
         command = command.strip()
         if not command:
@@ -267,6 +629,14 @@ class SocketServer:
         cmd = parts[0]
         args = parts[1] if len(parts) > 1 else ""
 
+        # Connection-level commands
+        if cmd in ("subscribe", "unsubscribe"):
+            if client is None:
+                return response(None, error_code=ERR_INVALID_ARG, error_msg=f"{cmd} needs a socket connection")
+            if cmd == "subscribe":
+                return self._cmd_subscribe(client, args)
+            return self._cmd_unsubscribe(client, args)
+
         # Dispatch
         handlers = {
             "is_processing": self._cmd_is_processing,
@@ -283,6 +653,8 @@ class SocketServer:
             "command": self._cmd_command,
             "save": self._cmd_save,
             "kill": self._cmd_kill,
+            "plugins": self._cmd_plugins,
+            "profile": self._cmd_profile,
             "quit": self._cmd_quit,
         }
 
@@ -314,6 +686,87 @@ class SocketServer:
                 None, error_code=ERR_INTERNAL, error_msg=error_msg
             )
 
+    # ========================================================================
+    # Event Subscriptions
+    # ========================================================================
+
+    def _publish(self, event: str, *args) -> None:
+        """Hook handler: queue an event line for every interested subscriber"""
+        line = None
+        for sub in self._subscribers:
+            if event not in sub.events:
+                continue
+            if line is None:
+                line = json.dumps({
+                    "event": event,
+                    "seq": next(self._event_seq),
+                    "ts": round(time.time(), 3),
+                    "data": dict(zip(STREAM_EVENTS[event], args)),
+                }, default=str)
+            with self._event_lock:
+                if len(sub.queue) >= SUBSCRIBER_QUEUE_SIZE:
+                    sub.dropped += 1
+                    continue
+                sub.queue.append(line)
+
+        # One wakeup covers everything queued until the loop drains it
+        if line is not None and not self._wake_pending:
+            self._wake_pending = True
+            self._wake()
+
+    def _deliver_events(self) -> None:
+        """Start sending to subscribers whose output is idle"""
+        for client in list(self.clients.values()):
+            if client.subscription and not client.outq:
+                self._flush(client)
+
+    def _pump_events(self, client: SocketClient) -> bool:
+        """Move a subscriber's queued events to its output; True if any"""
+        sub = client.subscription
+        if sub is None:
+            return False
+        with self._event_lock:
+            if not sub.queue and sub.dropped == sub.reported:
+                return False
+            lines = list(sub.queue)
+            sub.queue.clear()
+            dropped = sub.dropped - sub.reported
+            sub.reported = sub.dropped
+
+        if dropped:
+            self._queue(client, json.dumps({
+                "event": "events_dropped",
+                "ts": round(time.time(), 3),
+                "data": {"dropped": dropped, "total": sub.dropped},
+            }))
+        for line in lines:
+            self._queue(client, line)
+        return True
+
+    def _unsubscribe(self, client: SocketClient) -> EventSubscription:
+        """Remove a client's subscription and unhook events nobody wants"""
+        sub = client.subscription
+        client.subscription = None
+        self._subscribers = tuple(s for s in self._subscribers if s is not sub)
+        self._update_event_hooks()
+        return sub
+
+    def _update_event_hooks(self) -> None:
+        """Hook exactly the events some subscriber wants (none: zero cost)"""
+        plugin_system = getattr(self.aicoder, "plugin_system", None)
+        if plugin_system is None:
+            return
+        wanted = set()
+        for sub in self._subscribers:
+            wanted |= sub.events
+        for event in list(self._event_handlers):
+            if event not in wanted:
+                plugin_system.remove_hook(event, self._event_handlers.pop(event))
+        for event in wanted:
+            if event not in self._event_handlers:
+                handler = self._event_handlers[event] = partial(self._publish, event)
+                plugin_system.add_hook(event, handler)
+
     # ========================================================================
     # Command Handlers
     # ========================================================================
@@ -451,6 +904,70 @@ class SocketServer:
             "messages": len(messages),
         })
 
+    def _cmd_plugins(self, args: str) -> str:
+        """List plugins or get/control hook profiling"""
+        plugin_system = getattr(self.aicoder, "plugin_system", None)
+        if plugin_system is None:
+            return response(None, error_code=ERR_INTERNAL, error_msg="Plugin system not available")
+
+        parts = args.split()
+        if not parts:
+            return response({
+                "loaded": list(plugin_system.plugins),
+                "deferred": list(plugin_system.deferred_plugins),
+            })
+
+        if parts[0] == "profile":
+            action = parts[1] if len(parts) > 1 else "report"
+            if action == "on":
+                plugin_system.set_profiling(True)
+            elif action == "off":
+                plugin_system.set_profiling(False)
+            elif action == "reset":
+                plugin_system.reset_profile()
+            elif action != "report":
+                return response(
+                    None, error_code=ERR_INVALID_ARG, error_msg="Usage: plugins profile [on|off|reset]"
+                )
+            return response({
+                "enabled": plugin_system.profiling,
+                "slow_ms": plugin_system.slow_hook_ns / 1_000_000,
+                "hooks": plugin_system.profile_report(),
+            })
+
+        return response(
+            None, error_code=ERR_INVALID_ARG, error_msg="Usage: plugins [profile [on|off|reset]]"
+        )
+
+    def _cmd_profile(self, args: str) -> str:
+        """Control the session profiler or get its report"""
+        from aicoder.core import profiler  # Lazy: cProfile/pstats only once profiling is used
+
+        parts = args.split()
+        action = parts[0] if parts else "status"
+        try:
+            if action == "start":
+                mode = parts[1] if len(parts) > 1 else ""
+                if mode == "turn":
+                    profiler.arm_turn()
+                else:
+                    profiler.start(float(mode) if mode else Config.profile_hz())
+                return response(profiler.status())
+            if action == "stop":
+                return response({"stopped": profiler.stop(), **profiler.status()})
+            if action == "report":
+                top = int(parts[1]) if len(parts) > 1 else profiler.DEFAULT_TOP
+                return response({"report": profiler.report(top), "last": profiler.last_run(), **profiler.status()})
+        except RuntimeError as e:
+            return response(None, error_code=ERR_INVALID_ARG, error_msg=str(e))
+        except ValueError as e:
+            return response(None, error_code=ERR_INVALID_ARG, error_msg=f"Invalid argument: {e}")
+        if action == "status":
+            return response(profiler.status())
+        return response(
+            None, error_code=ERR_INVALID_ARG, error_msg="Usage: profile [start [hz|turn]|stop|report [N]|status]"
+        )
+
     def _cmd_stop(self, args: str) -> str:
         """Stop current processing"""
         stopped = False
@@ -472,25 +989,74 @@ class SocketServer:
             None, error_code=ERR_NOT_PROCESSING, error_msg="Not currently processing"
         )
 
-    def _cmd_messages(self, args: str) -> str:
-        """List or count messages"""
-        args = args.strip()
-
-        if args == "count":
-            messages = self.aicoder.message_history.get_messages()
-            return response({
-                "total": len(messages),
-                "user": sum(1 for m in messages if m.get("role") == "user"),
-                "assistant": sum(1 for m in messages if m.get("role") == "assistant"),
-                "system": sum(1 for m in messages if m.get("role") == "system"),
-                "tool": sum(1 for m in messages if m.get("role") == "tool"),
-            })
+    def _cmd_messages(self, args: str) -> Union[str, ChunkedResponse]:
+        """
+        List, count or page through messages:
+          messages [fields=a,b]                   all messages
+          messages count                          counts by role
+          messages since <seq> [fields=a,b]       messages added after seq
+          messages range <start> <end> [fields=a,b]  messages[start:end]
+        Cursor reads (since/range) return records with "seq" and "index";
+        fields picks message keys plus seq, index and length (characters
+        of text content).
+        """
+        parts = args.split()
+        fields = None
+        if parts and parts[-1].startswith("fields="):
+            fields = [name for name in parts.pop()[len("fields="):].split(",") if name]
+            if not fields:
+                return response(None, error_code=ERR_INVALID_ARG, error_msg="fields= needs at least one name")
+
+        history = self.aicoder.message_history
+        if parts == ["count"]:
+            counts = {"user": 0, "assistant": 0, "system": 0, "tool": 0}
+            messages = history.get_messages()
+            for m in messages:
+                role = m.get("role")
+                if role in counts:
+                    counts[role] += 1
+            return response({"total": len(messages), **counts})
+
+        if not parts:
+            messages = history.get_messages()
+            if fields:
+                records = [_project(m, fields, i, None) for i, m in enumerate(messages)]
+            else:
+                records = messages
+            return _records_response(records, {"count": len(messages)})
+
+        mode, rest = parts[0], parts[1:]
+        if mode == "since":
+            if len(rest) != 1:
+                return response(None, error_code=ERR_MISSING_ARG, error_msg="Usage: messages since <seq> [fields=a,b]")
+            try:
+                after = int(rest[0])
+            except ValueError:
+                return response(None, error_code=ERR_INVALID_ARG, error_msg=f"Invalid seq: {rest[0]}")
+            pairs = history.get_messages_with_seq()
+            selected = [(i, pair) for i, pair in enumerate(pairs) if pair[0] > after]
+        elif mode == "range":
+            if len(rest) != 2:
+                return response(None, error_code=ERR_MISSING_ARG, error_msg="Usage: messages range <start> <end> [fields=a,b]")
+            try:
+                start, end = int(rest[0]), int(rest[1])
+            except ValueError:
+                return response(None, error_code=ERR_INVALID_ARG, error_msg=f"Invalid range: {' '.join(rest)}")
+            pairs = history.get_messages_with_seq()
+            indices = range(len(pairs))[start:end]
+            selected = [(i, pairs[i]) for i in indices]
+        else:
+            return response(
+                None, error_code=ERR_INVALID_ARG,
+                error_msg="Usage: messages [count | since <seq> | range <start> <end>] [fields=a,b]"
+            )
 
-        # Return all messages
-        messages = self.aicoder.message_history.get_messages()
-        return response({
-            "messages": messages,
-            "count": len(messages)
+        records = [_project(msg, fields, i, seq) for i, (seq, msg) in selected]
+        return _records_response(records, {
+            "count": len(records),
+            "total": len(pairs),
+            # From this snapshot: another reader may already have numbered newer messages
+            "last_seq": max((seq for seq, _ in pairs), default=0),
         })
 
     def _cmd_inject(self, args: str) -> str:
@@ -738,3 +1304,38 @@ class SocketServer:
         import signal
         os.kill(os.getpid(), signal.SIGTERM)
         return response({"quit": True, "message": "Shutting down"})
+
+    def _cmd_subscribe(self, client: SocketClient, args: str) -> str:
+        """Turn the connection into an event stream (all events or the ones named)"""
+        if getattr(self.aicoder, "plugin_system", None) is None:
+            return response(None, error_code=ERR_INTERNAL, error_msg="Plugin system not available")
+
+        names = args.split()
+        unknown = [name for name in names if name not in STREAM_EVENTS]
+        if unknown:
+            return response(
+                None, error_code=ERR_INVALID_ARG,
+                error_msg=f"Unknown event: {', '.join(unknown)} (available: {', '.join(STREAM_EVENTS)})"
+            )
+
+        events = frozenset(names or STREAM_EVENTS)
+        if client.subscription:
+            client.subscription.events = events
+        else:
+            client.subscription = EventSubscription(events)
+            self._subscribers += (client.subscription,)
+        self._update_event_hooks()
+
+        # Subscribed connections stay open even when subscribe came as plain text
+        client.persistent = True
+        return response({
+            "subscribed": [name for name in STREAM_EVENTS if name in events],
+            "queue_size": SUBSCRIBER_QUEUE_SIZE,
+        })
+
+    def _cmd_unsubscribe(self, client: SocketClient, args: str) -> str:
+        """Stop the event stream on this connection"""
+        if client.subscription is None:
+            return response(None, error_code=ERR_INVALID_ARG, error_msg="Not subscribed")
+        sub = self._unsubscribe(client)
+        return response({"unsubscribed": True, "dropped": sub.dropped})
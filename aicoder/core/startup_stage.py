@@ -0,0 +1,72 @@
+"""
+Background startup stage: work not needed to show the first prompt
+Stateful: class needed to own the worker thread and completion event
+"""
+
+import threading
+import time
+from typing import Callable, Dict, List, Tuple
+
+from aicoder.core.config import Config
+from aicoder.utils import startup_profile
+from aicoder.utils.log import LogUtils
+
+
+class StartupStage:
+    """
+    Runs startup tasks in order on one daemon thread after the prompt can
+    be shown. Anything that needs their results (the first API request,
+    the first user message) calls wait() first. With staged startup
+    disabled, start() runs the tasks inline.
+    """
+
+    def __init__(self):
+        self._tasks: List[Tuple[str, Callable[[], None]]] = []
+        self._done = threading.Event()
+        self._thread = None
+        self.timings: Dict[str, float] = {}  # task -> seconds
+
+    def add(self, name: str, fn: Callable[[], None]) -> None:
+        """Queue a task (before start)"""
+        self._tasks.append((name, fn))
+
+    def start(self) -> None:
+        """Run queued tasks in the background (or inline when disabled)"""
+        if not Config.staged_startup():
+            self._run()
+            return
+        self._thread = threading.Thread(target=self._run, name="aicoder-startup", daemon=True)
+        self._thread.start()
+
+    @property
+    def ready(self) -> bool:
+        """True once every task has finished"""
+        return self._done.is_set()
+
+    def wait(self, timeout: float = None) -> bool:
+        """Block until the background tasks finish; returns readiness"""
+        if self._done.is_set() or self._thread is None:
+            return self._done.is_set()
+        if Config.debug():
+            LogUtils.debug("Waiting for background startup to finish...")
+        return self._done.wait(timeout)
+
+    def _run(self) -> None:
+        """Run every task, isolating failures"""
+        try:
+            for name, fn in self._tasks:
+                t0 = time.perf_counter()
+                try:
+                    fn()
+                except Exception as e:
+                    LogUtils.error(f"[!] Startup task {name} failed: {e}")
+                self.timings[name] = time.perf_counter() - t0
+                startup_profile.record_background(name, self.timings[name])
+        finally:
+            self._tasks = []
+            startup_profile.milestone("time_to_ready")
+            self._done.set()
+
+        if Config.debug():
+            detail = ", ".join(f"{name} {s * 1000:.0f}ms" for name, s in self.timings.items())
+            LogUtils.debug(f"Ready after background startup ({detail})")
@@ -4,10 +4,147 @@ Statistics tracking for AI Coder
 Stateful: class needed for maintaining counters
 """
 
+import math
 import time
+from typing import Any, Dict, List, Optional
 from aicoder.utils.log import LogUtils
 
 
+class Histogram:
+    """
+    Fixed-size log-scale histogram - simple class instead of dataclass
+    Bucket bounds grow by 2^(1/4) (about 19%) from MIN_VALUE, so memory is
+    constant and percentiles are within one bucket of the exact value.
+    """
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    MIN_VALUE = 0.01
+    BUCKETS_PER_DOUBLING = 4
+    NUM_BUCKETS = 112  # Values above MIN_VALUE * 2^27.5 (about 1.9M) share the last bucket
+
+    def __init__(self):
+        self.counts: List[int] = [0] * self.NUM_BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value: float) -> None:
+        """Record one value"""
+        if value <= self.MIN_VALUE:
+            index = 0
+        else:
+            index = min(
+                self.NUM_BUCKETS - 1,
+                int(math.log2(value / self.MIN_VALUE) * self.BUCKETS_PER_DOUBLING) + 1,
+            )
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: "Histogram") -> None:
+        """Add another histogram's values to this one"""
+        if not other.count:
+            return
+        counts = self.counts
+        for i, n in enumerate(other.counts):
+            if n:
+                counts[i] += n
+        self.count += other.count
+        self.total += other.total
+        if other.max > self.max:
+            self.max = other.max
+
+    def percentile(self, pct: float) -> float:
+        """Nearest-rank percentile: upper bound of its bucket, capped at max"""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(self.count * pct / 100))
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                bound = self.MIN_VALUE * 2 ** (i / self.BUCKETS_PER_DOUBLING)
+                return min(bound, self.max)
+        return self.max
+
+    def mean(self) -> float:
+        """Average of recorded values"""
+        return self.total / self.count if self.count else 0.0
+
+    def summary(self) -> Dict[str, float]:
+        """count, mean, p50, p99 and max, rounded for display and logs"""
+        return {
+            "count": self.count,
+            "mean": round(self.mean(), 2),
+            "p50": round(self.percentile(50), 2),
+            "p99": round(self.percentile(99), 2),
+            "max": round(self.max, 2),
+        }
+
+
+class RequestTimings:
+    """
+    Phase timestamps of one API request attempt - simple class instead of dataclass
+
+    The HTTP layer marks dns, connect, tls, request_sent and first_byte
+    (response headers read); the client marks first_token (any generated
+    token, reasoning included), first_content, first_tool_call and end,
+    and calls chunk() per streamed chunk to record inter-chunk gaps.
+    """
+
+    __slots__ = ("start", "marks", "gaps", "_last_chunk")
+
+    PHASES = (
+        "dns", "connect", "tls", "request_sent", "first_byte",
+        "first_token", "first_content", "first_tool_call", "end",
+    )
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.marks: Dict[str, float] = {}
+        self.gaps = Histogram()  # Milliseconds between streamed chunks
+        self._last_chunk = 0.0
+
+    def mark(self, phase: str) -> None:
+        """Record when phase happened (the first mark wins)"""
+        if phase not in self.marks:
+            self.marks[phase] = time.perf_counter()
+
+    def chunk(self) -> None:
+        """Record the arrival of a streamed chunk"""
+        now = time.perf_counter()
+        if self._last_chunk:
+            self.gaps.add((now - self._last_chunk) * 1000)
+        self._last_chunk = now
+
+    def summary(self, completion_tokens: int = 0) -> Dict[str, Any]:
+        """
+        Phase offsets in ms since the request started, TTFT, generation
+        speed (completion tokens over first token..end) and chunk gaps
+        """
+        marks = self.marks
+        phases = {
+            phase: round((marks[phase] - self.start) * 1000, 1)
+            for phase in self.PHASES if phase in marks
+        }
+        tokens_per_sec = None
+        if completion_tokens and "first_token" in marks and "end" in marks:
+            generation = marks["end"] - marks["first_token"]
+            if generation > 0:
+                tokens_per_sec = round(completion_tokens / generation, 1)
+        return {
+            "phases_ms": phases,
+            "ttft_ms": phases.get("first_token"),
+            "tokens_per_sec": tokens_per_sec,
+            "chunks": self.gaps.count + 1 if self._last_chunk else 0,
+            "gap_p50_ms": round(self.gaps.percentile(50), 2),
+            "gap_p99_ms": round(self.gaps.percentile(99), 2),
+        }
+
+
 class Stats:
     """
     Statistics tracking for AI Coder
@@ -30,6 +167,11 @@ class Stats:
         self.current_prompt_size_estimated = False
         self.last_user_prompt = ""
         self.start_time = time.time()
+        # Per-request latency, fed by record_request_timings
+        self.ttft_ms = Histogram()
+        self.tokens_per_sec = Histogram()
+        self.chunk_gap_ms = Histogram()
+        self.last_request_timings: Optional[Dict[str, Any]] = None
 
     def increment_api_requests(self) -> None:
         """
@@ -112,6 +254,56 @@ class Stats:
         """
         self.messages_sent += 1
 
+    def record_request_timings(self, timings: RequestTimings, completion_tokens: int = 0) -> Dict[str, Any]:
+        """
+        Close a successful request's timings and add them to the histograms
+
+        """
+        timings.mark("end")
+        summary = timings.summary(completion_tokens)
+        if summary["ttft_ms"] is not None:
+            self.ttft_ms.add(summary["ttft_ms"])
+        if summary["tokens_per_sec"] is not None:
+            self.tokens_per_sec.add(summary["tokens_per_sec"])
+        self.chunk_gap_ms.merge(timings.gaps)
+        self.last_request_timings = summary
+        return summary
+
+    def latency_summary(self) -> Dict[str, Any]:
+        """
+        Session latency histograms and the last request's timings
+
+        """
+        return {
+            "ttft_ms": self.ttft_ms.summary(),
+            "tokens_per_sec": self.tokens_per_sec.summary(),
+            "chunk_gap_ms": self.chunk_gap_ms.summary(),
+            "last_request": self.last_request_timings,
+        }
+
+    def format_latency(self) -> List[str]:
+        """
+        Latency lines for /stats and /debug (empty before the first request)
+
+        """
+        if not self.ttft_ms.count and not self.last_request_timings:
+            return []
+        ttft = self.ttft_ms
+        speed = self.tokens_per_sec
+        gaps = self.chunk_gap_ms
+        lines = [
+            f"  TTFT: p50 {ttft.percentile(50):.0f}ms, p99 {ttft.percentile(99):.0f}ms ({ttft.count} requests)",
+        ]
+        if speed.count:
+            lines.append(f"  Speed: p50 {speed.percentile(50):.1f} tok/s, p99 {speed.percentile(99):.1f} tok/s")
+        if gaps.count:
+            lines.append(f"  Chunk gap: p50 {gaps.percentile(50):.1f}ms, p99 {gaps.percentile(99):.1f}ms")
+        last = self.last_request_timings
+        if last:
+            phases = ", ".join(f"{name} {ms:.0f}" for name, ms in last["phases_ms"].items())
+            lines.append(f"  Last request (ms since start): {phases}")
+        return lines
+
     def print_stats(self) -> None:
         """
         Print statistics on exit
@@ -143,6 +335,17 @@ class Stats:
             LogUtils.print(f"Final Context Size: {self.current_prompt_size:,}{estimated}")
 
         LogUtils.print(f"Compactions: {self.compactions}")
+
+        latency = self.format_latency()
+        if latency:
+            LogUtils.print("--- Latency ---")
+            for line in latency:
+                LogUtils.print(line)
+
+        from aicoder.core.file_access_tracker import FileAccessTracker
+        hits, tokens_saved = FileAccessTracker.get_unchanged_stats()
+        if hits:
+            LogUtils.print(f"Unchanged re-reads skipped: {hits} (~{tokens_saved:,} tokens saved)")
         LogUtils.print("========================")
 
     def reset(self) -> None:
@@ -165,3 +368,7 @@ class Stats:
         self.last_prompt_tokens = 0
         self.last_completion_tokens = 0
         self.start_time = time.time()
+        self.ttft_ms = Histogram()
+        self.tokens_per_sec = Histogram()
+        self.chunk_gap_ms = Histogram()
+        self.last_request_timings = None
@@ -18,6 +18,11 @@ class StreamProcessor:
         # Maps tool_calls[] index -> call id for this stream. Some proxies
         # (opencode zen) send index=0 on every chunk; id is the reliable key.
         self._index_to_tool_id: Dict[Any, str] = {}
+        self._on_stream_delta = None
+
+    def set_plugin_system(self, plugin_system) -> None:
+        """Set plugin system, binding the per-delta dispatcher"""
+        self._on_stream_delta = plugin_system.dispatcher("on_stream_delta") if plugin_system else None
 
     def process_stream(
         self,
@@ -49,10 +54,16 @@ class StreamProcessor:
         reasoning_field_name = None
         thinking_signature = ""
 
+        # Bound once: read per chunk below
+        cfg = Config.snapshot()
+        debug = cfg.debug
+        reasoning_fields = cfg.reasoning_fields
+        on_delta = self._on_stream_delta.fire if self._on_stream_delta else None
+
         try:
             for chunk in self.streaming_client.stream_request(messages, send_tools=True):
                 # Detect model from first chunk that contains it
-                if Config.debug() and not detected_model and chunk.get("model"):
+                if debug and not detected_model and chunk.get("model"):
                     detected_model = chunk["model"]
                     LogUtils.debug(f"*** Response model: {detected_model}")
                 # Check if user interrupted
@@ -83,12 +94,6 @@ class StreamProcessor:
                     delta = choice["delta"]
 
                     # Check for reasoning tokens
-                    override = Config.get_reasoning_field()
-                    if override:
-                        reasoning_fields = [override]
-                    else:
-                        reasoning_fields = Config.get_possible_reasoning_fields()
-
                     # Anthropic re-sends full accumulated reasoning on the final
                     # done chunk (for storage) — already accumulated via deltas.
                     # Skip to avoid doubling.
@@ -98,6 +103,8 @@ class StreamProcessor:
                             if reasoning and reasoning.strip():
                                 reasoning_detected = True
                                 accumulated_reasoning += reasoning
+                                if on_delta:
+                                    on_delta("reasoning", reasoning)
                                 if reasoning_field_name is None:
                                     reasoning_field_name = field
                                 break
@@ -107,7 +114,7 @@ class StreamProcessor:
                         thinking_signature = delta.get("thinking_signature")
 
                     # Debug: log which reasoning field was detected
-                    if Config.debug() and reasoning_field_name and accumulated_reasoning == reasoning:
+                    if debug and reasoning_field_name and accumulated_reasoning == reasoning:
                         LogUtils.debug(f"Reasoning detected via field: {reasoning_field_name}")
 
                     content = delta.get("content")
@@ -130,6 +137,8 @@ class StreamProcessor:
                         if full_response == "":
                             content = content.lstrip()
                         full_response += content
+                        if on_delta:
+                            on_delta("content", content)
                         colored_content = self.streaming_client.process_with_colorization(content)
                         builtins.print(colored_content, end="", flush=True)
 
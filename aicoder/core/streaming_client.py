@@ -8,8 +8,10 @@ import itertools
 import os
 from typing import List, Generator, Optional, Dict, Any
 
+from aicoder.core import tracing
 from aicoder.core.config import Config
 from aicoder.core.markdown_colorizer import MarkdownColorizer
+from aicoder.core.stats import RequestTimings
 from aicoder.utils.log import error as log_error, warn as log_warn, info as log_info, debug as log_debug
 from aicoder.utils.http_utils import fetch, Response
 from aicoder.utils.file_utils import rotate_debug_log
@@ -29,6 +31,7 @@ class StreamingClient:
         self._recovery_attempted = False
         self._plugin_system = None
         self._last_raw_usage = None
+        self._request_timings: Optional[RequestTimings] = None
         # Pending state for Alibaba SDK streaming tool calls
         self._pending_tool_name = None
         self._pending_tool_id = None
@@ -38,6 +41,9 @@ class StreamingClient:
     def set_plugin_system(self, plugin_system) -> None:
         """Set plugin system for hooks"""
         self._plugin_system = plugin_system
+        if plugin_system:
+            self._on_api_request = plugin_system.dispatcher("before_api_request")
+            self._on_usage_data = plugin_system.dispatcher("after_usage_data")
 
     def _calculate_backoff(self, attempt_num: int) -> float:
         """Calculate exponential backoff: 2s, 4s, 8s, 16s, 32s, max_backoff (capped)"""
@@ -74,16 +80,17 @@ class StreamingClient:
         # Reset recovery flag for each new request
         self._recovery_attempted = False
 
-        max_retries = Config.effective_max_retries()
+        max_retries = Config.snapshot().max_retries
 
         for attempt_num in range(1, max_retries + 1) if max_retries > 0 else itertools.count(1):
             config = {"base_url": Config.base_url(), "model": Config.model()}
 
             try:
                 self._log_retry_attempt(config, attempt_num)
-                request_data = self._prepare_request_data(
-                    messages, config["model"], stream, send_tools
-                )
+                with tracing.span("build_payload", attempt=attempt_num):
+                    request_data = self._prepare_request_data(
+                        messages, config["model"], stream, send_tools
+                    )
                 endpoint = Config.api_endpoint()
 
                 self._log_request_details(endpoint, config, request_data, attempt_num)
@@ -112,18 +119,25 @@ class StreamingClient:
 
                 # Call plugin hook before API request (for throttling, etc.)
                 if self._plugin_system:
-                    self._plugin_system.call_hooks("before_api_request", endpoint, request_data)
+                    self._on_api_request.fire(endpoint, request_data)
 
                 response = None
-                response = fetch(
-                    endpoint,
-                    {
-                        "method": "POST",
-                        "headers": headers,
-                        "body": json.dumps(request_data),
-                        "timeout": Config.total_timeout(),
-                    },
-                )
+                with tracing.span("serialize_payload") as payload_span:
+                    body = json.dumps(request_data)
+                    payload_span.set(bytes=len(body))
+                timings = self._request_timings = RequestTimings()
+                with tracing.span("http_request", attempt=attempt_num) as request_span:
+                    response = fetch(
+                        endpoint,
+                        {
+                            "method": "POST",
+                            "headers": headers,
+                            "body": body,
+                            "timeout": Config.total_timeout(),
+                            "timings": timings,
+                        },
+                    )
+                    request_span.set(status=response.status)
 
                 if not response.ok():
                     self._log_error_response(response)
@@ -158,11 +172,12 @@ class StreamingClient:
                         )
                     yield from self._handle_non_streaming_response(response)
 
+                self._record_timings(timings)
                 self._update_stats_on_success(start_time)
 
                 # Fire usage hook AFTER stats are updated (elapsed is set)
                 if self._last_raw_usage and self._plugin_system:
-                    self._plugin_system.call_hooks("after_usage_data", self._last_raw_usage)
+                    self._on_usage_data.fire(self._last_raw_usage)
                     self._last_raw_usage = None
 
                 return  # Success - exit retry loop
@@ -270,6 +285,31 @@ class StreamingClient:
 
         return False  # Exit retry loop
 
+    def _record_timings(self, timings: RequestTimings) -> None:
+        """Add a finished request's latency to stats (before the usage hook reads them)"""
+        if not self.stats:
+            return
+        usage = self._create_usage(self._last_raw_usage)
+        summary = self.stats.record_request_timings(timings, usage["completion_tokens"] if usage else 0)
+        if Config.debug():
+            log_debug(f"*** Request timings: {summary}")
+
+    @staticmethod
+    def _mark_first_tokens(timings: RequestTimings, choices: List[Dict[str, Any]], reasoning_fields) -> bool:
+        """Mark first_token/first_content/first_tool_call from deltas; False once nothing is left to mark"""
+        marks = timings.marks
+        for choice in choices:
+            delta = choice.get("delta") or {}
+            if delta.get("content"):
+                timings.mark("first_token")
+                timings.mark("first_content")
+            if delta.get("tool_calls"):
+                timings.mark("first_token")
+                timings.mark("first_tool_call")
+            if "first_token" not in marks and any(delta.get(f) for f in reasoning_fields):
+                timings.mark("first_token")
+        return not ("first_content" in marks and "first_tool_call" in marks)
+
     def _update_stats_on_success(self, start_time: float) -> None:
         """Update stats on success -"""
         if self.stats:
@@ -353,6 +393,8 @@ class StreamingClient:
 
     def _format_messages(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Format messages for API -"""
+        cfg = Config.snapshot()
+        clear_thinking = Config.clear_thinking() is True
         formatted = []
         for msg in messages:
             msg_dict = {"role": msg.get("role"), "content": msg.get("content")}
@@ -365,19 +407,19 @@ class StreamingClient:
 
             # Preserve reasoning with the field name the current provider expects
             # clear_thinking=True strips reasoning from non-tool-call messages (save bandwidth)
-            if Config.clear_thinking() is True and not msg.get("tool_calls"):
+            if clear_thinking and not msg.get("tool_calls"):
                 pass  # strip reasoning from non-tool-call assistant messages
             else:
-                override = Config.get_reasoning_field()
+                override = cfg.reasoning_field
                 if override:
                     # Remap: find reasoning from any stored field, send with override name
-                    for field in Config.get_possible_reasoning_fields():
+                    for field in cfg.possible_reasoning_fields:
                         if msg.get(field):
                             msg_dict[override] = msg[field]
                             break
                 else:
                     # No override: preserve whatever field name was stored
-                    for field in Config.get_possible_reasoning_fields():
+                    for field in cfg.possible_reasoning_fields:
                         if msg.get(field):
                             msg_dict[field] = msg[field]
                             break
@@ -403,7 +445,7 @@ class StreamingClient:
             headers["Authorization"] = f"Bearer {api_key}"
 
         # Add custom headers from environment
-        custom_headers = Config.http_headers()
+        custom_headers = Config.snapshot().http_headers
         headers.update(custom_headers)
 
         return headers
@@ -437,6 +479,12 @@ class StreamingClient:
                     thinking_printed = False
 
             raw_response = ""
+            # Bound once: the loop below runs per SSE line
+            cfg = Config.snapshot()
+            debug = cfg.debug
+            reasoning_fields = cfg.reasoning_fields
+            timings = self._request_timings
+            marks_pending = timings is not None
 
             # Read response incrementally
             while True:
@@ -453,14 +501,14 @@ class StreamingClient:
                 raw_response += line + "\n"
 
                 # Debug: print first few lines
-                if Config.debug() and len(raw_response) < 200:
+                if debug and len(raw_response) < 200:
                     log_debug(f"SSE line: {repr(line)}")
 
                 # Skip empty lines
                 if line.strip() == "":
                     continue
 
-                if Config.debug() and "tool_calls" in line:
+                if debug and "tool_calls" in line:
                     log_debug(f"Tool call detected in stream: {line[:100]}")
 
                 if line.startswith("data:"):
@@ -471,12 +519,12 @@ class StreamingClient:
                     if data_str.startswith(" "):
                         data_str = data_str[1:]
                     if data_str == "[DONE]":
-                        if Config.debug():
+                        if debug:
                             log_debug("Received [DONE] signal")
                         return
 
                     try:
-                        if Config.debug() and "tool_calls" in data_str:
+                        if debug and "tool_calls" in data_str:
                             log_debug(f"Tool call JSON: {data_str[:100]}...")
                         chunk_data = json.loads(data_str)
 
@@ -490,9 +538,7 @@ class StreamingClient:
                             # Show thinking indicator if any reasoning field present
                             for c in choices:
                                 delta = c.get("delta", {})
-                                override = Config.get_reasoning_field()
-                                fields = [override] if override else Config.get_possible_reasoning_fields()
-                                if any(delta.get(f) and delta.get(f).strip() for f in fields):
+                                if any(delta.get(f) and delta.get(f).strip() for f in reasoning_fields):
                                     _show_thinking()
                                     break
                         else:
@@ -529,7 +575,7 @@ class StreamingClient:
                                 if not hasattr(self, '_pending_tool_args') or self._pending_tool_args is None:
                                     self._pending_tool_args = ""
                                 self._pending_tool_args += partial
-                                if Config.debug():
+                                if debug:
                                     log_debug(f"*** input_json_delta: accumulated={repr(self._pending_tool_args[:100])}")
 
                         elif delta_type == "text_delta" and not choices:
@@ -555,7 +601,7 @@ class StreamingClient:
                                 self._pending_tool_index = chunk_data.get("index", 0)
                                 self._pending_tool_args = ""
                                 # Skip to chunk creation with empty choices
-                                if Config.debug():
+                                if debug:
                                     log_debug(f"*** content_block_start tool_use: name={self._pending_tool_name}, id={self._pending_tool_id}")
 
                         # Handle message_delta for tool_use completion (Alibaba SDK)
@@ -582,7 +628,7 @@ class StreamingClient:
                                         },
                                     }
                                     choices = [choice]
-                                    if Config.debug():
+                                    if debug:
                                         log_debug(f"*** message_delta yielding tool: name={tool_name}, args={tool_args}")
                                 # Clear pending
                                 self._pending_tool_name = None
@@ -612,13 +658,18 @@ class StreamingClient:
                         if raw_usage:
                             self._last_raw_usage = raw_usage
 
+                        if timings is not None:
+                            timings.chunk()
+                            if marks_pending and choices:
+                                marks_pending = self._mark_first_tokens(timings, choices, reasoning_fields)
+
                         # Handle message_stop (end of Alibaba stream)
                         if chunk_data.get("type") == "message_stop":
-                            if Config.debug():
+                            if debug:
                                 log_debug("Received message_stop")
                             return
 
-                        if Config.debug():
+                        if debug:
                             if chunk_data.get("model"):
                                 log_debug(f"*** Model: {chunk_data.get('model')}")
                             if chunk_data.get("provider"):
@@ -706,6 +757,11 @@ class StreamingClient:
                     self._update_stats_from_usage(usage)
                     self._last_raw_usage = usage
 
+                if self._request_timings is not None:
+                    self._mark_first_tokens(
+                        self._request_timings, chunk["choices"], Config.snapshot().reasoning_fields
+                    )
+
                 yield chunk
                 return
 
@@ -752,7 +808,7 @@ class StreamingClient:
                 return True  # Retry with compacted context
 
         # Don't retry if HTTP status is known and not in retryable set
-        retryable = Config.retry_status_codes()
+        retryable = Config.snapshot().retry_status_codes
         if status != 0 and status not in retryable:
             log_warn(f"Not retrying HTTP {status} (not in retryable codes: {sorted(retryable)})")
             if self.stats:
@@ -7,6 +7,7 @@ import json
 import readline
 from typing import Dict, Any, List, Union
 
+from aicoder.core import tracing
 from aicoder.core.config import Config
 from aicoder.utils.log import LogUtils, LogOptions
 from aicoder.core.tool_formatter import ToolFormatter
@@ -36,7 +37,10 @@ class ToolExecutor:
         self.message_history = message_history
         self._guidance_mode = False
         self.plugin_system = plugin_system
-        
+        if plugin_system:
+            self._on_tool_results = plugin_system.dispatcher("after_tool_results")
+            self._on_tool_executed = plugin_system.dispatcher("after_single_tool_execution")
+
     def is_guidance_mode(self) -> bool:
         """Check if user requested guidance mode"""
         return self._guidance_mode
@@ -54,7 +58,9 @@ class ToolExecutor:
             tool_results = []
 
             for i, tool_call in enumerate(tool_calls):
-                result = self._execute_single_tool_call(tool_call)
+                tool_name = tool_call.get("function", {}).get("name")
+                with tracing.span(f"tool:{tool_name}", id=tool_call.get("id", "")):
+                    result = self._execute_single_tool_call(tool_call)
                 if result:
                     tool_results.append(result)
 
@@ -69,11 +75,12 @@ class ToolExecutor:
                     break
 
             # Add all tool results to message history
-            self.message_history.add_tool_results(tool_results)
+            with tracing.span("add_tool_results", count=len(tool_results)):
+                self.message_history.add_tool_results(tool_results)
 
             # Call plugin hook after tool results are added
             if self.plugin_system:
-                self.plugin_system.call_hooks("after_tool_results", tool_results)
+                self._on_tool_results.fire(tool_results)
 
         except Exception as e:
             LogUtils.error(f"Tool execution error: {e}")
@@ -111,14 +118,18 @@ class ToolExecutor:
                 LogUtils.printc(formatted_args, color="cyan")
 
         # Check approval
-        if not self._get_tool_approval(tool_name, arguments):
+        with tracing.span("approval") as approval_span:
+            approved = self._get_tool_approval(tool_name, arguments)
+            approval_span.set(approved=approved)
+        if not approved:
             return {
                 "tool_call_id": tool_call.get("id", ""),
                 "content": "Tool execution cancelled by user",
             }
 
         # Execute tool
-        return self._execute_tool(tool_name, arguments, tool_call.get("id", ""))
+        with tracing.span("execute"):
+            return self._execute_tool(tool_name, arguments, tool_call.get("id", ""))
 
     def _parse_tool_arguments(self, args_str: str) -> Dict[str, Any]:
         """Parse tool arguments from string"""
@@ -320,7 +331,7 @@ class ToolExecutor:
 
             # Notify plugins after each tool execution
             if self.plugin_system:
-                self.plugin_system.call_hooks("after_single_tool_execution", tool_name, arguments, result)
+                self._on_tool_executed.fire(tool_name, arguments, result)
 
             # Return result for message history (AI always gets detailed version)
             return {
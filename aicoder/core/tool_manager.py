@@ -45,6 +45,11 @@ class ToolManager:
         from aicoder.tools.internal.read_file import set_plugin_system as read_file_set_plugin_system
         read_file_set_plugin_system(plugin_system)
 
+    def set_message_history(self, message_history) -> None:
+        """Give tools that need it access to the message history"""
+        from aicoder.tools.internal.read_file import set_message_history as read_file_set_message_history
+        read_file_set_message_history(message_history)
+
     def _register_internal_tools(self):
         """Register all internal tools (filtered by TOOLS_ALLOW and TOOLS_DENY)"""
         all_tools = {
@@ -56,7 +61,8 @@ class ToolManager:
             "list_directory": LIST_DIRECTORY_DEF,
         }
 
-        allowed = Config.tools_allow()
+        cfg = Config.snapshot()
+        allowed = cfg.tools_allow
         if allowed is not None:
             # Only register allowed tools
             for name, tool_def in all_tools.items():
@@ -67,7 +73,7 @@ class ToolManager:
             self.tools.update(all_tools)
 
         # Filter by TOOLS_DENY (deny wins)
-        denied = Config.tools_deny()
+        denied = cfg.tools_deny
         for name in denied:
             self.tools.pop(name, None)
 
@@ -158,6 +164,11 @@ class ToolManager:
             # Track that we read this file (special case for read_file)
             if name == "read_file" and "path" in args_obj:
                 self.read_files.add(args_obj["path"])
+            if name == "read_file" and isinstance(args_obj.get("paths"), list):
+                for item in args_obj["paths"]:
+                    path = item.get("path") if isinstance(item, dict) else item
+                    if isinstance(path, str):
+                        self.read_files.add(path)
 
             return tool_output
 
@@ -0,0 +1,226 @@
+"""
+Turn tracing: nested spans exported as Chrome trace events
+Stateless module functions with module-level trace state
+
+Spans only record while tracing is enabled and a turn is active, so
+instrumented code pays one global check when it is off. Each finished turn is
+written to .aicoder/traces/ as JSONL, one trace event per line; wrap it into an
+array (`jq -s . turn.jsonl > turn.json`) to open it in chrome://tracing or
+Perfetto. Nesting is implied by time ranges on the same thread, so spans from
+helper threads show up on their own tracks.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+TRACE_DIR = ".aicoder/traces"
+# Oldest trace files beyond this are removed after each export
+MAX_TRACE_FILES = 100
+# Lines printed by format_last(); deeper trees are truncated
+MAX_FORMAT_LINES = 200
+
+# Module-level state: the enabled flag, events of the active turn (None when
+# no turn is running) and the last exported turn
+_enabled = False
+_events: Optional[List[Dict[str, Any]]] = None
+_last: Optional[Dict[str, Any]] = None
+_turn_count = 0
+# perf_counter_ns is monotonic but has no epoch; this maps it to wall-clock µs
+_epoch_offset_us = time.time() * 1_000_000 - time.perf_counter_ns() / 1000
+
+
+class _NoSpan:
+    """Shared no-op span returned while tracing is off"""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+    def set(self, **attrs: Any) -> None:
+        """Ignore attributes"""
+
+
+_NO_SPAN = _NoSpan()
+
+
+class _Span:
+    """One timed region, recorded as a complete ("X") event on exit"""
+
+    __slots__ = ("name", "attrs", "start_ns")
+
+    def __init__(self, name: str, attrs: Dict[str, Any]):
+        self.name = name
+        self.attrs = attrs
+        self.start_ns = 0
+
+    def __enter__(self) -> "_Span":
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        record(self.name, self.start_ns, time.perf_counter_ns() - self.start_ns, **self.attrs)
+        return False
+
+    def set(self, **attrs: Any) -> None:
+        """Add attributes, e.g. results known only at the end of the span"""
+        self.attrs.update(attrs)
+
+
+class _Turn(_Span):
+    """Root span: collects every span until it exits, then exports them"""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_Turn":
+        global _events
+        _events = []
+        return super().__enter__()
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        global _events
+        super().__exit__(exc_type, exc, tb)
+        events, _events = _events, None
+        if events:
+            _export(events)
+        return False
+
+
+def enable() -> None:
+    """Start tracing from the next turn"""
+    global _enabled
+    _enabled = True
+
+
+def disable() -> None:
+    """Stop tracing; a turn in progress stops recording immediately"""
+    global _enabled, _events
+    _enabled = False
+    _events = None
+
+
+def enabled() -> bool:
+    """Whether turns are being traced"""
+    return _enabled
+
+
+def turn(name: str, **attrs: Any):
+    """
+    Context manager for a traced turn. Outside a turn it starts collection and
+    exports on exit; inside one (process_with_ai recurses after tool calls) it
+    is an ordinary span.
+    """
+    if not _enabled:
+        return _NO_SPAN
+    if _events is not None:
+        return _Span(name, attrs)
+    return _Turn(name, attrs)
+
+
+def span(name: str, **attrs: Any):
+    """Context manager timing a nested region of the active turn"""
+    if _events is None:
+        return _NO_SPAN
+    return _Span(name, attrs)
+
+
+def active() -> bool:
+    """Whether a traced turn is collecting spans right now"""
+    return _events is not None
+
+
+def record(name: str, start_ns: int, duration_ns: int, **attrs: Any) -> None:
+    """Record a region timed by the caller with time.perf_counter_ns()"""
+    events = _events
+    if events is None:
+        return
+    events.append({
+        "name": name,
+        "cat": "aicoder",
+        "ph": "X",
+        "ts": round(start_ns / 1000 + _epoch_offset_us, 3),
+        "dur": round(duration_ns / 1000, 3),
+        "pid": os.getpid(),
+        "tid": threading.get_ident(),
+        "args": attrs,
+    })
+
+
+def _thread_names(events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Metadata events naming each thread that recorded spans"""
+    names = {thread.ident: thread.name for thread in threading.enumerate()}
+    pid = os.getpid()
+    return [
+        {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": names.get(tid, str(tid))}}
+        for tid in sorted({event["tid"] for event in events})
+    ]
+
+
+def _export(events: List[Dict[str, Any]]) -> None:
+    """Write a finished turn to TRACE_DIR and remember it for last_turn()"""
+    global _last, _turn_count
+    _turn_count += 1
+    events.sort(key=lambda e: (e["ts"], -e["dur"]))
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    path = os.path.join(TRACE_DIR, f"turn-{stamp}-{os.getpid()}-{_turn_count}.jsonl")
+    _last = {"path": None, "events": events}
+    try:
+        os.makedirs(TRACE_DIR, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            for event in _thread_names(events) + events:
+                f.write(json.dumps(event, default=str) + "\n")
+        _last["path"] = path
+        _prune()
+    except OSError:
+        pass  # Tracing must never break a turn; the events stay in memory
+
+
+def _prune() -> None:
+    """Keep only the newest MAX_TRACE_FILES traces"""
+    try:
+        files = [name for name in os.listdir(TRACE_DIR) if name.endswith(".jsonl")]
+    except OSError:
+        return
+    if len(files) <= MAX_TRACE_FILES:
+        return
+    paths = sorted((os.path.join(TRACE_DIR, name) for name in files), key=os.path.getmtime)
+    for path in paths[:-MAX_TRACE_FILES]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def last_turn() -> Optional[Dict[str, Any]]:
+    """The last exported turn as {"path", "events"}, or None"""
+    return _last
+
+
+def format_last() -> List[str]:
+    """Indented span tree of the last turn, one line per span"""
+    if _last is None:
+        return []
+
+    events = _last["events"]
+    root_tid = events[0]["tid"] if events else None
+    lines = []
+    stacks: Dict[int, List[float]] = {}  # tid -> end timestamps of open spans
+    for event in events[:MAX_FORMAT_LINES]:
+        stack = stacks.setdefault(event["tid"], [])
+        while stack and event["ts"] >= stack[-1]:
+            stack.pop()
+        thread = "" if event["tid"] == root_tid else f"[thread {event['tid']}] "
+        attrs = " ".join(f"{key}={value}" for key, value in event["args"].items())
+        lines.append(f"{'  ' * len(stack)}{thread}{event['name']} {event['dur'] / 1000:.1f}ms {attrs}".rstrip())
+        stack.append(event["ts"] + event["dur"])
+    if len(events) > MAX_FORMAT_LINES:
+        lines.append(f"... {len(events) - MAX_FORMAT_LINES} more spans")
+    return lines
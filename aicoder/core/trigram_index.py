@@ -0,0 +1,460 @@
+"""
+Trigram index for repository-wide grep (opt-in: AICODER_GREP_INDEX=1)
+
+Stateful: class needed for postings, persistence and the refresh thread.
+Files are tracked by (mtime_ns, size); changed files get a new id and the
+old one becomes dead until the next compaction. The grep tool asks for
+candidate files and verifies them with the regex; whenever the index does
+not exactly match the tree it answers None (plain scan) and refreshes in
+the background.
+"""
+
+import json
+import os
+import struct
+import threading
+import time
+from array import array
+from typing import Dict, List, Optional, Set, Tuple
+
+from aicoder.core.config import Config
+from aicoder.utils.file_scan import FileEntry, scan_files
+from aicoder.utils.log import LogUtils
+
+INDEX_VERSION = 1
+MAX_INDEXED_FILE_SIZE = 1024 * 1024  # bigger files are always candidates
+BINARY_SNIFF_BYTES = 8192
+COMPACT_DEAD_RATIO = 0.3  # rewrite postings when this share of ids is dead
+
+# Special file ids
+UNINDEXED = -1  # too large: always a candidate
+BINARY = -2  # never a candidate (grep skips binaries)
+
+_POSTING_HEADER = struct.Struct("<II")  # trigram, id count
+_ESCAPE_OPERANDS = {"x": 2, "u": 4, "U": 8}  # hex digits after \x, \u, \U
+
+
+def _trigrams(data: bytes) -> Set[int]:
+    """Distinct byte trigrams of data, packed as 24-bit ints"""
+    return {(a << 16) | (b << 8) | c for a, b, c in set(zip(data, data[1:], data[2:]))}
+
+
+def required_literals(pattern: str) -> List[str]:
+    """
+    Literal substrings every match of a regex must contain.
+
+    Conservative: alternation, inline flags and anything unclear yield no
+    literals (no narrowing) rather than a wrong candidate set. Only text
+    outside groups counts (a group may be optional: "(foo)?", "(x)*"), and
+    escapes with operands (\\x41, \\u, \\N{...}, octal, backreferences)
+    end a literal without contributing to it.
+    """
+    if "|" in pattern or "(?" in pattern:
+        return []
+
+    runs: List[str] = []
+    current: List[str] = []
+    depth = 0  # Group nesting; literals inside groups aren't required
+
+    def flush():
+        if current:
+            runs.append("".join(current))
+            current.clear()
+
+    i = 0
+    n = len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == "\\":
+            nxt = pattern[i + 1:i + 2]
+            i += 2
+            if nxt and not nxt.isalnum():
+                if depth == 0:
+                    current.append(nxt)  # escaped punctuation is literal
+                continue
+            flush()  # \s, \d, \b, \x41, \1... are not literals
+            if nxt in _ESCAPE_OPERANDS:
+                i += _ESCAPE_OPERANDS[nxt]
+            elif nxt == "N":
+                close = pattern.find("}", i)
+                if close == -1:
+                    return []
+                i = close + 1
+            elif nxt.isdigit():
+                while i < n and pattern[i].isdigit():
+                    i += 1  # octal (\012) or backreference (\12)
+            continue
+        if c in "*?":
+            if current:
+                current.pop()  # preceding char is optional
+            flush()
+            i += 1
+            continue
+        if c == "{":
+            if current:
+                current.pop()
+            flush()
+            close = pattern.find("}", i)
+            if close == -1:
+                return []
+            i = close + 1
+            continue
+        if c == "[":
+            flush()
+            j = i + 1
+            if pattern[j:j + 1] == "^":
+                j += 1
+            if pattern[j:j + 1] == "]":
+                j += 1
+            while j < n and pattern[j] != "]":
+                j += 2 if pattern[j] == "\\" else 1
+            if j >= n:
+                return []
+            i = j + 1
+            continue
+        if c == "(":
+            depth += 1
+        elif c == ")":
+            depth = max(0, depth - 1)
+        if c in "+.^$()":
+            flush()
+            i += 1
+            continue
+        if depth == 0:
+            current.append(c)
+        i += 1
+    flush()
+
+    return [run for run in runs if len(run.encode("utf-8")) >= 3]
+
+
+class TrigramIndex:
+    """On-disk trigram index of the files under one root"""
+
+    def __init__(self, root: str, index_dir: str):
+        self.root = os.path.abspath(root)
+        self.index_dir = index_dir
+        self._lock = threading.RLock()
+        self._files: Dict[str, Tuple[int, int, int]] = {}  # path -> (id, mtime_ns, size)
+        self._postings: Dict[int, array] = {}  # trigram -> file ids
+        self._next_id = 0
+        self._dead = 0
+        self._loaded = False
+        self._refresh_thread: Optional[threading.Thread] = None
+        self._refresh_requested = False
+        self.building = False
+        self.last_refresh = 0.0
+        self.last_refresh_seconds = 0.0
+
+        # Metrics
+        self.queries = 0
+        self.hits = 0
+        self.stale_fallbacks = 0
+        self.pattern_fallbacks = 0
+        self.last_candidates = 0
+        self.last_total = 0
+
+    # --- persistence ---
+
+    def _meta_path(self) -> str:
+        return os.path.join(self.index_dir, "meta.json")
+
+    def _postings_path(self) -> str:
+        return os.path.join(self.index_dir, "postings.bin")
+
+    def load(self) -> bool:
+        """Load the index from disk (once). Returns True if one was found."""
+        with self._lock:
+            if self._loaded:
+                return bool(self._files)
+            self._loaded = True
+            try:
+                with open(self._meta_path(), "r", encoding="utf-8") as f:
+                    meta = json.load(f)
+                if meta.get("version") != INDEX_VERSION or meta.get("root") != self.root:
+                    return False
+                with open(self._postings_path(), "rb") as f:
+                    data = f.read()
+            except (OSError, ValueError):
+                return False
+
+            postings: Dict[int, array] = {}
+            pos = 0
+            try:
+                while pos < len(data):
+                    trigram, count = _POSTING_HEADER.unpack_from(data, pos)
+                    pos += _POSTING_HEADER.size
+                    ids = array("I")
+                    ids.frombytes(data[pos:pos + count * 4])
+                    pos += count * 4
+                    postings[trigram] = ids
+            except struct.error:
+                return False
+
+            self._files = {path: tuple(v) for path, v in meta["files"].items()}
+            self._next_id = meta["next_id"]
+            self._dead = meta.get("dead", 0)
+            self._postings = postings
+            self.last_refresh = meta.get("updated", 0.0)
+            return True
+
+    def save(self) -> None:
+        """Write the index to disk (atomic rename of both files)"""
+        with self._lock:
+            if self._dead and self._dead > COMPACT_DEAD_RATIO * max(1, len(self._files)):
+                self._compact()
+            meta = {
+                "version": INDEX_VERSION,
+                "root": self.root,
+                "next_id": self._next_id,
+                "dead": self._dead,
+                "updated": self.last_refresh,
+                "files": dict(self._files),
+            }
+            chunks = []
+            for trigram, ids in self._postings.items():
+                chunks.append(_POSTING_HEADER.pack(trigram, len(ids)))
+                chunks.append(ids.tobytes())
+            blob = b"".join(chunks)
+
+        os.makedirs(self.index_dir, exist_ok=True)
+        for path, write in (
+            (self._postings_path(), lambda f: f.write(blob)),
+            (self._meta_path(), lambda f: f.write(json.dumps(meta).encode("utf-8"))),
+        ):
+            tmp = path + ".tmp"
+            with open(tmp, "wb") as f:
+                write(f)
+            os.replace(tmp, path)
+
+    def _compact(self) -> None:
+        """Drop dead ids from all postings"""
+        live = {v[0] for v in self._files.values() if v[0] >= 0}
+        for trigram in list(self._postings):
+            ids = array("I", (i for i in self._postings[trigram] if i in live))
+            if ids:
+                self._postings[trigram] = ids
+            else:
+                del self._postings[trigram]
+        self._dead = 0
+
+    # --- building ---
+
+    @staticmethod
+    def _read_trigrams(path: str, size: int) -> Tuple[int, Optional[Set[int]]]:
+        """Read a file outside the lock: (UNINDEXED|BINARY|0, trigrams)"""
+        if size > MAX_INDEXED_FILE_SIZE:
+            return UNINDEXED, None
+        with open(path, "rb") as f:
+            data = f.read()
+        if b"\0" in data[:BINARY_SNIFF_BYTES]:
+            return BINARY, None
+        return 0, _trigrams(data)
+
+    def _apply(self, path: str, mtime_ns: int, size: int, kind: int, trigrams: Optional[Set[int]]) -> None:
+        """Record a file's new trigrams; caller holds the lock"""
+        old = self._files.get(path)
+        if old and old[0] >= 0:
+            self._dead += 1
+        if trigrams is None:
+            self._files[path] = (kind, mtime_ns, size)
+            return
+
+        file_id = self._next_id
+        self._next_id += 1
+        postings = self._postings
+        for trigram in trigrams:
+            ids = postings.get(trigram)
+            if ids is None:
+                postings[trigram] = array("I", [file_id])
+            else:
+                ids.append(file_id)
+        self._files[path] = (file_id, mtime_ns, size)
+
+    def _remove(self, path: str) -> None:
+        """Forget a deleted file; caller holds the lock"""
+        old = self._files.pop(path, None)
+        if old and old[0] >= 0:
+            self._dead += 1
+
+    def refresh(self) -> int:
+        """
+        Bring the index in line with the tree. Returns files (re)indexed.
+
+        Files are read without holding the lock so queries keep getting
+        answered (as stale) while a large build runs.
+        """
+        self.load()
+        t0 = time.perf_counter()
+        entries, _ = scan_files(self.root)
+        with self._lock:
+            files = dict(self._files)
+
+        changed = 0
+        seen = set()
+        for path, mtime_ns, size in entries:
+            seen.add(path)
+            known = files.get(path)
+            if known and known[1] == mtime_ns and known[2] == size:
+                continue
+            try:
+                kind, trigrams = self._read_trigrams(path, size)
+            except OSError:
+                continue
+            with self._lock:
+                self._apply(path, mtime_ns, size, kind, trigrams)
+            changed += 1
+
+        with self._lock:
+            for path in [p for p in self._files if p not in seen]:
+                self._remove(path)
+                changed += 1
+            self.last_refresh = time.time()
+            self.last_refresh_seconds = time.perf_counter() - t0
+        if changed:
+            self.save()
+        return changed
+
+    def rebuild(self) -> int:
+        """Discard everything and index the tree from scratch"""
+        with self._lock:
+            self._loaded = True
+            self._files = {}
+            self._postings = {}
+            self._next_id = 0
+            self._dead = 0
+        return self.refresh()
+
+    def refresh_async(self, rebuild: bool = False) -> None:
+        """Refresh in a background thread (coalesces concurrent requests)"""
+        with self._lock:
+            if self._refresh_thread and self._refresh_thread.is_alive():
+                self._refresh_requested = True
+                return
+            self._refresh_requested = False
+            self.building = True
+            self._refresh_thread = threading.Thread(
+                target=self._refresh_worker, args=(rebuild,), daemon=True, name="trigram-index"
+            )
+            self._refresh_thread.start()
+
+    def _refresh_worker(self, rebuild: bool) -> None:
+        try:
+            self.rebuild() if rebuild else self.refresh()
+            while True:
+                with self._lock:
+                    if not self._refresh_requested:
+                        break
+                    self._refresh_requested = False
+                self.refresh()
+        except Exception as e:
+            if Config.debug():
+                LogUtils.warn(f"[!] Trigram index refresh failed: {e}")
+        finally:
+            self.building = False
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """Wait for a running background refresh"""
+        thread = self._refresh_thread
+        if thread:
+            thread.join(timeout)
+
+    # --- querying ---
+
+    def candidates(self, pattern: str, entries: List[FileEntry]) -> Optional[List[str]]:
+        """
+        Files among entries that may match pattern, or None when the index
+        can't answer (not built, stale, outside root, no literal trigrams).
+        """
+        self.queries += 1
+        literals = required_literals(pattern)
+        if not literals:
+            self.pattern_fallbacks += 1
+            return None
+
+        query: Set[int] = set()
+        for literal in literals:
+            query |= _trigrams(literal.encode("utf-8"))
+
+        self.load()
+        with self._lock:
+            files = self._files
+            stale = not files
+            for path, mtime_ns, size in entries:
+                known = files.get(path)
+                if not known or known[1] != mtime_ns or known[2] != size:
+                    stale = True
+                    break
+            if stale:
+                self.stale_fallbacks += 1
+                self.refresh_async()
+                return None
+
+            postings = sorted((self._postings.get(t, ()) for t in query), key=len)
+            matching = set(postings[0]) if postings else set()
+            for ids in postings[1:]:
+                if not matching:
+                    break
+                matching.intersection_update(ids)
+
+            result = []
+            for path, _, _ in entries:
+                file_id = files[path][0]
+                if file_id == UNINDEXED or file_id in matching:
+                    result.append(path)
+
+        self.hits += 1
+        self.last_candidates = len(result)
+        self.last_total = len(entries)
+        return result
+
+    def status(self) -> Dict[str, object]:
+        """Index size and hit metrics"""
+        self.load()
+        with self._lock:
+            indexed = sum(1 for v in self._files.values() if v[0] >= 0)
+            size = 0
+            for path in (self._meta_path(), self._postings_path()):
+                try:
+                    size += os.path.getsize(path)
+                except OSError:
+                    pass
+            return {
+                "root": self.root,
+                "files": len(self._files),
+                "indexed_files": indexed,
+                "trigrams": len(self._postings),
+                "dead_ids": self._dead,
+                "disk_bytes": size,
+                "building": self.building,
+                "last_refresh": self.last_refresh,
+                "last_refresh_seconds": self.last_refresh_seconds,
+                "queries": self.queries,
+                "hits": self.hits,
+                "stale_fallbacks": self.stale_fallbacks,
+                "pattern_fallbacks": self.pattern_fallbacks,
+                "last_candidates": self.last_candidates,
+                "last_total": self.last_total,
+            }
+
+
+# Module-level singleton for the current project
+_index: Optional[TrigramIndex] = None
+
+
+def get_index(create: bool = False) -> Optional[TrigramIndex]:
+    """Get the project index when AICODER_GREP_INDEX=1 (or create=True)"""
+    global _index
+    if not (create or Config.grep_index_enabled()):
+        return None
+    root = os.getcwd()
+    if _index is None or _index.root != root:
+        _index = TrigramIndex(root, os.path.join(root, ".aicoder", "index"))
+    return _index
+
+
+def notify_file_changed(path: str) -> None:
+    """Refresh the index in the background after write_file/edit_file"""
+    index = get_index()
+    if index is not None and os.path.abspath(path).startswith(index.root + os.sep):
+        index.refresh_async()
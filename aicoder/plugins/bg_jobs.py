@@ -10,20 +10,121 @@ Features:
 - Kill individual jobs or all jobs
 - Auto-cleanup on AI Coder exit
 - Process group management to prevent orphans
+- Output captured to size-capped rotating logs under .aicoder/jobs/ plus an
+  in-memory tail buffer; 'tail'/'grep' return only output new since the last read
 """
 
 import os
+import re
 import subprocess
 import signal
 import shlex
+import threading
 import time
 import atexit
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 
 from aicoder.core.config import Config
 from aicoder.utils.log import LogUtils, info, dim, warn, success, print
 
+JOBS_LOG_DIR = ".aicoder/jobs"
+# Each job's log rotates to <pid>.log.1 at this size, so disk use per job
+# stays under 2x; logs of the oldest jobs beyond MAX_JOB_LOGS are deleted
+LOG_MAX_BYTES = 1024 * 1024
+MAX_JOB_LOGS = 20
+# Most recent output kept in memory per job for tail/grep
+TAIL_BUFFER_BYTES = 256 * 1024
+
+
+class JobOutput:
+    """
+    Output of one background job: a reader thread copies the merged
+    stdout/stderr pipe into a rotating log file and a bounded in-memory
+    tail buffer. Offsets count bytes since the job started, so readers
+    can ask for "everything after offset N".
+    """
+
+    def __init__(self, log_path: str):
+        self.log_path = log_path
+        self.total = 0
+        self._tail = bytearray()
+        self._log_bytes = 0
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, pipe) -> None:
+        """Start draining the pipe in a daemon thread"""
+        self._thread = threading.Thread(target=self._drain, args=(pipe,), daemon=True)
+        self._thread.start()
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """Wait for the reader thread to hit EOF"""
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _drain(self, pipe) -> None:
+        """Reader thread: pipe -> log file + tail buffer until EOF"""
+        log = self._open_log()
+        try:
+            while True:
+                chunk = os.read(pipe.fileno(), 65536)
+                if not chunk:
+                    break
+                log = self._write_log(log, chunk)
+                with self._lock:
+                    self.total += len(chunk)
+                    self._tail += chunk
+                    if len(self._tail) > TAIL_BUFFER_BYTES:
+                        del self._tail[: len(self._tail) - TAIL_BUFFER_BYTES]
+        except OSError:
+            pass
+        finally:
+            pipe.close()
+            if log:
+                log.close()
+
+    def _open_log(self):
+        """Open (truncate) the log file, or None if it can't be written"""
+        try:
+            os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+            return open(self.log_path, "wb", buffering=0)
+        except OSError:
+            return None
+
+    def _write_log(self, log, chunk: bytes):
+        """Append to the log, rotating to .1 once it exceeds LOG_MAX_BYTES"""
+        if log is None:
+            return None
+        chunk = chunk[-LOG_MAX_BYTES:]
+        if self._log_bytes + len(chunk) > LOG_MAX_BYTES and self._log_bytes:
+            log.close()
+            try:
+                os.replace(self.log_path, self.log_path + ".1")
+            except OSError:
+                pass
+            log = self._open_log()
+            self._log_bytes = 0
+            if log is None:
+                return None
+        log.write(chunk)
+        self._log_bytes += len(chunk)
+        return log
+
+    def read_since(self, offset: int, max_bytes: int) -> Tuple[str, int, int]:
+        """
+        Output after byte offset, at most max_bytes (the newest are kept).
+        Returns (text, new offset, bytes skipped because they were no longer
+        buffered or over max_bytes).
+        """
+        with self._lock:
+            total = self.total
+            start = max(offset, total - len(self._tail))
+            start = max(start, total - max_bytes)
+            data = bytes(self._tail[len(self._tail) - (total - start):]) if total > start else b""
+        skipped = max(0, start - offset)
+        return data.decode("utf-8", errors="replace"), total, skipped
+
 
 def create_plugin(ctx):
     """
@@ -31,33 +132,86 @@ def create_plugin(ctx):
     """
 
     # In-memory job storage
-    # Key: pid, Value: {name, process, command, started_at}
+    # Key: pid, Value: {name, process, command, started_at, output, cursor}
     jobs: Dict[int, Dict[str, Any]] = {}
-    # Completed jobs history: [{name, command, started_at, ended_at, duration_seconds, pid}]
+    # Completed jobs history: [{name, command, started_at, ended_at, duration_seconds, pid, output, cursor}]
+    # Only the last MAX_JOB_LOGS are kept, each holding up to TAIL_BUFFER_BYTES
     completed_jobs: list = []
 
+    def prune_job_logs() -> None:
+        """Delete logs of the oldest finished jobs beyond MAX_JOB_LOGS"""
+        try:
+            logs = [f for f in os.listdir(JOBS_LOG_DIR) if f.endswith(".log")]
+        except OSError:
+            return
+        # A quiet running job's log can be the oldest; never delete it
+        live = {f"{pid}.log" for pid in jobs}
+        excess = len(logs) - MAX_JOB_LOGS + 1
+        logs = [f for f in logs if f not in live]
+        logs.sort(key=lambda f: os.path.getmtime(os.path.join(JOBS_LOG_DIR, f)))
+        for old in logs[: max(0, excess)]:
+            for path in (old, old + ".1"):
+                try:
+                    os.remove(os.path.join(JOBS_LOG_DIR, path))
+                except OSError:
+                    pass
+
     def start_background_job(name: str, command: str) -> int:
         """Start a background job with proper process group handling"""
         # Start with new session/process group (like run_shell_command does)
-        # Redirect stdout/stderr to DEVNULL to prevent output appearing on screen
+        # Output goes to a pipe drained by JobOutput, never to the screen
         process = subprocess.Popen(
             ["bash", "-c", command],
             preexec_fn=os.setsid,  # Create new process group
             stdin=subprocess.DEVNULL,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
         )
 
+        prune_job_logs()
+        output = JobOutput(os.path.join(os.getcwd(), JOBS_LOG_DIR, f"{process.pid}.log"))
+        output.start(process.stdout)
+
         # Store job info
         jobs[process.pid] = {
             "name": name,
             "process": process,
             "command": command,
             "started_at": datetime.now(),
+            "output": output,
+            "cursor": 0,  # Output offset already returned by tail/grep
         }
 
         return process.pid
 
+    def find_job(pid: int) -> Optional[Dict[str, Any]]:
+        """Running job by pid, else the most recent completed one"""
+        if pid in jobs:
+            return jobs[pid]
+        for job in reversed(completed_jobs):
+            if job["pid"] == pid:
+                return job
+        return None
+
+    def read_job_output(job: Dict[str, Any], pattern: Optional[str] = None,
+                        offset: Optional[int] = None) -> Tuple[str, int, int]:
+        """
+        Output since the job's cursor (or an explicit offset), optionally only
+        lines matching pattern. Advances the cursor. Returns (text, new offset,
+        skipped bytes).
+        """
+        start = job["cursor"] if offset is None else max(0, offset)
+        max_bytes = Config.max_tool_result_size() // 2
+        # grep filters first, so it may look further back than it returns
+        text, end, skipped = job["output"].read_since(start, max_bytes * (8 if pattern else 1))
+        if pattern:
+            regex = re.compile(pattern)
+            text = "\n".join(line for line in text.splitlines() if regex.search(line))
+            if len(text) > max_bytes:
+                text = "...\n" + text[-max_bytes:]
+        job["cursor"] = end
+        return text, end, skipped
+
     def kill_job(pid: int, timeout: float = 2.0) -> bool:
         """Kill a background job and its entire process group"""
         if pid not in jobs:
@@ -110,7 +264,10 @@ def create_plugin(ctx):
             "ended_at": ended_at,
             "duration_seconds": duration,
             "pid": pid,
+            "output": job["output"],
+            "cursor": job["cursor"],
         })
+        del completed_jobs[: max(0, len(completed_jobs) - MAX_JOB_LOGS)]
         del jobs[pid]
 
     def cleanup_dead_jobs() -> None:
@@ -170,9 +327,11 @@ def create_plugin(ctx):
             command = args.get("command", "")
             lines.append(f"Name: {name}")
             lines.append(f"Command: {command}")
-        elif action == "kill":
+        elif action in ("kill", "tail", "grep"):
             pid = args.get("pid", "")
             lines.append(f"PID: {pid}")
+            if args.get("pattern"):
+                lines.append(f"Pattern: {args['pattern']}")
         
         return "\n".join(lines)
 
@@ -281,6 +440,56 @@ def create_plugin(ctx):
                 "detailed": f"Successfully killed {killed} background job(s)"
             }
 
+        elif action in ("tail", "grep"):
+            try:
+                pid = int(args.get("pid"))
+            except (ValueError, TypeError):
+                return {
+                    "tool": "bg_jobs",
+                    "friendly": f"Error: '{action}' action requires a numeric 'pid'",
+                    "detailed": f"PID must be a number, got: {args.get('pid')}"
+                }
+            pattern = args.get("pattern")
+            if action == "grep" and not pattern:
+                return {
+                    "tool": "bg_jobs",
+                    "friendly": "Error: 'grep' action requires 'pattern'",
+                    "detailed": "Missing required parameter 'pattern' for 'grep' action"
+                }
+
+            cleanup_dead_jobs()
+            job = find_job(pid)
+            if job is None:
+                return {
+                    "tool": "bg_jobs",
+                    "friendly": f"Error: No job with pid: {pid}",
+                    "detailed": f"Cannot find running or completed job with pid: {pid}"
+                }
+            if pid not in jobs:
+                # Finished: let the reader drain what's left in the pipe
+                job["output"].wait(1)
+
+            try:
+                text, end, skipped = read_job_output(job, pattern if action == "grep" else None, args.get("offset"))
+            except re.error as e:
+                return {
+                    "tool": "bg_jobs",
+                    "friendly": f"Error: invalid regex: {e}",
+                    "detailed": f"Invalid regex pattern '{pattern}': {e}"
+                }
+
+            state = "running" if pid in jobs else "finished"
+            header = f"Job: {job['name']} (pid: {pid}, {state})\nLog: {job['output'].log_path}\nNext offset: {end}"
+            if skipped:
+                header += f"\n[{skipped:,} older bytes skipped - read the log file for them]"
+            what = "matching lines" if action == "grep" else "output"
+            body = text if text else f"(no new {what})"
+            return {
+                "tool": "bg_jobs",
+                "friendly": f"{job['name']}: {len(text):,} chars of new {what}",
+                "detailed": f"{header}\n\n{body}"
+            }
+
         elif action == "history":
             if not completed_jobs:
                 return {
@@ -304,7 +513,7 @@ def create_plugin(ctx):
             return {
                 "tool": "bg_jobs",
                 "friendly": f"Error: Unknown action: {action}",
-                "detailed": f"Valid actions are: run, list, kill, kill_all, history"
+                "detailed": f"Valid actions are: run, list, kill, kill_all, history, tail, grep"
             }
 
     # Register the bg_jobs tool
@@ -314,16 +523,16 @@ def create_plugin(ctx):
         description=(
             "Manage background long-running processes (web servers, databases, etc.). "
             "Use 'list' to see running jobs with uptime, 'history' to see finished jobs. "
-            "IMPORTANT: stdout and stderr are discarded (sent to /dev/null). "
-            "If you need to read the output, redirect it to files in the command, "
-            "e.g.: 'mycommand > output.log 2>&1', then read the file later."
+            "stdout/stderr are captured: 'tail' returns output new since the last tail/grep "
+            "of that pid (also works after the job exits), 'grep' returns only new lines "
+            "matching 'pattern'. Pass 'offset' (0 = from the start) to re-read."
         ),
         parameters={
             "type": "object",
             "properties": {
                 "action": {
                     "type": "string",
-                    "enum": ["run", "list", "kill", "kill_all", "history"],
+                    "enum": ["run", "list", "kill", "kill_all", "history", "tail", "grep"],
                     "description": "Action to perform"
                 },
                 "name": {
@@ -332,15 +541,19 @@ def create_plugin(ctx):
                 },
                 "command": {
                     "type": "string",
-                    "description": (
-                        "Bash command to run (required for 'run' action). "
-                        "NOTE: stdout/stderr are discarded. To capture output, "
-                        "redirect to files: 'cmd > out.log 2>&1'."
-                    )
+                    "description": "Bash command to run (required for 'run' action)"
                 },
                 "pid": {
                     "type": "integer",
-                    "description": "Process ID to kill (required for 'kill' action)"
+                    "description": "Process ID (required for 'kill', 'tail' and 'grep' actions)"
+                },
+                "pattern": {
+                    "type": "string",
+                    "description": "Regex to filter output lines (required for 'grep' action)"
+                },
+                "offset": {
+                    "type": "integer",
+                    "description": "Read output after this byte offset instead of since the last read (optional)"
                 }
             },
             "required": ["action"]
@@ -390,12 +603,14 @@ Background Jobs Commands:
   /bg-jobs kill <pid|seq>    - Kill a specific job
   /bg-jobs kill-all          - Kill all jobs
   /bg-jobs run <name> <cmd>  - Start a new background job
+  /bg-jobs tail <pid|seq>    - Show recent output of a job
 
 Examples:
   /bg-jobs list
   /bg-jobs status 1
   /bg-jobs history
   /bg-jobs kill 2312
+  /bg-jobs tail 1
   /bg-jobs kill-all
   /bg-jobs run Webserver "python -m http.server 8000"
 """)
@@ -435,8 +650,28 @@ PID: {pid}
 Status: running (uptime: {format_duration(uptime)})
 Command: {job['command']}
 Started: {format_time(job['started_at'])}
+Output: {job['output'].total:,} bytes ({job['output'].log_path})
 """)
 
+        elif action == "tail":
+            if len(args) < 2:
+                warn("/bg-jobs tail requires pid or sequence number")
+                return
+
+            identifier = args[1]
+            pid = parse_pid_or_seq(identifier)
+            job = jobs.get(pid) if pid is not None else None
+            if job is None and identifier.isdigit():
+                job = find_job(int(identifier))
+            if job is None:
+                warn(f"No job found: {identifier}")
+                return
+
+            # Doesn't move the AI's cursor
+            text, _, _ = job["output"].read_since(0, 4096)
+            dim(f"Log: {job['output'].log_path}")
+            print(text if text else "(no output yet)")
+
         elif action == "kill":
             if len(args) < 2:
                 warn("/bg-jobs kill requires pid or sequence number")
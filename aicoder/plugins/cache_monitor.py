@@ -5,6 +5,15 @@ Tracks every message positionally by hash. If any previously tracked
 message changes or is removed, alerts loudly — because messages should
 never change unless compaction or system prompt reload happens.
 
+Each message is hashed once, by the first turn that sees it (not when it
+is added: plugins later in the add hooks may still edit it in place, e.g.
+tools_compact or over). The hash is dropped only when the message history
+edits that message in place. A turn compares the history with the last
+snapshot by identity (cheap), so only messages from the first divergent
+index on are looked at, and that index is reported.
+Edits that bypass MessageHistory aren't seen per turn; /cm verify rehashes
+everything to catch them.
+
 Also handles cache drop alerts (moved from stats_logger) and correlates
 them with message changes: if no message changed but cache dropped,
 it's likely a provider-side eviction.
@@ -18,12 +27,15 @@ Env:
 
 Hooks:
     on_session_change      -> clear state
-    before_ai_processing   -> hash messages, detect changes
+    after_message_changed  -> drop the edited message's hash
+    before_ai_processing   -> hash new messages, detect changes from the
+                              first divergent index
     after_usage_data       -> cache drop analysis
 
 Commands:
     /cache-monitor         - Show status
     /cache-monitor on|off  - Enable/disable
+    /cache-monitor verify  - Rehash all messages, report stale hashes
     /cm                    - Alias
 """
 
@@ -39,8 +51,13 @@ from aicoder.utils.log import LogUtils
 _enabled = True
 _cache_alerts = True
 _message_hashes = []  # list of md5 hashes, one per message position
+_tracked_ids = []  # id() per message position at the last snapshot
+_tracked = []  # the snapshot's messages, so their ids can't be reused
+_hash_cache = {}  # id(msg) -> (msg, md5), hashed once per message
+_dirty = set()  # ids of messages edited in place since the snapshot
 _last_cached_tokens = None
 _msg_changed_this_turn = False  # flag set by before_ai, read by after_usage
+_first_changed = None  # first divergent index found by before_ai, if any
 _msg_count_at_hash = 0  # message count at last hash snapshot, to detect compaction after the fact
 
 _RED = "\033[91m"
@@ -54,6 +71,38 @@ def _hash_message(msg: dict) -> str:
     return hashlib.md5(serialized.encode()).hexdigest()
 
 
+def _cached_hash(msg: dict) -> str:
+    """Hash of a message, computed on first use"""
+    entry = _hash_cache.get(id(msg))
+    if entry is None or entry[0] is not msg:
+        entry = _hash_cache[id(msg)] = (msg, _hash_message(msg))
+    return entry[1]
+
+
+def _first_divergence(messages: list, ids: list) -> int:
+    """First index whose message isn't the tracked one or was edited in place"""
+    common = min(len(ids), len(_tracked_ids))
+    if ids[:common] == _tracked_ids[:common]:
+        first = common
+    else:
+        first = next(i for i in range(common) if ids[i] != _tracked_ids[i])
+    if _dirty:
+        first = next((i for i in range(first) if ids[i] in _dirty), first)
+    return first
+
+
+def _snapshot(messages: list, ids: list, hashes: list) -> None:
+    """Remember the history as of this turn"""
+    global _message_hashes, _tracked_ids, _tracked, _hash_cache
+    _message_hashes = hashes
+    _tracked_ids = ids
+    _tracked = messages
+    _dirty.clear()
+    # Forget hashes of messages that left the history
+    if len(_hash_cache) > 2 * len(messages) + 64:
+        _hash_cache = {i: _hash_cache[i] for i in ids if i in _hash_cache}
+
+
 def _extract_cached_tokens(usage):
     """Extract cached tokens from usage dict, handling various provider formats.
 
@@ -90,15 +139,27 @@ def _extract_cached_tokens(usage):
 def _on_session_change(action=None) -> None:
     """Session reset ( /new /load ) — clear all state"""
     global _message_hashes, _last_cached_tokens, _msg_changed_this_turn, _msg_count_at_hash
+    global _tracked_ids, _tracked, _first_changed
     _message_hashes.clear()
+    _tracked_ids = []
+    _tracked = []
+    _hash_cache.clear()
+    _dirty.clear()
     _last_cached_tokens = None
     _msg_changed_this_turn = False
+    _first_changed = None
     _msg_count_at_hash = 0
 
 
+def _on_message_changed(message: dict) -> None:
+    """The history edited a message in place: its hash is stale"""
+    _hash_cache.pop(id(message), None)
+    _dirty.add(id(message))
+
+
 def _on_before_ai() -> None:
     """Snapshot message hashes, alert on any change to existing messages"""
-    global _message_hashes, _msg_changed_this_turn, _msg_count_at_hash, _app
+    global _msg_changed_this_turn, _msg_count_at_hash, _first_changed, _app
     if not _enabled:
         return
 
@@ -109,14 +170,19 @@ def _on_before_ai() -> None:
     except Exception:
         return
 
-    current_hashes = [_hash_message(m) for m in messages]
+    ids = list(map(id, messages))
     _msg_changed_this_turn = False
+    _first_changed = None
 
     if not _message_hashes:
         # First run — just store
-        _message_hashes = current_hashes
+        _snapshot(messages, ids, [_cached_hash(m) for m in messages])
         return
 
+    # Messages before the first divergence keep their hashes
+    first = _first_divergence(messages, ids)
+    current_hashes = _message_hashes[:first] + [_cached_hash(m) for m in messages[first:]]
+
     # Detect compaction: message count shrunk significantly
     old_count = len(_message_hashes)
     new_count = len(current_hashes)
@@ -126,13 +192,13 @@ def _on_before_ai() -> None:
         # Compaction rewrites everything — individual msg changes are noise
         _msg_changed_this_turn = True
         print(f"\n{_YELLOW}[!] COMPACTION: {old_count} → {new_count} messages, hashes reset{_RESET}")
-        _message_hashes = current_hashes
+        _snapshot(messages, ids, current_hashes)
         return
 
     # Check for changes
     changed_positions = []
 
-    for i in range(old_count):
+    for i in range(first, old_count):
         if i >= new_count:
             changed_positions.append((i, "REMOVED"))
         elif current_hashes[i] != _message_hashes[i]:
@@ -141,15 +207,29 @@ def _on_before_ai() -> None:
 
     if changed_positions:
         _msg_changed_this_turn = True
-        print(f"\n{_RED}[!] MESSAGE INTEGRITY:{_RESET}")
+        _first_changed = changed_positions[0][0]
+        print(f"\n{_RED}[!] MESSAGE INTEGRITY (first divergence: msg[{_first_changed}]):{_RESET}")
         for pos, reason in changed_positions:
             print(f"  {_YELLOW}msg[{pos}]: {reason}{_RESET}")
 
     # Update stored hashes
-    _message_hashes = current_hashes
+    _snapshot(messages, ids, current_hashes)
     _msg_count_at_hash = len(current_hashes)
 
 
+def _verify() -> list:
+    """Rehash every message; return positions whose stored hash was stale"""
+    if _app is None:
+        return []
+    stale = []
+    for i, msg in enumerate(_app.message_history.get_messages()):
+        fresh = _hash_message(msg)
+        if _cached_hash(msg) != fresh:
+            stale.append(i)
+            _hash_cache[id(msg)] = (msg, fresh)
+    return stale
+
+
 def _on_usage_data(usage: dict) -> None:
     """Cache drop analysis — correlates with message changes"""
     global _last_cached_tokens, _msg_changed_this_turn, _msg_count_at_hash, _app
@@ -176,7 +256,7 @@ def _on_usage_data(usage: dict) -> None:
         if current_cached == 0:
             context = ""
             if _msg_changed_this_turn:
-                context = " [messages changed — expected]"
+                context = f" [messages changed{_changed_at()} — expected]"
             else:
                 context = " [messages unchanged — provider-side eviction]"
             print(
@@ -187,7 +267,7 @@ def _on_usage_data(usage: dict) -> None:
             pct = (1 - current_cached / _last_cached_tokens) * 100
             context = ""
             if _msg_changed_this_turn:
-                context = " [messages changed]"
+                context = f" [messages changed{_changed_at()}]"
             else:
                 context = " [messages unchanged]"
             print(
@@ -199,6 +279,11 @@ def _on_usage_data(usage: dict) -> None:
     _msg_changed_this_turn = False  # reset after consumption
 
 
+def _changed_at() -> str:
+    """" at msg[N]" for the first divergent index of this turn, if known"""
+    return f" at msg[{_first_changed}]" if _first_changed is not None else ""
+
+
 def _handle_command(args: str) -> None:
     global _enabled
     parts = args.strip().split() if args.strip() else []
@@ -208,6 +293,7 @@ def _handle_command(args: str) -> None:
         print(f"[cache-monitor] {status}, cache_alerts={_cache_alerts}")
         print("  /cm on|off   - Enable/disable")
         print("  /cm status   - Show state")
+        print("  /cm verify   - Rehash all messages, report stale hashes")
         return
 
     if parts[0] == "on":
@@ -224,11 +310,20 @@ def _handle_command(args: str) -> None:
         status = "enabled" if _enabled else "disabled"
         hash_count = len(_message_hashes)
         last_cache = _last_cached_tokens or "none"
-        print(f"[cache-monitor] {status}, {hash_count} msg hashes tracked")
+        print(f"[cache-monitor] {status}, {hash_count} msg hashes tracked, {len(_hash_cache)} cached")
         print(f"[cache-monitor] last cached_tokens: {last_cache}")
         return
 
-    print("Unknown. Try: /cm on|off|status")
+    if parts[0] == "verify":
+        stale = _verify()
+        if stale:
+            positions = ", ".join(f"msg[{i}]" for i in stale)
+            print(f"{_RED}[!] Edited outside the message history: {positions}{_RESET}")
+        else:
+            LogUtils.printc("[cache-monitor] All message hashes current", color="cyan")
+        return
+
+    print("Unknown. Try: /cm on|off|status|verify")
 
 
 # --- Entry Point ---
@@ -237,15 +332,14 @@ _app = None
 
 
 def create_plugin(ctx):
-    global _enabled, _cache_alerts, _app, _message_hashes, _last_cached_tokens
+    global _enabled, _cache_alerts, _app
 
     # Only load when explicitly enabled
     if os.environ.get("CACHE_MONITOR") != "1":
         return {}
 
     _app = ctx.app
-    _message_hashes = []
-    _last_cached_tokens = None
+    _on_session_change()
 
     # Env overrides
     env_enabled = os.environ.get("CACHE_MONITOR_ENABLE", "").lower()
@@ -257,6 +351,7 @@ def create_plugin(ctx):
         _cache_alerts = False
 
     ctx.register_hook("on_session_change", _on_session_change)
+    ctx.register_hook("after_message_changed", _on_message_changed)
     ctx.register_hook("before_ai_processing", _on_before_ai)
     ctx.register_hook("after_usage_data", _on_usage_data)
 
@@ -2,8 +2,10 @@
 Git Aware Plugin - Adds git context to AI system prompt
 
 Checks if current directory is a git repo using .git/HEAD stat (no subprocess
-at startup). Git subprocess only spawns on first context bar render or /git
-command. Non-git repos cost ~1 stat syscall at startup, nothing more.
+at startup). Branch and dirty state are first probed on the background
+startup thread, so the first prompt never waits on git; later context bar
+renders and /git commands run git directly. Non-git repos cost ~1 stat
+syscall at startup, nothing more.
 
 Commands:
 - /git commit-ai - Gather all git info and ask AI to commit in one shot
@@ -224,12 +226,26 @@ Create a meaningful commit message and run the appropriate git add/commit comman
 
         return "\n\nGit repository detected."
 
+    # Dirty flag probed by on_background_startup, used for the first render
+    startup_probe = {"pending": True, "dirty": None}
+
+    def on_background_startup():
+        """Hook: warm branch and dirty state off the prompt's critical path"""
+        if is_git:
+            _ensure_branch()
+            startup_probe["dirty"] = _is_repo_dirty()
+
     def on_context_bar():
         """Hook: Add git status to context bar"""
         if not is_git:
             return None
 
-        dirty = _is_repo_dirty()
+        if startup_probe["pending"]:
+            # First render: don't block the first prompt on git status
+            startup_probe["pending"] = False
+            dirty = bool(startup_probe["dirty"])
+        else:
+            dirty = _is_repo_dirty()
         if dirty:
             return f"{Config.colors['yellow']}{Config.colors['bold']}Git"
         return f"{Config.colors['dim']}Git"
@@ -237,6 +253,7 @@ Create a meaningful commit message and run the appropriate git add/commit comman
     # Register hooks
     ctx.register_hook("on_system_prompt_append", on_system_prompt_append)
     ctx.register_hook("on_context_bar", on_context_bar)
+    ctx.register_hook("on_background_startup", on_background_startup)
 
     if Config.debug():
         print("  - on_system_prompt_append hook (git awareness)")
@@ -176,12 +176,16 @@ def create_plugin(ctx):
     if base != NIM_URL:
         return
 
-    _load_cache()
+    refresh_due = _load_cache()
     _load_rep()
     _load_preference()
     _load_bans()
     _load_keys()
 
+    if refresh_due:
+        # models.dev can take seconds: fetch after the prompt is shown
+        ctx.register_hook("on_background_startup", _background_refresh)
+
     model = Config.model()
     if model != "auto":
         # Manual mode — user chose a specific model, plugin only provides commands
@@ -217,11 +221,14 @@ def _cache_path():
     return os.path.join(os.getcwd(), ".aicoder", "models.json")
 
 
-def _load_cache():
-    """Load cache if fresh (<1h), otherwise try refresh but keep stale on failure."""
+def _load_cache() -> bool:
+    """
+    Load cached models without touching the network: the cache if present
+    (even stale), else the built-in order so rotation still works.
+    Returns True if a refresh is due (cache missing or older than 1h).
+    """
     global _models
     path = _cache_path()
-    stale = None
 
     if os.path.exists(path):
         try:
@@ -229,28 +236,27 @@ def _load_cache():
                 data = json.load(f)
             ts = data.get("_ts", 0)
             models = data.get("models", [])
-            if time.time() - ts < 3600:
+            if models:
                 _models[:] = models
-                return              # fresh enough
-            stale = models           # hold onto it
+                return time.time() - ts >= 3600
         except (json.JSONDecodeError, IOError):
             pass
 
-    # Attempt refresh
-    ok = _fetch_models(path)
-    if ok:
-        return
-
-    # Fetch failed — use stale cache if we have it
-    if stale is not None:
-        _models[:] = stale
-        _nv_log(f"\n[nvidia] refresh failed, using cached data ({len(stale)} models)")
-        return
-
     # No cache at all — populate from default order so rotation still works
     _models[:] = [{"id": mid, "name": mid.split("/")[-1], "ctx": 0, "out": 0}
                    for mid in _DEFAULT_ORDER]
-    _nv_log(f"\n[nvidia] no cache, using {len(_models)} built-in models")
+    _nv_log(f"\n[nvidia] no cache, using {len(_models)} built-in models until refresh")
+    return True
+
+
+def _background_refresh():
+    """Hook: refresh a stale/missing cache on the startup thread"""
+    if _fetch_models(_cache_path()):
+        _load_preference()
+        if Config.model() == "auto":
+            _rotate()
+    else:
+        _nv_log(f"\n[nvidia] refresh failed, using cached data ({len(_models)} models)")
 
 
 def _fetch_models(path) -> bool:
@@ -459,6 +465,7 @@ def _set_active(mid: str):
     else:
         os.environ["REASONING_EFFORT_VALID"] = ""
         Config.set_reasoning_effort(None)
+    Config.invalidate()
     _activated_at = time.time()
     _current_model = mid
 
@@ -11,7 +11,8 @@ Features:
 - Modify individual parameters (switches to Custom mode)
 - Commands: /preset, /preset list, /preset <name|number|alias>, /preset set <param> <value>
 
-No changes to core required - modifies os.environ directly which Config reads.
+No changes to core required - modifies os.environ directly which Config reads,
+then calls Config.invalidate() so cached settings are re-read.
 """
 
 import os
@@ -21,6 +22,9 @@ from typing import Dict, List, Optional, Any
 from aicoder.core.config import Config
 from aicoder.utils.log import LogUtils
 
+# Applies AICODER_PRESET at startup, so it can't wait for first /preset use
+LAZY_LOAD = False
+
 
 def create_plugin(ctx):
     """
@@ -230,6 +234,7 @@ def create_plugin(ctx):
         # Clear all previous model parameters, then apply new preset
         clear_all_model_parameters()
         apply_parameters_to_env(active_parameters)
+        Config.invalidate()
 
         return True
 
@@ -261,6 +266,7 @@ def create_plugin(ctx):
 
         # Apply to environment
         apply_parameters_to_env({param_name.lower(): parsed_value})
+        Config.invalidate()
 
         return True
 
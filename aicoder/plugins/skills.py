@@ -6,8 +6,10 @@ See /skills help for details.
 """
 
 import os
+import threading
 
 from aicoder.core.config import Config
+from aicoder.utils.file_scan import list_dir
 from aicoder.utils.log import LogUtils
 
 # Internal skills are virtual files served via read_file as /internal/<skill>/<file>
@@ -81,12 +83,11 @@ def _parse_yaml_frontmatter(text: str) -> dict:
 def _get_skills(path: str, source: str) -> dict:
     """Scan a single skills dir, return {name: info} dict"""
     found = {}
-    if not os.path.exists(path):
+    listing = list_dir(path)
+    if listing is None:
         return found
-    for skill_name in os.listdir(path):
+    for skill_name in listing[1]:
         skill_path = os.path.join(path, skill_name)
-        if not os.path.isdir(skill_path):
-            continue
         skill_md = os.path.join(skill_path, "SKILL.md")
         if not os.path.exists(skill_md):
             continue
@@ -127,12 +128,24 @@ class SkillsManager:
         self.skills: dict = {}
         self.extra_count: int = 0
         self._loaded_dirs: list = []
+        self._discovered = False
+        self._lock = threading.Lock()
+
+    def ensure_discovered(self) -> None:
+        """Discover on first need (prompt build runs on the startup thread)"""
+        with self._lock:
+            if not self._discovered:
+                count = self.discover_skills()
+                if Config.debug():
+                    dirs_display = ", ".join(self._loaded_dirs) or "none"
+                    LogUtils.print(f"[+] Skills discovered: {count} (from: {dirs_display})")
 
     def discover_skills(self) -> int:
         """Discover all skills. Local overrides global on name collision."""
         self.skills.clear()
         self.extra_count = 0
         self._loaded_dirs = []
+        self._discovered = True
 
         # Scan order: global auto, local auto (override), then count extras separately
         global_auto = _list_skill_dirs(os.path.expanduser("~/.config/aicoder-v3"))
@@ -221,7 +234,6 @@ def create_plugin(ctx):
     """Skills plugin"""
 
     manager = SkillsManager()
-    count = manager.discover_skills()
 
     def internal_registry() -> dict:
         """Lazily query on_internal_skills hooks -> {name: {description, files}}.
@@ -262,6 +274,7 @@ def create_plugin(ctx):
     def handle_skills_command(args_str: str) -> str:
         """Handle /skills command"""
         args = args_str.strip().split(maxsplit=1) if args_str.strip() else []
+        manager.ensure_discovered()
 
         if not args:
             internal = internal_registry()
@@ -307,6 +320,7 @@ Any dir: skill_name/SKILL.md with YAML frontmatter."""
         return f"Unknown command: {args[0]}. Use /skills help for usage."
 
     def on_system_prompt_append():
+        manager.ensure_discovered()
         return manager.generate_skills_text(internal_registry())
 
     ctx.register_hook("on_system_prompt_append", on_system_prompt_append)
@@ -314,12 +328,7 @@ Any dir: skill_name/SKILL.md with YAML frontmatter."""
     ctx.register_command("skills", handle_skills_command, description="List available skills")
 
     if Config.debug():
-        if count > 0:
-            dirs_display = ", ".join(manager._loaded_dirs)
-            LogUtils.print(f"[+] Skills plugin loaded ({count} skills found)")
-            LogUtils.print(f"  - Loading from: {dirs_display}")
-        else:
-            LogUtils.print("[+] Skills plugin loaded (0 skills found)")
+        LogUtils.print("[+] Skills plugin loaded (skills discovered on first prompt build)")
 
     def cleanup():
         manager.skills.clear()
@@ -15,6 +15,7 @@ from typing import Optional
 from pathlib import Path
 from aicoder.utils.log import LogUtils, LogOptions, success, warn, error, info, dim, print
 from aicoder.core.config import Config
+from aicoder.utils.file_scan import list_dir
 
 
 def create_plugin(ctx):
@@ -68,9 +69,9 @@ def create_plugin(ctx):
             try:
                 current_mtime = os.path.getmtime(d)
                 _cache["mtimes"][d] = current_mtime
-                for f in os.scandir(d):
-                    if f.is_file() and not f.name.startswith("."):
-                        _cache["snippets"][f.name] = (source, d)
+                for name in list_dir(d)[2]:
+                    if not name.startswith("."):
+                        _cache["snippets"][name] = (source, d)
             except Exception:
                 pass
 
@@ -3,9 +3,11 @@ Stats Logger Plugin
 
 Logs each AI API request to:
 - .aicoder/stats.log (local, per-project)
-- stats_server via Unix socket (for central aggregation)
+- stats_server via Unix socket (for central aggregation), from a background
+  thread over a persistent connection; see StatsShipper
 
-Format: JSONL (one JSON object per line)
+Format: JSONL (one JSON object per line). Entries carry the request's
+latency under "timing" (phase offsets, TTFT, tokens/sec, chunk gaps).
 
 Before writing, fires on_stats_entry(entry) so plugins can complement the
 entry (e.g. ai_cost sets entry["cost_estimate"] next to provider-reported
@@ -19,13 +21,30 @@ Tests MUST set STATS_CENTRAL=0 (and STATS_FALLBACK_FILE=0) before firing,
 or stub sl._write_to_central.
 """
 
+import atexit
 import json
 import os
+import queue
+import socket
+import subprocess
 import sys
+import threading
+import time
 from datetime import datetime
 from aicoder.core.config import Config
 
 SOCKET_PATH = os.path.join(os.environ.get("TMP", "/tmp"), "stats_server.sock")
+# Lines the server couldn't take yet, replayed when it answers again
+SPOOL_DIR = os.path.join(os.path.expanduser("~"), ".aicoder", "stats_spool")
+# A spool file over this size drops its oldest lines down to half of it
+SPOOL_MAX_BYTES = 4 * 1024 * 1024
+QUEUE_SIZE = 1000
+BATCH_LINES = 100
+REPLY_TIMEOUT = 2.0
+BACKOFF_MIN = 0.5
+BACKOFF_MAX = 30.0
+FLUSH_TIMEOUT = 2.0  # At exit
+_STOP = object()
 
 
 def _extract_cost(usage):
@@ -61,52 +80,324 @@ def _extract_cost(usage):
     return None
 
 
-def _write_to_central(line):
-    """Write to stats_server via Unix socket. Returns True on success.
+class _ServerError(Exception):
+    """stats_server answered something other than ok"""
 
-    PRODUCTION WRITE PATH: the daemon appends to ~/.aicoder/central_stats.log.
-    Never call with test/fake data; disable via STATS_CENTRAL=0.
+
+class StatsShipper:
     """
-    import socket
-    try:
-        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
-        sock.settimeout(2.0)
-        sock.connect(SOCKET_PATH)
-        sock.sendall(line.encode())
-        # Read response
-        response = sock.recv(64).decode().strip()
-        sock.close()
-        if response == "ok":
-            return True
+    Ships stats lines to stats_server from a background thread so the agent
+    loop never waits on it.
+
+    Lines go through a bounded queue and are sent in batches over one
+    persistent connection; stats_server answers "ok" per line written. When
+    the server is gone (no socket) lines go to the central log directly, as
+    before. When it misbehaves (timeout, error reply, dropped connection) they
+    are spooled to SPOOL_DIR and replayed once it answers again, with
+    exponential backoff between attempts. Servers that close after one line
+    (older stats_server builds) get one connection per line. A spool file is
+    capped at SPOOL_MAX_BYTES: its oldest lines are dropped, counted in
+    spool_dropped.
+    """
+
+    def __init__(self, socket_path=None, spool_dir=None):
+        self.socket_path = socket_path or SOCKET_PATH
+        self.spool_dir = spool_dir or SPOOL_DIR
+        self.sent = 0
+        self.spooled = 0
+        self.spool_dropped = 0
+        self._queue = queue.Queue(maxsize=QUEUE_SIZE)
+        self._sock = None
+        self._buf = b""
+        self._acked_on_conn = 0
+        self._legacy = False
+        self._missing = False
+        self._backoff = 0.0
+        self._retry_at = 0.0
+        self._failing = False
+        self._closed = False
+        self._spool_lock = threading.Lock()
+        self._spool_path = os.path.join(self.spool_dir, f"{os.getpid()}-{time.time_ns()}.jsonl")
+        self._thread = threading.Thread(target=self._run, name="stats-shipper", daemon=True)
+        self._thread.start()
+
+    def submit(self, line):
+        """Queue one newline-terminated line; spools instead of blocking when full"""
+        if self._closed:
+            self._spool([line])
+            return
+        try:
+            self._queue.put_nowait(line)
+        except queue.Full:
+            self._spool([line])
+
+    def close(self, timeout=FLUSH_TIMEOUT):
+        """Flush what is queued (up to timeout), spool the rest and stop"""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+        leftover = []
+        while True:
+            try:
+                line = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if line is not _STOP:
+                leftover.append(line)
+        if leftover:
+            self._spool(leftover)
+
+    def _run(self):
+        """Shipper thread: take a batch off the queue and deliver it"""
+        while True:
+            line = self._queue.get()
+            if line is _STOP:
+                break
+            batch = [line]
+            stop = False
+            while len(batch) < BATCH_LINES:
+                try:
+                    line = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if line is _STOP:
+                    stop = True
+                    break
+                batch.append(line)
+            self._deliver(batch)
+            if stop:
+                break
+        self._disconnect()
+
+    def _deliver(self, lines):
+        """Send lines, replaying the spool first when (re)connecting"""
+        if time.monotonic() < self._retry_at:
+            self._unavailable(lines)
+            return
+        try:
+            if self._sock is None:
+                self._connect()
+                self._replay_spool()
+            self._send(lines)
+        except (FileNotFoundError, ConnectionRefusedError):
+            # No server listening: nothing will replay, so write the log directly
+            self._disconnect()
+            self._missing = True
+            self._unavailable(lines)
+            self._schedule_retry()
+        except (OSError, _ServerError) as e:
+            self._disconnect()
+            self._missing = False
+            self._unavailable(lines)
+            self._schedule_retry()
+            self._report_failure(f"central write failed: {e}")
         else:
-            err_msg = f"central server responded: {response}"
-            print(f"\n[stats_logger] {err_msg}\n  line: {line.strip()}", file=sys.stderr)
-            if os.environ.get("STATS_ERROR_DUNSTIFY") == "1":
-                os.system(f"timeout -k 2 5s dunstify -t 3000 'stats_logger error' '{err_msg}' &")
-            return False
-    except FileNotFoundError:
-        # Socket doesn't exist - server not running
-        return False
-    except (socket.timeout, ConnectionRefusedError, OSError) as e:
-        err_msg = f"central write failed: {e}"
-        print(f"\n[stats_logger] {err_msg}\n  line: {line.strip()}", file=sys.stderr)
+            self._backoff = 0.0
+            self._failing = False
+            self._missing = False
+
+    def _connect(self):
+        """Open the persistent connection"""
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(REPLY_TIMEOUT)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            raise
+        self._sock = sock
+        self._buf = b""
+        self._acked_on_conn = 0
+
+    def _disconnect(self):
+        """Drop the connection (a new one is opened on the next delivery)"""
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock = None
+
+    def _send(self, lines):
+        """Send lines in batches, removing each from lines once acknowledged"""
+        while lines:
+            if self._sock is None:
+                self._connect()
+            # A new connection carries one line first: older servers write
+            # whatever arrived with it but acknowledge and keep only that one
+            count = 1 if self._legacy or self._acked_on_conn == 0 else min(len(lines), BATCH_LINES)
+            try:
+                self._sock.sendall("".join(lines[:count]).encode())
+                for _ in range(count):
+                    reply = self._read_reply()
+                    if reply != "ok":
+                        raise _ServerError(f"central server responded: {reply}")
+                    del lines[0]
+                    self.sent += 1
+                    self._acked_on_conn += 1
+            except (BrokenPipeError, ConnectionResetError):
+                if self._acked_on_conn == 1 and not self._legacy:
+                    # Closed right after its first line: a one-line-per-connection server
+                    self._legacy = True
+                    self._disconnect()
+                    continue
+                raise
+            if self._legacy:
+                self._disconnect()
+
+    def _read_reply(self):
+        """Read one reply line from the server"""
+        while b"\n" not in self._buf:
+            data = self._sock.recv(4096)
+            if not data:
+                raise ConnectionResetError("central server closed the connection")
+            self._buf += data
+        reply, self._buf = self._buf.split(b"\n", 1)
+        return reply.decode(errors="replace").strip()
+
+    def _unavailable(self, lines):
+        """Keep lines the server can't take now"""
+        if self._missing and os.environ.get("STATS_FALLBACK_FILE", "1") != "0":
+            if _write_central_fallback("".join(lines)):
+                return
+        self._spool(lines)
+
+    def _schedule_retry(self):
+        """Back off exponentially before the next connection attempt"""
+        self._backoff = min(max(self._backoff * 2, BACKOFF_MIN), BACKOFF_MAX)
+        self._retry_at = time.monotonic() + self._backoff
+
+    def _report_failure(self, err_msg):
+        """Report a server failure once per outage, never waiting on the notifier"""
+        if self._failing:
+            return
+        self._failing = True
+        print(f"\n[stats_logger] {err_msg} (spooling to {self.spool_dir})", file=sys.stderr)
         if os.environ.get("STATS_ERROR_DUNSTIFY") == "1":
-            os.system(f"timeout -k 2 5s dunstify -t 3000 'stats_logger error' '{err_msg}' &")
+            try:
+                subprocess.Popen(
+                    ["timeout", "-k", "2", "5s", "dunstify", "-t", "3000", "stats_logger error", err_msg],
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                    start_new_session=True,
+                )
+            except OSError:
+                pass
+
+    def _spool(self, lines):
+        """Append lines to this process's spool file, dropping its oldest when full"""
+        with self._spool_lock:
+            try:
+                os.makedirs(self.spool_dir, exist_ok=True)
+                try:
+                    size = os.path.getsize(self._spool_path)
+                except OSError:
+                    size = 0
+                if size + sum(len(line.encode()) for line in lines) > SPOOL_MAX_BYTES:
+                    self._trim_spool(lines)
+                else:
+                    with open(self._spool_path, "a") as f:
+                        f.write("".join(lines))
+                self.spooled += len(lines)
+            except OSError:
+                pass  # Telemetry must never break the session
+
+    def _trim_spool(self, lines):
+        """Rewrite the spool with lines appended, keeping the newest half of SPOOL_MAX_BYTES"""
+        try:
+            with open(self._spool_path) as f:
+                kept = f.readlines() + list(lines)
+        except FileNotFoundError:
+            kept = list(lines)
+        size = sum(len(line.encode()) for line in kept)
+        drop = 0
+        # Trim well below the cap so a long outage doesn't rewrite it per line
+        while drop < len(kept) and size > SPOOL_MAX_BYTES // 2:
+            size -= len(kept[drop].encode())
+            drop += 1
+        tmp = self._spool_path + ".tmp"
+        with open(tmp, "w") as f:
+            f.write("".join(kept[drop:]))
+        os.replace(tmp, self._spool_path)
+        self.spool_dropped += drop
+
+    def _replay_spool(self):
+        """Send spool files of this and of exited processes, oldest first"""
+        try:
+            names = sorted(os.listdir(self.spool_dir))
+        except OSError:
+            return
+        own = os.path.basename(self._spool_path)
+        for name in names:
+            if not name.endswith(".jsonl") or (name != own and _pid_alive(name.split("-", 1)[0])):
+                continue
+            path = os.path.join(self.spool_dir, name)
+            claimed = f"{path}.{os.getpid()}.replay"
+            with self._spool_lock:
+                try:
+                    os.rename(path, claimed)  # Another process may have claimed it first
+                except OSError:
+                    continue
+            with open(claimed) as f:
+                lines = f.readlines()
+            try:
+                self._send(lines)
+            finally:
+                if lines:
+                    self._spool(lines)  # Unsent remainder goes back to the spool
+                os.remove(claimed)
+
+
+def _pid_alive(pid):
+    """Whether a spool file's writer process still runs"""
+    try:
+        os.kill(int(pid), 0)
+    except (ValueError, ProcessLookupError):
         return False
+    except PermissionError:
+        return True
+    return True
+
+
+_shipper = None
+
+
+def _get_shipper():
+    """Shared shipper, started on first use"""
+    global _shipper
+    if _shipper is None:
+        _shipper = StatsShipper()
+        atexit.register(_shipper.close)
+    return _shipper
+
+
+def _write_to_central(line):
+    """Queue a line for stats_server; returns at once, delivery is in the background.
+
+    PRODUCTION WRITE PATH: the daemon appends to ~/.aicoder/central_stats.log.
+    Never call with test/fake data; disable via STATS_CENTRAL=0.
+    """
+    _get_shipper().submit(line)
 
 
 def _write_central_fallback(line):
-    """Append to ~/.aicoder/central_stats.log if writable. Silently skip if not.
+    """Append to ~/.aicoder/central_stats.log if writable. Returns True if written.
     Disable with STATS_FALLBACK_FILE=0."""
     if os.environ.get("STATS_FALLBACK_FILE", "1") == "0":
-        return
+        return False
     try:
         path = os.path.join(os.path.expanduser("~"), ".aicoder", "central_stats.log")
         os.makedirs(os.path.dirname(path), exist_ok=True)
         with open(path, "a") as f:
             f.write(line)
+        return True
     except (PermissionError, OSError):
-        pass
+        return False
 
 
 def create_plugin(ctx):
@@ -150,6 +441,11 @@ def create_plugin(ctx):
         if tag:
             entry["tag"] = tag
 
+        # Latency of the request (phase offsets, TTFT, tokens/sec, chunk gaps)
+        timing = getattr(stats, "last_request_timings", None)
+        if isinstance(timing, dict):
+            entry["timing"] = timing
+
         # Provider-reported cost (field only added when provider reports one)
         cost = _extract_cost(usage)
         if cost is not None:
@@ -170,13 +466,12 @@ def create_plugin(ctx):
         with open(log_path, "a") as f:
             f.write(json_line + "\n")
 
-        # Send to central server (or fallback if unavailable).
+        # Send to central server (or fallback if unavailable) in the background.
         # PRODUCTION WRITE: lands in ~/.aicoder/central_stats.log via the
         # stats_server daemon. Tests with synthetic usage MUST set
         # STATS_CENTRAL=0 + STATS_FALLBACK_FILE=0 — this corrupts real reports.
         if os.environ.get("STATS_CENTRAL", "1") != "0":
-            if not _write_to_central(json_line + "\n"):
-                _write_central_fallback(json_line + "\n")
+            _write_to_central(json_line + "\n")
 
     # Register hook for usage data (fires for ALL API calls including compaction)
     ctx.register_hook("after_usage_data", _on_usage_data)
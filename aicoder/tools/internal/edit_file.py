@@ -137,6 +137,12 @@ def execute(args: Dict[str, Any]) -> Dict[str, Any]:
         if _plugin_system:
             _plugin_system.call_hooks("after_file_write", path, new_content)
 
+        # Keep the grep trigram index (if enabled) current
+        if Config.grep_index_enabled():
+            from aicoder.core.trigram_index import notify_file_changed  # Lazy: index is opt-in
+
+            notify_file_changed(path)
+
         # Mark file as read since user just modified it
         FileAccessTracker.record_read(path)
 
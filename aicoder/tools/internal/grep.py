@@ -1,16 +1,32 @@
 """
 Grep tool - text search in files
 
+Searches with ripgrep when installed, else a builtin Python engine
+(AICODER_GREP_ENGINE picks one). Results of the builtin and indexed
+searches are cached until a file under the search path changes; ripgrep
+output is never cached, so every rg search spawns rg again.
 """
 
 import os
+import re
 import subprocess
-from typing import Dict, Any, Optional
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
 from aicoder.core.config import Config
+from aicoder.utils.file_scan import scan_files
 from aicoder.utils.log import LogUtils
 
 # Configuration
 DEFAULT_MAX_RESULTS = Config.default_grep_max_results()
+SEARCH_TIMEOUT = 30  # seconds, for both engines
+SEARCH_WORKERS = 8  # thread pool size for the builtin engine
+BINARY_SNIFF_BYTES = 8192  # files with a NUL byte in this prefix are skipped
+MAX_CACHED_SEARCHES = 32
+
+# Module-level state
+_rg_available: Optional[bool] = None  # detected lazily on first search
+_search_cache: "OrderedDict[tuple, Tuple[int, List[str], List[str]]]" = OrderedDict()
 
 
 def validateArguments(args: Dict[str, Any]) -> None:
@@ -39,7 +55,7 @@ def formatArguments(args: Dict[str, Any]) -> str:
 
 
 def execute(args: Dict[str, Any]) -> Dict[str, Any]:
-    """Search for text in files using ripgrep or grep"""
+    """Search for text in files using ripgrep or the builtin Python engine"""
     text = args.get("text")
     path = args.get("path", ".")
     max_results = args.get("max_results", DEFAULT_MAX_RESULTS)
@@ -48,6 +64,7 @@ def execute(args: Dict[str, Any]) -> Dict[str, Any]:
     if not text:
         raise Exception("Text is required")
 
+    cmd = []
     try:
         # Check sandbox restrictions
         # Check sandbox restrictions, but don't print message (will show in result)
@@ -87,15 +104,58 @@ def execute(args: Dict[str, Any]) -> Dict[str, Any]:
             search_path,
         ]
 
-        # Prepend wrapper if configured (e.g. AICODER_SHELL_PREPEND_CMD="rtk")
-        prepend = Config.shell_prepend_cmd()
-        if prepend:
-            cmd = prepend.split() + cmd
-
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-
-        # Parse results
-        matches = result.stdout.strip().split("\n") if result.stdout.strip() else []
+        # Identical searches on an unchanged tree are served from cache. Only the
+        # Python engines use it: scan_files skips paths rg still searches, so its
+        # signature can't vouch for rg output (and rg shouldn't wait on a stat walk)
+        cache_key = (text, search_path, int(max_results), int(context))
+        matches = None
+        scanned = None
+
+        # Optional trigram index narrows the files the regex has to verify
+        index = None
+        if Config.grep_index_enabled():
+            from aicoder.core.trigram_index import get_index  # Lazy: only with AICODER_GREP_INDEX=1
+
+            index = get_index()
+        if index is not None and os.path.isdir(search_path) and (
+            search_path == index.root or search_path.startswith(index.root + os.sep)
+        ):
+            scanned = scan_files(search_path)
+            cached = _cache_get(cache_key, scanned[1])
+            if cached is not None:
+                matches, cmd = cached
+            else:
+                candidates = index.candidates(text, scanned[0])
+                if candidates is not None:
+                    cmd = ["(indexed grep)"] + cmd[cmd.index("rg") + 1:]
+                    matches = _native_search(text, search_path, candidates, int(max_results), int(context))
+                    _cache_put(cache_key, scanned[1], matches, cmd)
+
+        if matches is None and _use_ripgrep():
+            # Prepend wrapper if configured (e.g. AICODER_SHELL_PREPEND_CMD="rtk")
+            prepend = Config.shell_prepend_cmd()
+            if prepend:
+                cmd = prepend.split() + cmd
+
+            try:
+                result = subprocess.run(cmd, capture_output=True, text=True, timeout=SEARCH_TIMEOUT)
+            except FileNotFoundError:
+                if Config.grep_engine() == "rg":
+                    raise
+                _mark_ripgrep_missing()
+            else:
+                # Parse results
+                matches = result.stdout.strip().split("\n") if result.stdout.strip() else []
+
+        if matches is None:
+            entries, signature = scanned or scan_files(search_path)
+            cached = _cache_get(cache_key, signature)
+            if cached is not None:
+                matches, cmd = cached
+            else:
+                cmd = ["(builtin grep)"] + cmd[cmd.index("rg") + 1:]
+                matches = _native_search(text, search_path, [entry[0] for entry in entries], int(max_results), int(context))
+                _cache_put(cache_key, signature, matches, cmd)
 
         # Create friendly message
         if not matches:
@@ -115,6 +175,12 @@ def execute(args: Dict[str, Any]) -> Dict[str, Any]:
             "friendly": f"⏰ Search timed out",
             "detailed": f"Search for '{text}' timed out. Command: {' '.join(cmd)}"
         }
+    except re.error as e:
+        return {
+            "tool": "grep",
+            "friendly": f"❌ Search error: invalid regex: {str(e)}",
+            "detailed": f"Search for '{text}' failed: invalid regex: {str(e)}"
+        }
     except Exception as e:
         return {
             "tool": "grep",
@@ -123,6 +189,118 @@ def execute(args: Dict[str, Any]) -> Dict[str, Any]:
         }
 
 
+def _use_ripgrep() -> bool:
+    """Pick the engine: AICODER_GREP_ENGINE, else ripgrep when installed"""
+    global _rg_available
+    engine = Config.grep_engine()
+    if engine != "auto":
+        return engine == "rg"
+    if _rg_available is None:
+        _rg_available = _has_ripgrep()
+    return _rg_available
+
+
+def _mark_ripgrep_missing() -> None:
+    """Remember that rg disappeared so later searches go straight to Python"""
+    global _rg_available
+    _rg_available = False
+
+
+def _cache_get(key: tuple, signature: int):
+    """Get cached (matches, cmd) for key if the tree signature still matches"""
+    cached = _search_cache.get(key)
+    if cached is None or cached[0] != signature:
+        return None
+    _search_cache.move_to_end(key)
+    return cached[1], cached[2]
+
+
+def _cache_put(key: tuple, signature: int, matches: List[str], cmd: List[str]) -> None:
+    """Store a search result, evicting least recently used entries"""
+    _search_cache[key] = (signature, matches, cmd)
+    _search_cache.move_to_end(key)
+    while len(_search_cache) > MAX_CACHED_SEARCHES:
+        _search_cache.popitem(last=False)
+
+
+def clear_cache() -> None:
+    """Drop all cached search results"""
+    _search_cache.clear()
+
+
+def _search_file(regex: "re.Pattern", path: str, max_count: int, context: int, with_name: bool) -> List[str]:
+    """Search one file, returning rg-formatted output lines"""
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return []
+    if b"\0" in data[:BINARY_SNIFF_BYTES]:
+        return []  # binary file, rg skips these too
+
+    text = data.decode("utf-8", "replace")
+    if not regex.search(text):
+        return []
+
+    lines = text.split("\n")
+    if lines and lines[-1] == "":
+        lines.pop()
+
+    hits = []
+    for i, line in enumerate(lines):
+        if regex.search(line):
+            hits.append(i)
+            if len(hits) >= max_count:
+                break
+    if not hits:
+        return []
+
+    hit_set = set(hits)
+    prefix = path if with_name else ""
+    out: List[str] = []
+    last = -1
+    for i in hits:
+        start = max(i - context, last + 1)
+        if last >= 0 and start > last + 1 and context > 0:
+            out.append("--")
+        for j in range(start, min(i + context, len(lines) - 1) + 1):
+            sep = ":" if j in hit_set else "-"
+            out.append(f"{prefix}{sep if with_name else ''}{j + 1}{sep}{lines[j]}")
+        last = max(last, min(i + context, len(lines) - 1))
+    return out
+
+
+def _native_search(text: str, search_path: str, files: List[str], max_count: int, context: int) -> List[str]:
+    """
+    Pure-stdlib search with rg-compatible output (path:line:match,
+    path-line-context, "--" between groups). Files are scanned in a
+    thread pool in sorted order. Unlike rg, .gitignore is not honored.
+    """
+    regex = re.compile(text)
+    if max_count <= 0 or not files:
+        return []
+
+    from concurrent.futures import ThreadPoolExecutor  # Lazy: only the Python engines need it
+
+    with_name = os.path.isdir(search_path)
+    deadline = time.monotonic() + SEARCH_TIMEOUT
+
+    def search(path: str) -> List[str]:
+        if time.monotonic() > deadline:
+            raise subprocess.TimeoutExpired(["(builtin grep)", text], SEARCH_TIMEOUT)
+        return _search_file(regex, path, max_count, context, with_name)
+
+    matches: List[str] = []
+    with ThreadPoolExecutor(max_workers=SEARCH_WORKERS) as pool:
+        for lines in pool.map(search, files):
+            if not lines:
+                continue
+            if matches and context > 0:
+                matches.append("--")
+            matches.extend(lines)
+    return matches
+
+
 def _has_ripgrep() -> bool:
     """Check if ripgrep is available"""
     try:
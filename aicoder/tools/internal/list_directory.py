@@ -3,10 +3,11 @@ List directory tool
 
 """
 
+import fnmatch
 import os
-from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 from aicoder.core.config import Config
+from aicoder.utils.file_scan import list_dir
 from aicoder.utils.log import LogUtils
 
 
@@ -18,6 +19,9 @@ def validateArguments(args: Dict[str, Any]) -> None:
     max_depth = args.get("max_depth")
     if not max_depth or max_depth < 1:
         args["max_depth"] = 1
+    max_files = args.get("max_files")
+    if max_files is not None and (not isinstance(max_files, int) or max_files < 1):
+        args["max_files"] = None
 
 
 def formatArguments(args: Dict[str, Any]) -> str:
@@ -32,17 +36,83 @@ def formatArguments(args: Dict[str, Any]) -> str:
     return f"Listing current dir (depth {depth})" if depth > 1 else ""
 
 
+def _matches_pattern(filename: str, pattern: str) -> bool:
+    """Simple pattern matching for *.py, test_*.json etc."""
+    # Convert **/ pattern to standard glob
+    return fnmatch.fnmatch(filename, pattern.replace("**/", ""))
+
+
+def _collect(root: str, max_depth: int, pattern: Optional[str], limit: int) -> Tuple[List[Tuple[str, List[str]]], int]:
+    """
+    Walk root (sorted, directory by directory) using the shared listing cache.
+
+    Returns ([(dir, entry names)], count) where subdirectory names end with
+    "/", empty groups are omitted, and count stops at limit + 1.
+    """
+    ignore_dirs = set(Config.ignore_dirs())
+    ignore_patterns = tuple(Config.ignore_patterns())
+    groups: List[Tuple[str, List[str]]] = []
+    count = 0
+
+    # Depth-first so each dir's group is followed by its subdirs' groups
+    stack = [(root, 0)]
+    while stack and count <= limit:
+        current, depth = stack.pop()
+        listing = list_dir(current)
+        if listing is None:
+            continue
+        _, dirs, files, _ = listing
+
+        names = []
+        subdirs = []
+        for name in dirs:
+            if name in ignore_dirs:
+                continue
+            # Without a pattern directories are always listed; with one,
+            # only matching names are, but all are searched
+            if not pattern or _matches_pattern(name, pattern):
+                names.append(name + "/")
+            if depth + 1 < max_depth:
+                subdirs.append(os.path.join(current, name))
+        for name in files:
+            if name.endswith(ignore_patterns):
+                continue
+            if pattern and not _matches_pattern(name, pattern):
+                continue
+            names.append(name)
+
+        if names:
+            names = names[: limit + 1 - count]
+            count += len(names)
+            groups.append((current, names))
+        for subdir in reversed(subdirs):
+            stack.append((subdir, depth + 1))
+
+    return groups, count
+
+
+def _format_groups(root: str, groups: List[Tuple[str, List[str]]], limit: int) -> str:
+    """Render groups as a header per directory (relative to root) with indented names"""
+    lines = []
+    remaining = limit
+    for directory, names in groups:
+        if remaining <= 0:
+            break
+        rel = os.path.relpath(directory, root)
+        lines.append("./" if rel == "." else rel + "/")
+        lines.extend("  " + name for name in names[:remaining])
+        remaining -= len(names)
+    return "\n".join(lines)
+
+
 def execute(args: Dict[str, Any]) -> Dict[str, Any]:
-    """List directory contents using os.walk with ignore dir filtering"""
+    """List directory contents grouped by directory, with ignore dir filtering"""
     path = args.get("path", ".")
     pattern = args.get("pattern")
     max_depth = args.get("max_depth", 1)
-    MAX_FILES = 100
+    max_files = args.get("max_files") or Config.default_list_max_files()
 
     try:
-        # Resolve path
-        import os
-
         resolved_path = os.path.abspath(path)
 
         # Check sandbox restrictions
@@ -62,120 +132,27 @@ def execute(args: Dict[str, Any]) -> Dict[str, Any]:
                 "detailed": f"Directory not found at '{resolved_path}'. Path does not exist or is not a directory."
             }
 
-        # Get directories and patterns to ignore
-        ignore_dirs = set(Config.ignore_dirs())
-        ignore_patterns = Config.ignore_patterns()
-
-        files = []
-
-        if pattern:
-            # Use os.scandir with depth limiting for pattern matching
-            base = Path(resolved_path)
-            base_depth = len(base.parts)
-
-            def _walk_with_depth(current_path, depth):
-                if depth >= max_depth:
-                    return
-                try:
-                    entries = list(os.scandir(current_path))
-                except OSError:
-                    return
-
-                for entry in entries:
-                    if entry.is_file():
-                        # Check pattern
-                        if not _matches_pattern(entry.name, pattern):
-                            continue
-                        # Check ignore patterns
-                        if any(entry.name.endswith(p) for p in ignore_patterns):
-                            continue
-                        # Check ignore dirs
-                        rel_parts = Path(entry.path).relative_to(base).parts
-                        if any(part in ignore_dirs for part in rel_parts):
-                            continue
-                        files.append(entry.path)
-                        if len(files) >= MAX_FILES + 1:
-                            return
-                    elif entry.is_dir():
-                        # Check ignore dirs
-                        if entry.name in ignore_dirs:
-                            continue
-                        if not _show_hidden and entry.name.startswith("."):
-                            continue
-                        # Check pattern - list dir if it matches
-                        if _matches_pattern(entry.name, pattern):
-                            files.append(entry.path)
-                            if len(files) >= MAX_FILES + 1:
-                                return
-                        # Always recurse into dirs
-                        _walk_with_depth(entry.path, depth + 1)
-                        if len(files) >= MAX_FILES + 1:
-                            return
-
-            def _matches_pattern(filename, pattern):
-                """Simple pattern matching for *.py, test_*.json etc."""
-                import fnmatch
-                # Convert **/ pattern to standard glob
-                clean_pattern = pattern.replace("**/", "")
-                return fnmatch.fnmatch(filename, clean_pattern)
-
-            _show_hidden = True  # Show hidden for now
-            _walk_with_depth(resolved_path, 0)
-        else:
-            # No pattern - use custom walk with depth limiting and ignore dir filtering
-            base_depth = len(os.path.abspath(resolved_path).split(os.sep))
-
-            def _walk_with_depth(current_path, depth):
-                if depth >= max_depth:
-                    return
-                try:
-                    entries = list(os.scandir(current_path))
-                except OSError:
-                    return
-
-                for entry in entries:
-                    if entry.is_file():
-                        # Skip files matching ignore patterns
-                        if any(entry.name.endswith(p) for p in ignore_patterns):
-                            continue
-                        files.append(entry.path)
-                        if len(files) >= MAX_FILES + 1:
-                            return
-                    elif entry.is_dir():
-                        # Skip ignore dirs
-                        if entry.name in ignore_dirs:
-                            continue
-                        # List directory name (even if contents are filtered)
-                        files.append(entry.path)
-                        if len(files) >= MAX_FILES + 1:
-                            return
-                        _walk_with_depth(entry.path, depth + 1)
-                        if len(files) >= MAX_FILES + 1:
-                            return
-
-            _walk_with_depth(resolved_path, 0)
-
-        actual_count = len(files)
-        limited_files = files[:MAX_FILES]
+        groups, actual_count = _collect(resolved_path, max_depth, pattern, max_files)
+        listing = _format_groups(resolved_path, groups, max_files)
 
         # Create output
-        if limited_files == []:
+        if actual_count == 0:
             return {
                 "tool": "list_directory",
                 "friendly": f"Directory is empty: '{resolved_path}'",
                 "detailed": f"Directory '{resolved_path}' exists but contains no files or subdirectories."
             }
-        elif actual_count > MAX_FILES:
+        elif actual_count > max_files:
             return {
                 "tool": "list_directory",
-                "friendly": f"Found {MAX_FILES}+ files in '{resolved_path}'",
-                "detailed": f"Showing first {MAX_FILES} files:\n\n{chr(10).join(limited_files)}"
+                "friendly": f"Found {max_files}+ files in '{resolved_path}'",
+                "detailed": f"Showing first {max_files} entries of '{resolved_path}' (use pattern, a deeper path or max_files to see more):\n\n{listing}"
             }
         else:
             return {
                 "tool": "list_directory",
                 "friendly": f"✓ Found {actual_count} files in '{resolved_path}'",
-                "detailed": f"Directory '{resolved_path}' contents:\n\n{chr(10).join(limited_files)}"
+                "detailed": f"Directory '{resolved_path}' contents:\n\n{listing}"
             }
 
     except Exception as e:
@@ -295,6 +272,10 @@ TOOL_DEFINITION = {
                 "type": "integer",
                 "description": "Maximum directory depth to list (default: 1 = current level only). max_depth=2 includes one level of subdirectories, etc.",
                 "default": 1
+            },
+            "max_files": {
+                "type": "integer",
+                "description": f"Maximum entries to return (default: {Config.default_list_max_files()})",
             }
         },
         "additionalProperties": False,
@@ -3,20 +3,29 @@ Read file tool
 
 """
 
+import hashlib
 import os
-from typing import Dict, Any
+import re
+from typing import Dict, Any, List, Tuple
 from aicoder.core.config import Config
 from aicoder.core.file_access_tracker import FileAccessTracker
 from aicoder.utils.file_utils import file_exists, read_file as file_read
+from aicoder.utils.line_index import read_lines
 from aicoder.utils.log import LogUtils
 
 # Configuration
 DEFAULT_READ_LIMIT = Config.default_read_limit()
 MAX_LINE_LENGTH = 2000  # truncate single lines longer than this (minified files etc.)
+MAX_BATCH_WORKERS = 8  # thread pool size for multi-file reads
+LINE_INDEX_MIN_SIZE = 1024 * 1024  # files this big are paged via the line index
+_PAGE_RANGE = re.compile(r"^Total lines: (\d+)\nShowing: lines \d+-(\d+)$", re.M)  # _format_page header
 
 # Plugin system reference (set at startup by ToolManager)
 _plugin_system = None
 
+# Message history reference (set at startup by ToolManager)
+_message_history = None
+
 
 def set_plugin_system(plugin_system) -> None:
     """Set plugin system reference (for on_read_file intercept hooks)"""
@@ -24,6 +33,12 @@ def set_plugin_system(plugin_system) -> None:
     _plugin_system = plugin_system
 
 
+def set_message_history(message_history) -> None:
+    """Set message history reference (to check earlier reads are still in context)"""
+    global _message_history
+    _message_history = message_history
+
+
 def _check_sandbox(path: str, print_message: bool = True) -> bool:
     """Check if path is within allowed directory"""
     if Config.sandbox_disabled():
@@ -70,17 +85,20 @@ def _get_virtual_content(path: str):
 def _paginate(path: str, offset: int, limit: int, content: str) -> Dict[str, Any]:
     """Build the read_file result dict from raw content"""
     lines = content.split("\n")
+    return _format_page(path, offset, lines[offset:offset + limit], len(lines))
+
 
+def _format_page(path: str, offset: int, selected_lines: List[str], total_lines: int) -> Dict[str, Any]:
+    """Build the read_file result dict from an already selected line range"""
     # Apply offset and limit
-    if offset >= len(lines):
+    if offset >= total_lines:
         return {
             "tool": "read_file",
-            "friendly": f"File {path} has {len(lines)} lines, but offset {offset} is beyond end of file",
-            "detailed": f"Cannot read file '{path}'. Requested offset {offset} but file only has {len(lines)} lines."
+            "friendly": f"File {path} has {total_lines} lines, but offset {offset} is beyond end of file",
+            "detailed": f"Cannot read file '{path}'. Requested offset {offset} but file only has {total_lines} lines."
         }
 
-    end_index = min(offset + limit, len(lines))
-    selected_lines = lines[offset:end_index]
+    end_index = min(offset + len(selected_lines), total_lines)
     # Truncate very long lines (minified JS etc.) to protect context window
     truncated_lines = [
         line if len(line) <= MAX_LINE_LENGTH else line[:MAX_LINE_LENGTH] + f"... ({len(line)} chars total)"
@@ -89,39 +107,107 @@ def _paginate(path: str, offset: int, limit: int, content: str) -> Dict[str, Any
     selected_content = "\n".join(truncated_lines)
 
     friendly_msg = f"Read {len(selected_lines)} lines from {path}"
-    if offset > 0 or end_index < len(lines):
-        friendly_msg += f" (showing lines {offset + 1}-{end_index} of {len(lines)})"
+    if offset > 0 or end_index < total_lines:
+        friendly_msg += f" (showing lines {offset + 1}-{end_index} of {total_lines})"
 
     return {
         "tool": "read_file",
         "friendly": friendly_msg,
-        "detailed": f"File: {path}\nTotal lines: {len(lines)}\nShowing: lines {offset + 1}-{end_index}\n\nContent:\n{selected_content}"
+        "detailed": f"File: {path}\nTotal lines: {total_lines}\nShowing: lines {offset + 1}-{end_index}\n\nContent:\n{selected_content}"
     }
 
 
-def execute(args: Dict[str, Any]) -> Dict[str, Any]:
-    """Read file with pagination"""
-    path = args.get("path")
-    try:
-        offset = int(args.get("offset", 0))
-    except ValueError:
-        raise Exception("offset must be an integer, got: " + str(args.get("offset")))
-    
+def _stops_before_end(detailed: str) -> bool:
+    """Whether a _format_page result ends before the last line of the file"""
+    match = _PAGE_RANGE.search(detailed)
+    return match is not None and int(match.group(2)) < int(match.group(1))
+
+
+def _parse_int(args: Dict[str, Any], key: str, default: int) -> int:
+    """Parse an integer argument, raising a readable error"""
     try:
-        limit = int(args.get("limit", DEFAULT_READ_LIMIT))
-    except ValueError:
-        raise Exception("limit must be an integer, got: " + str(args.get("limit")))
+        return int(args.get(key, default))
+    except (ValueError, TypeError):
+        raise Exception(f"{key} must be an integer, got: " + str(args.get(key)))
 
-    if not path:
-        raise Exception("Path is required")
 
+def _fingerprint(path: str) -> str:
+    """Content fingerprint: sha1 for normal files, mtime/size for indexed ones"""
+    st = os.stat(path)
+    if st.st_size >= LINE_INDEX_MIN_SIZE:
+        return f"stat:{st.st_mtime_ns}:{st.st_size}"
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def _result_hash(text: str) -> str:
+    """Hash of a tool result as stored in message history"""
+    return hashlib.sha1(text.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+def _find_result_message(result_hash: str, result_len: int) -> int:
+    """
+    Find the tool message still holding an earlier read_file result.
+
+    Returns its index, or -1 when it is gone (compacted, pruned, truncated
+    or edited) and the content has to be served again.
+    """
+    if _message_history is None:
+        return -1
+
+    messages = _message_history.messages
+    for i in range(len(messages) - 1, -1, -1):
+        msg = messages[i]
+        content = msg.get("content")
+        if (
+            msg.get("role") == "tool"
+            and isinstance(content, str)
+            and len(content) == result_len
+            and _result_hash(content) == result_hash
+        ):
+            return i
+    return -1
+
+
+def _unchanged_result(path: str, offset: int, limit: int, fingerprint: str):
+    """Compact result for a repeated read of an unchanged range (or None)"""
+    snapshot = FileAccessTracker.get_snapshot(path, offset, limit)
+    if not snapshot or snapshot[0] != fingerprint:
+        return None
+
+    index = _find_result_message(snapshot[1], snapshot[2])
+    if index == -1:
+        return None
+
+    detailed = (
+        f"File: {path}\nUnchanged since message {index}: the same range (offset {offset}, limit {limit}) "
+        f"was already returned there and the file has not changed. Pass force=true to re-read it."
+    )
+    FileAccessTracker.record_unchanged_hit((snapshot[2] - len(detailed)) // 4)
+    return {
+        "tool": "read_file",
+        "friendly": f"{path} unchanged since message {index} (re-read skipped)",
+        "detailed": detailed,
+    }
+
+
+def _read_single(
+    path: str, offset: int, limit: int, print_message: bool = True, remember: bool = False, force: bool = False
+) -> Dict[str, Any]:
+    """
+    Read one file (or virtual path) and paginate it.
+
+    With remember=True the served range is fingerprinted so a repeated read
+    of the same unchanged range returns a short "unchanged" note instead,
+    unless force=True.
+    """
     # Virtual content (internal skills, plugin-served files) — before sandbox
     # and file_exists: virtual paths don't exist on disk and live outside cwd.
     virtual = _get_virtual_content(path)
     if virtual is not None:
         return _paginate(path, offset, limit, virtual)
 
-    if not _check_sandbox(path):
+    if not _check_sandbox(path, print_message=print_message):
         resolved_path = os.path.abspath(path)
         current_dir = os.getcwd()
         raise Exception(f'Path: {path}\n[x] Sandbox: trying to access "{resolved_path}" outside current directory "{current_dir}"')
@@ -130,12 +216,30 @@ def execute(args: Dict[str, Any]) -> Dict[str, Any]:
         raise Exception(f"File not found: {path}")
 
     try:
-        content = file_read(path)
-        
+        fingerprint = _fingerprint(path) if remember else None
+        if fingerprint and not force:
+            unchanged = _unchanged_result(path, offset, limit, fingerprint)
+            if unchanged:
+                FileAccessTracker.record_read(path)
+                return unchanged
+
+        # Large files: seek straight to the requested page via a cached
+        # line-offset index instead of reading and splitting everything
+        if offset >= 0 and os.path.getsize(path) >= LINE_INDEX_MIN_SIZE:
+            selected_lines, total_lines = read_lines(path, offset, limit)
+            result = _format_page(path, offset, selected_lines, total_lines)
+        else:
+            result = _paginate(path, offset, limit, file_read(path))
+
         # Record that this file was read for safety tracking
         FileAccessTracker.record_read(path)
+        if fingerprint:
+            detailed = result["detailed"]
+            FileAccessTracker.record_snapshot(
+                path, offset, limit, fingerprint, _result_hash(detailed), len(detailed)
+            )
 
-        return _paginate(path, offset, limit, content)
+        return result
 
     except Exception as e:
         return {
@@ -145,24 +249,117 @@ def execute(args: Dict[str, Any]) -> Dict[str, Any]:
         }
 
 
-def generatePreview(args):
-    """Generate preview with sandbox validation (executed BEFORE approval)"""
-    path = args.get("path", "")
+def _batch_entries(paths: List[Any], offset: int, limit: int) -> List[Tuple[str, int, int]]:
+    """Normalize "paths" items (str or {path, offset, limit}) to (path, offset, limit)"""
+    entries = []
+    for item in paths:
+        if isinstance(item, str):
+            entries.append((item, offset, limit))
+        elif isinstance(item, dict) and isinstance(item.get("path"), str):
+            entries.append((
+                item["path"],
+                _parse_int(item, "offset", offset),
+                _parse_int(item, "limit", limit),
+            ))
+        else:
+            raise Exception(f'Invalid "paths" item: {item!r} (expected string or object with "path")')
+    return entries
+
+
+def _read_batch(entries: List[Tuple[str, int, int]]) -> Dict[str, Any]:
+    """
+    Read several files concurrently under a shared budget.
 
-    # Virtual files need no preview — content is served by plugins
-    if _get_virtual_content(path) is not None:
-        return None
+    READ_BATCH_MAX_LINES and MAX_TOOL_RESULT_SIZE are split evenly across
+    files so every file gets a share of the result instead of the last ones
+    being cut off by ToolManager truncation. Per-file errors are reported
+    inline and don't fail the whole call.
+    """
+    count = len(entries)
+    line_share = max(1, Config.read_batch_max_lines() // count)
+    byte_share = max(1, Config.max_tool_result_size() // count)
+
+    def read_entry(entry: Tuple[str, int, int]) -> Dict[str, Any]:
+        path, offset, limit = entry
+        try:
+            result = _read_single(path, offset, min(limit, line_share), print_message=False)
+        except Exception as e:
+            return {
+                "friendly": f"❌ {path}: {str(e).splitlines()[-1]}",
+                "detailed": f"File: {path}\nError: {str(e)}",
+            }
+
+        detailed = result["detailed"]
+        # Only when the budget cut the read short, not for files shorter than it
+        if limit > line_share and _stops_before_end(detailed):
+            detailed += f"\n[batch budget: at most {line_share} lines per file - read it alone for more]"
+        if len(detailed) > byte_share:
+            detailed = detailed[:byte_share] + f"\n... [truncated to {byte_share} bytes by batch budget - read it alone for more]"
+        return {"friendly": result["friendly"], "detailed": detailed}
+
+    from concurrent.futures import ThreadPoolExecutor  # Lazy: only batch reads need it
+
+    with ThreadPoolExecutor(max_workers=min(MAX_BATCH_WORKERS, count)) as pool:
+        results = list(pool.map(read_entry, entries))
+
+    friendly = f"Read {count} files\n" + "\n".join(f"  {r['friendly']}" for r in results)
+    return {
+        "tool": "read_file",
+        "friendly": friendly,
+        "detailed": "\n\n".join(r["detailed"] for r in results),
+    }
 
-    # Check sandbox first - don't print message since preview will show it
-    if not _check_sandbox(path, print_message=False):
-        import os.path
 
-        resolved_path = os.path.abspath(path)
-        current_dir = os.getcwd()
+def execute(args: Dict[str, Any]) -> Dict[str, Any]:
+    """Read file with pagination (or several files with "paths")"""
+    path = args.get("path")
+    paths = args.get("paths")
+    offset = _parse_int(args, "offset", 0)
+    limit = _parse_int(args, "limit", DEFAULT_READ_LIMIT)
 
+    if paths:
+        if not isinstance(paths, list):
+            raise Exception('"paths" must be a list of file paths')
+        return _read_batch(_batch_entries(paths, offset, limit))
+
+    if not path:
+        raise Exception("Path is required")
+
+    force = args.get("force", False)
+    if isinstance(force, str):
+        force = force.lower() in ("true", "1", "yes")
+
+    return _read_single(path, offset, limit, remember=True, force=bool(force))
+
+
+def _paths_from_args(args) -> List[str]:
+    """Collect the path strings of a single or multi-file call"""
+    paths = args.get("paths")
+    if isinstance(paths, list):
+        return [item.get("path", "") if isinstance(item, dict) else str(item) for item in paths]
+    return [args.get("path", "")]
+
+
+def generatePreview(args):
+    """Generate preview with sandbox validation (executed BEFORE approval)"""
+    violations = []
+    for path in _paths_from_args(args):
+        # Virtual files need no preview — content is served by plugins
+        if _get_virtual_content(path) is not None:
+            continue
+
+        # Check sandbox first - don't print message since preview will show it
+        if not _check_sandbox(path, print_message=False):
+            resolved_path = os.path.abspath(path)
+            current_dir = os.getcwd()
+            violations.append(
+                f'Path: {path}\n[x] Sandbox: trying to access "{resolved_path}" outside current directory "{current_dir}"'
+            )
+
+    if violations:
         return {
             "tool": "read_file",
-            "content": f'Path: {path}\n[x] Sandbox: trying to access "{resolved_path}" outside current directory "{current_dir}"',
+            "content": "\n".join(violations),
             "can_approve": False,
         }
 
@@ -172,11 +369,13 @@ def generatePreview(args):
 
 def format_arguments(args):
     """Format arguments for display"""
-    path = args.get("path")
     offset = args.get("offset", 0)
     limit = args.get("limit", DEFAULT_READ_LIMIT)
 
-    lines = [f"Path: {path}"]
+    if isinstance(args.get("paths"), list):
+        lines = [f"Paths: {', '.join(_paths_from_args(args))}"]
+    else:
+        lines = [f"Path: {args.get('path')}"]
 
     if offset != 0:
         lines.append(f"Offset: {offset}")
@@ -189,9 +388,14 @@ def format_arguments(args):
 
 def validate_arguments(args):
     """Validate arguments"""
+    paths = args.get("paths")
+    if paths is not None:
+        if not isinstance(paths, list) or not paths:
+            raise Exception('read_file "paths" argument must be a non-empty list')
+        return
     path = args.get("path")
     if not path or not isinstance(path, str):
-        raise Exception('read_file requires "path" argument (string)')
+        raise Exception('read_file requires "path" argument (string) or "paths" (list)')
 
 
 # Tool definition
@@ -199,7 +403,7 @@ TOOL_DEFINITION = {
     "type": "internal",
     "auto_approved": True,
     "approval_excludes_arguments": False,
-    "description": "Reads the content from a specified file path.",
+    "description": "Reads the content from a specified file path. Use \"paths\" to read several files in one call (shared line budget, split across files).",
     "parameters": {
         "type": "object",
         "properties": {
@@ -207,6 +411,23 @@ TOOL_DEFINITION = {
                 "type": "string",
                 "description": "The file system path to read from.",
             },
+            "paths": {
+                "type": "array",
+                "description": "Read several files at once instead of \"path\". Each item is {path, offset?, limit?}; top-level offset/limit are the defaults.",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "path": {"type": "string"},
+                        "offset": {"type": "integer"},
+                        "limit": {"type": "integer"},
+                    },
+                    "required": ["path"],
+                },
+            },
+            "force": {
+                "type": "boolean",
+                "description": "Re-read the full content even if the same range was already read and the file is unchanged (default: false).",
+            },
             "offset": {
                 "type": "integer",
                 "description": "The line number to start reading from (default: 0).",
@@ -218,7 +439,7 @@ TOOL_DEFINITION = {
                 "default": DEFAULT_READ_LIMIT,
             },
         },
-        "required": ["path"],
+        "required": [],
     },
 }
 
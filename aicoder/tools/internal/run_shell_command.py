@@ -3,13 +3,17 @@ Run shell command tool
 
 """
 
+import atexit
 import subprocess
 import signal
 import os
 import time
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from aicoder.core.config import Config
 from aicoder.utils.log import LogUtils
+from aicoder.utils.output_capture import BoundedCapture, pump
+from aicoder.utils.persistent_shell import PersistentShell
+from aicoder.utils.temp_file_utils import create_temp_file, delete_file
 
 # Configuration
 DEFAULT_TIMEOUT = Config.default_shell_timeout()
@@ -19,6 +23,9 @@ DEFAULT_TIMEOUT = Config.default_shell_timeout()
 _active_proc: Optional[subprocess.Popen] = None
 _tty_path: Optional[str] = None
 
+# Long-lived bash for AICODER_PERSISTENT_SHELL=1
+_shell: Optional[PersistentShell] = None
+
 
 def get_tty_path() -> str:
     """Detect and cache the terminal device path.
@@ -89,8 +96,51 @@ def _wrap_with_tee(command: str) -> Optional[str]:
     return f"({command}) 2>&1 | tee {tty} 2>/dev/null; exit ${{PIPESTATUS[0]}}"
 
 
+def _open_captures() -> Tuple[BoundedCapture, BoundedCapture, Optional[str]]:
+    """Create bounded stdout/stderr captures, sharing a spill file if enabled"""
+    capture_bytes = Config.shell_capture_bytes()
+    head_limit = capture_bytes // 2
+    tail_limit = capture_bytes - head_limit
+    spill = None
+    spill_path = create_temp_file("aicoder-shell", ".log") if Config.shell_spill_output() else None
+    if spill_path:
+        os.makedirs(os.path.dirname(spill_path), exist_ok=True)
+        spill = open(spill_path, "wb")
+    return BoundedCapture(head_limit, tail_limit, spill), BoundedCapture(head_limit, tail_limit, spill), spill_path
+
+
+def _close_captures(stdout: BoundedCapture, stderr: BoundedCapture, spill_path: Optional[str]) -> None:
+    """Close the spill file, removing it when nothing was omitted"""
+    if stdout.spill is None:
+        return
+    stdout.spill.close()
+    if not (stdout.dropped or stderr.dropped):
+        delete_file(spill_path)
+
+
+def _captured_result(
+    command: str, returncode: int, stdout: BoundedCapture, stderr: BoundedCapture, spill_path: Optional[str]
+) -> subprocess.CompletedProcess:
+    """Build the CompletedProcess, with omitted_bytes and spill_path attached"""
+    result = subprocess.CompletedProcess(
+        args=command,
+        returncode=returncode,
+        stdout=stdout.text(),
+        stderr=stderr.text()
+    )
+    result.omitted_bytes = stdout.dropped + stderr.dropped
+    result.spill_path = spill_path if result.omitted_bytes else None
+    return result
+
+
 def execute_with_process_group(command: str, timeout: int, cwd: Optional[str] = None, live_output: bool = False) -> subprocess.CompletedProcess:
-    """Execute command with proper process group termination"""
+    """Execute command with proper process group termination.
+
+    Output is streamed into bounded head/tail buffers (Config.shell_capture_bytes()
+    per stream), so memory stays constant whatever the command prints. The result
+    carries omitted_bytes and, with AICODER_SHELL_SPILL=1, spill_path: a temp
+    file holding the full output when anything was omitted.
+    """
     global _active_proc
 
     # Get env with cleared vars (or None to inherit parent env)
@@ -102,49 +152,53 @@ def execute_with_process_group(command: str, timeout: int, cwd: Optional[str] =
         if wrapped:
             command = wrapped
 
-    # Create process group for the entire process tree
-    proc = subprocess.Popen(
-        ["bash", "-c", command],
-        shell=False,
-        preexec_fn=os.setsid,  # Create new process group
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True,
-        encoding="utf-8",
-        errors="replace",
-        cwd=cwd,
-        env=clean_env,
-    )
+    stdout, stderr, spill_path = _open_captures()
+    try:
+        # Create process group for the entire process tree
+        proc = subprocess.Popen(
+            ["bash", "-c", command],
+            shell=False,
+            preexec_fn=os.setsid,  # Create new process group
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=cwd,
+            env=clean_env,
+        )
+    except BaseException:
+        # e.g. cwd doesn't exist: don't leak the spill file
+        _close_captures(stdout, stderr, spill_path)
+        raise
 
     _active_proc = proc
+    streams = {proc.stdout: stdout, proc.stderr: stderr}
 
     try:
-        # Wait for timeout with communicate
-        stdout, stderr = proc.communicate(timeout=timeout)
-        return subprocess.CompletedProcess(
-            args=command,
-            returncode=proc.returncode,
-            stdout=stdout,
-            stderr=stderr
-        )
-
-    except subprocess.TimeoutExpired:
-        # Kill entire process group (all children)
-        _kill_process_group(proc)
-        time.sleep(2)  # Give it a moment to cleanup gracefully
-        _kill_process_group(proc)  # Force kill if still running
+        # Read both pipes as they fill so memory stays bounded
+        deadline = time.monotonic() + timeout
+        finished = pump(streams, deadline)
+        if finished:
+            try:
+                proc.wait(timeout=max(0.0, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired:
+                finished = False
 
-        # Get remaining output
-        stdout, stderr = proc.communicate()
+        if finished:
+            returncode = proc.returncode
+        else:
+            # Kill entire process group (all children), give it a moment to
+            # clean up gracefully while collecting its last output
+            _kill_process_group(proc)
+            pump(streams, time.monotonic() + 2)
+            _kill_process_group(proc)  # Force kill if still running
+            pump(streams, time.monotonic() + 1)
+            returncode = -1  # Custom code for timeout
 
-        return subprocess.CompletedProcess(
-            args=command,
-            returncode=-1,  # Custom code for timeout
-            stdout=stdout,
-            stderr=stderr
-        )
+        return _captured_result(command, returncode, stdout, stderr, spill_path)
 
     finally:
+        for stream in streams:
+            stream.close()
+        _close_captures(stdout, stderr, spill_path)
         # Always clean up process group to ensure spawned children are killed
         if _active_proc is not None:
             if Config.debug():
@@ -152,12 +206,44 @@ def execute_with_process_group(command: str, timeout: int, cwd: Optional[str] =
             _kill_process_group(_active_proc)
             # Reap the process to clean up zombies
             try:
-                _active_proc.communicate(timeout=1)
+                _active_proc.wait(timeout=1)
             except Exception:
                 pass
             _active_proc = None
 
 
+def _use_persistent_shell(live_output: bool) -> bool:
+    """Persistent mode is opt-in and can't tee output to the TTY"""
+    return Config.persistent_shell() and not (Config.detail_tty() or live_output)
+
+
+def execute_in_persistent_shell(command: str, timeout: int, cwd: Optional[str] = None) -> subprocess.CompletedProcess:
+    """Execute command in the session's long-lived bash (spawned on first use).
+
+    Same result shape as execute_with_process_group. cd, exports and venv
+    activation carry over to later commands; an explicit cwd does not.
+    """
+    global _shell
+    if _shell is None:
+        _shell = PersistentShell(env=_get_cleared_env())
+        atexit.register(close_persistent_shell)
+
+    stdout, stderr, spill_path = _open_captures()
+    try:
+        returncode = _shell.run(command, timeout, stdout, stderr, cwd=cwd)
+        return _captured_result(command, returncode, stdout, stderr, spill_path)
+    finally:
+        _close_captures(stdout, stderr, spill_path)
+
+
+def close_persistent_shell() -> None:
+    """Kill the persistent shell (a new one starts on the next command)"""
+    global _shell
+    if _shell is not None:
+        _shell.close()
+        _shell = None
+
+
 def _format_duration(seconds: float) -> str:
     """Format elapsed wall-clock time into a compact human-readable string.
 
@@ -199,7 +285,10 @@ def execute(args: Dict[str, Any]) -> Dict[str, Any]:
     start = time.monotonic()
     try:
         # Execute command with proper process group termination
-        result = execute_with_process_group(command, timeout, cwd, live_output=live_output)
+        if _use_persistent_shell(live_output):
+            result = execute_in_persistent_shell(command, timeout, cwd)
+        else:
+            result = execute_with_process_group(command, timeout, cwd, live_output=live_output)
         elapsed_str = _format_duration(time.monotonic() - start)
 
         # Create friendly message
@@ -222,6 +311,16 @@ def execute(args: Dict[str, Any]) -> Dict[str, Any]:
             else:
                 output = result.stderr
 
+        omitted = getattr(result, "omitted_bytes", 0)
+        if omitted:
+            if result.spill_path:
+                output += (
+                    f"\n\nNOTE: {omitted:,} bytes of output omitted. Full output saved to "
+                    f"{result.spill_path} (page through it with read_file offset/limit)"
+                )
+            else:
+                output += f"\n\nNOTE: {omitted:,} bytes of output omitted from the middle"
+
         # Build detailed message with explicit timeout information for AI
         if result.returncode == -1:
             # Make timeout VERY clear to AI with actionable suggestion
@@ -110,6 +110,12 @@ def execute(args: Dict[str, Any]) -> Dict[str, Any]:
             if _plugin_system:
                 _plugin_system.call_hooks("after_file_write", path, content)
 
+            # Keep the grep trigram index (if enabled) current
+            if Config.grep_index_enabled():
+                from aicoder.core.trigram_index import notify_file_changed  # Lazy: index is opt-in
+
+                notify_file_changed(path)
+
             # Prepare result
             if exists:
                 friendly = f"✓ Updated '{path}'"
@@ -0,0 +1,132 @@
+"""
+Source tree scanning shared by list_directory, grep and plugin discovery
+Stateless module functions with a module-level directory listing cache
+"""
+
+import os
+import time
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from aicoder.core.config import Config
+
+# (path, mtime_ns, size) for every file found
+FileEntry = Tuple[str, int, int]
+
+# (mtime_ns, subdirs, files, symlink names) - names sorted, dirs/files
+# classified after following symlinks
+DirListing = Tuple[int, List[str], List[str], FrozenSet[str]]
+
+# Module-level state: dir path -> listing, reused while the dir's mtime is
+# unchanged. Any entry added, removed or renamed bumps the dir mtime; file
+# content edits don't, so callers needing file stats still stat files.
+MAX_CACHED_DIRS = 50000
+# Listings of dirs modified this recently aren't cached: a second change
+# within the filesystem's timestamp granularity would go unnoticed
+RACY_WINDOW_NS = 2_000_000_000
+_listings: Dict[str, DirListing] = {}
+_stats = {"hits": 0, "misses": 0}
+
+
+def list_dir(path: str) -> Optional[DirListing]:
+    """
+    Sorted listing of one directory, served from cache when the directory's
+    mtime is unchanged. Returns None if path can't be listed.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+
+    cached = _listings.get(path)
+    if cached is not None and cached[0] == st.st_mtime_ns:
+        _stats["hits"] += 1
+        return cached
+
+    _stats["misses"] += 1
+    dirs: List[str] = []
+    files: List[str] = []
+    links = set()
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if entry.is_symlink():
+                        links.add(entry.name)
+                    if entry.is_dir():
+                        dirs.append(entry.name)
+                    elif entry.is_file():
+                        files.append(entry.name)
+                except OSError:
+                    continue
+    except OSError:
+        return None
+
+    dirs.sort()
+    files.sort()
+    listing = (st.st_mtime_ns, dirs, files, frozenset(links))
+    if time.time_ns() - st.st_mtime_ns > RACY_WINDOW_NS:
+        if len(_listings) >= MAX_CACHED_DIRS:
+            _listings.clear()
+        _listings[path] = listing
+    return listing
+
+
+def clear_cache() -> None:
+    """Drop all cached directory listings"""
+    _listings.clear()
+    _stats["hits"] = 0
+    _stats["misses"] = 0
+
+
+def cache_stats() -> Dict[str, int]:
+    """Listing cache hits/misses and size"""
+    return {"dirs": len(_listings), **_stats}
+
+
+def scan_files(root: str) -> Tuple[List[FileEntry], int]:
+    """
+    Walk root like rg does by default (no hidden entries, no symlinks)
+    plus Config.ignore_dirs()/ignore_patterns().
+
+    Returns (entries, signature): entries sorted by path, and a hash of
+    every directory and file mtime seen, so any add/remove/edit under root
+    changes the signature. A file root yields just that file.
+    """
+    try:
+        st = os.stat(root)
+    except OSError:
+        return [], 0
+    if not os.path.isdir(root):
+        entry = (root, st.st_mtime_ns, st.st_size)
+        return [entry], hash(entry)
+
+    ignore_dirs = set(Config.ignore_dirs())
+    ignore_patterns = tuple(Config.ignore_patterns())
+    entries: List[FileEntry] = []
+    dir_stamps: List[Tuple[str, int]] = []
+
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        listing = list_dir(current)
+        if listing is None:
+            continue
+        mtime_ns, dirs, files, links = listing
+        dir_stamps.append((current, mtime_ns))
+
+        for name in files:
+            if name.startswith(".") or name in links or name.endswith(ignore_patterns):
+                continue
+            path = os.path.join(current, name)
+            try:
+                file_stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((path, file_stat.st_mtime_ns, file_stat.st_size))
+        for name in reversed(dirs):
+            if name.startswith(".") or name in links or name in ignore_dirs:
+                continue
+            stack.append(os.path.join(current, name))
+
+    entries.sort()
+    return entries, hash((tuple(entries), tuple(dir_stamps)))
@@ -38,6 +38,94 @@ def _get_zlib():
     return _zlib
 
 
+def _timed_create_connection(timings, address, timeout=socket._GLOBAL_DEFAULT_TIMEOUT, source_address=None, *args):
+    """socket.create_connection that marks dns and connect on timings"""
+    host, port = address
+    infos = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)
+    timings.mark("dns")
+    error = None
+    for family, socktype, proto, _, addr in infos:
+        sock = None
+        try:
+            sock = socket.socket(family, socktype, proto)
+            if timeout is not socket._GLOBAL_DEFAULT_TIMEOUT:
+                sock.settimeout(timeout)
+            if source_address:
+                sock.bind(source_address)
+            sock.connect(addr)
+            timings.mark("connect")
+            return sock
+        except OSError as e:
+            error = e
+            if sock is not None:
+                sock.close()
+    raise error or OSError(f"getaddrinfo returned no addresses for {host}")
+
+
+class _TimedConnectionMixin:
+    """HTTP(S)Connection methods marking phases on self._timings"""
+
+    _timings = None
+
+    def connect(self):
+        self._create_connection = lambda *args: _timed_create_connection(self._timings, *args)
+        super().connect()
+        if hasattr(self, "_context"):  # HTTPS: super().connect() did the handshake
+            self._timings.mark("tls")
+
+    def request(self, *args, **kwargs):
+        super().request(*args, **kwargs)
+        self._timings.mark("request_sent")
+
+    def getresponse(self):
+        response = super().getresponse()
+        self._timings.mark("first_byte")  # Status line and headers read
+        return response
+
+
+_timed_handler_classes = None
+
+
+def _get_timed_handler_classes():
+    """urllib handler classes using timed connections (built on first use)"""
+    global _timed_handler_classes
+    if _timed_handler_classes is None:
+        import http.client
+        urllib_req = _get_urllib()
+
+        class TimedHTTPConnection(_TimedConnectionMixin, http.client.HTTPConnection):
+            pass
+
+        class TimedHTTPSConnection(_TimedConnectionMixin, http.client.HTTPSConnection):
+            pass
+
+        def _factory(cls, timings):
+            def create(*args, **kwargs):
+                conn = cls(*args, **kwargs)
+                conn._timings = timings
+                return conn
+            return create
+
+        class TimedHTTPHandler(urllib_req.HTTPHandler):
+            def __init__(self, timings):
+                super().__init__()
+                self._timings = timings
+
+            def http_open(self, req):
+                return self.do_open(_factory(TimedHTTPConnection, self._timings), req)
+
+        class TimedHTTPSHandler(urllib_req.HTTPSHandler):
+            def __init__(self, timings):
+                super().__init__()
+                self._timings = timings
+
+            def https_open(self, req):
+                return self.do_open(_factory(TimedHTTPSConnection, self._timings), req, context=self._context)
+
+        _timed_handler_classes = (TimedHTTPHandler, TimedHTTPSHandler)
+    return _timed_handler_classes
+
+
 class Response:
     """Simple response object mimicking fetch Response"""
 
@@ -214,6 +302,9 @@ class Response:
 def fetch(url: str, options: Optional[Dict[str, Any]] = None) -> Response:
     """
     Simple fetch-like function with total timeout enforcement.
+
+    options["timings"] (an object with mark(phase), e.g. RequestTimings)
+    gets dns, connect, tls, request_sent and first_byte marks.
     """
     return _fetch_impl(url, options)
 
@@ -246,7 +337,13 @@ def _fetch_impl(url: str, options: Optional[Dict[str, Any]] = None) -> Response:
         remaining = deadline - time.monotonic()
         if remaining <= 0:
             raise socket.timeout("Total timeout exceeded before connection")
-        response = urllib_req.urlopen(req, timeout=remaining)
+        timings = options.get("timings")
+        if timings is not None:
+            handlers = _get_timed_handler_classes()
+            opener = urllib_req.build_opener(*(handler(timings) for handler in handlers))
+            response = opener.open(req, timeout=remaining)
+        else:
+            response = urllib_req.urlopen(req, timeout=remaining)
         return Response(response, deadline=deadline)
     except Exception as e:
         # Import urllib.error here to avoid startup cost
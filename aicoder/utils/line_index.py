@@ -0,0 +1,100 @@
+"""
+Line-offset index for paging through large files
+Stateless module functions with a small module-level LRU cache
+"""
+
+import mmap
+import os
+import re
+import threading
+from array import array
+from collections import OrderedDict
+from typing import List, Tuple
+
+# Module-level state: abs path -> (mtime_ns, size, line start offsets)
+_MAX_CACHED_INDEXES = 16
+_index_cache: "OrderedDict[str, Tuple[int, int, array]]" = OrderedDict()
+_cache_lock = threading.Lock()  # Batch reads page files from pool threads
+
+# Universal newlines, as open(path, "r") splits the small-file path
+_LINE_BREAK = re.compile(rb"\r\n|\r|\n")
+_LONE_CR = re.compile(rb"\r(?!\n)")
+
+
+def _build_index(path: str, size: int) -> array:
+    """Record the byte offset of every line start, scanning an mmap"""
+    starts = array("Q", [0])
+    if size == 0:
+        return starts
+
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            append = starts.append
+            if _LONE_CR.search(mm):
+                # Lone CR line breaks: slower regex pass (LF and CRLF start
+                # lines after the same "\n", so they keep the find loop)
+                for match in _LINE_BREAK.finditer(mm):
+                    append(match.end())
+                return starts
+            find = mm.find
+            pos = find(b"\n")
+            while pos != -1:
+                append(pos + 1)
+                pos = find(b"\n", pos + 1)
+    return starts
+
+
+def get_line_index(path: str) -> array:
+    """Get line start offsets for a file, cached by (path, mtime, size)"""
+    key = os.path.abspath(path)
+    st = os.stat(key)
+
+    with _cache_lock:
+        cached = _index_cache.get(key)
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            _index_cache.move_to_end(key)
+            return cached[2]
+
+    # Built outside the lock so one large file doesn't stall other readers
+    starts = _build_index(key, st.st_size)
+    with _cache_lock:
+        _index_cache[key] = (st.st_mtime_ns, st.st_size, starts)
+        _index_cache.move_to_end(key)
+        while len(_index_cache) > _MAX_CACHED_INDEXES:
+            _index_cache.popitem(last=False)
+    return starts
+
+
+def read_lines(path: str, offset: int, limit: int) -> Tuple[List[str], int]:
+    """
+    Read lines offset..offset+limit without loading the whole file.
+
+    Returns (lines, total_lines). Line counting matches content.split("\\n")
+    on universal-newline text (what read_file returns for small files): LF,
+    CRLF and lone CR all end a line, and a trailing one yields a final empty
+    line.
+    """
+    starts = get_line_index(path)
+    total = len(starts)
+    offset = max(offset, 0)
+    if offset >= total or limit <= 0:
+        return [], total
+
+    end = min(offset + limit, total)
+    with open(path, "rb") as f:
+        f.seek(starts[offset])
+        if end < total:
+            raw = f.read(starts[end] - starts[offset])
+        else:
+            raw = f.read()
+
+    lines = raw.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    if end < total:
+        lines.pop()  # Empty text after the last requested line's break
+    return lines, total
+
+
+def clear_cache() -> None:
+    """Drop all cached indexes"""
+    with _cache_lock:
+        _index_cache.clear()
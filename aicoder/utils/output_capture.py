@@ -0,0 +1,87 @@
+"""
+Bounded capture of process output
+Stateful: class needed for per-stream head/tail buffers and byte counts
+"""
+
+import os
+import selectors
+import time
+from typing import BinaryIO, Dict, Optional
+
+READ_CHUNK = 65536
+
+
+class BoundedCapture:
+    """
+    Keep the first head_limit bytes and the last tail_limit bytes of a
+    stream, counting everything dropped in between. Memory stays constant
+    whatever the total output size.
+    """
+
+    def __init__(self, head_limit: int, tail_limit: int, spill: Optional[BinaryIO] = None):
+        self.head_limit = max(0, head_limit)
+        self.tail_limit = max(0, tail_limit)
+        self.spill = spill
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.total = 0
+
+    def write(self, data: bytes) -> None:
+        """Add a chunk of output"""
+        self.total += len(data)
+        if self.spill is not None:
+            self.spill.write(data)
+
+        room = self.head_limit - len(self.head)
+        if room > 0:
+            self.head += data[:room]
+            data = data[room:]
+        if not data or not self.tail_limit:
+            return
+
+        self.tail += data
+        # Trim lazily so a stream of small chunks isn't O(n) per chunk
+        if len(self.tail) > 2 * self.tail_limit:
+            del self.tail[: len(self.tail) - self.tail_limit]
+
+    @property
+    def dropped(self) -> int:
+        """Bytes seen but not kept"""
+        return self.total - len(self.head) - min(len(self.tail), self.tail_limit)
+
+    def text(self) -> str:
+        """Decoded output with an omission marker where bytes were dropped"""
+        tail = bytes(self.tail[-self.tail_limit:]) if self.tail_limit else b""
+        head = self.head.decode("utf-8", errors="replace")
+        if not self.dropped:
+            return head + tail.decode("utf-8", errors="replace")
+        return (
+            head
+            + f"\n\n... [{self.dropped:,} bytes omitted] ...\n\n"
+            + tail.decode("utf-8", errors="replace")
+        )
+
+
+def pump(streams: Dict[BinaryIO, BoundedCapture], deadline: float) -> bool:
+    """
+    Read every stream into its capture until all reach EOF or the
+    monotonic deadline passes. Streams that hit EOF are closed and removed
+    from the dict. Returns True if all streams finished.
+    """
+    with selectors.DefaultSelector() as sel:
+        for stream, capture in streams.items():
+            sel.register(stream, selectors.EVENT_READ, capture)
+
+        while sel.get_map():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            for key, _ in sel.select(remaining):
+                chunk = os.read(key.fd, READ_CHUNK)
+                if chunk:
+                    key.data.write(chunk)
+                    continue
+                sel.unregister(key.fileobj)
+                key.fileobj.close()
+                del streams[key.fileobj]
+    return True
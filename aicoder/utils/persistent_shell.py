@@ -0,0 +1,219 @@
+"""
+Long-lived bash coprocess for run_shell_command
+Stateful: class needed to keep the shell process and its protocol token
+"""
+
+import os
+import re
+import selectors
+import shlex
+import signal
+import subprocess
+import time
+from typing import Dict, Optional, Tuple
+
+from aicoder.utils.output_capture import BoundedCapture, READ_CHUNK
+
+# Time given to the foreground job to die after SIGINT before the whole
+# shell is killed (and respawned on the next command)
+INTERRUPT_GRACE = 2.0
+
+
+def _gen_token_hex(n):
+    """Generate random hex token - lazy import to avoid 50ms secrets cost"""
+    import secrets
+    return secrets.token_hex(n)
+
+
+class PersistentShell:
+    """
+    One bash process fed commands over stdin. Each command runs through
+    eval in a helper function (so syntax errors don't kill the shell) with
+    stdin from /dev/null,
+    followed by sentinels on stdout and stderr (both carrying $?) that mark
+    the end of its output. cd, exports and venv activation persist between
+    commands. Background jobs don't outlive their command: the shell sends
+    SIGTERM to its process group (trapping it itself) before the sentinels.
+    On timeout the process group gets SIGINT, which the shell traps and its
+    foreground job does not; if that fails, or a command closes the shell's
+    stdout/stderr, the shell is killed and respawned lazily.
+    """
+
+    def __init__(self, env: Optional[Dict[str, str]] = None, cwd: Optional[str] = None):
+        self.env = env
+        self.cwd = cwd
+        self.proc: Optional[subprocess.Popen] = None
+        self.token = b""
+        self.spawns = 0
+        self.commands = 0
+        self._returncode: Optional[int] = None
+        self._broken = False  # A pipe hit EOF: the shell can't run more commands
+
+    @property
+    def alive(self) -> bool:
+        """True while the bash process is running"""
+        return self.proc is not None and self.proc.poll() is None
+
+    def _spawn(self) -> None:
+        """Start (or restart) the bash process"""
+        self.close()
+        self.token = _gen_token_hex(8).encode()
+        self.proc = subprocess.Popen(
+            ["bash", "--noprofile", "--norc"],
+            shell=False,
+            preexec_fn=os.setsid,  # Own process group, like bash -c mode
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=self.cwd,
+            env=self.env,
+        )
+        # A (non-ignored) trap keeps the shell alive on SIGINT while its
+        # children still get the default action; while a command runs the
+        # trap also abandons the rest of it, like ^C at an interactive prompt
+        self._send(
+            b"__aicoder_run() { trap 'trap : INT; return 130' INT; eval \"$1\"; "
+            b"local __aicoder_rc=$?; trap : INT; return $__aicoder_rc; }\n"
+            b"trap : INT\n"
+            b"trap : TERM\n"
+        )
+        self.spawns += 1
+
+    def _send(self, data: bytes) -> None:
+        """Write to the shell's stdin"""
+        self.proc.stdin.write(data)
+        self.proc.stdin.flush()
+
+    def close(self) -> None:
+        """Kill the shell and its process group"""
+        proc, self.proc = self.proc, None
+        if proc is None:
+            return
+        try:
+            os.killpg(os.getpgid(proc.pid), signal.SIGKILL)
+        except (ProcessLookupError, OSError):
+            pass
+        for stream in (proc.stdin, proc.stdout, proc.stderr):
+            try:
+                stream.close()
+            except OSError:
+                pass
+        try:
+            proc.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            pass
+
+    def _interrupt(self) -> None:
+        """SIGINT the foreground job (the shell itself traps it)"""
+        try:
+            os.killpg(os.getpgid(self.proc.pid), signal.SIGINT)
+        except (ProcessLookupError, OSError):
+            pass
+
+    def run(
+        self,
+        command: str,
+        timeout: float,
+        stdout: BoundedCapture,
+        stderr: BoundedCapture,
+        cwd: Optional[str] = None,
+    ) -> int:
+        """
+        Run one command, streaming its output into the captures.
+        Returns the exit code, or -1 on timeout.
+        """
+        if not self.alive:
+            self._spawn()
+        self.commands += 1
+        self._returncode = None
+        self._broken = False
+
+        if cwd:
+            # An explicit cwd is a one-off: don't move the session
+            command = f"( cd -- {shlex.quote(cwd)} && eval {shlex.quote(command)} )"
+        script = f"__aicoder_run {shlex.quote(command)}"
+        token = self.token.decode()
+        # Both sentinels carry $?, so either one is enough if the command
+        # closed the other stream
+        self._send(
+            (
+                f"{script} < /dev/null\n"
+                f"__aicoder_rc=$?; kill -TERM 0 2>/dev/null\n"
+                f"printf '\\n__AICODER_{token}_%s__\\n' \"$__aicoder_rc\"\n"
+                f"printf '\\n__AICODER_{token}_%s__\\n' \"$__aicoder_rc\" >&2\n"
+            ).encode()
+        )
+
+        # Per-stream (capture, held-back bytes), dropped once its sentinel arrives
+        streams = {
+            self.proc.stdout: (stdout, bytearray()),
+            self.proc.stderr: (stderr, bytearray()),
+        }
+        try:
+            returncode, completed = self._collect(streams, time.monotonic() + timeout)
+            if not completed:
+                # Timed out: interrupt the foreground job, then give up on the shell
+                self._interrupt()
+                _, completed = self._collect(streams, time.monotonic() + INTERRUPT_GRACE)
+                if not completed:
+                    for capture, pending in streams.values():
+                        capture.write(bytes(pending))
+                    self.close()
+                returncode = -1
+            if self._broken:
+                self.close()
+            return returncode
+        except BaseException:
+            # Ctrl+C or a broken pipe leaves the protocol out of sync
+            self.close()
+            raise
+
+    def _collect(self, streams: Dict, deadline: float) -> Tuple[int, bool]:
+        """
+        Read until both sentinels arrive, the shell dies or the deadline
+        passes. Returns (exit code, completed); a dead shell reports its
+        own exit status (e.g. after `exit 3`).
+        """
+        marker = b"\n__AICODER_" + self.token + b"_"
+        done = re.compile(re.escape(marker) + rb"(\d+)__\n")
+        # Bytes held back so a sentinel split across reads is still found
+        keep = len(marker) + 8
+
+        with selectors.DefaultSelector() as sel:
+            for stream, state in streams.items():
+                sel.register(stream, selectors.EVENT_READ, state)
+
+            while sel.get_map():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return -1, False
+                for key, _ in sel.select(remaining):
+                    capture, pending = key.data
+                    chunk = os.read(key.fd, READ_CHUNK)
+                    if not chunk:
+                        # The shell exited, or the command closed this stream
+                        # (exec 1>&-): keep reading the other one
+                        capture.write(bytes(pending))
+                        sel.unregister(key.fileobj)
+                        del streams[key.fileobj]
+                        self._broken = True
+                        continue
+
+                    pending += chunk
+                    match = done.search(pending)
+                    if match:
+                        self._returncode = int(match.group(1))
+                        capture.write(bytes(pending[:match.start()]))
+                        sel.unregister(key.fileobj)
+                        del streams[key.fileobj]
+                    elif len(pending) > keep:
+                        capture.write(bytes(pending[:-keep]))
+                        del pending[:-keep]
+
+        if self._returncode is not None:
+            return self._returncode, True
+        # Both streams closed without a sentinel: wait for the shell to exit
+        try:
+            return self.proc.wait(timeout=max(0.0, deadline - time.monotonic())), True
+        except subprocess.TimeoutExpired:
+            return -1, False
@@ -0,0 +1,203 @@
+"""
+Startup phase timing and the --profile-startup report
+Stateless module functions with module-level phase marks
+"""
+
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+# Child process prints its summary on a line starting with this
+RESULT_PREFIX = "AICODER_STARTUP_PROFILE "
+CHILD_ENV = "AICODER_PROFILE_STARTUP_CHILD"
+# Imports below this cumulative time are left out of the printed tree
+MIN_TREE_US = 1000
+
+# Module-level state: phase name -> seconds, in first-mark order. Background
+# tasks and milestones (seconds since process start) are kept apart since
+# they overlap the main thread's phases.
+_phases: Dict[str, float] = {}
+_background: Dict[str, float] = {}
+_milestones: Dict[str, float] = {}
+_last_mark = time.perf_counter()
+_loaded_at = time.time()
+
+
+def mark(phase: str) -> None:
+    """Close the current phase: everything since the previous mark counts as phase"""
+    global _last_mark
+    now = time.perf_counter()
+    _phases[phase] = _phases.get(phase, 0.0) + (now - _last_mark)
+    _last_mark = now
+
+
+def record(phase: str, seconds: float) -> None:
+    """Record a phase timed by the caller; the next phase starts now"""
+    global _last_mark
+    _phases[phase] = _phases.get(phase, 0.0) + seconds
+    _last_mark = time.perf_counter()
+
+
+def record_background(task: str, seconds: float) -> None:
+    """Record a background startup task (doesn't affect main-thread phases)"""
+    _background[task] = _background.get(task, 0.0) + seconds
+
+
+def milestone(name: str) -> None:
+    """Record seconds since process start (AICODER_START_TIME) under name"""
+    try:
+        origin = float(os.environ.get("AICODER_START_TIME", ""))
+    except ValueError:
+        origin = _loaded_at
+    _milestones[name] = time.time() - origin
+
+
+def phases_ms() -> Dict[str, float]:
+    """Recorded phases in milliseconds"""
+    return {name: seconds * 1000 for name, seconds in _phases.items()}
+
+
+def milestones_ms() -> Dict[str, float]:
+    """Recorded milestones in milliseconds since process start"""
+    return {name: seconds * 1000 for name, seconds in _milestones.items()}
+
+
+def parse_importtime(text: str) -> List[Dict[str, Any]]:
+    """
+    Parse `python -X importtime` stderr lines into rows of
+    {module, self_us, cumulative_us, depth}, in the original (post-order) order.
+    """
+    rows = []
+    for line in text.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            self_us = int(parts[0])
+            cumulative_us = int(parts[1])
+        except ValueError:
+            continue  # Header line
+        name = parts[2].rstrip()
+        indent = len(name) - len(name.lstrip())
+        rows.append({
+            "module": name.strip(),
+            "self_us": self_us,
+            "cumulative_us": cumulative_us,
+            "depth": max(0, (indent - 1) // 2),
+        })
+    return rows
+
+
+def format_import_tree(rows: List[Dict[str, Any]], min_us: int = MIN_TREE_US) -> str:
+    """Render rows like -X importtime, keeping only imports >= min_us cumulative"""
+    lines = [f"{'self [us]':>10} | {'cumulative':>10} | imported package"]
+    for row in rows:
+        if row["cumulative_us"] < min_us:
+            continue
+        lines.append(
+            f"{row['self_us']:>10} | {row['cumulative_us']:>10} | {'  ' * row['depth']}{row['module']}"
+        )
+    return "\n".join(lines)
+
+
+def summarize(
+    rows: List[Dict[str, Any]],
+    phases: Dict[str, float],
+    wall_ms: float,
+    background: Optional[Dict[str, float]] = None,
+    milestones: Optional[Dict[str, float]] = None,
+) -> Dict[str, Any]:
+    """Machine-readable summary: phases, import totals and the slowest imports"""
+    top_level = [r for r in rows if r["depth"] == 0]
+    slowest = sorted(rows, key=lambda r: r["self_us"], reverse=True)[:20]
+    return {
+        "wall_ms": round(wall_ms, 2),
+        "phases_ms": {name: round(ms, 2) for name, ms in phases.items()},
+        "total_ms": round(sum(phases.values()), 2),
+        "background_ms": {name: round(ms, 2) for name, ms in (background or {}).items()},
+        "milestones_ms": {name: round(ms, 2) for name, ms in (milestones or {}).items()},
+        "imports": {
+            "modules": len(rows),
+            "total_ms": round(sum(r["cumulative_us"] for r in top_level) / 1000, 2),
+            "slowest_self": [
+                {"module": r["module"], "self_us": r["self_us"], "cumulative_us": r["cumulative_us"]}
+                for r in slowest
+            ],
+        },
+    }
+
+
+def child_report() -> None:
+    """In the profiled child: print the phase timings for the parent"""
+    report = {
+        "phases": phases_ms(),
+        "background": {name: seconds * 1000 for name, seconds in _background.items()},
+        "milestones": milestones_ms(),
+    }
+    print(RESULT_PREFIX + json.dumps(report), flush=True)
+
+
+def run_profile(main_script: str, as_json: bool = False, timeout: float = 60.0) -> int:
+    """
+    Re-run main_script under -X importtime in a child that initializes and
+    exits instead of prompting, then print the import tree, phase timings
+    and JSON summary (or only the JSON with as_json). Returns an exit code.
+    """
+    import subprocess  # Only needed for the profile run itself
+
+    env = dict(os.environ)
+    env[CHILD_ENV] = "1"
+    env["AICODER_AUTO_SAVE"] = "0"  # Don't touch the last session
+    env.pop("AICODER_START_TIME", None)
+
+    start = time.perf_counter()
+    try:
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", main_script],
+            stdin=subprocess.DEVNULL,
+            capture_output=True,
+            text=True,
+            env=env,
+            timeout=timeout,
+        )
+    except subprocess.TimeoutExpired:
+        print(f"Startup profile timed out after {timeout:.0f}s", file=sys.stderr)
+        return 1
+    wall_ms = (time.perf_counter() - start) * 1000
+
+    report: Optional[Dict[str, Dict[str, float]]] = None
+    for line in proc.stdout.splitlines():
+        if line.startswith(RESULT_PREFIX):
+            report = json.loads(line[len(RESULT_PREFIX):])
+    if report is None:
+        print(f"Startup profile failed (exit {proc.returncode}):", file=sys.stderr)
+        print(proc.stdout + "\n".join(
+            line for line in proc.stderr.splitlines() if not line.startswith("import time:")
+        ), file=sys.stderr)
+        return 1
+
+    rows = parse_importtime(proc.stderr)
+    summary = summarize(rows, report["phases"], wall_ms, report["background"], report["milestones"])
+    if as_json:
+        print(json.dumps(summary, indent=2))
+        return 0
+
+    print(f"Import tree (imports >= {MIN_TREE_US / 1000:g}ms cumulative):")
+    print(format_import_tree(rows))
+    print("\nStartup phases:")
+    for name, ms in summary["phases_ms"].items():
+        print(f"  {name:<12} {ms:>9.1f} ms")
+    print(f"  {'total':<12} {summary['total_ms']:>9.1f} ms  (process wall time {wall_ms:.0f} ms)")
+    if summary["background_ms"]:
+        print("\nBackground startup tasks:")
+        for name, ms in summary["background_ms"].items():
+            print(f"  {name:<12} {ms:>9.1f} ms")
+    for name, ms in summary["milestones_ms"].items():
+        print(f"{name.replace('_', ' ').capitalize()}: {ms:.1f} ms")
+    print("\nJSON summary:")
+    print(json.dumps(summary))
+    return 0
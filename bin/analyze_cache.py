@@ -2,96 +2,236 @@
 """Analyze cache drops from stats.log.
 
 Usage:
-  python3 analyze_cache.py [--json] [path/to/stats.log]
+  python3 analyze_cache.py [--json] [--since WHEN] [--until WHEN] [--top N] [--follow] [path/to/stats.log]
 
 Detects cache drops by comparing cached_tokens between consecutive entries.
 Old pipe-delimited format (no cache info) is skipped automatically.
+
+The log is streamed in one pass and each (api_provider, model, url) group keeps
+constant state (previous cached count and session, counters, the last drops
+and a top-N heap of the worst ones), so multi-GB logs need little memory.
+
+  --since/--until  Only entries in this window. WHEN is 30m, 2h or 7d ago, or
+                   a UTC date/time: YYYY-MM-DD[ HH:MM[:SS]] (until a bare date
+                   includes that whole day)
+  --top N          Worst drops kept per group (default 5)
+  --follow         After reading the log, tail it and print drops as they
+                   happen; Ctrl-C prints the summary
 """
 
+import heapq
 import json
+import os
+import re
 import sys
-from collections import defaultdict
-from pathlib import Path
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+
+DEFAULT_TOP = 5
+RECENT_DROPS = 5
+# A drop is losing more than 10% of the previously cached tokens
+DROP_RATIO = 0.9
+READ_BYTES = 1024 * 1024
+POLL_INTERVAL = 0.5
+TS_FORMAT = "%Y-%m-%d_%H:%M:%S"
+
+
+def read_lines(path, follow=False, poll=POLL_INTERVAL):
+    """Yield the lines of path without loading it.
+
+    With follow, yields None once the end is reached, then keeps yielding
+    lines as they are appended (reopening the log after rotation or
+    truncation) until interrupted.
+    """
+    f = open(path, "rb")
+    try:
+        buf = b""
+        caught_up = False
+        while True:
+            chunk = f.read(READ_BYTES)
+            if chunk:
+                buf += chunk
+                *lines, buf = buf.split(b"\n")
+                for line in lines:
+                    yield line.decode("utf-8", "replace")
+                continue
+            if not follow:
+                if buf:
+                    yield buf.decode("utf-8", "replace")
+                return
+            if not caught_up:
+                caught_up = True
+                yield None
+            time.sleep(poll)
+            if _replaced(path, f):
+                # Lines written to the old file just before it was replaced come first
+                for chunk in iter(lambda: f.read(READ_BYTES), b""):
+                    buf += chunk
+                    *lines, buf = buf.split(b"\n")
+                    for line in lines:
+                        yield line.decode("utf-8", "replace")
+                if buf:
+                    yield buf.decode("utf-8", "replace")
+                f.close()
+                f = open(path, "rb")
+                buf = b""
+    finally:
+        f.close()
+
+
+def _replaced(path, f):
+    """Whether path now names another file, or was truncated below our position."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return False  # Rotated away; wait for the new log
+    return st.st_ino != os.fstat(f.fileno()).st_ino or st.st_size < f.tell()
+
+
+def parse_line(line):
+    """Parsed JSON entry of a stats.log line, or None (old pipe format, junk)."""
+    line = line.strip()
+    if not line.startswith("{"):
+        return None
+    try:
+        entry = json.loads(line)
+    except json.JSONDecodeError:
+        return None
+    return entry if isinstance(entry, dict) else None
 
 
 def parse_stats(path):
     """Yield parsed JSON entries from stats.log, skipping old pipe format."""
-    for line in Path(path).read_text().splitlines():
-        line = line.strip()
-        if not line:
-            continue
-        if line.startswith("{"):
-            try:
-                yield json.loads(line)
-            except json.JSONDecodeError:
-                continue
+    for line in read_lines(path):
+        entry = parse_line(line)
+        if entry is not None:
+            yield entry
 
 
-def analyze(entries):
-    """Analyze cache behavior per (api_provider, model, url) group."""
-    groups = defaultdict(list)
-    for e in entries:
-        key = (e.get("api_provider", "?"), e.get("model", "?"), e.get("url", "?"))
-        groups[key].append(e)
-
-    results = {}
-    for key, group in groups.items():
-        provider, model, url = key
-        total = len(group)
-        drops = 0
-        drop_details = []
-        prev_cached = None
-        prev_session = None
-
-        for i, e in enumerate(group):
-            usage = e.get("usage") or {}
-            ptd = usage.get("prompt_tokens_details") or {}
-            cached = ptd.get("cached_tokens")
-
-            if cached is None:
-                continue  # no cache info for this entry
-
-            # Reset baseline on first entry OR session change.
-            # Each session has its own KV cache on the provider side;
-            # comparing cached_tokens across sessions produces false drops
-            # because every new session starts with ~0 cached tokens.
-            current_session = e.get("session")
-            if prev_cached is None or current_session != prev_session:
-                prev_cached = cached
-                prev_session = current_session
-                continue
+def parse_when(value, end=False):
+    """--since/--until value as a log timestamp (UTC "YYYY-MM-DD_HH:MM:SS")."""
+    match = re.fullmatch(r"(\d+)([mhd])", value)
+    if match:
+        unit = {"m": "minutes", "h": "hours", "d": "days"}[match.group(2)]
+        dt = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(**{unit: int(match.group(1))})
+    else:
+        dt = datetime.fromisoformat(value.replace("_", "T"))
+        if end and len(value) == 10:
+            dt = dt.replace(hour=23, minute=59, second=59)
+    return dt.strftime(TS_FORMAT)
+
+
+class GroupStats:
+    """Running cache stats of one (api_provider, model, url) group."""
+
+    __slots__ = (
+        "provider", "model", "url", "top", "total", "tracked", "drops",
+        "prev_cached", "prev_session", "recent", "worst",
+    )
+
+    def __init__(self, key, top=DEFAULT_TOP):
+        self.provider, self.model, self.url = key
+        self.top = top
+        self.total = 0
+        self.tracked = 0
+        self.drops = 0
+        self.prev_cached = None
+        self.prev_session = None
+        self.recent = deque(maxlen=RECENT_DROPS)
+        self.worst = []  # Min-heap of (pct, drop number, drop): the top worst
+
+    def add(self, e):
+        """Account one entry; returns the drop it shows, if any."""
+        self.total += 1
+        usage = e.get("usage") or {}
+        ptd = usage.get("prompt_tokens_details") or {}
+        cached = ptd.get("cached_tokens")
 
-            # Detect meaningful cache drop (>10% loss)
-            if cached < prev_cached * 0.9:
-                pct = (1 - cached / prev_cached) * 100
-                drops += 1
-                drop_details.append({
-                    "ts": e.get("ts"),
-                    "prev": prev_cached,
-                    "curr": cached,
-                    "pct": round(pct, 1),
-                })
-
-            prev_cached = cached
-            prev_session = current_session
-
-        # Count entries that actually have cache tracking
-        tracked = sum(1 for e in group
-                      if (e.get("usage") or {}).get("prompt_tokens_details") is not None
-                      and (e["usage"]["prompt_tokens_details"] or {}).get("cached_tokens") is not None)
-
-        results[key] = {
-            "provider": provider,
-            "model": model,
-            "url": url.replace("https://", "").rstrip("/"),
-            "total_calls": total,
-            "tracked_calls": tracked,
-            "cache_drops": drops,
-            "drop_pct": round(drops / tracked * 100, 1) if tracked else 0,
-            "drops": drop_details[-5:] if drop_details else [],  # last 5 drops
+        if cached is None:
+            return None  # no cache info for this entry
+        self.tracked += 1
+
+        # Reset baseline on first entry OR session change.
+        # Each session has its own KV cache on the provider side;
+        # comparing cached_tokens across sessions produces false drops
+        # because every new session starts with ~0 cached tokens.
+        current_session = e.get("session")
+        prev_cached = self.prev_cached
+        self.prev_cached = cached
+        if prev_cached is None or current_session != self.prev_session:
+            self.prev_session = current_session
+            return None
+
+        # Detect meaningful cache drop (>10% loss)
+        if cached >= prev_cached * DROP_RATIO:
+            return None
+        self.drops += 1
+        drop = {
+            "ts": e.get("ts"),
+            "prev": prev_cached,
+            "curr": cached,
+            "pct": round((1 - cached / prev_cached) * 100, 1),
+        }
+        self.recent.append(drop)
+        if self.top > 0:
+            item = (drop["pct"], self.drops, drop)
+            if len(self.worst) < self.top:
+                heapq.heappush(self.worst, item)
+            else:
+                heapq.heappushpop(self.worst, item)
+        return drop
+
+    def result(self):
+        """Summary of the group."""
+        return {
+            "provider": self.provider,
+            "model": self.model,
+            "url": self.url.replace("https://", "").rstrip("/"),
+            "total_calls": self.total,
+            "tracked_calls": self.tracked,
+            "cache_drops": self.drops,
+            "drop_pct": round(self.drops / self.tracked * 100, 1) if self.tracked else 0,
+            "drops": list(self.recent),  # last 5 drops
+            "worst_drops": [drop for _, _, drop in sorted(self.worst, reverse=True)],
         }
 
-    return results
+
+class CacheAnalyzer:
+    """Single-pass cache drop analysis over a stream of entries."""
+
+    def __init__(self, top=DEFAULT_TOP, since=None, until=None):
+        self.top = top
+        self.since = since
+        self.until = until
+        self.entries = 0
+        self.groups = {}
+
+    def add(self, e):
+        """Account one entry; returns (group, drop) when it shows a drop."""
+        if self.since or self.until:
+            ts = e.get("ts")
+            if not isinstance(ts, str) or (self.since and ts < self.since) or (self.until and ts > self.until):
+                return None
+        self.entries += 1
+        key = (e.get("api_provider", "?"), e.get("model", "?"), e.get("url", "?"))
+        group = self.groups.get(key)
+        if group is None:
+            group = self.groups[key] = GroupStats(key, self.top)
+        drop = group.add(e)
+        return (group, drop) if drop else None
+
+    def results(self):
+        """Per-group summaries keyed by (api_provider, model, url)."""
+        return {key: group.result() for key, group in self.groups.items()}
+
+
+def analyze(entries, top=DEFAULT_TOP):
+    """Analyze cache behavior per (api_provider, model, url) group."""
+    analyzer = CacheAnalyzer(top)
+    for e in entries:
+        analyzer.add(e)
+    return analyzer.results()
 
 
 def print_table(results):
@@ -120,28 +260,71 @@ def print_table(results):
         print(f"{r[0]:<12} {r[1]:<22} {r[2]:<30} {r[3]:>6} {r[4]:>8} {r[5]:>6} {r[6]:>6}")
 
     print()
-    # Show recent drops for groups with drops
+    # Show recent and worst drops for groups with drops
     for key, r in results.items():
         if not r["drops"]:
             continue
         print(f"\n--- Recent drops ({r['provider']}/{r['model']} @ {r['url']}) ---")
         for d in r["drops"]:
             print(f"  {d['ts']}: {d['prev']} -> {d['curr']} ({d['pct']}% drop)")
+        if r["worst_drops"]:
+            print(f"--- Worst drops ({r['provider']}/{r['model']} @ {r['url']}) ---")
+            for d in r["worst_drops"]:
+                print(f"  {d['ts']}: {d['prev']} -> {d['curr']} ({d['pct']}% drop)")
+
+
+def print_drop(group, drop, json_out):
+    """Print one drop seen while following."""
+    if json_out:
+        print(json.dumps({"provider": group.provider, "model": group.model, "url": group.url, **drop}), flush=True)
+    else:
+        print(f"{drop['ts']}  {group.provider}/{group.model} @ {group.url}: "
+              f"{drop['prev']} -> {drop['curr']} ({drop['pct']}% drop)", flush=True)
 
 
 def main():
-    path = sys.argv[1] if len(sys.argv) > 1 and not sys.argv[1].startswith("--") else ".aicoder/stats.log"
-    json_out = "--json" in sys.argv
+    args = sys.argv[1:]
+    json_out = "--json" in args
+    follow = "--follow" in args
+    try:
+        top = int(args[args.index("--top") + 1]) if "--top" in args else DEFAULT_TOP
+        since = parse_when(args[args.index("--since") + 1]) if "--since" in args else None
+        until = parse_when(args[args.index("--until") + 1], end=True) if "--until" in args else None
+    except (IndexError, ValueError) as e:
+        print(f"Invalid option: {e}")
+        sys.exit(1)
+    values = {args[i + 1] for i, arg in enumerate(args[:-1]) if arg in ("--top", "--since", "--until")}
+    paths = [arg for arg in args if not arg.startswith("--") and arg not in values]
+    path = paths[0] if paths else ".aicoder/stats.log"
 
-    entries = list(parse_stats(path))
-    if not entries:
-        print(f"No JSON entries found in {path}")
+    analyzer = CacheAnalyzer(top, since, until)
+    live = False
+    try:
+        for line in read_lines(path, follow):
+            if line is None:
+                live = True
+                print(f"Following {path} (Ctrl-C to stop)...", file=sys.stderr, flush=True)
+                continue
+            entry = parse_line(line)
+            if entry is None:
+                continue
+            hit = analyzer.add(entry)
+            if live and hit:
+                print_drop(*hit, json_out)
+    except OSError as e:
+        print(f"Cannot read {path}: {e}")
         sys.exit(1)
+    except KeyboardInterrupt:
+        print()
 
-    results = analyze(entries)
+    if not analyzer.entries and not follow:
+        print(f"No JSON entries found in {path}")
+        sys.exit(1)
 
+    results = analyzer.results()
     if json_out:
-        print(json.dumps(results, indent=2, default=str))
+        # Tuple keys aren't valid JSON; each result carries its provider, model and url
+        print(json.dumps(list(results.values()), indent=2, default=str))
     else:
         print_table(results)
 
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""Benchmark the grep tool engines on a large tree.
+
+Usage:
+  python3 bin/bench_grep.py [--files N] [--runs N] [path]
+
+Without a path a synthetic tree of --files source files is generated in a
+temp dir. Compares ripgrep (if installed), the builtin Python engine and a
+cached repeat of the same search, and checks both engines print the same
+matches (order-insensitive, rg scans in parallel).
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["MINI_SANDBOX"] = "0"  # read at import time; the tree lives in /tmp
+
+from aicoder.tools.internal import grep  # noqa: E402
+
+PATTERN = r"def handle_\w+"
+
+
+def make_tree(root, files):
+    """Generate a tree of python-ish files spread over nested dirs."""
+    for i in range(files):
+        d = os.path.join(root, f"pkg{i % 50}", f"sub{i % 7}")
+        os.makedirs(d, exist_ok=True)
+        with open(os.path.join(d, f"mod{i}.py"), "w") as f:
+            for j in range(200):
+                if j % 97 == 0:
+                    f.write(f"def handle_{i}_{j}(event):\n")
+                else:
+                    f.write(f"    value_{j} = compute({i}, {j})  # filler line\n")
+
+
+def run(path, engine, runs, clear):
+    """Run one engine, returning (best seconds, match lines)."""
+    os.environ["AICODER_GREP_ENGINE"] = engine
+    best = None
+    result = None
+    for _ in range(runs):
+        if clear:
+            grep.clear_cache()
+        t0 = time.perf_counter()
+        result = grep.execute({"text": PATTERN, "path": path, "context": 0})
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    matches = result["detailed"].split("Matches:\n", 1)[-1].splitlines()
+    return best, matches
+
+
+def main():
+    args = sys.argv[1:]
+    files = int(args[args.index("--files") + 1]) if "--files" in args else 5000
+    runs = int(args[args.index("--runs") + 1]) if "--runs" in args else 3
+    positional = [a for i, a in enumerate(args) if not a.startswith("--") and (i == 0 or not args[i - 1].startswith("--"))]
+
+    tmp = None
+    if positional:
+        path = os.path.abspath(positional[0])
+    else:
+        tmp = tempfile.mkdtemp(prefix="bench-grep-")
+        path = tmp
+        print(f"Generating {files} files in {tmp}...")
+        make_tree(tmp, files)
+
+    try:
+        rows = []
+        py_time, py_matches = run(path, "python", runs, clear=True)
+        rows.append(("python", py_time, len(py_matches)))
+        cached_time, _ = run(path, "python", runs, clear=False)
+        rows.append(("python (cached)", cached_time, len(py_matches)))
+
+        if shutil.which("rg"):
+            rg_time, rg_matches = run(path, "rg", runs, clear=True)
+            rows.append(("rg", rg_time, len(rg_matches)))
+            same = sorted(rg_matches) == sorted(py_matches)
+        else:
+            same = None
+
+        print(f"{'Engine':<18} {'Best (s)':>10} {'Matches':>8}")
+        print("-" * 38)
+        for name, t, n in rows:
+            print(f"{name:<18} {t:>10.4f} {n:>8}")
+        if same is None:
+            print("\nrg not installed - output comparison skipped")
+        else:
+            print(f"\nOutput identical across engines: {'yes' if same else 'NO'}")
+            if not same:
+                sys.exit(1)
+    finally:
+        if tmp:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""Benchmark plugin hook dispatch overhead per simulated turn.
+
+Usage:
+  python3 bin/bench_hooks.py [--plugins N] [--turns N] [--tools N]
+
+Generates N plugins (default 50) that each register a few cheap hooks on
+the events a turn fires, loads them through PluginSystem, then replays a
+turn's hook calls (--tools tool calls per turn) three ways: the previous
+call_hooks loop, call_hooks on compiled dispatchers, and dispatchers bound
+once at the call site as the hot paths do.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aicoder.core.plugin_system import PluginSystem  # noqa: E402
+
+# Events fired each turn; the first few usually have handlers
+HANDLED_EVENTS = [
+    "after_user_message_added",
+    "after_assistant_message_added",
+    "after_tool_results_added",
+    "after_usage_data",
+    "after_single_tool_execution",
+]
+UNHANDLED_EVENTS = [
+    "before_user_prompt",
+    "before_ai_processing",
+    "before_api_request",
+    "after_tool_results",
+    "on_before_context_bar",
+    "on_after_context_bar",
+]
+
+PLUGIN_TEMPLATE = '''
+def create_plugin(ctx):
+    seen = []
+
+    def on_event(*args, **kwargs):
+        seen.append(len(args))
+        if len(seen) > 64:
+            seen.clear()
+
+    for event in {events!r}:
+        ctx.register_hook(event, on_event)
+'''
+
+
+def make_plugins(root, count):
+    """Write count plugins, each hooking two of the handled events."""
+    for i in range(count):
+        events = [HANDLED_EVENTS[i % len(HANDLED_EVENTS)], HANDLED_EVENTS[(i + 2) % len(HANDLED_EVENTS)]]
+        with open(os.path.join(root, f"bench_{i:03d}.py"), "w") as f:
+            f.write(PLUGIN_TEMPLATE.format(events=events))
+
+
+def legacy_call_hooks(hooks, event_name, *args, **kwargs):
+    """The call_hooks loop before compiled dispatch, for comparison."""
+    if event_name not in hooks:
+        return None
+    results = []
+    for hook in hooks[event_name]:
+        try:
+            results.append(hook(*args, **kwargs))
+        except Exception:
+            pass
+    return results if results else None
+
+
+def turn_events(tools):
+    """(event, args) sequence for one turn with the given tool calls."""
+    message = {"role": "assistant", "content": "x"}
+    calls = [(e, ()) for e in UNHANDLED_EVENTS[:3]]
+    calls.append(("after_user_message_added", (message,)))
+    calls.append(("after_usage_data", ({"prompt_tokens": 1},)))
+    calls.append(("after_assistant_message_added", (message,)))
+    for _ in range(tools):
+        calls.append(("after_single_tool_execution", ("read_file", {}, {})))
+        calls.append(("after_tool_results_added", (message,)))
+    calls.extend((e, ()) for e in UNHANDLED_EVENTS[3:])
+    return calls
+
+
+def bench(fn, turns):
+    """Best-of-5 seconds per turn."""
+    best = None
+    for _ in range(5):
+        t0 = time.perf_counter()
+        for _ in range(turns):
+            fn()
+        dt = (time.perf_counter() - t0) / turns
+        best = dt if best is None else min(best, dt)
+    return best
+
+
+def main():
+    args = sys.argv[1:]
+    plugins = int(args[args.index("--plugins") + 1]) if "--plugins" in args else 50
+    turns = int(args[args.index("--turns") + 1]) if "--turns" in args else 2000
+    tools = int(args[args.index("--tools") + 1]) if "--tools" in args else 5
+
+    tmp = tempfile.mkdtemp(prefix="bench-hooks-")
+    try:
+        make_plugins(tmp, plugins)
+        ps = PluginSystem(
+            plugins_dir=tmp,
+            global_plugins_dir=os.path.join(tmp, "none"),
+            manifest_path=os.path.join(tmp, "manifest.json"),
+        )
+        ps.bundled_plugins_dir = os.path.join(tmp, "none")
+        ps.load_plugins()
+        calls = turn_events(tools)
+        hooks = ps.hooks
+
+        def legacy():
+            for event, call_args in calls:
+                legacy_call_hooks(hooks, event, *call_args)
+
+        def compiled():
+            for event, call_args in calls:
+                ps.call_hooks(event, *call_args)
+
+        bound = [(ps.dispatcher(event).fire, call_args) for event, call_args in calls]
+
+        def bound_fire():
+            for fire, call_args in bound:
+                fire(*call_args)
+
+        rows = [
+            ("legacy call_hooks", bench(legacy, turns)),
+            ("compiled call_hooks", bench(compiled, turns)),
+            ("bound fire()", bench(bound_fire, turns)),
+        ]
+        handlers = sum(len(h) for h in hooks.values())
+        print(f"{len(ps.plugins)} plugins, {handlers} handlers, {len(calls)} hook calls per turn\n")
+        print(f"{'Dispatch':<22} {'us/turn':>10} {'vs legacy':>10}")
+        print("-" * 44)
+        base = rows[0][1]
+        for name, t in rows:
+            print(f"{name:<22} {t * 1e6:>10.1f} {base / t:>9.2f}x")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
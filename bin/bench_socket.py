@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""Load test the socket API: request rate and latency percentiles.
+
+Usage:
+  python3 bin/bench_socket.py [--rate N] [--duration S] [--clients N]
+                              [--cmd CMD] [--oneshot] [--socket PATH] [--max-p99 MS]
+
+Sends --rate requests/second in total (default 1000) for --duration seconds
+(default 5) from --clients threads (default 10), each pacing its share of
+the rate. Clients keep one connection open and send JSON requests with ids
+unless --oneshot, which connects once per plain text command as the tmux
+status scripts used to. Without --socket a server with a stub app runs in a
+child process so the clients don't share its GIL. Exits 1 when fewer than
+95% of the target requests complete or p99 latency exceeds --max-p99.
+"""
+
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+class _StubHistory:
+    """Message history with a few messages for status/messages commands."""
+
+    is_compacting = False
+
+    def __init__(self):
+        self._messages = [{"role": "user", "content": "hello"}, {"role": "assistant", "content": "hi"}]
+
+    def get_messages(self):
+        return self._messages
+
+
+class _StubSession:
+    is_processing = False
+
+
+class _StubApp:
+    def __init__(self):
+        self.message_history = _StubHistory()
+        self.session_manager = _StubSession()
+
+
+def serve(path):
+    """Child process: run a SocketServer on path until stdin closes."""
+    from aicoder.core.socket_server import SocketServer
+
+    os.environ["AICODER_SOCKET_IPC_FILE"] = path
+    server = SocketServer(_StubApp())
+    server.start()
+    print("ready", flush=True)
+    sys.stdin.read()
+    server.stop()
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def run_client(path, cmd, interval, deadline, oneshot, latencies, errors):
+    """Send one request every interval seconds until deadline, recording latency."""
+    sock = reader = None
+    next_send = time.perf_counter()
+    request_id = 0
+    while True:
+        now = time.perf_counter()
+        if now >= deadline:
+            break
+        if next_send > now:
+            time.sleep(next_send - now)
+        next_send += interval
+
+        start = time.perf_counter()
+        try:
+            if oneshot:
+                with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+                    s.connect(path)
+                    s.sendall(cmd.encode() + b"\n")
+                    line = s.makefile("rb").readline()
+            else:
+                if sock is None:
+                    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                    sock.connect(path)
+                    reader = sock.makefile("rb")
+                request_id += 1
+                sock.sendall(json.dumps({"id": request_id, "cmd": cmd}).encode() + b"\n")
+                line = reader.readline()
+            reply = json.loads(line)
+            if reply.get("status") != "success" or (not oneshot and reply.get("id") != request_id):
+                raise ValueError(f"bad reply: {line[:100]!r}")
+        except Exception:
+            errors.append(1)
+            if sock:
+                sock.close()
+                sock = None
+            continue
+        latencies.append(time.perf_counter() - start)
+
+    if sock:
+        sock.close()
+
+
+def main():
+    args = sys.argv[1:]
+    if "--serve" in args:
+        serve(args[args.index("--serve") + 1])
+        return
+
+    rate = float(args[args.index("--rate") + 1]) if "--rate" in args else 1000.0
+    duration = float(args[args.index("--duration") + 1]) if "--duration" in args else 5.0
+    clients = int(args[args.index("--clients") + 1]) if "--clients" in args else 10
+    cmd = args[args.index("--cmd") + 1] if "--cmd" in args else "status"
+    max_p99 = float(args[args.index("--max-p99") + 1]) if "--max-p99" in args else None
+    oneshot = "--oneshot" in args
+
+    child = tmpdir = None
+    if "--socket" in args:
+        path = args[args.index("--socket") + 1]
+    else:
+        tmpdir = tempfile.mkdtemp(prefix="bench-socket-")
+        path = os.path.join(tmpdir, "bench.socket")
+        child = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "--serve", path],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        child.stdout.readline()  # "ready"
+
+    latencies, errors = [], []
+    try:
+        interval = clients / rate
+        start = time.perf_counter()
+        deadline = start + duration
+        threads = [
+            threading.Thread(target=run_client, args=(path, cmd, interval, deadline, oneshot, latencies, errors))
+            for _ in range(clients)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+    finally:
+        if child:
+            child.stdin.close()
+            child.wait(timeout=5)
+            os.rmdir(tmpdir)
+
+    latencies.sort()
+    completed = len(latencies)
+    achieved = completed / elapsed
+    mode = "one-shot connections" if oneshot else "persistent NDJSON connections"
+    print(f"{clients} clients, {mode}, command {cmd!r}, target {rate:.0f} req/s for {duration:g}s\n")
+    print(f"Completed {completed} requests ({achieved:.0f} req/s), {len(errors)} errors")
+    print(f"{'latency':<8} {'ms':>8}")
+    print("-" * 17)
+    for label, pct in (("p50", 50), ("p90", 90), ("p99", 99), ("p99.9", 99.9)):
+        print(f"{label:<8} {percentile(latencies, pct) * 1000:>8.3f}")
+    print(f"{'max':<8} {(latencies[-1] if latencies else 0) * 1000:>8.3f}")
+
+    failed = False
+    if completed < 0.95 * rate * duration:
+        print(f"\nFAIL: completed {completed} of {rate * duration:.0f} target requests")
+        failed = True
+    p99_ms = percentile(latencies, 99) * 1000
+    if max_p99 is not None and p99_ms > max_p99:
+        print(f"\nFAIL: p99 {p99_ms:.3f} ms exceeds {max_p99:g} ms")
+        failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Benchmark startup time against a saved baseline.
+
+Usage:
+  python3 bin/bench_startup.py [--runs N] [--baseline MS] [--tolerance F] [--save]
+
+Runs `main.py --profile-startup=json` --runs times (default 5) and takes the
+median of the in-process startup total (imports through socket server).
+Exits 1 when the median exceeds the baseline by more than --tolerance
+(default 0.2 = 20%). The baseline comes from --baseline or from
+.aicoder/startup_baseline.json, which --save writes. Startup depends on the
+machine, so baselines are kept per checkout rather than committed.
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_FILE = os.path.join(".aicoder", "startup_baseline.json")
+
+
+def profile_once():
+    """One profiled startup, returning its JSON summary."""
+    env = dict(os.environ)
+    # validate_config needs an endpoint; nothing is contacted at startup
+    if not env.get("API_BASE_URL") and not env.get("OPENAI_BASE_URL"):
+        env["API_BASE_URL"] = "http://127.0.0.1:9/v1"
+    proc = subprocess.run(
+        [sys.executable, os.path.join(ROOT, "main.py"), "--profile-startup=json"],
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    if proc.returncode != 0:
+        sys.stderr.write(proc.stderr)
+        sys.exit(2)
+    return json.loads(proc.stdout)
+
+
+def main():
+    args = sys.argv[1:]
+    runs = int(args[args.index("--runs") + 1]) if "--runs" in args else 5
+    tolerance = float(args[args.index("--tolerance") + 1]) if "--tolerance" in args else 0.2
+
+    summaries = [profile_once() for _ in range(runs)]
+    totals = [s["total_ms"] for s in summaries]
+    median = statistics.median(totals)
+
+    print(f"{'Phase':<12} {'median ms':>10}")
+    print("-" * 23)
+    for phase in summaries[0]["phases_ms"]:
+        print(f"{phase:<12} {statistics.median(s['phases_ms'].get(phase, 0) for s in summaries):>10.1f}")
+    print(f"{'total':<12} {median:>10.1f}  (min {min(totals):.1f}, max {max(totals):.1f}, {runs} runs)")
+
+    if "--save" in args:
+        os.makedirs(os.path.dirname(BASELINE_FILE), exist_ok=True)
+        with open(BASELINE_FILE, "w") as f:
+            json.dump({"total_ms": median}, f)
+        print(f"\nBaseline saved to {BASELINE_FILE}")
+        return
+
+    if "--baseline" in args:
+        baseline = float(args[args.index("--baseline") + 1])
+    elif os.path.exists(BASELINE_FILE):
+        with open(BASELINE_FILE) as f:
+            baseline = json.load(f)["total_ms"]
+    else:
+        print("\nNo baseline (use --baseline MS or --save)")
+        return
+
+    limit = baseline * (1 + tolerance)
+    print(f"\nBaseline {baseline:.1f} ms, limit {limit:.1f} ms (+{tolerance:.0%})")
+    if median > limit:
+        print(f"FAIL: startup {median:.1f} ms exceeds limit")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@
 
 Finds all .aicoder/stats.log files and aggregates usage statistics.
 Uses a persistent cache (no expiration). Run `update` to refresh cache.
+Reports come from an incremental index of the logs (see UsageIndex).
 
 Usage:
     python ai_usage.py [today|yesterday|24h|week|month|year] # Preset periods
@@ -11,9 +12,11 @@ Usage:
     python ai_usage.py since YYYY-MM-DD                      # Since date (or just YYYY-MM-DD)
     python ai_usage.py update                                # Scan & update cache
     python ai_usage.py clear-cache                           # Delete cache
+    python ai_usage.py clear-index                           # Delete the usage index
     python ai_usage.py help                                  # Show this usage
     LOCAL=1 ALL=1 python ai_usage.py ...                     # All cached dirs (ignore cwd)
     LOCAL=1 python ai_usage.py ...                           # Per-project stats.log mode
+    NOINDEX=1 python ai_usage.py ...                         # Full rescan, skip the index
 
 Notes:
     - Cache persists indefinitely. Run 'update' to scan all dirs below PWD.
@@ -22,6 +25,13 @@ Notes:
     - LOCAL=1 uses per-project .aicoder/stats.log instead.
     - TZ=+8 sets timezone offset (useful for matching provider dashboards).
 
+Index behavior:
+    - ~/.cache/ai_usage_index.sqlite3 keeps hourly totals per
+      (provider, model, url, tag) and how far each log has been read
+    - Each run only parses lines appended since the last one; a truncated,
+      rotated or rewritten log is re-read from the start
+    - Results equal a full rescan (NOINDEX=1 FULL=1); clear-index rebuilds it
+
 Cache behavior:
     - Cache persists indefinitely (no automatic expiration)
     - --update scans all dirs below, adds new entries, removes invalid ones
@@ -39,9 +49,12 @@ except ImportError:
     json_loads = json.loads
 import os
 from pathlib import Path
-from typing import List, Dict, Any
+import sqlite3
+import sys
+from typing import List, Dict, Any, Iterable
 
 CACHE_FILE = Path.home() / ".cache" / "ai_usage_dirs_cache.txt"
+INDEX_FILE = Path.home() / ".cache" / "ai_usage_index.sqlite3"
 FILTER_TAG = os.environ.get("FILTER_TAG")
 FILTER_URL = os.environ.get("FILTER_URL")
 FILTER_MODEL = os.environ.get("FILTER_MODEL")
@@ -269,6 +282,54 @@ def get_time_range(period: str) -> tuple[datetime, datetime]:
         return (now - delta, now) if delta else (None, None)
 
 
+def _matches_filters(entry: dict) -> bool:
+    """Whether a log entry passes FILTER_TAG, FILTER_URL and FILTER_MODEL."""
+    # Filter by tag if FILTER_TAG env var is set
+    if FILTER_TAG is not None:
+        entry_tag = entry.get("tag")
+        if FILTER_TAG == "":
+            # Match entries with no tag or empty tag
+            if entry_tag:
+                return False
+        elif entry_tag != FILTER_TAG:
+            return False
+    # Filter by URL substring if FILTER_URL env var is set
+    if FILTER_URL is not None and FILTER_URL not in entry.get("url", ""):
+        return False
+    # Filter by model name substring if FILTER_MODEL env var is set
+    if FILTER_MODEL is not None and FILTER_MODEL not in entry.get("model", ""):
+        return False
+    return True
+
+
+def _entry_time(entry: dict) -> datetime:
+    """Log timestamp of an entry (UTC, naive)."""
+    return datetime.fromisoformat(entry["ts"].replace("_", "T"))
+
+
+def _normalize(entry: dict) -> dict:
+    """Report fields of a log entry."""
+    provider = entry.get("api_provider", "openai")
+    usage = entry.get("usage", {})
+    parsed = parse_usage(usage, provider)
+    # Entry-level enrichment (ai_cost plugin): cost_estimate always present
+    # when active; cost seeded only when provider reports one. Null-tolerant:
+    # some legacy entries carry "cost": null.
+    entry_cost = entry.get("cost") or 0.0
+    return {
+        "url": entry.get("url", ""),
+        "model": entry.get("model", ""),
+        "session": entry.get("session", ""),
+        "prompt": parsed["prompt"],
+        "completion": parsed["completion"],
+        "elapsed": entry.get("elapsed", 0),
+        "cache_read": parsed["cache_read"],
+        "cache_miss": parsed["cache_miss"],
+        "cost": parsed["cost"] or entry_cost,
+        "est": float(entry.get("cost_estimate") or 0.0),
+    }
+
+
 def _parse_line(line: str, start: datetime | None, end: datetime | None) -> dict | None:
     """Parse a single JSONL stats.log line."""
     if not line or not line.startswith("{"):
@@ -276,46 +337,13 @@ def _parse_line(line: str, start: datetime | None, end: datetime | None) -> dict
 
     try:
         entry = json_loads(line)
-        # Filter by tag if FILTER_TAG env var is set
-        if FILTER_TAG is not None:
-            entry_tag = entry.get("tag")
-            if FILTER_TAG == "":
-                # Match entries with no tag or empty tag
-                if entry_tag:
-                    return None
-            elif entry_tag != FILTER_TAG:
-                return None
-        # Filter by URL substring if FILTER_URL env var is set
-        if FILTER_URL is not None and FILTER_URL not in entry.get("url", ""):
+        if not _matches_filters(entry):
             return None
-        # Filter by model name substring if FILTER_MODEL env var is set
-        if FILTER_MODEL is not None and FILTER_MODEL not in entry.get("model", ""):
-            return None
-        ts = entry["ts"].replace("_", "T")
-        dt = datetime.fromisoformat(ts)
         # Log timestamps are UTC; convert to local time for comparison
-        dt = dt + _get_tz_offset()
+        dt = _entry_time(entry) + _get_tz_offset()
         if start and (dt < start or dt > end):
             return None
-        provider = entry.get("api_provider", "openai")
-        usage = entry.get("usage", {})
-        parsed = parse_usage(usage, provider)
-        # Entry-level enrichment (ai_cost plugin): cost_estimate always present
-        # when active; cost seeded only when provider reports one. Null-tolerant:
-        # some legacy entries carry "cost": null.
-        entry_cost = entry.get("cost") or 0.0
-        return {
-            "url": entry.get("url", ""),
-            "model": entry.get("model", ""),
-            "session": entry.get("session", ""),
-            "prompt": parsed["prompt"],
-            "completion": parsed["completion"],
-            "elapsed": entry.get("elapsed", 0),
-            "cache_read": parsed["cache_read"],
-            "cache_miss": parsed["cache_miss"],
-            "cost": parsed["cost"] or entry_cost,
-            "est": float(entry.get("cost_estimate") or 0.0),
-        }
+        return _normalize(entry)
     except (json.JSONDecodeError, KeyError, ValueError):
         return None
 
@@ -363,8 +391,330 @@ def parse_central_stats(filepath: Path, start: datetime | None, end: datetime |
     return parse_stats(filepath, start, end)
 
 
+STAT_KEYS = ("n", "p", "c", "t", "cr", "cm", "cost", "est")
+
+
+def _new_agg() -> dict:
+    """url -> model -> stats, created on first use."""
+    return defaultdict(lambda: defaultdict(lambda: {"n": 0, "p": 0, "c": 0, "t": 0.0, "cr": 0, "cm": 0, "cost": 0.0, "est": 0.0}))
+
+
+def _cost_usd(cost) -> float:
+    """Cost as a number (some providers report {"usd": ...})."""
+    if isinstance(cost, dict):
+        return cost.get("usd", 0.0)
+    return cost
+
+
+def aggregate(entries: Iterable[Dict], agg: dict | None = None) -> dict:
+    """Sum parsed entries into url -> model -> stats (test-model skipped)."""
+    if agg is None:
+        agg = _new_agg()
+    for e in entries:
+        if e["model"] == "test-model":
+            continue
+        d = agg[e["url"]][e["model"]]
+        d["n"] += 1
+        d["p"] += e["prompt"]
+        d["c"] += e["completion"]
+        d["t"] += e["elapsed"]
+        d["cr"] += e.get("cache_read", 0)
+        d["cm"] += e.get("cache_miss", 0)
+        d["cost"] += _cost_usd(e.get("cost", 0.0))
+        d["est"] += e["est"]
+    return agg
+
+
+EPOCH = datetime(1970, 1, 1)
+HOUR = timedelta(hours=1)
+MICROSECOND = timedelta(microseconds=1)
+INDEX_SCHEMA_VERSION = 1
+# First bytes of each log kept to notice a log rewritten in place
+INDEX_HEAD_BYTES = 4096
+INDEX_READ_BYTES = 16 * 1024 * 1024
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    dev INTEGER NOT NULL,
+    ino INTEGER NOT NULL,
+    head BLOB NOT NULL,
+    offset INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS groups (
+    id INTEGER PRIMARY KEY,
+    provider TEXT,
+    model TEXT,
+    url TEXT,
+    tag TEXT,
+    UNIQUE (provider, model, url, tag)
+);
+CREATE TABLE IF NOT EXISTS buckets (
+    file_id INTEGER NOT NULL,
+    hour INTEGER NOT NULL,
+    group_id INTEGER NOT NULL,
+    n INTEGER NOT NULL, p INTEGER NOT NULL, c INTEGER NOT NULL, t REAL NOT NULL,
+    cr INTEGER NOT NULL, cm INTEGER NOT NULL, cost REAL NOT NULL, est REAL NOT NULL,
+    PRIMARY KEY (file_id, hour, group_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS spans (
+    file_id INTEGER NOT NULL,
+    hour INTEGER NOT NULL,
+    first INTEGER NOT NULL,
+    last INTEGER NOT NULL,
+    PRIMARY KEY (file_id, hour)
+) WITHOUT ROWID;
+"""
+
+
+class UsageIndex:
+    """Incremental hourly aggregates of stats logs in SQLite.
+
+    Each log's ingested byte offset is stored, so a run only parses the lines
+    appended since the previous one. Entries are summed into buckets per UTC
+    hour and (provider, model, url, tag), and the byte span each hour covers
+    in its log is kept. A query adds up the buckets of hours that lie wholly
+    inside the range and re-reads only the spans of the partial hours at its
+    edges through _parse_line, so it returns what a full rescan would.
+
+    Only newline-terminated lines are ingested; a line still being written is
+    picked up by the next run.
+    """
+
+    def __init__(self, path: Path = INDEX_FILE):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(path), timeout=30, isolation_level=None)
+        if self.db.execute("PRAGMA user_version").fetchone()[0] != INDEX_SCHEMA_VERSION:
+            self.db.executescript(
+                "DROP TABLE IF EXISTS files; DROP TABLE IF EXISTS groups;"
+                "DROP TABLE IF EXISTS buckets; DROP TABLE IF EXISTS spans;"
+            )
+            self.db.executescript(INDEX_SCHEMA)
+            self.db.execute(f"PRAGMA user_version = {INDEX_SCHEMA_VERSION}")
+        self._groups: Dict[tuple, int] = {}
+
+    def __enter__(self) -> "UsageIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.db.close()
+
+    def ingest(self, path: Path) -> tuple[int, int]:
+        """Index lines appended to a log since the last run.
+
+        Returns (file id, lines read), or (0, 0) if the log can't be opened.
+        """
+        try:
+            f = open(path, "rb")
+        except OSError:
+            return 0, 0
+        with f:
+            st = os.fstat(f.fileno())
+            head = f.read(INDEX_HEAD_BYTES)
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                file_id, offset = self._file_offset(str(path.resolve()), st, head)
+                sums, spans, lines, offset = self._scan(f, offset)
+                self._store(file_id, sums, spans)
+                self.db.execute(
+                    "UPDATE files SET dev = ?, ino = ?, head = ?, offset = ? WHERE id = ?",
+                    (st.st_dev, st.st_ino, head, offset, file_id),
+                )
+                self.db.execute("COMMIT")
+            except BaseException:
+                self.db.execute("ROLLBACK")
+                raise
+        return file_id, lines
+
+    def _file_offset(self, key: str, st: os.stat_result, head: bytes) -> tuple[int, int]:
+        """File id and ingested offset; forgets a log that was replaced or truncated."""
+        row = self.db.execute(
+            "SELECT id, dev, ino, head, offset FROM files WHERE path = ?", (key,)
+        ).fetchone()
+        if row is None:
+            cur = self.db.execute(
+                "INSERT INTO files (path, dev, ino, head, offset) VALUES (?, ?, ?, ?, 0)",
+                (key, st.st_dev, st.st_ino, head),
+            )
+            return cur.lastrowid, 0
+        file_id, dev, ino, old_head, offset = row
+        if (dev, ino) != (st.st_dev, st.st_ino) or st.st_size < offset or head[:len(old_head)] != old_head:
+            self.db.execute("DELETE FROM buckets WHERE file_id = ?", (file_id,))
+            self.db.execute("DELETE FROM spans WHERE file_id = ?", (file_id,))
+            offset = 0
+        return file_id, offset
+
+    def _scan(self, f, offset: int) -> tuple[dict, dict, int, int]:
+        """Sum complete lines from offset: (hour, group) -> stats, hour -> byte span."""
+        sums: Dict[tuple, list] = {}
+        spans: Dict[int, list] = {}
+        lines = 0
+        pos = offset
+        tail = b""
+        f.seek(offset)
+        while True:
+            chunk = f.read(INDEX_READ_BYTES)
+            if not chunk:
+                break
+            data = tail + chunk
+            cut = data.rfind(b"\n") + 1
+            tail = data[cut:]
+            for raw in data[:cut].split(b"\n")[:-1]:
+                line_start = pos
+                pos += len(raw) + 1
+                lines += 1
+                if not raw.startswith(b"{"):
+                    continue
+                try:
+                    entry = json_loads(raw)
+                    hour = (_entry_time(entry) - EPOCH) // HOUR
+                    e = _normalize(entry)
+                    tag = entry.get("tag")
+                    group = (entry.get("api_provider", "openai"), e["model"], e["url"],
+                             tag if isinstance(tag, str) else str(tag) if tag else "")
+                    values = (1, e["prompt"], e["completion"], e["elapsed"], e["cache_read"],
+                              e["cache_miss"], _cost_usd(e["cost"]), e["est"])
+                except (json.JSONDecodeError, KeyError, ValueError, TypeError, AttributeError):
+                    continue
+                d = sums.get((hour, group))
+                if d is None:
+                    sums[(hour, group)] = list(values)
+                else:
+                    for i, value in enumerate(values):
+                        d[i] += value
+                span = spans.get(hour)
+                if span is None:
+                    spans[hour] = [line_start, pos]
+                else:
+                    span[1] = pos
+        return sums, spans, lines, pos
+
+    def _store(self, file_id: int, sums: dict, spans: dict) -> None:
+        """Add scanned sums and spans to the file's buckets."""
+        self.db.executemany(
+            "INSERT INTO buckets VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (file_id, hour, group_id) DO UPDATE SET "
+            + ", ".join(f"{k} = {k} + excluded.{k}" for k in STAT_KEYS),
+            [(file_id, hour, self._group_id(group), *values) for (hour, group), values in sums.items()],
+        )
+        self.db.executemany(
+            "INSERT INTO spans VALUES (?, ?, ?, ?) ON CONFLICT (file_id, hour) DO UPDATE SET "
+            "first = min(first, excluded.first), last = max(last, excluded.last)",
+            [(file_id, hour, first, last) for hour, (first, last) in spans.items()],
+        )
+
+    def _group_id(self, group: tuple) -> int:
+        """Id of a (provider, model, url, tag) group, created if new."""
+        group_id = self._groups.get(group)
+        if group_id is None:
+            self.db.execute("INSERT OR IGNORE INTO groups (provider, model, url, tag) VALUES (?, ?, ?, ?)", group)
+            group_id = self.db.execute(
+                "SELECT id FROM groups WHERE provider IS ? AND model IS ? AND url IS ? AND tag IS ?", group
+            ).fetchone()[0]
+            self._groups[group] = group_id
+        return group_id
+
+    def aggregate(self, paths: List[Path], start: datetime | None, end: datetime | None) -> dict:
+        """Bring the logs up to date, then sum url -> model -> stats over [start, end] (local time)."""
+        files = [(path, file_id) for path in paths for file_id, _ in [self.ingest(path)] if file_id]
+        agg = _new_agg()
+        if not files:
+            return agg
+
+        full = (None, None)
+        edges: List[int] = []
+        if start is not None:
+            # Hours are UTC; the range is local time at whole microseconds
+            offset = _get_tz_offset()
+            start_us = (start - offset - EPOCH) // MICROSECOND
+            end_us = (end - offset - EPOCH) // MICROSECOND
+            if start_us > end_us:
+                return agg
+            hour_us = HOUR // MICROSECOND
+            full = (-(-start_us // hour_us), (end_us + 1) // hour_us - 1)
+            edges = sorted({h for h in (start_us // hour_us, end_us // hour_us) if not full[0] <= h <= full[1]})
+
+        self._sum_buckets(agg, [file_id for _, file_id in files], *full)
+        for hour in edges:
+            hour_start = EPOCH + hour * HOUR + _get_tz_offset()
+            lo, hi = max(start, hour_start), min(end, hour_start + HOUR - MICROSECOND)
+            for path, file_id in files:
+                aggregate(self._rescan_hour(path, file_id, hour, lo, hi), agg)
+        return agg
+
+    def _sum_buckets(self, agg: dict, file_ids: List[int], first: int | None, last: int | None) -> None:
+        """Add the buckets of hours first..last (all hours if None) that pass the filters."""
+        where = [f"b.file_id IN ({', '.join('?' * len(file_ids))})"]
+        params: list = list(file_ids)
+        if first is not None:
+            if first > last:
+                return
+            where.append("b.hour BETWEEN ? AND ?")
+            params += [first, last]
+        if FILTER_TAG is not None:
+            where.append("g.tag = ?")
+            params.append(FILTER_TAG)
+        if FILTER_URL is not None:
+            where.append("instr(g.url, ?) > 0")
+            params.append(FILTER_URL)
+        if FILTER_MODEL is not None:
+            where.append("instr(g.model, ?) > 0")
+            params.append(FILTER_MODEL)
+        rows = self.db.execute(
+            f"SELECT g.url, g.model, {', '.join(f'SUM(b.{k})' for k in STAT_KEYS)} "
+            f"FROM buckets b JOIN groups g ON g.id = b.group_id WHERE {' AND '.join(where)} "
+            "GROUP BY g.url, g.model",
+            params,
+        )
+        for url, model, *values in rows:
+            if model == "test-model":
+                continue
+            d = agg[url][model]
+            for key, value in zip(STAT_KEYS, values):
+                d[key] += value
+
+    def _rescan_hour(self, path: Path, file_id: int, hour: int, start: datetime, end: datetime) -> List[Dict]:
+        """Entries in [start, end] from the bytes of the log that hold this hour."""
+        span = self.db.execute(
+            "SELECT first, last FROM spans WHERE file_id = ? AND hour = ?", (file_id, hour)
+        ).fetchone()
+        if span is None:
+            return []
+        with open(path, "rb") as f:
+            f.seek(span[0])
+            data = f.read(span[1] - span[0])
+        entries = []
+        for line in data.decode("utf-8", "replace").split("\n"):
+            entry = _parse_line(line, start, end)
+            if entry:
+                entries.append(entry)
+        return entries
+
+
+def clear_index() -> None:
+    """Delete the usage index if it exists."""
+    for suffix in ("", "-journal"):
+        try:
+            Path(str(INDEX_FILE) + suffix).unlink()
+        except (OSError, IOError):
+            pass
+
+
+def collect(files: List[Path], start: datetime | None, end: datetime | None) -> dict:
+    """url -> model -> stats over files, from the index unless NOINDEX=1."""
+    if not os.environ.get("NOINDEX"):
+        try:
+            with UsageIndex() as index:
+                return index.aggregate(files, start, end)
+        except sqlite3.Error as e:
+            print(f"Usage index unavailable ({e}), rescanning logs", file=sys.stderr)
+    return aggregate(e for f in files if f.exists() for e in parse_stats(f, start, end))
+
+
 def main():
-    import sys
     args = sys.argv[1:]
 
     # Handle manual cache commands
@@ -372,6 +722,10 @@ def main():
         clear_cache()
         print("Cache cleared.")
         sys.exit(0)
+    elif "clear-index" in args or "--clear-index" in args:
+        clear_index()
+        print("Index cleared.")
+        sys.exit(0)
     elif "--help" in args or "-h" in args or "help" in args:
         print("Usage:")
         print("  ai_usage.py [today|yesterday|24h|week|month|year]         # Time period")
@@ -380,7 +734,9 @@ def main():
         print("  ai_usage.py since YYYY-MM-DD | YYYY-MM-DD               # Since date (to now)")
         print("  ai_usage.py update         # Scan all dirs below, update cache")
         print("  ai_usage.py clear-cache    # Delete cache")
+        print("  ai_usage.py clear-index    # Delete the usage index (rebuilt on next run)")
         print("  LOCAL=1 ALL=1 ai_usage.py ...  # All cached dirs (ignore cwd filter)")
+        print("  NOINDEX=1 ai_usage.py ...      # Rescan the logs instead of using the index")
         sys.exit(0)
     elif "update" in args or "--update" in args:
         # Update cache: scan filesystem, add new dirs, remove invalid
@@ -438,41 +794,24 @@ def main():
             sys.exit(1)
         label = period
 
-    # Find and parse stats files
+    # Find and aggregate stats files: url -> model -> stats
     if os.environ.get("LOCAL"):
         files = find_stats_files()
         if not files:
             print("No .aicoder/stats.log files found.")
             sys.exit(0)
-        entries = [e for f in files for e in parse_stats(f, start, end)]
-        if not entries:
+        agg = collect(files, start, end)
+        if not agg:
             print(f"No requests found for: {label}")
             sys.exit(0)
     else:
         central_path = Path.home() / ".aicoder" / "central_stats.log"
         print(f"Using central log: {central_path}")
-        entries = parse_central_stats(central_path, start, end)
-        if not entries:
+        agg = collect([central_path], start, end)
+        if not agg:
             print(f"No requests found in central log for: {label}")
             sys.exit(0)
 
-    # Aggregate: url -> model -> stats
-    agg: dict[str, dict[str, dict]] = defaultdict(lambda: defaultdict(lambda: {"n": 0, "p": 0, "c": 0, "t": 0.0, "cr": 0, "cm": 0, "cost": 0.0, "est": 0.0}))
-    for e in entries:
-        if e["model"] == "test-model":
-            continue
-        agg[e["url"]][e["model"]]["n"] += 1
-        agg[e["url"]][e["model"]]["p"] += e["prompt"]
-        agg[e["url"]][e["model"]]["c"] += e["completion"]
-        agg[e["url"]][e["model"]]["t"] += e["elapsed"]
-        agg[e["url"]][e["model"]]["cr"] += e.get("cache_read", 0)
-        agg[e["url"]][e["model"]]["cm"] += e.get("cache_miss", 0)
-        cost = e.get("cost", 0.0)
-        if isinstance(cost, dict):
-            cost = cost.get("usd", 0.0)
-        agg[e["url"]][e["model"]]["cost"] += cost
-        agg[e["url"]][e["model"]]["est"] += e["est"]
-
     # Report
     print(f"\n{'='*60}")
     print(f"  AI Usage Report: {label}")
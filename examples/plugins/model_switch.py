@@ -229,6 +229,9 @@ def _handle_model_command(args_str: str) -> Optional[str]:
         else:
             os.environ['API_ENDPOINT'] = f"{base_url}/chat/completions"
 
+    # Drop config parsed from the old model's environment
+    Config.invalidate()
+
     # Store previous config
     _set_previous_config(current_config)
 
@@ -243,6 +246,7 @@ def _handle_model_command(args_str: str) -> Optional[str]:
 
 def _handle_model_back_command(args_str: str) -> Optional[str]:
     """Handle /mb command - toggle back to previous model"""
+    from aicoder.core.config import Config
 
     previous_config = _get_previous_config()
 
@@ -267,6 +271,9 @@ def _handle_model_back_command(args_str: str) -> Optional[str]:
         else:
             os.environ['API_ENDPOINT'] = f"{base_url}/chat/completions"
 
+    # Drop config parsed from the old model's environment
+    Config.invalidate()
+
     _set_previous_config(current_config)
 
     # Swap API client if provider changed
@@ -2,7 +2,9 @@
  * stats_server - Central stats collector via Unix socket
  *
  * Listens on a Unix socket, receives JSONL lines, appends to central log.
- * Returns "ok\n" after each successful write.
+ * Returns "ok\n" after each line written. Clients may keep the connection
+ * open and send many lines (several at once); up to MAX_CLIENTS are served
+ * together with poll() so one slow client never holds up the others.
  *
  * Build: make
  * Run:   ./stats_server
@@ -18,16 +20,28 @@
 #include <sys/un.h>
 #include <sys/stat.h>
 #include <errno.h>
+#include <poll.h>
 
 #define SOCKET_PATH_DEFAULT "/tmp/stats_server.sock"
 #define LOG_PATH_ENV "AICODER_CENTRAL_LOG"
 #define DEFAULT_LOG_PATH "/home/blah/.aicoder/central_stats.log"
 #define BUF_SIZE 65536
+#define MAX_CLIENTS 64
 
 static volatile int running = 1;
 static int server_fd = -1;
 static char socket_path[108];
 static char pid_path[512];
+static const char *log_path;
+static FILE *log_fp;
+
+struct client {
+    int fd;
+    size_t len;
+    char buf[BUF_SIZE];
+};
+
+static struct client clients[MAX_CLIENTS];
 
 static void handle_signal(int sig) {
     (void)sig;
@@ -42,8 +56,59 @@ static void cleanup(void) {
     unlink(pid_path);
 }
 
+/* Append one line (ending in newline); reopens the log if it was deleted */
+static int write_line(const char *line, size_t len) {
+    /* Check if file was deleted (nlink == 0) */
+    struct stat st;
+    if (log_fp && fstat(fileno(log_fp), &st) == 0 && st.st_nlink == 0) {
+        fclose(log_fp);
+        log_fp = fopen(log_path, "a");
+        if (log_fp) setvbuf(log_fp, NULL, _IONBF, 0);
+    }
+
+    size_t written = log_fp ? fwrite(line, 1, len, log_fp) : 0;
+    if (written != len && log_fp) {
+        /* Retry: reopen and write */
+        fclose(log_fp);
+        log_fp = fopen(log_path, "a");
+        if (log_fp) {
+            setvbuf(log_fp, NULL, _IONBF, 0);
+            written = fwrite(line, 1, len, log_fp);
+        }
+    }
+    return written == len;
+}
+
+static void reply(int fd, int ok) {
+    const char *msg = ok ? "ok\n" : "error: write failed\n";
+    ssize_t n = write(fd, msg, strlen(msg));
+    (void)n; /* A client that went away is noticed on its next read */
+}
+
+/* Write every complete line in the client's buffer, one reply per line.
+ * A full buffer without a newline is written as one (truncated) line, and
+ * so is a trailing partial line when the client closes (at_eof). */
+static void drain_lines(struct client *c, int at_eof) {
+    size_t start = 0;
+    for (;;) {
+        char *nl = memchr(c->buf + start, '\n', c->len - start);
+        if (!nl) break;
+        size_t end = (size_t)(nl - c->buf) + 1;
+        reply(c->fd, write_line(c->buf + start, end - start));
+        start = end;
+    }
+    memmove(c->buf, c->buf + start, c->len - start);
+    c->len -= start;
+
+    if (c->len > 0 && (at_eof || c->len >= BUF_SIZE - 1)) {
+        c->buf[c->len++] = '\n';
+        reply(c->fd, write_line(c->buf, c->len));
+        c->len = 0;
+    }
+}
+
 int main(void) {
-    const char *log_path = getenv(LOG_PATH_ENV);
+    log_path = getenv(LOG_PATH_ENV);
     if (!log_path) log_path = DEFAULT_LOG_PATH;
 
     /* Resolve socket path */
@@ -84,7 +149,7 @@ int main(void) {
         mkdir(dir, 0755);
     }
 
-    FILE *log_fp = fopen(log_path, "a");
+    log_fp = fopen(log_path, "a");
     if (!log_fp) {
         perror("fopen log");
         return 1;
@@ -113,7 +178,7 @@ int main(void) {
 
     chmod(socket_path, 0600);
 
-    if (listen(server_fd, 5) < 0) {
+    if (listen(server_fd, 16) < 0) {
         perror("listen");
         cleanup();
         return 1;
@@ -126,63 +191,72 @@ int main(void) {
     fprintf(stderr, "[stats_server] Listening on %s\n", socket_path);
     fprintf(stderr, "[stats_server] Writing to %s\n", log_path);
 
+    for (int i = 0; i < MAX_CLIENTS; i++) clients[i].fd = -1;
+
+    struct pollfd fds[MAX_CLIENTS + 1];
+    int slot_of[MAX_CLIENTS + 1];
+
     while (running) {
-        int client_fd = accept(server_fd, NULL, NULL);
-        if (client_fd < 0) {
-            if (errno == EINTR) continue;
-            perror("accept");
-            continue;
+        int nfds = 0;
+        int have_room = 0;
+        for (int i = 0; i < MAX_CLIENTS; i++) {
+            if (clients[i].fd < 0) {
+                have_room = 1;
+                continue;
+            }
+            fds[nfds].fd = clients[i].fd;
+            fds[nfds].events = POLLIN;
+            slot_of[nfds++] = i;
+        }
+        /* Stop accepting while full; queued connections wait in the backlog */
+        if (have_room) {
+            fds[nfds].fd = server_fd;
+            fds[nfds].events = POLLIN;
+            slot_of[nfds++] = -1;
         }
 
-        char buf[BUF_SIZE];
-        ssize_t total = 0;
-        ssize_t n;
-
-        while (total < BUF_SIZE - 1) {
-            n = read(client_fd, buf + total, BUF_SIZE - 1 - total);
-            if (n <= 0) break;
-            total += n;
-            if (memchr(buf, '\n', total)) break;
+        if (poll(fds, nfds, -1) < 0) {
+            if (errno == EINTR) continue;
+            perror("poll");
+            break;
         }
 
-        if (total > 0) {
-            if (buf[total - 1] != '\n') {
-                buf[total] = '\n';
-                total++;
-            }
-            buf[total] = '\0';
-
-            /* Check if file was deleted (nlink == 0) */
-            struct stat st;
-            if (fstat(fileno(log_fp), &st) == 0 && st.st_nlink == 0) {
-                fclose(log_fp);
-                log_fp = fopen(log_path, "a");
-                if (log_fp) setvbuf(log_fp, NULL, _IONBF, 0);
-            }
+        for (int k = 0; k < nfds; k++) {
+            if (!fds[k].revents) continue;
 
-            ssize_t written = log_fp ? (ssize_t)fwrite(buf, 1, total, log_fp) : -1;
-            if (written != total && log_fp) {
-                /* Retry: reopen and write */
-                fclose(log_fp);
-                log_fp = fopen(log_path, "a");
-                if (log_fp) {
-                    setvbuf(log_fp, NULL, _IONBF, 0);
-                    written = fwrite(buf, 1, total, log_fp);
+            if (slot_of[k] < 0) {
+                int client_fd = accept(server_fd, NULL, NULL);
+                if (client_fd < 0) {
+                    if (errno != EINTR) perror("accept");
+                    continue;
                 }
+                for (int i = 0; i < MAX_CLIENTS; i++) {
+                    if (clients[i].fd < 0) {
+                        clients[i].fd = client_fd;
+                        clients[i].len = 0;
+                        break;
+                    }
+                }
+                continue;
             }
 
-            if (written == total) {
-                const char *ok = "ok\n";
-                write(client_fd, ok, 3);
+            struct client *c = &clients[slot_of[k]];
+            ssize_t n = read(c->fd, c->buf + c->len, BUF_SIZE - 1 - c->len);
+            if (n < 0 && (errno == EINTR || errno == EAGAIN)) continue;
+            if (n > 0) {
+                c->len += (size_t)n;
+                drain_lines(c, 0);
             } else {
-                const char *err = "error: write failed\n";
-                write(client_fd, err, strlen(err));
+                drain_lines(c, 1);
+                close(c->fd);
+                c->fd = -1;
             }
         }
-
-        close(client_fd);
     }
 
+    for (int i = 0; i < MAX_CLIENTS; i++) {
+        if (clients[i].fd >= 0) close(clients[i].fd);
+    }
     cleanup();
     fclose(log_fp);
     fprintf(stderr, "[stats_server] Stopped\n");
@@ -12,24 +12,45 @@ import time
 _AICODER_START_SET_BY_SHELL = "AICODER_START_TIME" in os.environ
 if not _AICODER_START_SET_BY_SHELL:
     os.environ["AICODER_START_TIME"] = str(time.time())
+_IMPORT_START = time.perf_counter()
 
 from aicoder.core.aicoder import AICoder  # noqa: E402
 from aicoder.core.config import Config  # noqa: E402
 from aicoder.utils.log import LogUtils, LogOptions  # noqa: E402
+from aicoder.utils import startup_profile  # noqa: E402
+
+startup_profile.record("imports", time.perf_counter() - _IMPORT_START)
+_PROFILE_CHILD = os.environ.get(startup_profile.CHILD_ENV) == "1"
 
 
 def main():
     """Main entry point"""
 
+    # --profile-startup re-runs this script in a profiled child and reports
+    if "--profile-startup" in sys.argv or "--profile-startup=json" in sys.argv:
+        sys.exit(startup_profile.run_profile(
+            os.path.abspath(__file__), as_json="--profile-startup=json" in sys.argv
+        ))
+
     # Show startup info
     if Config.debug():
         LogUtils.success("AI Coder starting in debug mode")
 
     # Create and run AI Coder
     app = AICoder()
+    startup_profile.mark("construct")
 
     try:
         app.initialize()
+        startup_profile.milestone("time_to_prompt")
+
+        if _PROFILE_CHILD:
+            # Profiled startup: wait for the background stage, report, exit
+            app.startup.wait()
+            startup_profile.child_report()
+            app.shutdown()
+            app.plugin_system.cleanup()
+            return
 
         # Calculate and display startup time (only in TTY)
         start_time_str = os.environ.get("AICODER_START_TIME")
@@ -39,7 +60,9 @@ def main():
                 current_time = time.time()
                 startup_time = current_time - start_time
                 label = "total" if _AICODER_START_SET_BY_SHELL else "app loading"
-                LogUtils.printc(f"Startup time ({label}): {startup_time:.2f}s", color="brightCyan", stderr=True)
+                LogUtils.printc(
+                    f"Startup time ({label}): {startup_time:.2f}s to prompt", color="brightCyan", stderr=True
+                )
             except ValueError:
                 pass
 
@@ -9,9 +9,17 @@ import pytest
 # These interfere with tests that depend on stdlib behavior
 os.environ["PERF_DISABLE"] = "1"
 
+from aicoder.core.config import Config
 from aicoder.core.token_estimator import clear_cache, _message_cache, _tools_tokens
 
 
+@pytest.fixture(autouse=True)
+def fresh_config_snapshot():
+    """Rebuild the config snapshot per test so env changes from other tests don't leak"""
+    Config.invalidate()
+    yield
+
+
 @pytest.fixture(autouse=True)
 def clear_token_cache():
     """Clear token estimator cache before each test to prevent state contamination"""
@@ -294,3 +294,131 @@ class TestConcurrentExecution:
         # Start a command and it should handle interruption gracefully
         result = execute({"command": "sleep 0.1; echo done", "timeout": 5})
         assert result["tool"] == "run_shell_command"
+
+class TestBoundedOutput:
+    """Test that large output is bounded while streaming."""
+
+    def test_large_output_truncated_in_middle(self, monkeypatch):
+        """Only the head and tail of huge output are kept."""
+        monkeypatch.setenv("SHELL_CAPTURE_BYTES", "1000")
+        result = execute({"command": "echo START; yes filler | head -c 2000000; echo END"})
+        assert result["friendly"].startswith("✓")
+        assert "START" in result["detailed"]
+        assert "END" in result["detailed"]
+        assert "bytes omitted" in result["detailed"]
+        assert len(result["detailed"]) < 5000
+
+    def test_spill_file_has_full_output(self, monkeypatch, tmp_path):
+        """With spilling enabled the full output is saved to a temp file."""
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setenv("SHELL_CAPTURE_BYTES", "100")
+        monkeypatch.setenv("AICODER_SHELL_SPILL", "1")
+        proc = execute_with_process_group("seq 1 10000", timeout=10)
+        assert proc.omitted_bytes > 0
+        with open(proc.spill_path) as f:
+            assert f.read().splitlines() == [str(i) for i in range(1, 10001)]
+
+    def test_no_spill_file_for_small_output(self, monkeypatch, tmp_path):
+        """Spill files are removed when nothing was omitted."""
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setenv("AICODER_SHELL_SPILL", "1")
+        proc = execute_with_process_group("echo small", timeout=10)
+        assert proc.spill_path is None
+        assert os.listdir(tmp_path / "tmp") == []
+
+    def test_no_spill_file_when_popen_fails(self, monkeypatch, tmp_path):
+        """A command that can't start (missing cwd) leaves no spill file behind."""
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setenv("AICODER_SHELL_SPILL", "1")
+        with pytest.raises(FileNotFoundError):
+            execute_with_process_group("echo hi", timeout=10, cwd=str(tmp_path / "missing"))
+        assert os.listdir(tmp_path / "tmp") == []
+
+    def test_timeout_keeps_partial_output(self):
+        """Output printed before a timeout is still captured."""
+        result = execute({"command": "echo before; sleep 30", "timeout": 1})
+        assert "timed out" in result["friendly"]
+        assert "before" in result["detailed"]
+
+class TestPersistentShell:
+    """Test the opt-in long-lived shell mode."""
+
+    @pytest.fixture(autouse=True)
+    def persistent(self, monkeypatch):
+        from aicoder.tools.internal import run_shell_command
+        monkeypatch.setenv("AICODER_PERSISTENT_SHELL", "1")
+        yield run_shell_command
+        run_shell_command.close_persistent_shell()
+
+    def test_state_persists(self, persistent, tmp_path):
+        """cd and exports carry over between commands."""
+        execute({"command": f"cd {tmp_path} && export AICODER_TEST_VAR=kept"})
+        result = execute({"command": "pwd; echo $AICODER_TEST_VAR"})
+        assert str(tmp_path) in result["detailed"]
+        assert "kept" in result["detailed"]
+        assert persistent._shell.spawns == 1
+
+    def test_exit_code_and_streams(self, persistent):
+        """Exit codes and both streams are captured per command."""
+        proc = persistent.execute_in_persistent_shell("echo out; echo err >&2; (exit 3)", 5)
+        assert proc.returncode == 3
+        assert proc.stdout == "out\n"
+        assert proc.stderr == "err\n"
+
+    def test_output_without_newline(self, persistent):
+        """Sentinels don't add or eat trailing newlines."""
+        assert persistent.execute_in_persistent_shell("printf abc", 5).stdout == "abc"
+
+    def test_syntax_error_keeps_shell(self, persistent):
+        """A syntax error fails the command, not the shell."""
+        assert persistent.execute_in_persistent_shell("if then", 5).returncode == 2
+        assert persistent.execute_in_persistent_shell("echo ok", 5).stdout == "ok\n"
+        assert persistent._shell.spawns == 1
+
+    def test_timeout_interrupts_foreground_job(self, persistent):
+        """A timeout aborts the command but the shell survives."""
+        execute({"command": "export AICODER_TEST_VAR=survived"})
+        result = execute({"command": "sleep 30; echo reached", "timeout": 1})
+        assert "timed out" in result["friendly"]
+        assert "(no output captured before timeout)" in result["detailed"]
+        assert "survived" in execute({"command": "echo $AICODER_TEST_VAR"})["detailed"]
+        assert persistent._shell.spawns == 1
+
+    def test_respawn_after_exit(self, persistent):
+        """An exited shell is replaced on the next command."""
+        assert persistent.execute_in_persistent_shell("exit 7", 5).returncode == 7
+        assert persistent.execute_in_persistent_shell("echo back", 5).stdout == "back\n"
+        assert persistent._shell.spawns == 2
+
+    def test_explicit_cwd_is_one_off(self, persistent, tmp_path):
+        """cwd applies to one command without moving the session."""
+        before = persistent.execute_in_persistent_shell("pwd", 5).stdout
+        assert persistent.execute_in_persistent_shell("pwd", 5, cwd=str(tmp_path)).stdout == f"{tmp_path}\n"
+        assert persistent.execute_in_persistent_shell("pwd", 5).stdout == before
+
+    def test_closed_stdout_does_not_hang(self, persistent):
+        """A command closing the shell's stdout ends at once; the shell is replaced."""
+        start = time.monotonic()
+        proc = persistent.execute_in_persistent_shell("exec 1>/dev/null; echo gone; echo kept >&2; (exit 4)", 10)
+        assert time.monotonic() - start < 5
+        assert proc.returncode == 4
+        assert proc.stderr == "kept\n"
+        assert persistent.execute_in_persistent_shell("echo back", 5).stdout == "back\n"
+        assert persistent._shell.spawns == 2
+
+    def test_background_jobs_end_with_command(self, persistent):
+        """Jobs started with & don't outlive their command or leak output."""
+        proc = persistent.execute_in_persistent_shell("(sleep 0.5; echo late) & sh -c 'sleep 30' & echo now", 5)
+        assert proc.stdout == "now\n"
+        time.sleep(1)
+        assert persistent.execute_in_persistent_shell("echo next", 5).stdout == "next\n"
+        assert persistent._shell.spawns == 1
+        group = subprocess.run(
+            ["ps", "-o", "pid=,stat=", "-g", str(persistent._shell.proc.pid)], capture_output=True, text=True
+        )
+        running = [line.split()[0] for line in group.stdout.splitlines() if "Z" not in line.split()[1]]
+        assert running == [str(persistent._shell.proc.pid)]
+
+    def test_stdin_not_shared(self, persistent):
+        """Commands read /dev/null, not the shell's command stream."""
+        assert persistent.execute_in_persistent_shell("cat; echo done", 5).stdout == "done\n"
@@ -0,0 +1,141 @@
+"""Test examples/ai_usage.py: the incremental index must match a full rescan"""
+
+import importlib.util
+import json
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+SCRIPT = Path(__file__).resolve().parent.parent / "examples" / "ai_usage.py"
+BASE = datetime(2026, 3, 1, 9, 0, 0)
+
+
+@pytest.fixture
+def ai_usage(monkeypatch):
+    """Load the script as a module, with the full rescan reading every line"""
+    monkeypatch.setenv("FULL", "1")
+    monkeypatch.delenv("TZ", raising=False)
+    spec = importlib.util.spec_from_file_location("ai_usage", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def index(ai_usage, tmp_path):
+    with ai_usage.UsageIndex(tmp_path / "index.sqlite3") as index:
+        yield index
+
+
+def entry_line(i, minutes):
+    """One stats.log line; models, urls and tags vary with i"""
+    entry = {
+        "ts": (BASE + timedelta(minutes=minutes)).strftime("%Y-%m-%d_%H:%M:%S"),
+        "api_provider": "openai",
+        "model": ("model-a", "model-b", "test-model")[i % 3],
+        "url": ("https://one.example/v1", "https://two.example/v1")[i % 2],
+        "tag": "bench" if i % 4 == 0 else None,
+        "elapsed": 0.5 + i,
+        "usage": {
+            "prompt_tokens": 1000 + i,
+            "completion_tokens": 10 + i,
+            "prompt_tokens_details": {"cached_tokens": 500 if i % 5 else 0},
+        },
+        "cost_estimate": 0.001 * i,
+    }
+    return json.dumps(entry) + "\n"
+
+
+def write_log(path, count, start=0, step=17, mode="w"):
+    """Log entries start..start+count, step minutes apart (spanning many hours)"""
+    with open(path, mode) as f:
+        f.write("old|pipe|format\n" if mode == "w" else "")
+        for i in range(start, start + count):
+            f.write(entry_line(i, i * step))
+
+
+def plain(agg):
+    """Aggregate as plain dicts, floats rounded, for comparison"""
+    return {
+        url: {model: {k: round(v, 6) for k, v in stats.items()} for model, stats in models.items()}
+        for url, models in agg.items()
+    }
+
+
+WINDOWS = [
+    (None, None),
+    (BASE, BASE + timedelta(days=2)),
+    (BASE + timedelta(minutes=95, seconds=30), BASE + timedelta(hours=7, minutes=5)),
+    (BASE + timedelta(hours=3), BASE + timedelta(hours=3, minutes=59, seconds=59)),
+    (BASE + timedelta(minutes=20), BASE + timedelta(minutes=40)),
+]
+
+
+def assert_matches_full_pass(ai_usage, index, log):
+    for start, end in WINDOWS:
+        full = ai_usage.aggregate(ai_usage.parse_stats(log, start, end))
+        assert plain(index.aggregate([log], start, end)) == plain(full), (start, end)
+
+
+class TestUsageIndex:
+    def test_matches_full_pass(self, ai_usage, index, tmp_path):
+        log = tmp_path / "stats.log"
+        write_log(log, 40)
+        assert_matches_full_pass(ai_usage, index, log)
+
+    def test_appended_log_reads_only_new_lines(self, ai_usage, index, tmp_path):
+        log = tmp_path / "stats.log"
+        write_log(log, 40)
+        index.ingest(log)
+
+        write_log(log, 25, start=40, mode="a")
+        with open(log, "a") as f:
+            f.write(entry_line(65, 65 * 17)[:30])  # Still being written
+        assert index.ingest(log)[1] == 25
+        assert_matches_full_pass(ai_usage, index, log)
+
+        with open(log, "a") as f:
+            f.write(entry_line(65, 65 * 17)[30:])
+        assert index.ingest(log)[1] == 1
+        assert_matches_full_pass(ai_usage, index, log)
+
+    def test_truncated_log_is_reread(self, ai_usage, index, tmp_path):
+        log = tmp_path / "stats.log"
+        write_log(log, 60)
+        index.ingest(log)
+
+        with open(log, "r+") as f:  # Same inode, shorter content
+            f.truncate(0)
+        write_log(log, 10, start=100, step=5, mode="a")
+        assert_matches_full_pass(ai_usage, index, log)
+
+    def test_rewritten_log_is_reread(self, ai_usage, index, tmp_path):
+        log = tmp_path / "stats.log"
+        write_log(log, 30)
+        index.ingest(log)
+
+        write_log(log, 40, start=1)  # Longer, but different from the start
+        assert_matches_full_pass(ai_usage, index, log)
+
+    def test_timezone_offset(self, ai_usage, index, tmp_path, monkeypatch):
+        monkeypatch.setenv("TZ", "+5:30")
+        log = tmp_path / "stats.log"
+        write_log(log, 40)
+        assert_matches_full_pass(ai_usage, index, log)
+
+    def test_several_logs(self, ai_usage, index, tmp_path):
+        logs = [tmp_path / "a.log", tmp_path / "b.log"]
+        write_log(logs[0], 20)
+        write_log(logs[1], 20, start=7, step=11)
+        for start, end in WINDOWS:
+            full = ai_usage.aggregate(e for log in logs for e in ai_usage.parse_stats(log, start, end))
+            assert plain(index.aggregate(logs, start, end)) == plain(full)
+
+    def test_collect_without_index(self, ai_usage, tmp_path, monkeypatch):
+        monkeypatch.setenv("NOINDEX", "1")
+        log = tmp_path / "stats.log"
+        write_log(log, 10)
+        agg = ai_usage.collect([log, tmp_path / "missing.log"], None, None)
+        assert sum(stats["n"] for models in agg.values() for stats in models.values()) == 7
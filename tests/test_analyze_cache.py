@@ -0,0 +1,192 @@
+"""Test bin/analyze_cache.py: the streaming analysis must match a full pass"""
+
+import importlib.util
+import json
+import threading
+from pathlib import Path
+
+import pytest
+
+SCRIPT = Path(__file__).resolve().parent.parent / "bin" / "analyze_cache.py"
+
+
+@pytest.fixture
+def analyze_cache(monkeypatch):
+    spec = importlib.util.spec_from_file_location("analyze_cache", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    monkeypatch.setattr(module, "READ_BYTES", 7)  # Lines straddle every chunk
+    return module
+
+
+def entry_line(i):
+    """One stats.log line; groups, sessions and cached counts vary with i"""
+    entry = {
+        "ts": f"2026-03-01_{i // 60 % 24:02d}:{i % 60:02d}:00",
+        "api_provider": "openai",
+        "model": ("model-a", "model-b")[i % 2],
+        "url": "https://api.example/v1/",
+        "session": f"s{i // 25}",
+    }
+    if i % 7 != 3:
+        entry["usage"] = {"prompt_tokens_details": {"cached_tokens": (i * 7919) % 5000}}
+    return json.dumps(entry)
+
+
+def log_text(start, count):
+    lines = [entry_line(i) for i in range(start, start + count)]
+    lines[len(lines) // 2:len(lines) // 2] = ["old|pipe|format", "{not json", ""]
+    return "\n".join(lines) + "\n"
+
+
+def full_pass(text, top=5, since=None, until=None):
+    """Reference: load every entry, then compare each group's neighbours"""
+    groups = {}
+    for line in text.splitlines():
+        line = line.strip()
+        if not line.startswith("{"):
+            continue
+        try:
+            e = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if (since and e["ts"] < since) or (until and e["ts"] > until):
+            continue
+        groups.setdefault((e.get("api_provider", "?"), e.get("model", "?"), e.get("url", "?")), []).append(e)
+
+    results = {}
+    for (provider, model, url), group in groups.items():
+        tracked = [e for e in group if ((e.get("usage") or {}).get("prompt_tokens_details") or {}).get("cached_tokens") is not None]
+        drops = []
+        for prev, e in zip([None] + tracked, tracked):
+            cached = e["usage"]["prompt_tokens_details"]["cached_tokens"]
+            if prev is None or prev.get("session") != e.get("session"):
+                continue
+            prev_cached = prev["usage"]["prompt_tokens_details"]["cached_tokens"]
+            if cached < prev_cached * 0.9:
+                drops.append({"ts": e["ts"], "prev": prev_cached, "curr": cached,
+                              "pct": round((1 - cached / prev_cached) * 100, 1)})
+        worst = sorted(enumerate(drops), key=lambda item: (item[1]["pct"], item[0]), reverse=True)[:top]
+        results[(provider, model, url)] = {
+            "provider": provider,
+            "model": model,
+            "url": url.replace("https://", "").rstrip("/"),
+            "total_calls": len(group),
+            "tracked_calls": len(tracked),
+            "cache_drops": len(drops),
+            "drop_pct": round(len(drops) / len(tracked) * 100, 1) if tracked else 0,
+            "drops": drops[-5:],
+            "worst_drops": [drop for _, drop in worst],
+        }
+    return results
+
+
+def stream(analyze_cache, lines, top=5, since=None, until=None):
+    """What main() does with the lines read_lines yields"""
+    analyzer = analyze_cache.CacheAnalyzer(top, since, until)
+    for line in lines:
+        entry = analyze_cache.parse_line(line) if line is not None else None
+        if entry is not None:
+            analyzer.add(entry)
+    return analyzer.results()
+
+
+class TestStreaming:
+    def test_matches_full_pass(self, analyze_cache, tmp_path):
+        log = tmp_path / "stats.log"
+        text = log_text(0, 300)
+        log.write_text(text + entry_line(300))  # Last line without a newline
+        for top in (0, 1, 5):
+            expected = full_pass(text + entry_line(300), top)
+            assert stream(analyze_cache, analyze_cache.read_lines(log), top) == expected
+            assert analyze_cache.analyze(analyze_cache.parse_stats(log), top) == expected
+        assert any(r["cache_drops"] > 5 for r in expected.values())
+
+    def test_window_matches_full_pass(self, analyze_cache, tmp_path):
+        log = tmp_path / "stats.log"
+        log.write_text(log_text(0, 300))
+        since = analyze_cache.parse_when("2026-03-01 01:10")
+        until = analyze_cache.parse_when("2026-03-01_03:20:00")
+        assert stream(analyze_cache, analyze_cache.read_lines(log), 5, since, until) == \
+            full_pass(log.read_text(), 5, since, until)
+
+
+def take(lines, count, timeout=5.0):
+    """The next count items of a follow generator, failing instead of hanging"""
+    taken = []
+    thread = threading.Thread(target=lambda: taken.extend(next(lines) for _ in range(count)), daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), f"read_lines stalled after {len(taken)} of {count} lines"
+    return taken
+
+
+class TestFollow:
+    @pytest.fixture
+    def follow(self, analyze_cache, tmp_path):
+        log = tmp_path / "stats.log"
+        log.write_text(log_text(0, 100))
+        lines = analyze_cache.read_lines(log, follow=True, poll=0.01)
+        yield log, lines
+        try:
+            lines.close()
+        except ValueError:
+            pass  # Still running in the thread of a stalled take()
+
+    def take_until_caught_up(self, lines, count):
+        """The next count lines, then the None marking the end of the log"""
+        taken = take(lines, count + 1)
+        assert taken.index(None) == count
+        return taken[:count]
+
+    def test_appended_lines_match_full_pass(self, analyze_cache, follow):
+        log, lines = follow
+        seen = self.take_until_caught_up(lines, 103)
+
+        appended = log_text(100, 60)
+        with open(log, "a") as f:
+            f.write(appended[:1000])
+            f.flush()
+            seen += take(lines, appended[:1000].count("\n"))
+            f.write(appended[1000:])
+        seen += take(lines, appended[1000:].count("\n"))
+
+        assert "\n".join(seen) + "\n" == log.read_text()
+        assert stream(analyze_cache, seen) == full_pass(log.read_text())
+
+    def test_truncated_log_is_reread(self, analyze_cache, follow):
+        log, lines = follow
+        self.take_until_caught_up(lines, 103)
+
+        with open(log, "r+") as f:  # Same inode, shorter content
+            f.truncate(0)
+            f.write(log_text(500, 10))
+        seen = take(lines, 13)
+        assert "\n".join(seen) + "\n" == log.read_text()
+        assert stream(analyze_cache, seen) == full_pass(log.read_text())
+
+    def test_rotated_log_is_reopened(self, analyze_cache, follow, tmp_path):
+        log, lines = follow
+        self.take_until_caught_up(lines, 103)
+
+        rotated = tmp_path / "new.log"
+        rotated.write_text(log_text(700, 200))
+        rotated.replace(log)
+        seen = take(lines, 203)
+        assert stream(analyze_cache, seen) == full_pass(log.read_text())
+
+    def test_rotation_drains_old_log(self, analyze_cache, follow, tmp_path):
+        log, lines = follow
+        seen = self.take_until_caught_up(lines, 103)
+        before = log.read_text()
+
+        unread = log_text(300, 20) + entry_line(320)  # Last line without a newline
+        with open(log, "a") as f:
+            f.write(unread)
+        rotated = tmp_path / "new.log"
+        rotated.write_text(log_text(700, 50))
+        rotated.replace(log)
+        seen_after = take(lines, 24 + 53)
+        assert "\n".join(seen_after) + "\n" == unread + "\n" + log.read_text()
+        assert stream(analyze_cache, seen + seen_after) == \
+            full_pass(before + unread + "\n" + log.read_text())
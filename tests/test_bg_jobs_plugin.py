@@ -0,0 +1,156 @@
+"""Test bg_jobs plugin output capture (rotating log, tail buffer, tail/grep cursor)"""
+
+import os
+import time
+
+import pytest
+
+from aicoder.plugins import bg_jobs
+from aicoder.plugins.bg_jobs import JobOutput
+
+
+class FakeCtx:
+    """Collects what the plugin registers"""
+
+    def __init__(self):
+        self.tools = {}
+
+    def register_tool(self, name, fn, description, parameters, auto_approved=False, format_arguments=None):
+        self.tools[name] = fn
+
+    def register_command(self, name, handler, description=None):
+        pass
+
+    def register_hook(self, event, fn):
+        pass
+
+
+@pytest.fixture
+def tool(tmp_path, monkeypatch):
+    """bg_jobs tool running in a temp cwd; kills leftover jobs"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(bg_jobs.atexit, "register", lambda fn: None)
+    ctx = FakeCtx()
+    plugin = bg_jobs.create_plugin(ctx)
+    yield ctx.tools["bg_jobs"]
+    plugin["cleanup"]()
+
+
+def _run_job(tool, command):
+    """Start a job and wait for it to finish producing output"""
+    result = tool({"action": "run", "name": "job", "command": command})
+    pid = int(result["detailed"].split("PID: ")[1].split("\n")[0])
+    deadline = time.time() + 5
+    while time.time() < deadline:
+        status = tool({"action": "list"})
+        if str(pid) not in status["detailed"]:
+            break
+        time.sleep(0.05)
+    return pid
+
+
+def _pipe_output(tmp_path, data_chunks):
+    """Feed chunks through a JobOutput and wait for EOF"""
+    r, w = os.pipe()
+    output = JobOutput(str(tmp_path / "jobs" / "1.log"))
+    output.start(os.fdopen(r, "rb"))
+    for chunk in data_chunks:
+        os.write(w, chunk)
+    os.close(w)
+    output.wait(5)
+    return output
+
+
+class TestJobOutput:
+    def test_log_and_read_since(self, tmp_path):
+        output = _pipe_output(tmp_path, [b"hello\n", b"world\n"])
+        assert output.total == 12
+        assert (tmp_path / "jobs" / "1.log").read_bytes() == b"hello\nworld\n"
+        assert output.read_since(0, 1000) == ("hello\nworld\n", 12, 0)
+        assert output.read_since(6, 1000) == ("world\n", 12, 0)
+        assert output.read_since(12, 1000) == ("", 12, 0)
+
+    def test_max_bytes_keeps_newest(self, tmp_path):
+        output = _pipe_output(tmp_path, [b"aaaa", b"bbbb"])
+        assert output.read_since(0, 4) == ("bbbb", 8, 4)
+
+    def test_memory_and_disk_bounded(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(bg_jobs, "TAIL_BUFFER_BYTES", 100)
+        monkeypatch.setattr(bg_jobs, "LOG_MAX_BYTES", 1000)
+        output = _pipe_output(tmp_path, [b"x" * 300] * 20)
+        assert output.total == 6000
+        text, end, skipped = output.read_since(0, 10_000)
+        assert len(text) == 100
+        assert skipped == 5900
+        assert os.path.getsize(tmp_path / "jobs" / "1.log") <= 1000
+        rotated = tmp_path / "jobs" / "1.log.1"
+        assert not rotated.exists() or os.path.getsize(rotated) <= 1000
+
+    def test_log_rotates(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(bg_jobs, "LOG_MAX_BYTES", 10)
+        output = JobOutput(str(tmp_path / "jobs" / "1.log"))
+        log = output._open_log()
+        for chunk in (b"aaaaaa", b"bbbbbb", b"cccccc"):
+            log = output._write_log(log, chunk)
+        log.close()
+        assert (tmp_path / "jobs" / "1.log").read_bytes() == b"cccccc"
+        assert (tmp_path / "jobs" / "1.log.1").read_bytes() == b"bbbbbb"
+
+
+class TestTailGrepActions:
+    def test_tail_returns_only_new_output(self, tool):
+        pid = _run_job(tool, "echo first; echo second >&2")
+        result = tool({"action": "tail", "pid": pid})
+        assert "first\nsecond" in result["detailed"]
+        assert "finished" in result["detailed"]
+        again = tool({"action": "tail", "pid": pid})
+        assert "(no new output)" in again["detailed"]
+
+    def test_offset_rereads(self, tool):
+        pid = _run_job(tool, "echo one")
+        tool({"action": "tail", "pid": pid})
+        result = tool({"action": "tail", "pid": pid, "offset": 0})
+        assert "one" in result["detailed"]
+
+    def test_grep_filters_lines(self, tool):
+        pid = _run_job(tool, "echo 'GET / 200'; echo 'ERROR boom'; echo 'GET /x 200'")
+        result = tool({"action": "grep", "pid": pid, "pattern": "ERROR"})
+        assert "ERROR boom" in result["detailed"]
+        assert "GET" not in result["detailed"].split("\n\n", 1)[1]
+
+    def test_grep_requires_pattern(self, tool):
+        pid = _run_job(tool, "true")
+        assert "requires 'pattern'" in tool({"action": "grep", "pid": pid})["friendly"]
+
+    def test_unknown_pid(self, tool):
+        assert "No job" in tool({"action": "tail", "pid": 999999})["friendly"]
+
+    def test_log_file_written(self, tool, tmp_path):
+        pid = _run_job(tool, "echo logged")
+        time.sleep(0.1)
+        assert (tmp_path / ".aicoder" / "jobs" / f"{pid}.log").read_text() == "logged\n"
+
+
+class TestHistoryBounds:
+    def test_completed_history_capped(self, tool, monkeypatch):
+        monkeypatch.setattr(bg_jobs, "MAX_JOB_LOGS", 3)
+        pids = [_run_job(tool, f"echo job{i}") for i in range(5)]
+        for pid in pids[:2]:
+            assert "No job" in tool({"action": "tail", "pid": pid})["friendly"]
+        for i, pid in enumerate(pids[2:], 2):
+            assert f"job{i}" in tool({"action": "tail", "pid": pid})["detailed"]
+
+    def test_prune_keeps_running_job_log(self, tool, tmp_path, monkeypatch):
+        monkeypatch.setattr(bg_jobs, "MAX_JOB_LOGS", 2)
+        result = tool({"action": "run", "name": "quiet", "command": "sleep 30"})
+        quiet = int(result["detailed"].split("PID: ")[1].split("\n")[0])
+        log = tmp_path / ".aicoder" / "jobs" / f"{quiet}.log"
+        deadline = time.time() + 5
+        while not log.exists() and time.time() < deadline:
+            time.sleep(0.01)
+        os.utime(log, (0, 0))  # Older than any finished job's log
+        for i in range(3):
+            _run_job(tool, f"echo job{i}")
+        assert log.exists()
+        logs = os.listdir(tmp_path / ".aicoder" / "jobs")
+        assert len(logs) <= 2
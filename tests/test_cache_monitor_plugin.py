@@ -0,0 +1,141 @@
+"""Test cache_monitor's incremental message hashing against a real MessageHistory"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from aicoder.core.message_history import MessageHistory
+from aicoder.core.stats import Stats
+from aicoder.plugins import cache_monitor as cm
+
+
+class FakePlugins:
+    """Just enough of PluginSystem for MessageHistory and create_plugin"""
+
+    def __init__(self):
+        self.hooks = {}
+
+    def register_hook(self, event, handler):
+        self.hooks.setdefault(event, []).append(handler)
+
+    def register_command(self, *args):
+        pass
+
+    def dispatcher(self, event):
+        return SimpleNamespace(fire=lambda *args: self.call_hooks(event, *args))
+
+    def call_hooks(self, event, *args):
+        for handler in self.hooks.get(event, []):
+            handler(*args)
+
+
+@pytest.fixture
+def history(monkeypatch):
+    monkeypatch.setenv("CACHE_MONITOR", "1")
+    monkeypatch.setattr(cm, "_enabled", True)
+    history = MessageHistory(Stats())
+    plugins = FakePlugins()
+    plugins.app = SimpleNamespace(message_history=history)
+    cm.create_plugin(plugins)
+    history.set_plugin_system(plugins)
+    history.add_system_message("system")
+    yield history
+    cm._app = None
+
+
+@pytest.fixture
+def hashed(monkeypatch):
+    """Messages passed to _hash_message, in call order"""
+    calls = []
+    original = cm._hash_message
+
+    def counting(msg):
+        calls.append(msg)
+        return original(msg)
+
+    monkeypatch.setattr(cm, "_hash_message", counting)
+    return calls
+
+
+def add_tool_round(history, call_id, content="x" * 1000):
+    history.add_assistant_message({"content": "", "tool_calls": [{"id": call_id, "function": {"name": "t"}}]})
+    history.add_tool_results([{"tool_call_id": call_id, "content": content}])
+
+
+class TestIncrementalHashing:
+    def test_each_message_hashed_once_across_turns(self, history, hashed, capsys):
+        for turn in range(5):
+            history.add_user_message(f"question {turn}")
+            add_tool_round(history, f"call-{turn}")
+            cm._on_before_ai()
+
+        assert len(hashed) == len(history.messages)
+        assert len({id(msg) for msg in hashed}) == len(hashed)
+        assert "MESSAGE INTEGRITY" not in capsys.readouterr().out
+        assert cm._first_changed is None
+
+    def test_edits_by_later_add_hooks_are_not_changes(self, history, capsys):
+        """Plugins like tools_compact edit a message in the add hook, after cache_monitor"""
+        def promote_reasoning(message):
+            if not message.get("content"):
+                message["content"] = message.pop("reasoning_content", "")
+
+        history._plugin_system.register_hook("after_assistant_message_added", promote_reasoning)
+        history.add_user_message("question")
+        history.add_assistant_message({"content": "", "reasoning_content": "thought"})
+        cm._on_before_ai()
+        history.add_user_message("next")
+        cm._on_before_ai()
+
+        assert "MESSAGE INTEGRITY" not in capsys.readouterr().out
+        assert cm._verify() == []
+
+    def test_in_place_edit_reports_first_divergent_index(self, history, capsys):
+        history.add_user_message("question")
+        add_tool_round(history, "call-1")
+        add_tool_round(history, "call-2")
+        cm._on_before_ai()
+
+        history.prune_oldest_tool_results(1)  # The tool result at index 3
+        cm._on_before_ai()
+
+        out = capsys.readouterr().out
+        assert "first divergence: msg[3]" in out
+        assert "msg[3]: CHANGED (role=tool)" in out
+        assert "msg[5]" not in out
+        assert cm._msg_changed_this_turn is True
+        assert cm._changed_at() == " at msg[3]"
+
+        cm._on_before_ai()  # Reported once, then tracked again
+        assert "MESSAGE INTEGRITY" not in capsys.readouterr().out
+
+    def test_insertion_shifts_from_its_index(self, history, capsys):
+        history.add_user_message("question")
+        history.add_assistant_message({"content": "answer"})
+        history.add_assistant_message({"content": "", "tool_calls": [{"id": "open"}]})
+        cm._on_before_ai()
+
+        history.insert_user_message_at_appropriate_position("interjection")
+        cm._on_before_ai()
+
+        out = capsys.readouterr().out
+        assert "first divergence: msg[3]" in out
+        assert "msg[2]" not in out
+
+    def test_verify_catches_edits_outside_the_history(self, history, capsys):
+        history.add_user_message("question")
+        cm._on_before_ai()
+
+        history.messages[1]["content"] = "rewritten by a plugin"
+        cm._on_before_ai()
+        assert "MESSAGE INTEGRITY" not in capsys.readouterr().out  # Not seen per turn
+
+        cm._handle_command("verify")
+        assert "msg[1]" in capsys.readouterr().out
+        assert cm._verify() == []
+
+    def test_session_change_forgets_hashes(self, history):
+        history.add_user_message("question")
+        cm._on_before_ai()
+        cm._on_session_change()
+        assert cm._message_hashes == [] and cm._hash_cache == {} and cm._tracked_ids == []
@@ -546,3 +546,95 @@ class TestConfigPluginsAllow:
         monkeypatch.setenv("PLUGINS_ALLOW", "")
         result = config.Config.plugins_allow()
         assert result is None  # Empty string = not set = all plugins allowed
+
+
+class TestConfigSnapshot:
+    """Tests for the cached config snapshot and invalidation"""
+
+    def test_snapshot_cached_until_invalidated(self, monkeypatch):
+        """Test snapshot is built once and rebuilt after invalidate"""
+        monkeypatch.setenv("AICODER_RETRY_STATUS_CODES", "429,503")
+        config.Config.invalidate()
+        snap = config.Config.snapshot()
+        assert snap is config.Config.snapshot()
+        assert snap.retry_status_codes == frozenset({429, 503})
+
+        monkeypatch.setenv("AICODER_RETRY_STATUS_CODES", "500")
+        assert config.Config.snapshot().retry_status_codes == frozenset({429, 503})
+        config.Config.invalidate()
+        assert config.Config.snapshot().retry_status_codes == frozenset({500})
+
+    def test_snapshot_is_immutable(self):
+        """Test snapshot attributes can't be assigned"""
+        snap = config.Config.snapshot()
+        with pytest.raises(AttributeError):
+            snap.debug = True
+        with pytest.raises(TypeError):
+            snap.http_headers["X"] = "y"
+
+    def test_snapshot_parsed_values(self, monkeypatch):
+        """Test snapshot holds the same values as the getters"""
+        monkeypatch.setenv("TOOLS_ALLOW", "read_file,grep")
+        monkeypatch.setenv("TOOLS_DENY", "grep")
+        monkeypatch.setenv("AICODER_HTTP_HEADERS", "X-A: 1\nX-B: 2")
+        monkeypatch.setenv("AICODER_REASONING_FIELD", "reasoning")
+        config.Config.invalidate()
+        snap = config.Config.snapshot()
+        assert snap.tools_allow == {"read_file", "grep"}
+        assert snap.tools_deny == {"grep"}
+        assert dict(snap.http_headers) == {"X-A": "1", "X-B": "2"}
+        assert snap.reasoning_field == "reasoning"
+        assert snap.reasoning_fields == ("reasoning",)
+
+    def test_reasoning_fields_default_to_guess_list(self, monkeypatch):
+        """Test reasoning_fields falls back to the possible fields"""
+        monkeypatch.delenv("AICODER_REASONING_FIELD", raising=False)
+        monkeypatch.delenv("AICODER_REASONING_POSSIBLE_FIELDS", raising=False)
+        config.Config.invalidate()
+        snap = config.Config.snapshot()
+        assert snap.reasoning_field is None
+        assert snap.reasoning_fields == tuple(config.Config.REASONING_FIELDS_DEFAULT)
+
+    def test_runtime_setters_invalidate(self):
+        """Test runtime setters rebuild the snapshot"""
+        original_debug = config.Config.debug()
+        try:
+            config.Config.set_runtime_max_retries(3)
+            assert config.Config.snapshot().max_retries == 3
+            config.Config.set_debug(not original_debug)
+            assert config.Config.snapshot().debug is (not original_debug)
+        finally:
+            config.Config.set_runtime_max_retries(None)
+            config.Config.set_debug(original_debug)
+
+    def test_set_env_sets_removes_and_notifies(self, monkeypatch):
+        """Test set_env updates os.environ and runs change listeners"""
+        monkeypatch.setenv("TOOLS_DENY", "grep")
+        calls = []
+        listener = lambda: calls.append(config.Config.snapshot().tools_deny)
+        config.Config.on_change(listener)
+        try:
+            config.Config.set_env({"TOOLS_DENY": "write_file", "TOOLS_ALLOW": None})
+            assert os.environ["TOOLS_DENY"] == "write_file"
+            assert "TOOLS_ALLOW" not in os.environ
+            assert calls == [frozenset({"write_file"})]
+        finally:
+            config.Config.remove_change_listener(listener)
+        config.Config.invalidate()
+        assert len(calls) == 1
+
+    def test_failing_listener_does_not_break_invalidate(self, capsys):
+        """Test a raising listener is logged and others still run"""
+        calls = []
+
+        def bad():
+            raise RuntimeError("boom")
+
+        config.Config.on_change(bad)
+        config.Config.on_change(lambda: calls.append(1))
+        try:
+            config.Config.invalidate()
+        finally:
+            config.Config._change_listeners.clear()
+        assert calls == [1]
+        assert "boom" in capsys.readouterr().err
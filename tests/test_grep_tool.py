@@ -2,13 +2,25 @@
 Test grep tool module
 """
 
+import os
 import pytest
 import subprocess
 from unittest.mock import patch, Mock
+from aicoder.tools.internal import grep
 from aicoder.tools.internal.grep import validateArguments, formatArguments, execute, _has_ripgrep, _check_sandbox
 from aicoder.core.config import Config
 
 
+@pytest.fixture(autouse=True)
+def ripgrep_engine(monkeypatch):
+    """Run against the rg engine (mocked) with an empty result cache"""
+    monkeypatch.delenv("AICODER_GREP_ENGINE", raising=False)
+    monkeypatch.setattr(grep, "_rg_available", True)
+    grep.clear_cache()
+    yield
+    grep.clear_cache()
+
+
 class TestValidateArguments:
     """Test argument validation"""
 
@@ -171,7 +183,21 @@ class TestExecute:
             assert result["tool"] == "grep"
             assert "timed out" in result["friendly"].lower()
 
-    def test_ripgrep_not_found(self):
+    def test_ripgrep_not_found(self, tmp_path):
+        (tmp_path / "a.txt").write_text("a test line\n")
+        with patch.object(Config, 'sandbox_disabled', return_value=True), \
+             patch('aicoder.tools.internal.grep.subprocess.run', side_effect=FileNotFoundError("rg not found")):
+            
+            result = execute({"text": "test", "path": str(tmp_path)})
+            
+            # Falls back to the builtin engine and remembers rg is missing
+            assert result["tool"] == "grep"
+            assert "Found 1 matches" in result["friendly"]
+            assert "(builtin grep)" in result["detailed"]
+            assert grep._rg_available is False
+
+    def test_ripgrep_forced_but_missing(self, monkeypatch):
+        monkeypatch.setenv("AICODER_GREP_ENGINE", "rg")
         with patch.object(Config, 'sandbox_disabled', return_value=True), \
              patch('aicoder.tools.internal.grep.subprocess.run', side_effect=FileNotFoundError("rg not found")):
             
@@ -214,6 +240,133 @@ class TestExecute:
             assert kwargs["timeout"] == 30
 
 
+class TestBuiltinEngine:
+    """Test the pure-Python fallback engine"""
+
+    @pytest.fixture
+    def tree(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("AICODER_GREP_ENGINE", "python")
+        (tmp_path / "src").mkdir()
+        (tmp_path / "src" / "a.py").write_text("one\ntwo\nneedle here\nthree\nfour\nfive\nsix\nneedle again\n")
+        (tmp_path / "b.txt").write_text("no match\n")
+        (tmp_path / "node_modules").mkdir()
+        (tmp_path / "node_modules" / "x.js").write_text("needle\n")
+        (tmp_path / ".hidden").write_text("needle\n")
+        (tmp_path / "bin.dat").write_bytes(b"needle\0\n")
+        return tmp_path
+
+    def _search(self, args):
+        with patch.object(Config, 'sandbox_disabled', return_value=True):
+            return execute(args)
+
+    def test_rg_compatible_output(self, tree):
+        result = self._search({"text": "needle", "path": str(tree), "context": 1})
+        a = tree / "src" / "a.py"
+        expected = [
+            f"{a}-2-two",
+            f"{a}:3:needle here",
+            f"{a}-4-three",
+            "--",
+            f"{a}-7-six",
+            f"{a}:8:needle again",
+        ]
+        assert result["detailed"].endswith("Matches:\n" + "\n".join(expected))
+        assert "Found 6 matches" in result["friendly"]
+
+    def test_skips_ignored_hidden_and_binary(self, tree):
+        result = self._search({"text": "needle", "path": str(tree), "context": 0})
+        assert "node_modules" not in result["detailed"]
+        assert ".hidden" not in result["detailed"]
+        assert "bin.dat" not in result["detailed"]
+
+    def test_max_count_is_per_file(self, tree):
+        result = self._search({"text": "needle", "path": str(tree), "context": 0, "max_results": 1})
+        assert "needle here" in result["detailed"]
+        assert "needle again" not in result["detailed"]
+
+    def test_single_file_omits_name(self, tree):
+        result = self._search({"text": "needle", "path": str(tree / "src" / "a.py"), "context": 0})
+        assert result["detailed"].endswith("Matches:\n3:needle here\n8:needle again")
+
+    def test_regex(self, tree):
+        result = self._search({"text": r"needle\s+a\w+", "path": str(tree), "context": 0})
+        assert "Found 1 matches" in result["friendly"]
+
+    def test_invalid_regex(self, tree):
+        result = self._search({"text": "needle(", "path": str(tree)})
+        assert "invalid regex" in result["friendly"]
+
+
+class TestSearchCache:
+    """Test the mtime-validated result cache"""
+
+    def test_identical_search_is_cached(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("AICODER_GREP_ENGINE", "python")
+        (tmp_path / "a.txt").write_text("needle\n")
+        with patch.object(Config, 'sandbox_disabled', return_value=True), \
+             patch('aicoder.tools.internal.grep._native_search', wraps=grep._native_search) as native:
+            first = execute({"text": "needle", "path": str(tmp_path)})
+            second = execute({"text": "needle", "path": str(tmp_path)})
+        assert first == second
+        assert native.call_count == 1
+
+    def test_file_change_invalidates(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("AICODER_GREP_ENGINE", "python")
+        target = tmp_path / "a.txt"
+        target.write_text("needle\n")
+        with patch.object(Config, 'sandbox_disabled', return_value=True):
+            execute({"text": "needle", "path": str(tmp_path)})
+            target.write_text("needle\nneedle twice\n")
+            os.utime(target, ns=(1, 1))
+            result = execute({"text": "needle", "path": str(tmp_path)})
+        assert "needle twice" in result["detailed"]
+
+    def test_new_file_invalidates(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("AICODER_GREP_ENGINE", "python")
+        (tmp_path / "a.txt").write_text("needle\n")
+        with patch.object(Config, 'sandbox_disabled', return_value=True):
+            execute({"text": "needle", "path": str(tmp_path)})
+            (tmp_path / "b.txt").write_text("needle\n")
+            result = execute({"text": "needle", "path": str(tmp_path)})
+        assert "b.txt" in result["detailed"]
+
+    def test_ripgrep_results_not_cached(self, tmp_path, ripgrep_engine):
+        """
+        Deliberately uncached: rg searches paths scan_files skips, so its
+        signature can't vouch for rg output; identical searches rerun rg
+        """
+        (tmp_path / "a.txt").write_text("needle\n")
+        mock_result = Mock(returncode=0, stdout="a.txt:1:needle\n")
+        with patch.object(Config, 'sandbox_disabled', return_value=True), \
+             patch('aicoder.tools.internal.grep.subprocess.run', return_value=mock_result) as run, \
+             patch('aicoder.tools.internal.grep.scan_files') as scan:
+            execute({"text": "needle", "path": str(tmp_path)})
+            execute({"text": "needle", "path": str(tmp_path)})
+        assert run.call_count == 2
+        scan.assert_not_called()
+        assert len(grep._search_cache) == 0
+
+    def test_ripgrep_reruns_on_identical_search(self, tmp_path, ripgrep_engine):
+        """Each rg run's own output is returned, even for the same arguments"""
+        first = Mock(returncode=0, stdout="a.txt:1:needle\n")
+        second = Mock(returncode=0, stdout="b.txt:1:needle\n")
+        with patch.object(Config, 'sandbox_disabled', return_value=True), \
+             patch('aicoder.tools.internal.grep.subprocess.run', side_effect=[first, second]):
+            assert "a.txt" in execute({"text": "needle", "path": str(tmp_path)})["detailed"]
+            result = execute({"text": "needle", "path": str(tmp_path)})
+        assert "b.txt:1:needle" in result["detailed"]
+        assert "a.txt" not in result["detailed"].split("Matches:")[1]
+
+    def test_cache_is_bounded(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("AICODER_GREP_ENGINE", "python")
+        monkeypatch.setattr(grep, "MAX_CACHED_SEARCHES", 2)
+        (tmp_path / "a.txt").write_text("x\n")
+        with patch.object(Config, 'sandbox_disabled', return_value=True):
+            for text in ("a", "b", "c"):
+                execute({"text": text, "path": str(tmp_path)})
+        assert len(grep._search_cache) == 2
+
+
 class TestToolDefinition:
     """Test TOOL_DEFINITION structure"""
 
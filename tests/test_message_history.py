@@ -547,38 +547,54 @@ def test_set_plugin_system(message_history):
     assert message_history._plugin_system is mock_plugin_system
 
 
+def _hook_mocks(plugin_system):
+    """Give each event its own dispatcher mock, keyed by event name"""
+    hooks = {}
+    plugin_system.dispatcher.side_effect = lambda event: hooks.setdefault(event, MagicMock())
+    return hooks
+
+
+def _fired(hooks):
+    """Events whose dispatcher fired"""
+    return sorted(event for event, hook in hooks.items() if hook.fire.called)
+
+
 def test_add_user_message_calls_hook(message_history):
     """Test that user message addition triggers hook"""
     mock_plugin_system = MagicMock()
+    hooks = _hook_mocks(mock_plugin_system)
     message_history.set_plugin_system(mock_plugin_system)
 
     message_history.add_user_message("Test message")
 
-    mock_plugin_system.call_hooks.assert_called_once()
-    call_args = mock_plugin_system.call_hooks.call_args
-    assert call_args[0][0] == "after_user_message_added"
+    assert _fired(hooks) == ["after_user_message_added"]
+    hooks["after_user_message_added"].fire.assert_called_once()
 
 
 def test_add_assistant_message_calls_hook(message_history):
     """Test that assistant message addition triggers hook"""
     mock_plugin_system = MagicMock()
+    hooks = _hook_mocks(mock_plugin_system)
     message_history.set_plugin_system(mock_plugin_system)
 
     message_history.add_assistant_message({"role": "assistant", "content": "Test"})
 
-    mock_plugin_system.call_hooks.assert_called_once()
+    assert _fired(hooks) == ["after_assistant_message_added"]
+    hooks["after_assistant_message_added"].fire.assert_called_once()
 
 
 def test_add_tool_results_calls_hook(message_history):
     """Test that tool results addition triggers hook"""
     mock_plugin_system = MagicMock()
+    hooks = _hook_mocks(mock_plugin_system)
     _add_tool_calls(message_history, ["call_1"])  # seed parent BEFORE hook attaches
     message_history.set_plugin_system(mock_plugin_system)
 
     message_history.add_tool_results([{"tool_call_id": "call_1", "content": "Result"}])
 
     # Should be called once for the tool result
-    assert mock_plugin_system.call_hooks.call_count == 1
+    assert _fired(hooks) == ["after_tool_results_added"]
+    assert hooks["after_tool_results_added"].fire.call_count == 1
 
 
 def test_set_messages_calls_hook(message_history):
@@ -853,3 +869,62 @@ class TestToolResultInsertPosition:
         tool_results = [msg for msg in message_history.messages if msg.get("role") == "tool"]
         assert len(tool_results) == 1
         assert tool_results[0]["tool_call_id"] == "valid_call"
+
+
+class TestMessageSeq:
+    """Monotonic per-message sequence numbers for cursor reads"""
+
+    def test_seqs_follow_history_order(self, message_history):
+        message_history.add_system_message("System")
+        message_history.add_user_message("Hello")
+        pairs = message_history.get_messages_with_seq()
+        assert [seq for seq, _ in pairs] == [1, 2]
+        assert [msg["content"] for _, msg in pairs] == ["System", "Hello"]
+        assert message_history.last_seq == 2
+
+    def test_seqs_are_stable_and_only_new_messages_are_returned(self, message_history):
+        message_history.add_user_message("one")
+        message_history.get_messages_with_seq()
+        message_history.add_user_message("two")
+        assert [msg["content"] for _, msg in message_history.get_messages_since(1)] == ["two"]
+        assert message_history.get_messages_since(2) == []
+
+    def test_seqs_survive_set_messages_and_never_repeat(self, message_history):
+        message_history.add_user_message("keep")
+        message_history.add_user_message("drop")
+        keep_seq = message_history.get_messages_with_seq()[0][0]
+
+        message_history.set_messages([message_history.messages[0], {"role": "user", "content": "summary"}])
+        pairs = message_history.get_messages_with_seq()
+        assert pairs[0][0] == keep_seq
+        assert pairs[1][0] == 3
+        # Messages that left the history are forgotten
+        assert len(message_history._seqs) == 2
+
+    def test_concurrent_readers_while_messages_are_inserted(self, message_history):
+        """Socket readers run while the agent thread inserts: one seq per message"""
+        import threading
+
+        message_history.messages.extend({"role": "user", "content": str(i)} for i in range(200))
+        done = threading.Event()
+        seen = {}
+        errors = []
+
+        def read():
+            while not done.is_set():
+                pairs = message_history.get_messages_with_seq()
+                if len({id(msg) for _, msg in pairs}) != len(pairs):
+                    errors.append("message read twice in one snapshot")
+                for seq, msg in pairs:
+                    if seen.setdefault(id(msg), seq) != seq:
+                        errors.append(f"{msg['content']} renumbered")
+
+        readers = [threading.Thread(target=read) for _ in range(2)]
+        for reader in readers:
+            reader.start()
+        for i in range(2000):
+            message_history.messages.insert(i % 7, {"role": "user", "content": f"new{i}"})
+        done.set()
+        for reader in readers:
+            reader.join()
+        assert errors == []
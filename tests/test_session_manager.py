@@ -536,3 +536,37 @@ class TestSessionManagerProcessWithAi:
             mock_prep.side_effect = Exception("Processing error")
             # Should not raise, error handled internally
             manager.process_with_ai()
+
+    def test_process_with_ai_fires_start_and_stop(self):
+        """Test processing start/stop hooks fire even when processing fails."""
+        mock_app = MagicMock()
+        manager = SessionManager(mock_app)
+
+        with patch.object(manager, '_prepare_for_processing', side_effect=Exception("boom")):
+            manager.process_with_ai()
+
+        fired = [c.args[0] for c in mock_app.plugin_system.fire.call_args_list]
+        assert fired == ["on_processing_start", "on_processing_stop"]
+
+    def test_process_with_ai_traces_turn(self, tmp_path):
+        """Test a traced turn records prepare/stream/tool spans with network timings."""
+        from aicoder.core import tracing
+        mock_app = MagicMock()
+        mock_app.stats.last_request_timings = {"phases_ms": {"connect": 1.5}, "ttft_ms": 20.0, "chunks": 3}
+        manager = SessionManager(mock_app)
+
+        with patch.object(tracing, "TRACE_DIR", str(tmp_path)), \
+                patch.object(manager, '_prepare_for_processing', return_value={"should_continue": True, "messages": []}), \
+                patch.object(manager, '_stream_response', return_value={"should_continue": True, "full_response": "hi", "accumulated_tool_calls": {}}), \
+                patch.object(manager, '_validate_and_process_tool_calls', return_value=(False, "text_content")), \
+                patch.object(manager, '_handle_post_processing'):
+            tracing.enable()
+            try:
+                manager.process_with_ai()
+            finally:
+                tracing.disable()
+
+        spans = {e["name"]: e for e in tracing.last_turn()["events"]}
+        assert {"process_with_ai", "startup_wait", "prepare", "stream_response", "tool_calls"} <= set(spans)
+        assert spans["stream_response"]["args"] == {"messages": 0, "connect_ms": 1.5, "ttft_ms": 20.0, "chunks": 3}
+        assert spans["process_with_ai"]["args"] == {"status": "text_content"}
@@ -721,56 +721,6 @@ class TestSocketServerExecuteCommandErrors:
         assert parsed["code"] == ERR_INTERNAL
 
 
-class TestSocketServerReadLine:
-    """Test _read_line method."""
-
-    @pytest.fixture
-    def server(self):
-        """Create a server."""
-        mock_aicoder = MockAICoder()
-        mock_aicoder.message_history = MockMessageHistory()
-        return SocketServer(mock_aicoder)
-
-    def test_read_line_empty(self, server):
-        """Test reading empty data returns None."""
-        import socket as sock
-        mock_sock = MagicMock()
-        mock_sock.recv.return_value = b""  # Empty data, no newline
-        result = server._read_line(mock_sock, timeout=1.0)
-        assert result is None
-
-    def test_read_line_with_newline(self, server):
-        """Test reading data with newline."""
-        import socket as sock
-        mock_sock = MagicMock()
-        mock_sock.recv.side_effect = [
-            b"hello world\n",
-            b""  # Empty to break loop
-        ]
-        result = server._read_line(mock_sock, timeout=1.0)
-        assert result == "hello world"
-
-
-class TestSocketServerSendLine:
-    """Test _send_line method."""
-
-    @pytest.fixture
-    def server(self):
-        """Create a server."""
-        mock_aicoder = MockAICoder()
-        mock_aicoder.message_history = MockMessageHistory()
-        return SocketServer(mock_aicoder)
-
-    def test_send_line_success(self, server):
-        """Test sending a line successfully."""
-        import socket as sock
-        mock_sock = MagicMock()
-        server._send_line(mock_sock, '{"status":"success"}')
-        mock_sock.sendall.assert_called_once()
-        call_args = mock_sock.sendall.call_args[0][0]
-        assert b'\n' in call_args
-
-
 class TestSocketServerDetailToggle:
     """Test detail toggle."""
 
@@ -978,69 +928,3 @@ class TestSocketServerExecuteCommandWithArgs:
         parsed = json.loads(result)
         assert parsed["status"] == "success"
         assert parsed["data"]["enabled"] is True
-
-
-class TestSocketServerReadLineTimeout:
-    """Test _read_line with timeout scenarios."""
-
-    @pytest.fixture
-    def server(self):
-        """Create a server."""
-        mock_aicoder = MockAICoder()
-        mock_aicoder.message_history = MockMessageHistory()
-        return SocketServer(mock_aicoder)
-
-    def test_read_line_timeout_exception(self, server):
-        """Test _read_line handles socket.timeout."""
-        import socket as sock
-        mock_sock = MagicMock()
-        mock_sock.recv.side_effect = socket.timeout("timed out")
-        result = server._read_line(mock_sock, timeout=1.0)
-        assert result is None
-
-
-class TestSocketServerSendLineError:
-    """Test _send_line error handling."""
-
-    @pytest.fixture
-    def server(self):
-        """Create a server."""
-        mock_aicoder = MockAICoder()
-        mock_aicoder.message_history = MockMessageHistory()
-        return SocketServer(mock_aicoder)
-
-    @patch('aicoder.core.socket_server.LogUtils.warn')
-    def test_send_line_handles_exception(self, mock_warn, server):
-        """Test _send_line handles send errors gracefully."""
-        import socket as sock
-        mock_sock = MagicMock()
-        mock_sock.sendall.side_effect = OSError("Broken pipe")
-        # Should not raise
-        server._send_line(mock_sock, '{"status":"success"}')
-
-
-class TestSocketServerHandleClient:
-    """Test _handle_client method."""
-
-    @pytest.fixture
-    def server(self):
-        """Create a server."""
-        mock_aicoder = MockAICoder()
-        mock_aicoder.message_history = MockMessageHistory()
-        return SocketServer(mock_aicoder)
-
-    def test_handle_client_empty_command(self, server):
-        """Test _handle_client with empty command."""
-        mock_client = MagicMock()
-        mock_client.recv.return_value = b""  # Empty command
-        server._handle_client(mock_client)
-        # Should send error and close
-        mock_client.sendall.assert_called()
-
-    def test_handle_client_exception(self, server):
-        """Test _handle_client handles exceptions."""
-        mock_client = MagicMock()
-        mock_client.recv.side_effect = Exception("Test error")
-        server._handle_client(mock_client)
-        # Should send error response
-        mock_client.sendall.assert_called()
@@ -3,6 +3,8 @@ Test Stats class
 Tests for
 """
 
+from unittest.mock import patch
+
 from aicoder.core.stats import Stats
 
 # Type definitions are now dicts
@@ -131,3 +133,54 @@ def test_print_stats(capsys):
     assert "Messages Sent: 1" in output
     assert "Final Context Size: 500 (estimated)" in output
     assert "========================" in output
+
+
+def test_histogram_percentiles_within_one_bucket():
+    """Test log-bucket percentiles stay within ~19% of the exact value"""
+    from aicoder.core.stats import Histogram
+
+    hist = Histogram()
+    for value in range(1, 1001):
+        hist.add(float(value))
+    assert hist.count == 1000
+    assert 500 <= hist.percentile(50) <= 500 * 1.19
+    assert 990 <= hist.percentile(99) <= 1000
+    assert hist.percentile(100) == 1000
+    assert len(hist.counts) == Histogram.NUM_BUCKETS
+
+    other = Histogram()
+    other.add(5000.0)
+    hist.merge(other)
+    assert hist.count == 1001
+    assert hist.max == 5000.0
+    assert Histogram().percentile(50) == 0.0
+
+
+def test_record_request_timings():
+    """Test per-request latency feeds the session histograms"""
+    from aicoder.core.stats import RequestTimings
+
+    stats = Stats()
+    timings = RequestTimings()
+    timings.start = 100.0
+    timings.marks = {"connect": 100.01, "first_byte": 100.2, "first_token": 100.5}
+    timings.chunk()
+    timings.chunk()
+
+    with patch("time.perf_counter", return_value=102.5):
+        summary = stats.record_request_timings(timings, completion_tokens=100)
+
+    assert summary["ttft_ms"] == 500.0
+    assert summary["phases_ms"]["end"] == 2500.0
+    assert summary["tokens_per_sec"] == 50.0
+    assert summary["chunks"] == 2
+    assert stats.ttft_ms.count == 1
+    assert stats.tokens_per_sec.count == 1
+    assert stats.chunk_gap_ms.count == 1
+    assert stats.last_request_timings is summary
+    assert any("TTFT" in line for line in stats.format_latency())
+
+    stats.reset()
+    assert stats.ttft_ms.count == 0
+    assert stats.last_request_timings is None
+    assert stats.format_latency() == []
@@ -0,0 +1,154 @@
+"""Test stats_logger's background shipper (batching, legacy servers, spool replay)
+
+Never point these at the real stats_server or ~/.aicoder/central_stats.log:
+every test uses its own socket and spool dir under tmp_path with
+STATS_FALLBACK_FILE=0.
+"""
+
+import json
+import os
+import socket
+import threading
+import time
+
+import pytest
+
+from aicoder.plugins import stats_logger as sl
+
+
+class FakeServer:
+    """stats_server stand-in: "ok" per line, or one line per connection (legacy)"""
+
+    def __init__(self, path, legacy=False):
+        self.path = path
+        self.legacy = legacy
+        self.lines = []
+        self.connections = 0
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.bind(path)
+        self._sock.listen(16)
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def _serve(self):
+        while True:
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                return
+            self.connections += 1
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _handle(self, conn):
+        with conn:
+            buf = b""
+            while True:
+                data = conn.recv(65536)
+                if not data:
+                    return
+                buf += data
+                while b"\n" in buf:
+                    line, buf = buf.split(b"\n", 1)
+                    self.lines.append(json.loads(line))
+                    conn.sendall(b"ok\n")
+                    if self.legacy:
+                        return  # Old builds close after the first line
+
+    def close(self):
+        self._sock.close()
+        os.unlink(self.path)
+
+
+@pytest.fixture
+def paths(tmp_path, monkeypatch):
+    monkeypatch.setenv("STATS_FALLBACK_FILE", "0")
+    return str(tmp_path / "stats.sock"), str(tmp_path / "spool")
+
+
+def submit_all(shipper, count, start=0):
+    for i in range(start, start + count):
+        shipper.submit(json.dumps({"i": i}) + "\n")
+
+
+class TestStatsShipper:
+    def test_batches_over_one_connection(self, paths):
+        server = FakeServer(paths[0])
+        shipper = sl.StatsShipper(*paths)
+        submit_all(shipper, 300)
+        shipper.close(timeout=5)
+        server.close()
+
+        assert [line["i"] for line in server.lines] == list(range(300))
+        assert server.connections == 1
+        assert shipper.spooled == 0
+
+    def test_legacy_server_gets_one_line_per_connection(self, paths):
+        server = FakeServer(paths[0], legacy=True)
+        shipper = sl.StatsShipper(*paths)
+        submit_all(shipper, 20)
+        shipper.close(timeout=5)
+        server.close()
+
+        assert [line["i"] for line in server.lines] == list(range(20))  # No duplicates
+        assert shipper._legacy is True
+
+    def test_spools_while_down_and_replays_in_order(self, paths, monkeypatch):
+        monkeypatch.setattr(sl, "BACKOFF_MIN", 0.05)
+        shipper = sl.StatsShipper(*paths)
+        submit_all(shipper, 10)
+        deadline = time.time() + 5
+        while shipper.spooled < 10 and time.time() < deadline:
+            time.sleep(0.01)
+        assert shipper.spooled == 10
+
+        server = FakeServer(paths[0])
+        time.sleep(0.1)  # Past the backoff
+        submit_all(shipper, 5, start=10)
+        shipper.close(timeout=5)
+        server.close()
+
+        assert [line["i"] for line in server.lines] == list(range(15))
+        assert [name for name in os.listdir(paths[1]) if name.endswith(".jsonl")] == []
+
+    def test_hung_server_never_blocks_submit(self, paths, monkeypatch):
+        monkeypatch.setattr(sl, "REPLY_TIMEOUT", 0.2)
+        hung = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        hung.bind(paths[0])
+        hung.listen(1)
+        shipper = sl.StatsShipper(*paths)
+
+        start = time.perf_counter()
+        submit_all(shipper, 50)
+        assert time.perf_counter() - start < 0.1
+        shipper.close(timeout=2)
+        hung.close()
+
+        with open(os.path.join(paths[1], os.listdir(paths[1])[0])) as f:
+            assert len(f.readlines()) == 50
+
+    def test_replays_spool_of_exited_process(self, paths):
+        os.makedirs(paths[1])
+        with open(os.path.join(paths[1], "999999999-1.jsonl"), "w") as f:
+            f.write('{"i": 0}\n{"i": 1}\n')
+        server = FakeServer(paths[0])
+        shipper = sl.StatsShipper(*paths)
+        submit_all(shipper, 1, start=2)
+        shipper.close(timeout=5)
+        server.close()
+
+        assert [line["i"] for line in server.lines] == [0, 1, 2]
+        assert os.listdir(paths[1]) == []
+
+    def test_spool_is_capped_dropping_oldest(self, paths, monkeypatch):
+        monkeypatch.setattr(sl, "SPOOL_MAX_BYTES", 1000)
+        shipper = sl.StatsShipper(*paths)
+        shipper.close()  # Everything submitted from now on is spooled
+        submit_all(shipper, 200)
+
+        with open(shipper._spool_path) as f:
+            spooled = [json.loads(line)["i"] for line in f]
+        assert os.path.getsize(shipper._spool_path) <= 1000
+        assert spooled == list(range(200 - len(spooled), 200))  # Newest, in order
+        assert shipper.spooled == 200
+        assert shipper.spool_dropped == 200 - len(spooled)
+        assert os.listdir(paths[1]) == [os.path.basename(shipper._spool_path)]
@@ -806,6 +806,28 @@ class TestHandleStreamingResponse:
         assert len(result) == 1
         assert result[0]["choices"][0]["delta"]["content"] == "Hello"
 
+    def test_marks_first_tokens_and_chunk_gaps(self):
+        """Test request timings get first token/content/tool-call marks per chunk"""
+        from aicoder.core.stats import RequestTimings
+
+        client = StreamingClient()
+        client._request_timings = timings = RequestTimings()
+        mock_response = Mock()
+        mock_response.readline.side_effect = [
+            b"data: {\"choices\":[{\"delta\":{\"reasoning_content\":\"hmm\"}}]}\n",
+            b"data: {\"choices\":[{\"delta\":{\"content\":\"Hi\"}}]}\n",
+            b"data: {\"choices\":[{\"delta\":{\"tool_calls\":[{\"index\":0,\"id\":\"c1\"}]}}]}\n",
+            b"data: [DONE]\n",
+            b"",
+        ]
+
+        with patch.object(Config, 'debug', return_value=False):
+            list(client._handle_streaming_response(mock_response))
+
+        marks = timings.marks
+        assert marks["first_token"] <= marks["first_content"] <= marks["first_tool_call"]
+        assert timings.gaps.count == 2
+
     def test_handles_multiple_chunks(self):
         """Test handling multiple data chunks"""
         client = StreamingClient()
@@ -14,6 +14,8 @@ from aicoder.core.commands.help import HelpCommand
 from aicoder.core.commands.save import SaveCommand
 from aicoder.core.commands.load import LoadCommand
 from aicoder.core.commands.stats import StatsCommand
+from aicoder.core.commands.trace import TraceCommand
+from aicoder.core.commands.profile import ProfileCommand
 
 class MockMessageHistory:
     """Mock MessageHistory for testing."""
@@ -648,3 +650,87 @@ class TestLoadCommand:
                     result = cmd.execute(["session.jsonl"])
                     assert result.should_quit is False
                     assert result.run_api_call is False
+
+
+class TestTraceCommand:
+    """Test TraceCommand."""
+
+    @pytest.fixture(autouse=True)
+    def trace_dir(self, tmp_path):
+        from aicoder.core import tracing
+        with patch.object(tracing, "TRACE_DIR", str(tmp_path)), patch.object(tracing, "_last", None):
+            yield
+        tracing.disable()
+
+    def test_on_off_toggles_hook_tracing(self, mock_context):
+        """Test trace on/off switches tracing and plugin hook spans."""
+        from aicoder.core import tracing
+        cmd = TraceCommand(mock_context)
+        assert cmd.get_name() == "trace"
+
+        cmd.execute(["on"])
+        assert tracing.enabled() is True
+        mock_context.command_handler.plugin_system.set_tracing.assert_called_with(True)
+
+        result = cmd.execute(["off"])
+        assert tracing.enabled() is False
+        mock_context.command_handler.plugin_system.set_tracing.assert_called_with(False)
+        assert result.should_quit is False
+        assert result.run_api_call is False
+
+    def test_last_prints_span_tree(self, mock_context, capsys):
+        """Test trace last shows the last turn and its file."""
+        from aicoder.core import tracing
+        cmd = TraceCommand(mock_context)
+        cmd.execute(["last"])
+        assert "No traced turn yet" in capsys.readouterr().out
+
+        cmd.execute(["on"])
+        with tracing.turn("process_with_ai"):
+            with tracing.span("stream_response"):
+                pass
+        cmd.execute(["last"])
+        out = capsys.readouterr().out
+        assert "process_with_ai" in out
+        assert "  stream_response" in out
+        assert tracing.last_turn()["path"] in out
+
+
+class TestProfileCommand:
+    """Test ProfileCommand."""
+
+    @pytest.fixture(autouse=True)
+    def profile_dir(self, tmp_path):
+        from aicoder.core import profiler
+        with patch.object(profiler, "PROFILE_DIR", str(tmp_path)):
+            yield
+            profiler.stop()
+
+    def test_start_stop_report(self, mock_context, capsys):
+        """Test sampling start/stop prints output files and report."""
+        cmd = ProfileCommand(mock_context)
+        assert cmd.get_name() == "profile"
+
+        cmd.execute(["start", "200"])
+        assert "200 Hz" in capsys.readouterr().out
+        cmd.execute(["start"])
+        assert "already running" in capsys.readouterr().err
+
+        cmd.execute(["stop"])
+        out = capsys.readouterr().out
+        assert "samples over" in out
+        assert ".collapsed" in out
+
+        result = cmd.execute(["report", "3"])
+        assert "self %" in capsys.readouterr().out
+        assert result.should_quit is False
+        assert result.run_api_call is False
+
+    def test_start_turn(self, mock_context, capsys):
+        """Test turn mode arms cProfile for the next turn."""
+        from aicoder.core import profiler
+        cmd = ProfileCommand(mock_context)
+        cmd.execute(["start", "turn"])
+        assert profiler.status()["mode"] == "turn"
+        cmd.execute([])
+        assert "armed for the next turn" in capsys.readouterr().out
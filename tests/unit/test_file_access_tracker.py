@@ -96,3 +96,31 @@ class TestFileAccessTracker:
         path = "/absolute/path/to/file.py"
         FileAccessTracker.record_read(path)
         assert FileAccessTracker.was_file_read(path) is True
+
+
+class TestSnapshots:
+    """Test content fingerprint tracking for unchanged re-reads"""
+
+    def setup_method(self):
+        FileAccessTracker.clear_state()
+
+    def teardown_method(self):
+        FileAccessTracker.clear_state()
+
+    def test_record_and_get_snapshot(self):
+        FileAccessTracker.record_snapshot("a.py", 0, 150, "fp", "hash", 42)
+        assert FileAccessTracker.get_snapshot("a.py", 0, 150) == ("fp", "hash", 42)
+        assert FileAccessTracker.get_snapshot("a.py", 10, 150) is None
+        assert FileAccessTracker.get_snapshot("b.py", 0, 150) is None
+
+    def test_unchanged_stats(self):
+        FileAccessTracker.record_unchanged_hit(100)
+        FileAccessTracker.record_unchanged_hit(-5)
+        assert FileAccessTracker.get_unchanged_stats() == (2, 100)
+
+    def test_clear_state_resets_snapshots(self):
+        FileAccessTracker.record_snapshot("a.py", 0, 150, "fp", "hash", 42)
+        FileAccessTracker.record_unchanged_hit(10)
+        FileAccessTracker.clear_state()
+        assert FileAccessTracker.get_snapshot("a.py", 0, 150) is None
+        assert FileAccessTracker.get_unchanged_stats() == (0, 0)
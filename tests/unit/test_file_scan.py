@@ -0,0 +1,89 @@
+"""
+Tests for the shared directory listing cache
+"""
+
+import os
+
+import pytest
+
+from aicoder.utils import file_scan
+from aicoder.utils.file_scan import list_dir, scan_files
+
+OLD_NS = 1_000_000_000_000_000_000  # 2001, outside the racy window
+
+
+@pytest.fixture(autouse=True)
+def clean_cache():
+    """Start every test with an empty cache"""
+    file_scan.clear_cache()
+    yield
+    file_scan.clear_cache()
+
+
+def _age(path):
+    """Backdate a directory so its listing is cacheable"""
+    os.utime(path, ns=(OLD_NS, OLD_NS))
+
+
+class TestListDir:
+    """Test cached directory listings"""
+
+    def test_listing_sorted_and_classified(self, tmp_path):
+        (tmp_path / "b.txt").write_text("")
+        (tmp_path / "a.txt").write_text("")
+        (tmp_path / "sub").mkdir()
+        os.symlink(tmp_path / "a.txt", tmp_path / "link.txt")
+
+        _, dirs, files, links = list_dir(str(tmp_path))
+        assert dirs == ["sub"]
+        assert files == ["a.txt", "b.txt", "link.txt"]
+        assert links == {"link.txt"}
+
+    def test_unchanged_dir_served_from_cache(self, tmp_path):
+        (tmp_path / "a.txt").write_text("")
+        _age(tmp_path)
+        list_dir(str(tmp_path))
+        list_dir(str(tmp_path))
+        assert file_scan.cache_stats()["hits"] == 1
+        assert file_scan.cache_stats()["misses"] == 1
+
+    def test_added_file_invalidates(self, tmp_path):
+        _age(tmp_path)
+        list_dir(str(tmp_path))
+        (tmp_path / "new.txt").write_text("")
+        assert "new.txt" in list_dir(str(tmp_path))[2]
+
+    def test_recently_modified_dir_not_cached(self, tmp_path):
+        (tmp_path / "a.txt").write_text("")
+        list_dir(str(tmp_path))
+        assert file_scan.cache_stats()["dirs"] == 0
+
+    def test_missing_dir(self, tmp_path):
+        assert list_dir(str(tmp_path / "missing")) is None
+
+
+class TestScanFiles:
+    """Test recursive scans on top of the listing cache"""
+
+    def test_skips_hidden_ignored_and_symlinks(self, tmp_path):
+        (tmp_path / "src").mkdir()
+        (tmp_path / "src" / "a.py").write_text("x")
+        (tmp_path / ".git").mkdir()
+        (tmp_path / ".git" / "config").write_text("")
+        (tmp_path / "node_modules").mkdir()
+        (tmp_path / "node_modules" / "m.js").write_text("")
+        os.symlink(tmp_path / "src" / "a.py", tmp_path / "link.py")
+
+        entries, _ = scan_files(str(tmp_path))
+        assert [e[0] for e in entries] == [str(tmp_path / "src" / "a.py")]
+
+    def test_signature_tracks_file_edits(self, tmp_path):
+        target = tmp_path / "a.py"
+        target.write_text("x")
+        _age(tmp_path)
+        _, before = scan_files(str(tmp_path))
+        target.write_text("changed")
+        os.utime(target, ns=(OLD_NS, OLD_NS + 1))
+        _, after = scan_files(str(tmp_path))
+        assert before != after
+        assert file_scan.cache_stats()["hits"] == 1
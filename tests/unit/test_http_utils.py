@@ -606,3 +606,43 @@ class TestResponseIntegration:
         assert line2 == b'line2\n'
         # After first split, remainder is stored in _content
         # Second readline reads the stored _content
+
+
+class TestFetchTimings:
+    """Test fetch marks connection phases on a timings object"""
+
+    def test_marks_phases_against_local_server(self):
+        import threading
+        from http.server import BaseHTTPRequestHandler, HTTPServer
+        from aicoder.core.stats import RequestTimings
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers["Content-Length"]))
+                body = b'{"ok": true}'
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = HTTPServer(("127.0.0.1", 0), Handler)
+        thread = threading.Thread(target=server.handle_request, daemon=True)
+        thread.start()
+        try:
+            timings = RequestTimings()
+            response = fetch(
+                f"http://127.0.0.1:{server.server_port}/v1",
+                {"method": "POST", "body": "{}", "timeout": 5, "timings": timings},
+            )
+            assert response.json() == {"ok": True}
+        finally:
+            thread.join(5)
+            server.server_close()
+
+        marks = timings.marks
+        assert "tls" not in marks
+        assert marks["dns"] <= marks["connect"] <= marks["request_sent"] <= marks["first_byte"]
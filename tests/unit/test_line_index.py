@@ -0,0 +1,113 @@
+"""Unit tests for the line-offset index."""
+
+import os
+
+import pytest
+
+from aicoder.utils import line_index
+from aicoder.utils.line_index import clear_cache, get_line_index, read_lines
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    """Start every test with an empty index cache."""
+    clear_cache()
+    yield
+    clear_cache()
+
+
+def _split_page(content: str, offset: int, limit: int):
+    lines = content.split("\n")
+    return lines[offset:offset + limit], len(lines)
+
+
+class TestReadLines:
+    """Test read_lines matches content.split semantics."""
+
+    @pytest.mark.parametrize("content", [
+        "",
+        "one line",
+        "a\nb\nc",
+        "a\nb\nc\n",
+        "\n\n\n",
+        "unicode é ✓\nsecond\n",
+    ])
+    def test_matches_split(self, tmp_path, content):
+        path = tmp_path / "f.txt"
+        path.write_bytes(content.encode("utf-8"))
+        for offset in range(0, 5):
+            for limit in (1, 2, 10):
+                assert read_lines(str(path), offset, limit) == _split_page(content, offset, limit)
+
+    def test_strips_crlf(self, tmp_path):
+        path = tmp_path / "f.txt"
+        path.write_bytes(b"a\r\nb\r\nc")
+        assert read_lines(str(path), 0, 10) == (["a", "b", "c"], 3)
+
+    @pytest.mark.parametrize("raw", [
+        b"a\rb\rc",
+        b"a\r\nb\rc\n",
+        b"\r\r\n\n\r",
+        b"old mac\rline\r",
+    ])
+    def test_matches_universal_newlines(self, tmp_path, raw):
+        """Same lines as the small-file path, which reads in text mode"""
+        path = tmp_path / "f.txt"
+        path.write_bytes(raw)
+        with open(path, "r", encoding="utf-8") as f:
+            content = f.read()
+        for offset in range(0, 5):
+            for limit in (1, 2, 10):
+                assert read_lines(str(path), offset, limit) == _split_page(content, offset, limit)
+
+    def test_pages_large_file(self, tmp_path):
+        path = tmp_path / "big.log"
+        path.write_text("".join(f"line {i}\n" for i in range(10000)))
+        lines, total = read_lines(str(path), 5000, 3)
+        assert lines == ["line 5000", "line 5001", "line 5002"]
+        assert total == 10001
+
+
+class TestIndexCache:
+    """Test the (path, mtime, size) cache."""
+
+    def test_reuses_index(self, tmp_path):
+        path = tmp_path / "f.txt"
+        path.write_text("a\nb\n")
+        assert get_line_index(str(path)) is get_line_index(str(path))
+
+    def test_rebuilds_on_change(self, tmp_path):
+        path = tmp_path / "f.txt"
+        path.write_text("a\nb\n")
+        first = get_line_index(str(path))
+        path.write_text("a\nb\nc\nd\n")
+        os.utime(path, ns=(1, 1))
+        second = get_line_index(str(path))
+        assert second is not first
+        assert read_lines(str(path), 2, 5) == (["c", "d", ""], 5)
+
+    def test_cache_is_bounded(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(line_index, "_MAX_CACHED_INDEXES", 2)
+        for i in range(4):
+            path = tmp_path / f"f{i}.txt"
+            path.write_text("x\n")
+            get_line_index(str(path))
+        assert len(line_index._index_cache) == 2
+
+    def test_concurrent_readers(self, tmp_path, monkeypatch):
+        """Batch reads page files from pool threads"""
+        from concurrent.futures import ThreadPoolExecutor
+        monkeypatch.setattr(line_index, "_MAX_CACHED_INDEXES", 3)
+        paths = []
+        for i in range(8):
+            path = tmp_path / f"f{i}.txt"
+            path.write_text("".join(f"{i}:{n}\n" for n in range(50)))
+            paths.append(str(path))
+
+        def read(n):
+            i = n % len(paths)
+            return read_lines(paths[i], 10, 1) == ([f"{i}:10"], 51)
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            assert all(pool.map(read, range(2000)))
+        assert len(line_index._index_cache) == 3
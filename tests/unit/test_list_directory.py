@@ -210,3 +210,42 @@ class TestListDirectoryEdgeCases:
             assert result["tool"] == "list_directory"
             # The file should be listed (check for unicode name or .txt extension)
             assert unicode_name in result["detailed"] or ".txt" in result["detailed"]
+
+    def test_output_grouped_by_directory(self, tmp_path):
+        """Entries are sorted and grouped under their directory."""
+        (tmp_path / "src").mkdir()
+        (tmp_path / "src" / "b.py").write_text("")
+        (tmp_path / "a.py").write_text("")
+        (tmp_path / "node_modules").mkdir()
+
+        with patch.object(Config, 'sandbox_disabled', return_value=True):
+            result = execute({"path": str(tmp_path), "max_depth": 2})
+        listing = result["detailed"].split("\n\n", 1)[1]
+        assert listing == "./\n  src/\n  a.py\nsrc/\n  b.py"
+
+    def test_max_files_argument(self, tmp_path):
+        """max_files overrides the default limit."""
+        for i in range(5):
+            (tmp_path / f"f{i}.txt").write_text("")
+
+        with patch.object(Config, 'sandbox_disabled', return_value=True):
+            result = execute({"path": str(tmp_path), "max_files": 3})
+        assert "3+" in result["friendly"]
+        assert "f2.txt" in result["detailed"]
+        assert "f3.txt" not in result["detailed"]
+
+    def test_max_files_from_env(self, tmp_path, monkeypatch):
+        """LIST_MAX_FILES sets the default limit."""
+        monkeypatch.setenv("LIST_MAX_FILES", "2")
+        for i in range(3):
+            (tmp_path / f"f{i}.txt").write_text("")
+
+        with patch.object(Config, 'sandbox_disabled', return_value=True):
+            result = execute({"path": str(tmp_path)})
+        assert "2+" in result["friendly"]
+
+    def test_validate_arguments_invalid_max_files(self):
+        """Invalid max_files falls back to the default."""
+        args = {"path": ".", "max_files": 0}
+        validateArguments(args)
+        assert args["max_files"] is None
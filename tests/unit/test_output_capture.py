@@ -0,0 +1,77 @@
+"""
+Tests for bounded output capture
+"""
+
+import io
+import os
+import time
+
+from aicoder.utils.output_capture import BoundedCapture, pump
+
+
+class TestBoundedCapture:
+    """Test head/tail buffering"""
+
+    def test_small_output_kept_whole(self):
+        capture = BoundedCapture(10, 10)
+        capture.write(b"hello ")
+        capture.write(b"world")
+        assert capture.dropped == 0
+        assert capture.text() == "hello world"
+
+    def test_middle_dropped(self):
+        capture = BoundedCapture(4, 4)
+        for chunk in (b"HEAD", b"middle" * 100, b"TAIL"):
+            capture.write(chunk)
+        assert capture.total == 608
+        assert capture.dropped == 600
+        text = capture.text()
+        assert text.startswith("HEAD")
+        assert text.endswith("TAIL")
+        assert "[600 bytes omitted]" in text
+
+    def test_memory_bounded(self):
+        capture = BoundedCapture(100, 100)
+        for _ in range(10000):
+            capture.write(b"x" * 1000)
+        assert len(capture.head) == 100
+        assert len(capture.tail) <= 200
+        assert capture.dropped == 10_000_000 - 200
+
+    def test_spill_gets_everything(self):
+        spill = io.BytesIO()
+        capture = BoundedCapture(2, 2, spill)
+        capture.write(b"abcdef")
+        assert spill.getvalue() == b"abcdef"
+        assert capture.dropped == 2
+
+    def test_invalid_utf8_replaced(self):
+        capture = BoundedCapture(10, 10)
+        capture.write(b"ok \xff")
+        assert capture.text() == "ok �"
+
+
+class TestPump:
+    """Test reading pipes into captures"""
+
+    def test_reads_until_eof(self):
+        r, w = os.pipe()
+        os.write(w, b"data")
+        os.close(w)
+        reader = os.fdopen(r, "rb")
+        capture = BoundedCapture(100, 100)
+        streams = {reader: capture}
+        assert pump(streams, time.monotonic() + 5) is True
+        assert streams == {}
+        assert capture.text() == "data"
+
+    def test_deadline(self):
+        r, w = os.pipe()
+        reader = os.fdopen(r, "rb")
+        try:
+            streams = {reader: BoundedCapture(100, 100)}
+            assert pump(streams, time.monotonic() + 0.05) is False
+            assert reader in streams
+        finally:
+            reader.close()
+            os.close(w)
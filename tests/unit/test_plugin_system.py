@@ -4,6 +4,8 @@
 import os
 import sys
 import tempfile
+import threading
+import time
 import pytest
 from pathlib import Path
 from unittest.mock import MagicMock, patch
@@ -15,8 +17,8 @@ from aicoder.core.plugin_system import PluginContext, PluginSystem
 def no_bundled_plugins():
     """Prevent bundled plugins from autoloading and polluting test assertions"""
     orig_init = PluginSystem.__init__
-    def patched_init(self, plugins_dir='.aicoder/plugins', global_plugins_dir=None):
-        orig_init(self, plugins_dir, global_plugins_dir)
+    def patched_init(self, plugins_dir='.aicoder/plugins', global_plugins_dir=None, **kwargs):
+        orig_init(self, plugins_dir, global_plugins_dir, **kwargs)
         self.bundled_plugins_dir = '/nonexistent'
     with patch.object(PluginSystem, '__init__', patched_init):
         yield
@@ -622,6 +624,171 @@ class TestCallHooksWithReturn:
 
         assert result == "start_success"
 
+class TestHookDispatcher:
+    """Test compiled per-event dispatch"""
+
+    def test_unhandled_event_is_noop(self):
+        ps = PluginSystem()
+        d = ps.dispatcher("nothing")
+        assert d.fire(1) is None
+        assert d.call(1) is None
+        assert d.chain("value", 1) == "value"
+
+    def test_bound_dispatcher_sees_later_hooks(self):
+        ps = PluginSystem()
+        d = ps.dispatcher("test_event")
+        seen = []
+        ps._register_hook("test_event", lambda x: seen.append(x) or "r1")
+        ps._register_hook("test_event", lambda x: "r2")
+
+        assert d.fire("a") is None
+        assert seen == ["a"]
+        assert d.call("b") == ["r1", "r2"]
+
+    def test_fire_isolates_failures(self):
+        ps = PluginSystem()
+        seen = []
+        def failing_hook():
+            raise ValueError("Test error")
+        ps._register_hook("test_event", failing_hook)
+        ps._register_hook("test_event", lambda: seen.append(1))
+        ps.fire("test_event")
+        assert seen == [1]
+
+    def test_chain(self):
+        ps = PluginSystem()
+        d = ps.dispatcher("transform")
+        ps._register_hook("transform", lambda v, suffix: v + suffix)
+        ps._register_hook("transform", lambda v, suffix: None)
+        assert d.chain("a", "!") == "a!"
+
+    def test_profiling_recompiles_bound_dispatcher(self):
+        ps = PluginSystem()
+        ps._register_hook("test_event", lambda: None)
+        d = ps.dispatcher("test_event")
+        ps.set_profiling(True)
+        d.fire()
+        ps.set_profiling(False)
+        d.fire()
+        assert ps.profile_report()[0]["count"] == 1
+
+
+class TestHookProfiling:
+    """Test per-hook timing"""
+
+    def test_disabled_by_default(self):
+        ps = PluginSystem()
+        ps._register_hook("test_event", lambda: None)
+        ps.call_hooks("test_event")
+        assert ps.profiling is False
+        assert ps.profile_report() == []
+
+    def test_records_per_event_and_plugin(self):
+        ps = PluginSystem()
+        def hook(value):
+            return value + 1
+        hook.__module__ = "plugin_counter"
+        ps._register_hook("transform", hook)
+        ps._register_hook("notify", hook)
+        ps.set_profiling(True)
+
+        for _ in range(5):
+            assert ps.call_hooks_with_return("transform", 1) == 2
+        assert ps.call_hooks("notify", 1) == [2]
+
+        rows = {(r["event"], r["plugin"]): r for r in ps.profile_report()}
+        assert rows[("transform", "counter")]["count"] == 5
+        assert rows[("notify", "counter")]["count"] == 1
+        row = rows[("transform", "counter")]
+        assert 0 <= row["p50_ms"] <= row["p99_ms"] <= row["max_ms"] <= row["total_ms"]
+
+    def test_failing_hook_still_timed(self):
+        ps = PluginSystem()
+        def failing_hook():
+            raise ValueError("Test error")
+        ps._register_hook("test_event", failing_hook)
+        ps.set_profiling(True)
+        ps.call_hooks("test_event")
+        assert ps.profile_report()[0]["count"] == 1
+
+    def test_off_and_reset(self):
+        ps = PluginSystem()
+        ps._register_hook("test_event", lambda: None)
+        ps.set_profiling(True)
+        ps.call_hooks("test_event")
+        ps.set_profiling(False)
+        ps.call_hooks("test_event")
+        assert ps.profile_report()[0]["count"] == 1
+        ps.reset_profile()
+        assert ps.profile_report() == []
+
+    def test_slow_hook_warning(self):
+        ps = PluginSystem()
+        ps._register_hook("test_event", lambda: time.sleep(0.005))
+        ps.set_slow_hook_ms(1)
+        with patch("aicoder.core.plugin_system.LogUtils.warn") as warn:
+            ps.call_hooks("test_event")
+        assert "Slow hook test_event" in warn.call_args[0][0]
+        # Threshold alone doesn't record timings
+        assert ps.profile_report() == []
+
+    def test_env_config(self, monkeypatch):
+        monkeypatch.setenv("AICODER_HOOK_PROFILE", "1")
+        monkeypatch.setenv("AICODER_HOOK_SLOW_MS", "250")
+        ps = PluginSystem()
+        assert ps.profiling is True
+        assert ps.slow_hook_ns == 250_000_000
+
+    def test_remove_hook_during_timed_dispatch(self):
+        """Subscribers leaving (socket thread) don't skip hooks of a running dispatch"""
+        ps = PluginSystem()
+        calls = []
+        def leaving():
+            calls.append("leaving")
+            ps.remove_hook("test_event", leaving)
+            ps.remove_hook("test_event", staying)
+        def staying():
+            calls.append("staying")
+        ps.add_hook("test_event", leaving)
+        ps.add_hook("test_event", staying)
+        ps.set_profiling(True)
+
+        ps.call_hooks("test_event")
+        assert calls == ["leaving", "staying"]
+        assert "test_event" not in ps.hooks
+        assert ps.call_hooks("test_event") is None
+        assert ps._call_hooks_timed("test_event", (), {}) is None
+
+    def test_report_while_recording(self):
+        """The socket thread reports while the agent thread records new samples and keys"""
+        ps = PluginSystem()
+        ps.set_profiling(True)
+        stop = threading.Event()
+        def record():
+            i = 0
+            while not stop.is_set():
+                ps._record_hook(f"event_{i % 50}", record, 0, i)
+                i += 1
+        thread = threading.Thread(target=record)
+        thread.start()
+        try:
+            for _ in range(20):
+                for row in ps.profile_report():
+                    assert row["p50_ms"] <= row["p99_ms"] <= row["max_ms"]
+        finally:
+            stop.set()
+            thread.join()
+
+    def test_percentiles(self):
+        from aicoder.core.plugin_system import HookTiming
+        timing = HookTiming()
+        for ns in range(1, 101):
+            timing.add(ns)
+        assert timing.percentile(50) == 51
+        assert timing.percentile(99) == 100
+        assert timing.max_ns == 100
+
+
 class TestCleanup:
     """Test plugin cleanup functionality"""
 
@@ -836,3 +1003,134 @@ def create_plugin(ctx):
                 assert "plugin_b_tool" in ps.tools
             finally:
                 os.environ.pop("PLUGINS_ALLOW", None)
+
+
+COMMAND_ONLY_PLUGIN = """
+import sys
+sys.modules.setdefault("lazy_test_imports", []).append(1)
+
+def create_plugin(ctx):
+    ctx.register_command("hello", lambda args: "hello " + args, "Say hello")
+"""
+
+HOOK_PLUGIN = """
+def create_plugin(ctx):
+    ctx.register_command("hooked", lambda args: None, "Has a hook too")
+    ctx.register_hook("after_user_message_added", lambda *a: None)
+"""
+
+
+class TestLazyLoading:
+    """Test manifest-driven deferral of command-only plugins"""
+
+    @pytest.fixture
+    def make_ps(self, tmp_path):
+        """Factory for plugin systems using a temp bundled dir and manifest"""
+        bundled = tmp_path / "bundled"
+        bundled.mkdir()
+        (bundled / "greeter.py").write_text(COMMAND_ONLY_PLUGIN)
+        (bundled / "hooked.py").write_text(HOOK_PLUGIN)
+        sys.modules.pop("lazy_test_imports", None)
+
+        def make():
+            ps = PluginSystem(
+                plugins_dir=str(tmp_path / "none"),
+                global_plugins_dir=str(tmp_path / "none"),
+                manifest_path=str(tmp_path / ".aicoder" / "plugin_manifest.json"),
+            )
+            ps.bundled_plugins_dir = str(bundled)
+            ps.load_plugins()
+            return ps
+
+        yield make
+        sys.modules.pop("lazy_test_imports", None)
+
+    def test_first_run_loads_eagerly_and_writes_manifest(self, make_ps, tmp_path):
+        ps = make_ps()
+        assert "greeter" in ps.plugins
+        assert ps.deferred_plugins == {}
+        assert (tmp_path / ".aicoder" / "plugin_manifest.json").exists()
+
+    def test_command_only_plugin_deferred(self, make_ps):
+        make_ps()
+        ps = make_ps()
+        assert "greeter" in ps.deferred_plugins
+        assert "hooked" in ps.plugins
+        assert ps.commands["hello"]["description"] == "Say hello"
+        assert len(sys.modules["lazy_test_imports"]) == 1
+
+    def test_deferred_plugin_imported_on_first_use(self, make_ps):
+        make_ps()
+        ps = make_ps()
+        stub = ps.commands["hello"]["fn"]
+        assert stub("world") == "hello world"
+        assert "greeter" not in ps.deferred_plugins
+        assert "greeter" in ps.plugins
+        assert stub("again") == "hello again"
+        assert len(sys.modules["lazy_test_imports"]) == 2
+
+    def test_background_preload_keeps_stub_working(self, make_ps):
+        make_ps()
+        ps = make_ps()
+        stub = ps.commands["hello"]["fn"]
+        ps.load_deferred_plugins()
+        assert ps.deferred_plugins == {}
+        assert "greeter" in ps.plugins
+        assert stub("world") == "hello world"
+        assert len(sys.modules["lazy_test_imports"]) == 2
+
+    def test_changed_plugin_loaded_eagerly(self, make_ps, tmp_path):
+        make_ps()
+        path = tmp_path / "bundled" / "greeter.py"
+        path.write_text(COMMAND_ONLY_PLUGIN + "\n# edited\n")
+        ps = make_ps()
+        assert "greeter" in ps.plugins
+
+    def test_disabled_by_env(self, make_ps, monkeypatch):
+        make_ps()
+        monkeypatch.setenv("AICODER_LAZY_PLUGINS", "0")
+        ps = make_ps()
+        assert ps.deferred_plugins == {}
+
+    def test_opt_out(self, make_ps, tmp_path):
+        (tmp_path / "bundled" / "greeter.py").write_text("LAZY_LOAD = False\n" + COMMAND_ONLY_PLUGIN)
+        make_ps()
+        ps = make_ps()
+        assert "greeter" in ps.plugins
+
+    def test_corrupt_manifest_ignored(self, make_ps, tmp_path):
+        manifest = tmp_path / ".aicoder" / "plugin_manifest.json"
+        manifest.parent.mkdir()
+        manifest.write_text("{not json")
+        ps = make_ps()
+        assert "greeter" in ps.plugins
+
+
+class TestHookTracing:
+    """Test hook spans in turn traces"""
+
+    def test_hooks_recorded_as_spans(self, tmp_path, monkeypatch):
+        from aicoder.core import tracing
+        monkeypatch.setattr(tracing, "TRACE_DIR", str(tmp_path))
+        ps = PluginSystem()
+        def autosave():
+            return None
+        autosave.__module__ = "plugin_session_autosaver"
+        ps._register_hook("after_tool_results_added", autosave)
+        d = ps.dispatcher("after_tool_results_added")
+
+        tracing.enable()
+        ps.set_tracing(True)
+        try:
+            with tracing.turn("turn"):
+                d.fire()
+            ps.call_hooks("after_tool_results_added")  # Outside a turn: not recorded
+        finally:
+            tracing.disable()
+            ps.set_tracing(False)
+
+        spans = [e for e in tracing.last_turn()["events"] if e["name"].startswith("hook:")]
+        assert len(spans) == 1
+        assert spans[0]["name"] == "hook:after_tool_results_added"
+        assert spans[0]["args"] == {"plugin": "session_autosaver"}
+        assert ps.profile_report() == []  # Tracing alone doesn't profile
@@ -0,0 +1,153 @@
+"""Tests for the on-demand sampling and per-turn cProfile profiler"""
+
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from aicoder.core import profiler
+
+
+@pytest.fixture(autouse=True)
+def profile_dir(tmp_path, monkeypatch):
+    """Write profiles under tmp_path and stop anything left running"""
+    monkeypatch.setattr(profiler, "PROFILE_DIR", str(tmp_path / "profiles"))
+    monkeypatch.setattr(profiler, "_last", None)
+    monkeypatch.setattr(profiler, "_last_sampler", None)
+    yield tmp_path / "profiles"
+    profiler.stop()
+
+
+def spin_in_marker(stop):
+    """Busy loop with a recognizable frame name"""
+    while not stop.is_set():
+        sum(range(100))
+
+
+class TestSampling:
+    def test_samples_other_threads_and_writes_outputs(self, profile_dir):
+        stop = threading.Event()
+        worker = threading.Thread(target=spin_in_marker, args=(stop,), name="spinner")
+        worker.start()
+        try:
+            profiler.start(200)
+            assert profiler.status()["running"] is True
+            time.sleep(0.3)
+            result = profiler.stop()
+        finally:
+            stop.set()
+            worker.join()
+
+        assert result["mode"] == "sample"
+        assert result["samples"] > 0
+        assert 0 <= result["overhead_pct"] < 100
+        assert profiler.status() == {"running": False}
+
+        with open(result["files"]["collapsed"]) as f:
+            lines = f.read().splitlines()
+        spinner = [line for line in lines if line.startswith("spinner;")]
+        assert spinner
+        stack, count = spinner[0].rsplit(" ", 1)
+        assert "spin_in_marker (test_profiler.py:" in stack
+        assert int(count) > 0
+        assert not any("_Sampler._run" in line for line in lines)  # Own thread skipped
+
+        report = profiler.report(5)
+        assert report[0].startswith(f"{result['samples']} samples")
+        assert "spinner" in report[1]
+        assert len(report) <= 3 + 5
+        assert os.path.exists(result["files"]["report"])
+
+    def test_live_report_while_running(self):
+        profiler.start(100)
+        time.sleep(0.05)
+        assert "samples over" in profiler.report()[0]
+        assert profiler.status()["mode"] == "sample"
+
+    def test_report_in_a_loop_while_sampling(self):
+        """/profile report from the main or socket thread while stacks are added"""
+        def recurse(depth, stop):
+            if depth and not stop.is_set():
+                return recurse(depth - 1, stop)
+            sum(range(50))
+
+        def churn(stop, seed):
+            depth = seed
+            while not stop.is_set():
+                recurse(depth % 40, stop)  # Always new stacks to add
+                depth += 7
+
+        stop = threading.Event()
+        workers = [threading.Thread(target=churn, args=(stop, i)) for i in range(4)]
+        for worker in workers:
+            worker.start()
+        try:
+            profiler.start(1000)
+            deadline = time.monotonic() + 1.0
+            while time.monotonic() < deadline:
+                assert "samples over" in profiler.report(3)[0]
+        finally:
+            stop.set()
+            for worker in workers:
+                worker.join()
+            profiler.stop()
+
+    def test_rejects_double_start_and_bad_rate(self):
+        with pytest.raises(ValueError):
+            profiler.start(0)
+        profiler.start(50)
+        with pytest.raises(RuntimeError):
+            profiler.start(50)
+        with pytest.raises(RuntimeError):
+            profiler.arm_turn()
+
+    def test_stop_without_sampler(self):
+        assert profiler.stop() is None
+        assert profiler.report() == []
+
+
+class TestTurnProfile:
+    def test_profiles_exactly_one_turn(self, profile_dir):
+        profiler.arm_turn()
+        assert profiler.status() == {"running": True, "mode": "turn", "in_turn": False}
+        with profiler.turn():
+            assert profiler.status()["in_turn"] is True
+            with profiler.turn():  # Recursive process_with_ai: same profile
+                sorted(range(1000))
+        assert profiler.running() is False
+
+        last = profiler.last_run()
+        assert last["mode"] == "turn"
+        assert os.path.exists(last["files"]["pstats"])
+        assert any("function calls" in line for line in profiler.report())
+
+        with profiler.turn():  # Next turn is not profiled
+            pass
+        assert profiler.last_run() == last
+
+    def test_stop_disarms(self):
+        profiler.arm_turn()
+        assert profiler.stop() is None
+        assert profiler.running() is False
+
+
+class TestLazyImport:
+    def test_startup_modules_do_not_import_profiler(self):
+        code = (
+            "import sys\n"
+            "import aicoder.core.session_manager, aicoder.core.socket_server, aicoder.core.commands.registry\n"
+            "assert 'aicoder.core.profiler' not in sys.modules\n"
+            "assert 'cProfile' not in sys.modules\n"
+        )
+        subprocess.run([sys.executable, "-c", code], check=True)
+
+    def test_session_manager_uses_armed_turn(self):
+        from aicoder.core.session_manager import _profile_turn
+
+        profiler.arm_turn()
+        with _profile_turn():
+            assert profiler.status()["in_turn"] is True
+        assert profiler.last_run()["mode"] == "turn"
@@ -304,3 +304,156 @@ class TestIntegration:
                 assert "Single line content" in result["detailed"]
         finally:
             os.unlink(path)
+
+
+class TestBatchRead:
+    """Test multi-file "paths" mode"""
+
+    def test_reads_all_files(self, temp_file, large_file):
+        """Test that every file is read and registered"""
+        with patch('aicoder.tools.internal.read_file._check_sandbox', return_value=True):
+            result = execute({"paths": [temp_file, large_file], "limit": 5})
+        assert result["tool"] == "read_file"
+        assert "Read 2 files" in result["friendly"]
+        assert f"File: {temp_file}" in result["detailed"]
+        assert f"File: {large_file}" in result["detailed"]
+        assert "Line 4: Content here" in result["detailed"]
+        assert "Line 5: Content here" not in result["detailed"]
+        assert FileAccessTracker.was_file_read(temp_file)
+        assert FileAccessTracker.was_file_read(large_file)
+
+    def test_per_file_offset_and_limit(self, temp_file, large_file):
+        """Test that object items keep their own offset/limit"""
+        with patch('aicoder.tools.internal.read_file._check_sandbox', return_value=True):
+            result = execute({"paths": [
+                {"path": large_file, "offset": 50, "limit": 2},
+                temp_file,
+            ]})
+        assert "Line 50: Content here" in result["detailed"]
+        assert "Line 52: Content here" not in result["detailed"]
+        assert "Line 0: Hello World" in result["detailed"]
+
+    def test_line_budget_split_across_files(self, large_file, monkeypatch):
+        """Test that the total line budget is shared between files"""
+        monkeypatch.setenv("READ_BATCH_MAX_LINES", "20")
+        with patch('aicoder.tools.internal.read_file._check_sandbox', return_value=True):
+            result = execute({"paths": [large_file, large_file], "limit": 100})
+        assert "Line 9: Content here" in result["detailed"]
+        assert "Line 10: Content here" not in result["detailed"]
+        assert "batch budget" in result["detailed"]
+
+    def test_budget_note_only_when_cut_short(self, temp_file, large_file, monkeypatch):
+        """Test that files shorter than their share get no budget note"""
+        monkeypatch.setenv("READ_BATCH_MAX_LINES", "20")
+        with patch('aicoder.tools.internal.read_file._check_sandbox', return_value=True):
+            result = execute({"paths": [temp_file, large_file], "limit": 100})
+            short = execute({"paths": [temp_file, {"path": large_file, "offset": 95}], "limit": 100})
+        temp_part, large_part = result["detailed"].split(f"File: {large_file}")
+        assert "batch budget" not in temp_part
+        assert "batch budget" in large_part
+        assert "batch budget" not in short["detailed"]
+
+    def test_missing_file_does_not_fail_batch(self, temp_file):
+        """Test that per-file errors are reported inline"""
+        with patch('aicoder.tools.internal.read_file._check_sandbox', return_value=True):
+            result = execute({"paths": ["/nonexistent/file.txt", temp_file]})
+        assert "File not found: /nonexistent/file.txt" in result["detailed"]
+        assert "Line 0: Hello World" in result["detailed"]
+
+    def test_validate_paths(self):
+        """Test validation of the paths argument"""
+        validate_arguments({"paths": ["a.txt"]})
+        with pytest.raises(Exception):
+            validate_arguments({"paths": []})
+        with pytest.raises(Exception):
+            validate_arguments({"paths": "a.txt"})
+
+    def test_format_paths(self):
+        """Test formatting of multi-file arguments"""
+        result = format_arguments({"paths": ["a.txt", {"path": "b.txt"}]})
+        assert "Paths: a.txt, b.txt" in result
+
+    def test_preview_sandbox_violation(self):
+        """Test that a sandbox violation in any path blocks the batch"""
+        result = generatePreview({"paths": ["/etc/passwd"]})
+        assert result["can_approve"] is False
+        assert "/etc/passwd" in result["content"]
+
+
+class TestIndexedRead:
+    """Test that large files are paged through the line index"""
+
+    def test_indexed_read_matches_full_read(self, large_file, monkeypatch):
+        """Test that the index path produces the same result"""
+        with patch('aicoder.tools.internal.read_file._check_sandbox', return_value=True):
+            expected = execute({"path": large_file, "offset": 40, "limit": 7})
+            monkeypatch.setattr('aicoder.tools.internal.read_file.LINE_INDEX_MIN_SIZE', 0)
+            with patch('aicoder.tools.internal.read_file.file_read') as full_read:
+                result = execute({"path": large_file, "offset": 40, "limit": 7})
+            full_read.assert_not_called()
+        assert result == expected
+        assert FileAccessTracker.was_file_read(large_file)
+
+    def test_indexed_offset_beyond_eof(self, large_file, monkeypatch):
+        """Test offset beyond end of file with the index path"""
+        monkeypatch.setattr('aicoder.tools.internal.read_file.LINE_INDEX_MIN_SIZE', 0)
+        with patch('aicoder.tools.internal.read_file._check_sandbox', return_value=True):
+            result = execute({"path": large_file, "offset": 500})
+        assert "beyond end of file" in result["friendly"]
+
+
+class TestUnchangedReRead:
+    """Test the "unchanged since message N" short-circuit"""
+
+    @pytest.fixture
+    def history(self, monkeypatch):
+        """Fake message history that stores results like the tool executor does"""
+        history = MagicMock()
+        history.messages = [{"role": "system", "content": "sys"}]
+        monkeypatch.setattr('aicoder.tools.internal.read_file._message_history', history)
+        return history
+
+    def _read(self, history, args):
+        with patch('aicoder.tools.internal.read_file._check_sandbox', return_value=True):
+            result = execute(args)
+        history.messages.append({"role": "tool", "content": result["detailed"]})
+        return result
+
+    def test_repeated_read_is_short_circuited(self, temp_file, history):
+        first = self._read(history, {"path": temp_file})
+        assert "Line 0" in first["detailed"]
+        second = self._read(history, {"path": temp_file})
+        assert "Unchanged since message 1" in second["detailed"]
+        assert "Line 0" not in second["detailed"]
+        hits, saved = FileAccessTracker.get_unchanged_stats()
+        assert hits == 1
+        assert saved >= 0
+
+    def test_force_rereads(self, temp_file, history):
+        self._read(history, {"path": temp_file})
+        result = self._read(history, {"path": temp_file, "force": True})
+        assert "Line 0" in result["detailed"]
+
+    def test_different_range_is_read(self, temp_file, history):
+        self._read(history, {"path": temp_file})
+        result = self._read(history, {"path": temp_file, "offset": 1})
+        assert "Line 1" in result["detailed"]
+
+    def test_changed_file_is_read(self, temp_file, history):
+        self._read(history, {"path": temp_file})
+        with open(temp_file, "a") as f:
+            f.write("\nLine 5: New")
+        result = self._read(history, {"path": temp_file})
+        assert "Line 5: New" in result["detailed"]
+
+    def test_pruned_result_is_read_again(self, temp_file, history):
+        self._read(history, {"path": temp_file})
+        history.messages[1]["content"] = "[Old tool result content cleared due to memory compaction]"
+        result = self._read(history, {"path": temp_file})
+        assert "Line 0" in result["detailed"]
+
+    def test_without_history_always_reads(self, temp_file):
+        with patch('aicoder.tools.internal.read_file._check_sandbox', return_value=True):
+            execute({"path": temp_file})
+            result = execute({"path": temp_file})
+        assert "Line 0" in result["detailed"]
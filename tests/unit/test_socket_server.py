@@ -15,7 +15,11 @@ import base64
 from unittest.mock import MagicMock, patch
 
 from aicoder.core.socket_server import (
+    ChunkedResponse,
+    EventSubscription,
+    SocketClient,
     SocketServer,
+    SUBSCRIBER_QUEUE_SIZE,
     response,
     ERR_NOT_PROCESSING,
     ERR_UNKNOWN_CMD,
@@ -452,6 +456,69 @@ class TestSocketServerCmdHandlers:
         assert len(data["data"]["messages"]) == 2
 
 
+class TestSocketServerCmdPlugins:
+    """Tests for the plugins command."""
+
+    def _server(self):
+        from aicoder.core.plugin_system import PluginSystem
+        mock_aicoder = MockAICoder()
+        ps = PluginSystem(plugins_dir="/nonexistent")
+        ps._register_hook("test_event", lambda: None)
+        mock_aicoder.plugin_system = ps
+        return SocketServer(mock_aicoder), ps
+
+    def test_profile_on_and_report(self):
+        server, ps = self._server()
+        data = json.loads(server._cmd_plugins("profile on"))
+        assert data["data"]["enabled"] is True
+        ps.call_hooks("test_event")
+        hooks = json.loads(server._cmd_plugins("profile"))["data"]["hooks"]
+        assert hooks[0]["event"] == "test_event"
+        assert hooks[0]["count"] == 1
+
+    def test_list(self):
+        server, ps = self._server()
+        data = json.loads(server._cmd_plugins(""))
+        assert data["data"]["loaded"] == list(ps.plugins)
+
+    def test_invalid_arg(self):
+        server, _ = self._server()
+        data = json.loads(server._cmd_plugins("profile bogus"))
+        assert data["code"] == ERR_INVALID_ARG
+
+
+class TestSocketServerCmdProfile:
+    """Tests for the profile command."""
+
+    @pytest.fixture(autouse=True)
+    def profile_dir(self, tmp_path):
+        from aicoder.core import profiler
+        with patch.object(profiler, "PROFILE_DIR", str(tmp_path)):
+            yield
+            profiler.stop()
+
+    def test_start_report_stop(self):
+        server = SocketServer(MockAICoder())
+        data = json.loads(server._cmd_profile("start 200"))["data"]
+        assert data["running"] is True
+        assert data["hz"] == 200
+        time.sleep(0.05)
+        assert json.loads(server._cmd_profile("report 5"))["data"]["report"]
+
+        data = json.loads(server._cmd_profile("stop"))["data"]
+        assert data["running"] is False
+        assert os.path.exists(data["stopped"]["files"]["collapsed"])
+
+    def test_start_turn_and_errors(self):
+        server = SocketServer(MockAICoder())
+        data = json.loads(server._cmd_profile("start turn"))["data"]
+        assert data == {"running": True, "mode": "turn", "in_turn": False}
+        assert json.loads(server._cmd_profile("start"))["code"] == ERR_INVALID_ARG
+        assert json.loads(server._cmd_profile("stop"))["data"]["stopped"] is None
+        assert json.loads(server._cmd_profile("start fast"))["code"] == ERR_INVALID_ARG
+        assert json.loads(server._cmd_profile("bogus"))["code"] == ERR_INVALID_ARG
+
+
 class TestSocketServerInjectText:
     """Tests for _cmd_inject_text command handler."""
 
@@ -608,97 +675,368 @@ class TestSocketServerCmdProcess:
         assert data["code"] == ERR_NOT_PROCESSING
 
 
-class TestSocketServerReadLine:
-    """Tests for _read_line method."""
-
-    def test_read_line_timeout(self):
-        """Test _read_line returns None on timeout."""
-        mock_aicoder = MockAICoder()
-        server = SocketServer(mock_aicoder)
-
-        mock_sock = MagicMock()
-        mock_sock.recv.side_effect = socket.timeout()
-
-        result = server._read_line(mock_sock, timeout=0.1)
-
-        assert result is None
-
-    def test_read_line_complete_line(self):
-        """Test _read_line returns complete line."""
-        mock_aicoder = MockAICoder()
-        server = SocketServer(mock_aicoder)
-
-        mock_sock = MagicMock()
-        mock_sock.recv.side_effect = [
-            b"test command\n"
+@pytest.fixture
+def running_server(tmp_path, monkeypatch):
+    """Started server on a temporary socket path."""
+    monkeypatch.setenv("AICODER_SOCKET_IPC_FILE", str(tmp_path / "test.socket"))
+    server = SocketServer(MockAICoder())
+    server.start()
+    yield server
+    server.stop()
+
+
+def _connect(server):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(5.0)
+    sock.connect(server.socket_path)
+    return sock
+
+
+def _read_all(sock):
+    data = b""
+    while True:
+        chunk = sock.recv(65536)
+        if not chunk:
+            return data
+        data += chunk
+
+
+class TestSocketServerOneShot:
+    """Plain text clients: one command, one response, connection closed."""
+
+    def test_command_then_close(self, running_server):
+        """Test response is sent and the server closes the connection."""
+        sock = _connect(running_server)
+        sock.sendall(b"is_processing\n")
+        lines = _read_all(sock).splitlines()
+        sock.close()
+        assert len(lines) == 1
+        assert json.loads(lines[0])["data"] == {"processing": False}
+
+    def test_command_without_newline(self, running_server):
+        """Test a command terminated by EOF instead of a newline."""
+        sock = _connect(running_server)
+        sock.sendall(b"yolo status")
+        sock.shutdown(socket.SHUT_WR)
+        parsed = json.loads(_read_all(sock))
+        sock.close()
+        assert parsed["status"] == "success"
+
+    def test_empty_command(self, running_server):
+        """Test connecting and closing without a command."""
+        sock = _connect(running_server)
+        sock.shutdown(socket.SHUT_WR)
+        parsed = json.loads(_read_all(sock))
+        sock.close()
+        assert parsed["message"] == "Empty command"
+
+    def test_only_first_command_answered(self, running_server):
+        """Test a one-shot client gets exactly one response."""
+        sock = _connect(running_server)
+        sock.sendall(b"status\nstatus\n")
+        lines = _read_all(sock).splitlines()
+        sock.close()
+        assert len(lines) == 1
+
+    def test_idle_client_times_out(self, running_server, monkeypatch):
+        """Test a client that never sends a command gets a timeout error."""
+        monkeypatch.setattr("aicoder.core.socket_server.ONE_SHOT_TIMEOUT", 0.0)
+        sock = _connect(running_server)
+        parsed = json.loads(_read_all(sock))
+        sock.close()
+        assert parsed["message"] == "Timeout"
+
+
+class TestSocketServerPersistent:
+    """JSON clients: pipelined requests with ids on one connection."""
+
+    def test_pipelined_requests_echo_ids(self, running_server):
+        """Test several requests in one write get responses with their ids."""
+        sock = _connect(running_server)
+        requests = [{"id": i, "cmd": "is_processing"} for i in range(50)]
+        sock.sendall("".join(json.dumps(r) + "\n" for r in requests).encode())
+        f = sock.makefile("rb")
+        responses = [json.loads(f.readline()) for _ in requests]
+        sock.close()
+        assert [r["id"] for r in responses] == list(range(50))
+        assert all(r["data"] == {"processing": False} for r in responses)
+
+    def test_connection_stays_open(self, running_server):
+        """Test requests can be sent after reading earlier responses."""
+        sock = _connect(running_server)
+        f = sock.makefile("rb")
+        for i in ("a", "b"):
+            sock.sendall(json.dumps({"id": i, "cmd": "debug", "args": "status"}).encode() + b"\n")
+            assert json.loads(f.readline())["id"] == i
+        # Plain text lines are answered too once the connection is persistent
+        sock.sendall(b"\nstatus\n")
+        assert json.loads(f.readline())["status"] == "success"
+        sock.close()
+
+    def test_request_without_id(self, running_server):
+        """Test a response without an id when the request has none."""
+        sock = _connect(running_server)
+        sock.sendall(b'{"cmd": "status"}\n')
+        parsed = json.loads(sock.makefile("rb").readline())
+        sock.close()
+        assert "id" not in parsed
+        assert parsed["status"] == "success"
+
+    def test_invalid_requests(self, running_server):
+        """Test malformed JSON and missing cmd return errors."""
+        sock = _connect(running_server)
+        f = sock.makefile("rb")
+        sock.sendall(b'{not json\n{"id": 3}\n{"id": 4, "cmd": "bogus"}\n')
+        invalid, missing, unknown = (json.loads(f.readline()) for _ in range(3))
+        sock.close()
+        assert invalid["code"] == ERR_INVALID_ARG
+        assert missing["id"] == 3 and missing["code"] == ERR_MISSING_ARG
+        assert unknown["id"] == 4 and unknown["code"] == ERR_UNKNOWN_CMD
+
+    def test_concurrent_clients(self, running_server):
+        """Test many open connections are served at the same time."""
+        socks = [_connect(running_server) for _ in range(20)]
+        for i, sock in enumerate(socks):
+            sock.sendall(json.dumps({"id": i, "cmd": "status"}).encode() + b"\n")
+        for i, sock in enumerate(socks):
+            assert json.loads(sock.makefile("rb").readline())["id"] == i
+            sock.close()
+        assert len(running_server.clients) <= 20
+
+    def test_stop_closes_clients(self, running_server):
+        """Test stop() disconnects persistent clients."""
+        sock = _connect(running_server)
+        sock.sendall(b'{"id": 1, "cmd": "status"}\n')
+        sock.makefile("rb").readline()
+        running_server.stop()
+        assert _read_all(sock) == b""
+        sock.close()
+        assert running_server.clients == {}
+
+
+@pytest.fixture
+def event_server(tmp_path, monkeypatch):
+    """Started server whose app has a real plugin system."""
+    from aicoder.core.plugin_system import PluginSystem
+
+    monkeypatch.setenv("AICODER_SOCKET_IPC_FILE", str(tmp_path / "events.socket"))
+    app = MockAICoder()
+    app.plugin_system = PluginSystem(plugins_dir=str(tmp_path / "plugins"))
+    server = SocketServer(app)
+    server.start()
+    yield server
+    server.stop()
+
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.time() + timeout
+    while not predicate():
+        if time.time() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+class TestSocketServerSubscribe:
+    """subscribe/unsubscribe event streams."""
+
+    def test_subscribe_streams_events(self, event_server):
+        """Test hook events arrive as JSON lines after the response."""
+        plugins = event_server.aicoder.plugin_system
+        sock = _connect(event_server)
+        f = sock.makefile("rb")
+        sock.sendall(b'{"id": 1, "cmd": "subscribe"}\n')
+        reply = json.loads(f.readline())
+        assert reply["id"] == 1
+        assert "on_stream_delta" in reply["data"]["subscribed"]
+
+        plugins.fire("on_processing_start")
+        plugins.fire("on_stream_delta", "content", "Hello")
+        plugins.fire("after_usage_data", {"prompt_tokens": 5})
+        events = [json.loads(f.readline()) for _ in range(3)]
+        sock.close()
+
+        assert [e["event"] for e in events] == ["on_processing_start", "on_stream_delta", "after_usage_data"]
+        assert events[1]["data"] == {"kind": "content", "text": "Hello"}
+        assert events[2]["data"] == {"usage": {"prompt_tokens": 5}}
+        assert events[0]["seq"] < events[1]["seq"] < events[2]["seq"]
+
+    def test_subscribe_filters_events(self, event_server):
+        """Test only the named events are delivered and hooked."""
+        plugins = event_server.aicoder.plugin_system
+        sock = _connect(event_server)
+        f = sock.makefile("rb")
+        sock.sendall(b"subscribe on_processing_stop\n")
+        assert json.loads(f.readline())["data"]["subscribed"] == ["on_processing_stop"]
+        assert "on_stream_delta" not in plugins.hooks
+
+        plugins.fire("on_processing_start")
+        plugins.fire("on_processing_stop")
+        assert json.loads(f.readline())["event"] == "on_processing_stop"
+        sock.close()
+
+    def test_plain_subscribe_keeps_connection_open(self, event_server):
+        """Test a plain text subscribe isn't closed like one-shot commands."""
+        sock = _connect(event_server)
+        f = sock.makefile("rb")
+        sock.sendall(b"subscribe\n")
+        f.readline()
+        sock.sendall(b"unsubscribe\n")
+        reply = json.loads(f.readline())
+        sock.close()
+        assert reply["data"] == {"unsubscribed": True, "dropped": 0}
+
+    def test_unknown_event(self, event_server):
+        """Test subscribing to an unknown event is rejected."""
+        sock = _connect(event_server)
+        sock.sendall(b'{"id": 1, "cmd": "subscribe", "args": "bogus"}\n')
+        reply = json.loads(sock.makefile("rb").readline())
+        sock.close()
+        assert reply["code"] == ERR_INVALID_ARG
+        assert "bogus" in reply["message"]
+
+    def test_hooks_removed_on_disconnect(self, event_server):
+        """Test event hooks go away with the last subscriber."""
+        plugins = event_server.aicoder.plugin_system
+        sock = _connect(event_server)
+        sock.sendall(b"subscribe\n")
+        sock.makefile("rb").readline()
+        assert "on_stream_delta" in plugins.hooks
+        sock.close()
+        assert _wait_for(lambda: not event_server._subscribers)
+        assert not any(event in plugins.hooks for event in ("on_stream_delta", "after_usage_data"))
+
+    def test_slow_subscriber_drops_instead_of_blocking(self, event_server):
+        """Test publishing never blocks on a subscriber that doesn't read."""
+        plugins = event_server.aicoder.plugin_system
+        sock = _connect(event_server)
+        f = sock.makefile("rb")
+        sock.sendall(b"subscribe on_stream_delta\n")
+        f.readline()
+
+        start = time.time()
+        for i in range(20000):
+            plugins.fire("on_stream_delta", "content", "x" * 100)
+        assert time.time() - start < 5.0
+        sub = event_server._subscribers[0]
+        assert sub.dropped > 0
+        assert len(sub.queue) <= SUBSCRIBER_QUEUE_SIZE
+        sock.close()
+
+    def test_dropped_events_reported(self):
+        """Test the next delivery announces how many events were dropped."""
+        server = SocketServer(MockAICoder())
+        a, b = socket.socketpair()
+        client = SocketClient(a)
+        client.subscription = EventSubscription(frozenset(["on_processing_start"]))
+        server._subscribers = (client.subscription,)
+        with patch("aicoder.core.socket_server.SUBSCRIBER_QUEUE_SIZE", 2):
+            for _ in range(5):
+                server._publish("on_processing_start")
+
+        assert server._pump_events(client) is True
+        lines = [json.loads(bytes(m)) for m in client.outq]
+        a.close()
+        b.close()
+        assert lines[0]["event"] == "events_dropped"
+        assert lines[0]["data"] == {"dropped": 3, "total": 3}
+        assert [line["event"] for line in lines[1:]] == ["on_processing_start"] * 2
+        assert server._pump_events(client) is False
+
+    def test_subscribe_needs_connection(self):
+        """Test subscribe outside a socket connection is rejected."""
+        server = SocketServer(MockAICoder())
+        parsed = json.loads(server._execute_command("subscribe"))
+        assert parsed["code"] == ERR_INVALID_ARG
+
+
+class TestSocketServerCmdMessages:
+    """Tests for counting and cursor reads of messages."""
+
+    def _server(self, messages):
+        from aicoder.core.message_history import MessageHistory
+        from aicoder.core.stats import Stats
+
+        app = MockAICoder()
+        app.message_history = MessageHistory(Stats())
+        app.message_history.messages = messages
+        return SocketServer(app)
+
+    def test_count_by_role(self):
+        server = self._server([
+            {"role": "system", "content": "s"},
+            {"role": "user", "content": "u"},
+            {"role": "assistant", "content": "a"},
+            {"role": "tool", "content": "t", "tool_call_id": "1"},
+            {"role": "user", "content": "u2"},
+        ])
+        data = json.loads(server._cmd_messages("count"))["data"]
+        assert data == {"total": 5, "user": 2, "assistant": 1, "system": 1, "tool": 1}
+
+    def test_since_returns_new_messages_with_cursor(self):
+        server = self._server([{"role": "user", "content": "one"}])
+        first = json.loads(server._cmd_messages("since 0"))["data"]
+        assert first["messages"] == [{"seq": 1, "index": 0, "role": "user", "content": "one"}]
+
+        server.aicoder.message_history.messages.append({"role": "assistant", "content": "two"})
+        data = json.loads(server._cmd_messages(f"since {first['last_seq']}"))["data"]
+        assert [m["content"] for m in data["messages"]] == ["two"]
+        assert data["count"] == 1
+        assert data["total"] == 2
+        assert data["last_seq"] == 2
+
+    def test_range_with_projection(self):
+        server = self._server([
+            {"role": "user", "content": "abc"},
+            {"role": "assistant", "content": [{"type": "text", "text": "hello"}]},
+            {"role": "user", "content": "x"},
+        ])
+        data = json.loads(server._cmd_messages("range -2 3 fields=index,role,length"))["data"]
+        assert data["messages"] == [
+            {"index": 1, "role": "assistant", "length": 5},
+            {"index": 2, "role": "user", "length": 1},
         ]
 
-        result = server._read_line(mock_sock, timeout=1.0)
-
-        assert result == "test command"
-
-
-class TestSocketServerSendLine:
-    """Tests for _send_line method."""
-
-    def test_send_line(self):
-        """Test _send_line sends data correctly."""
-        mock_aicoder = MockAICoder()
-        server = SocketServer(mock_aicoder)
-
-        mock_sock = MagicMock()
-        server._send_line(mock_sock, '{"status": "success"}')
-
-        mock_sock.sendall.assert_called_once()
-        sent_data = mock_sock.sendall.call_args[0][0]
-        assert sent_data.endswith(b"\n")
-        assert b'{"status": "success"}' in sent_data
-
-
-class TestSocketServerHandleClient:
-    """Tests for _handle_client method."""
-
-    def test_handle_client_empty_command(self):
-        """Test _handle_client with empty command."""
-        mock_aicoder = MockAICoder()
-        server = SocketServer(mock_aicoder)
-
-        mock_sock = MagicMock()
-        mock_sock.recv.return_value = b""
-
-        with patch.object(server, "_read_line", return_value=None):
-            server._handle_client(mock_sock)
-
-            # Should send error and close
-            assert mock_sock.close.called
-
-    def test_handle_client_with_command(self):
-        """Test _handle_client with valid command."""
-        mock_aicoder = MockAICoder()
-        server = SocketServer(mock_aicoder)
-
-        mock_sock = MagicMock()
-        mock_sock.recv.return_value = b"status\n"
-
-        with patch.object(server, "_read_line", return_value="status"), \
-             patch.object(server, "_send_line") as mock_send:
-
-            server._handle_client(mock_sock)
-
-            mock_send.assert_called_once()
-
-    def test_handle_client_timeout(self):
-        """Test _handle_client with timeout."""
-        mock_aicoder = MockAICoder()
-        server = SocketServer(mock_aicoder)
-
-        mock_sock = MagicMock()
-        mock_sock.recv.return_value = b"test\n"
-
-        with patch.object(server, "_read_line", side_effect=socket.timeout()), \
-             patch.object(server, "_send_line") as mock_send:
-
-            server._handle_client(mock_sock)
-
-            # Should send error for timeout
-            assert mock_send.called
+    def test_plain_list_with_projection(self):
+        server = self._server([{"role": "user", "content": "abc"}])
+        data = json.loads(server._cmd_messages("fields=role"))["data"]
+        assert data == {"messages": [{"role": "user"}], "count": 1}
+
+    @pytest.mark.parametrize("args", ["since", "since x", "range 1", "range a b", "bogus", "since 0 fields="])
+    def test_invalid_arguments(self, args):
+        server = self._server([])
+        parsed = json.loads(server._cmd_messages(args))
+        assert parsed["status"] == "error"
+        assert parsed["code"] in (ERR_MISSING_ARG, ERR_INVALID_ARG)
+
+    def test_large_response_is_chunked(self):
+        big = "x" * 40000
+        server = self._server([{"role": "user", "content": big} for _ in range(40)])
+        resp = server._cmd_messages("since 0")
+        assert isinstance(resp, ChunkedResponse)
+        chunks = list(resp.chunks())
+        assert len(chunks) > 10
+        data = json.loads("".join(chunks))["data"]
+        assert data["count"] == 40
+        assert data["messages"][-1]["seq"] == 40
+
+    def test_large_response_streams_over_socket(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("AICODER_SOCKET_IPC_FILE", str(tmp_path / "test.socket"))
+        big = "y" * 100000
+        server = self._server([{"role": "user", "content": big} for _ in range(30)])
+        server.start()
+        try:
+            sock = _connect(server)
+            reader = sock.makefile("rb")
+            sock.sendall(b'{"id": 7, "cmd": "messages", "args": "since 0 fields=seq,content"}\n')
+            sock.sendall(b'{"id": 8, "cmd": "messages", "args": "count"}\n')
+            first = json.loads(reader.readline())
+            second = json.loads(reader.readline())
+            sock.close()
+        finally:
+            server.stop()
+        assert first["id"] == 7
+        assert len(first["data"]["messages"]) == 30
+        assert first["data"]["messages"][0]["content"] == big
+        assert second["id"] == 8
+        assert second["data"]["total"] == 30
@@ -0,0 +1,85 @@
+"""Tests for startup phase timing and the --profile-startup report"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from aicoder.utils import startup_profile
+
+IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     _io
+import time:       300 |        420 |   encodings
+import time:      2000 |       2500 |     aicoder.core.config
+import time:       500 |       3000 |   aicoder.core
+import time:        80 |       3080 | aicoder
+"""
+
+
+class TestParseImporttime:
+    def test_rows_and_depth(self):
+        rows = startup_profile.parse_importtime(IMPORTTIME)
+        assert [r["module"] for r in rows] == ["_io", "encodings", "aicoder.core.config", "aicoder.core", "aicoder"]
+        assert rows[0]["depth"] == 2
+        assert rows[-1] == {"module": "aicoder", "self_us": 80, "cumulative_us": 3080, "depth": 0}
+
+    def test_ignores_other_output(self):
+        assert startup_profile.parse_importtime("hello\nimport time: garbage\n") == []
+
+    def test_tree_filters_small_imports(self):
+        tree = startup_profile.format_import_tree(startup_profile.parse_importtime(IMPORTTIME), min_us=1000)
+        assert "aicoder.core.config" in tree
+        assert "encodings" not in tree
+        assert "|     aicoder.core.config" in tree
+
+    def test_summary(self):
+        rows = startup_profile.parse_importtime(IMPORTTIME)
+        summary = startup_profile.summarize(rows, {"imports": 3.0, "plugins": 2.5}, 10.0)
+        assert summary["total_ms"] == 5.5
+        assert summary["imports"]["modules"] == 5
+        assert summary["imports"]["total_ms"] == 3.08
+        assert summary["imports"]["slowest_self"][0]["module"] == "aicoder.core.config"
+
+
+class TestPhases:
+    def test_background_and_milestones(self, monkeypatch):
+        monkeypatch.setattr(startup_profile, "_background", {})
+        monkeypatch.setattr(startup_profile, "_milestones", {})
+        monkeypatch.setenv("AICODER_START_TIME", "0")
+        startup_profile.record_background("socket", 0.002)
+        startup_profile.milestone("time_to_prompt")
+        assert startup_profile._background == {"socket": 0.002}
+        assert startup_profile.milestones_ms()["time_to_prompt"] > 0
+
+    def test_mark_accumulates(self, monkeypatch):
+        monkeypatch.setattr(startup_profile, "_phases", {})
+        startup_profile.record("imports", 0.5)
+        startup_profile.mark("plugins")
+        startup_profile.mark("plugins")
+        phases = startup_profile.phases_ms()
+        assert list(phases) == ["imports", "plugins"]
+        assert phases["imports"] == 500
+        assert 0 <= phases["plugins"] < 500
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="POSIX only")
+def test_profile_startup_json(tmp_path):
+    """main.py --profile-startup=json initializes in a child and exits"""
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    env = dict(os.environ, API_BASE_URL="http://127.0.0.1:9/v1", HOME=str(tmp_path))
+    proc = subprocess.run(
+        [sys.executable, os.path.join(root, "main.py"), "--profile-startup=json"],
+        capture_output=True, text=True, env=env, cwd=tmp_path, timeout=60,
+    )
+    assert proc.returncode == 0, proc.stderr
+    summary = json.loads(proc.stdout)
+    for phase in ("imports", "construct", "config", "plugins"):
+        assert phase in summary["phases_ms"]
+    for task in ("prompt", "socket", "hooks", "plugins"):
+        assert task in summary["background_ms"]
+    milestones = summary["milestones_ms"]
+    assert milestones["time_to_ready"] >= milestones["time_to_prompt"] > 0
+    assert summary["imports"]["modules"] > 0
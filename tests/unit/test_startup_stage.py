@@ -0,0 +1,53 @@
+"""Tests for the background startup stage"""
+
+import threading
+
+from aicoder.core.startup_stage import StartupStage
+
+
+class TestStartupStage:
+    def test_runs_tasks_in_order_in_background(self):
+        stage = StartupStage()
+        order = []
+        threads = []
+        stage.add("a", lambda: order.append("a"))
+        stage.add("b", lambda: (order.append("b"), threads.append(threading.current_thread().name)))
+        stage.start()
+        assert stage.wait(timeout=5)
+        assert stage.ready
+        assert order == ["a", "b"]
+        assert threads == ["aicoder-startup"]
+        assert set(stage.timings) == {"a", "b"}
+
+    def test_failure_does_not_stop_later_tasks(self, capsys):
+        stage = StartupStage()
+        ran = []
+        def broken():
+            raise RuntimeError("boom")
+        stage.add("broken", broken)
+        stage.add("after", lambda: ran.append(True))
+        stage.start()
+        assert stage.wait(timeout=5)
+        assert ran == [True]
+        assert "Startup task broken failed: boom" in capsys.readouterr().err
+
+    def test_wait_blocks_until_done(self):
+        stage = StartupStage()
+        release = threading.Event()
+        stage.add("slow", lambda: release.wait(5))
+        stage.start()
+        assert stage.wait(timeout=0.05) is False
+        release.set()
+        assert stage.wait(timeout=5)
+
+    def test_disabled_runs_inline(self, monkeypatch):
+        monkeypatch.setenv("AICODER_STAGED_STARTUP", "0")
+        stage = StartupStage()
+        threads = []
+        stage.add("task", lambda: threads.append(threading.current_thread()))
+        stage.start()
+        assert stage.ready
+        assert threads == [threading.main_thread()]
+
+    def test_wait_before_start_does_not_block(self):
+        assert StartupStage().wait() is False
@@ -569,3 +569,19 @@ class TestAccumulateToolCall:
 
         assert len(accumulated) == 2
         assert list(accumulated) == ["tool_call_0", "tool_call_1"]
+
+    def test_process_stream_fires_stream_deltas(self):
+        """Test content and reasoning deltas fire on_stream_delta."""
+        plugin_system = Mock()
+        self.processor.set_plugin_system(plugin_system)
+        plugin_system.dispatcher.assert_called_once_with("on_stream_delta")
+        fire = plugin_system.dispatcher.return_value.fire
+
+        chunks = [
+            {"choices": [{"delta": {"reasoning_content": "think"}}], "usage": None},
+            {"choices": [{"delta": {"content": "Hi"}}], "usage": None},
+        ]
+        self.mock_streaming_client.stream_request.return_value = iter(chunks)
+        self.processor.process_stream([{"role": "user", "content": "hi"}], Mock(return_value=True), Mock())
+
+        assert fire.call_args_list == [(("reasoning", "think"),), (("content", "Hi"),)]
@@ -464,6 +464,8 @@ class TestToolExecutorPluginHooks:
         mock_tool_manager = MagicMock()
         mock_message_history = MagicMock()
         mock_plugin_system = MagicMock()
+        hooks = {}  # One dispatcher mock per event, so each event is checked on its own
+        mock_plugin_system.dispatcher.side_effect = lambda event: hooks.setdefault(event, MagicMock())
 
         executor = ToolExecutor(mock_tool_manager, mock_message_history, mock_plugin_system)
 
@@ -472,7 +474,7 @@ class TestToolExecutorPluginHooks:
         with patch.object(executor, '_execute_single_tool_call', return_value={"tool_call_id": "1", "content": "Result"}):
             executor.execute_tool_calls([{"id": "1", "function": {"name": "read_file"}}])
 
-        mock_plugin_system.call_hooks.assert_called_once_with("after_tool_results", tool_results)
+        hooks["after_tool_results"].fire.assert_called_once_with(tool_results)
 
 class TestToolExecutorPreviewHook:
     """Test the on_tool_preview plugin hook."""
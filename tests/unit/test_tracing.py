@@ -0,0 +1,128 @@
+"""Tests for turn tracing spans and the Chrome trace-event export"""
+
+import json
+import os
+import threading
+
+import pytest
+
+from aicoder.core import tracing
+
+
+@pytest.fixture(autouse=True)
+def trace_dir(tmp_path, monkeypatch):
+    """Write traces under tmp_path and leave tracing off afterwards"""
+    monkeypatch.setattr(tracing, "TRACE_DIR", str(tmp_path / "traces"))
+    monkeypatch.setattr(tracing, "_last", None)
+    yield tmp_path / "traces"
+    tracing.disable()
+
+
+def read_trace(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+class TestDisabled:
+    def test_spans_are_shared_noop(self):
+        assert tracing.enabled() is False
+        with tracing.turn("turn") as turn:
+            with tracing.span("work", a=1) as span:
+                span.set(b=2)
+        assert turn is span
+        assert tracing.last_turn() is None
+
+    def test_span_outside_turn_records_nothing(self, trace_dir):
+        tracing.enable()
+        with tracing.span("orphan"):
+            pass
+        tracing.record("orphan", 0, 10)
+        assert tracing.active() is False
+        assert not trace_dir.exists()
+
+
+class TestTurn:
+    def test_exports_nested_spans(self, trace_dir):
+        tracing.enable()
+        with tracing.turn("process_with_ai") as turn:
+            assert tracing.active()
+            with tracing.span("prepare"):
+                with tracing.span("context_bar"):
+                    pass
+            with tracing.span("stream_response", messages=3) as span:
+                span.set(ttft_ms=12.5)
+            turn.set(status="text_content")
+        assert tracing.active() is False
+
+        last = tracing.last_turn()
+        assert os.path.dirname(last["path"]) == str(trace_dir)
+        events = read_trace(last["path"])
+        meta = [e for e in events if e["ph"] == "M"]
+        spans = {e["name"]: e for e in events if e["ph"] == "X"}
+        assert meta[0]["name"] == "thread_name"
+        assert meta[0]["args"]["name"] == threading.current_thread().name
+        assert set(spans) == {"process_with_ai", "prepare", "context_bar", "stream_response"}
+        assert spans["stream_response"]["args"] == {"messages": 3, "ttft_ms": 12.5}
+        assert spans["process_with_ai"]["args"] == {"status": "text_content"}
+
+        root, child = spans["process_with_ai"], spans["context_bar"]
+        assert root["ts"] <= child["ts"]
+        assert child["ts"] + child["dur"] <= root["ts"] + root["dur"]
+        assert {e["cat"] for e in spans.values()} == {"aicoder"}
+
+    def test_nested_turn_is_a_span(self):
+        tracing.enable()
+        with tracing.turn("process_with_ai"):
+            with tracing.turn("process_with_ai"):
+                pass
+        names = [e["name"] for e in tracing.last_turn()["events"]]
+        assert names == ["process_with_ai", "process_with_ai"]
+
+    def test_exception_marks_span(self):
+        tracing.enable()
+        with pytest.raises(ValueError):
+            with tracing.turn("turn"):
+                with tracing.span("tool:bad"):
+                    raise ValueError("boom")
+        spans = {e["name"]: e for e in tracing.last_turn()["events"]}
+        assert spans["tool:bad"]["args"]["error"] == "ValueError"
+        assert spans["turn"]["args"]["error"] == "ValueError"
+
+    def test_spans_from_other_threads(self):
+        tracing.enable()
+        with tracing.turn("turn"):
+            worker = threading.Thread(target=lambda: tracing.span("bg").__enter__().__exit__(None, None, None))
+            worker.start()
+            worker.join()
+        tids = {e["name"]: e["tid"] for e in tracing.last_turn()["events"]}
+        assert tids["bg"] != tids["turn"]
+        assert any("[thread" in line and "bg" in line for line in tracing.format_last())
+
+    def test_prunes_old_traces(self, trace_dir, monkeypatch):
+        monkeypatch.setattr(tracing, "MAX_TRACE_FILES", 2)
+        tracing.enable()
+        for _ in range(4):
+            with tracing.turn("turn"):
+                pass
+        assert len(os.listdir(trace_dir)) == 2
+
+    def test_format_last_indents_children(self):
+        tracing.enable()
+        with tracing.turn("turn"):
+            with tracing.span("prepare"):
+                with tracing.span("context_bar"):
+                    pass
+            with tracing.span("stream_response"):
+                pass
+        lines = tracing.format_last()
+        assert [line.split()[0] for line in lines] == ["turn", "prepare", "context_bar", "stream_response"]
+        assert lines[2].startswith("    context_bar")
+        assert lines[3].startswith("  stream_response")
+
+    def test_disable_mid_turn_drops_spans(self):
+        tracing.enable()
+        with tracing.turn("turn"):
+            tracing.disable()
+            with tracing.span("after"):
+                pass
+        assert tracing.last_turn() is None
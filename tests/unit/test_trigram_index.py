@@ -0,0 +1,192 @@
+"""
+Tests for the grep trigram index
+"""
+
+import os
+import subprocess
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from aicoder.core import trigram_index
+from aicoder.core.config import Config
+from aicoder.core.trigram_index import TrigramIndex, required_literals
+
+
+@pytest.fixture
+def tree(tmp_path):
+    """Small source tree"""
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "a.py").write_text("def handle_event(x):\n    return x\n")
+    (tmp_path / "src" / "b.py").write_text("def other():\n    pass\n")
+    (tmp_path / "README.md").write_text("handle_event is documented here\n")
+    return tmp_path
+
+
+def _entries(root):
+    from aicoder.utils.file_scan import scan_files
+    return scan_files(str(root))[0]
+
+
+class TestRequiredLiterals:
+    """Test literal extraction from regex patterns"""
+
+    def test_plain_text(self):
+        assert required_literals("handle_event") == ["handle_event"]
+
+    def test_splits_on_metacharacters(self):
+        assert required_literals(r"def \w+_event\(") == ["def ", "_event("]
+
+    def test_optional_char_dropped(self):
+        assert required_literals("colou?r") == ["colo"]
+
+    def test_char_class(self):
+        assert required_literals("foo[abc]barbaz") == ["foo", "barbaz"]
+
+    def test_alternation_gives_up(self):
+        assert required_literals("foo|bar") == []
+
+    def test_inline_flags_give_up(self):
+        assert required_literals("(?i)handle") == []
+
+    def test_short_literals_dropped(self):
+        assert required_literals(r"ab\d+cd") == []
+
+    @pytest.mark.parametrize("pattern, expected", [
+        ("(foo)?barbaz", ["barbaz"]),
+        ("(abc)*defg", ["defg"]),
+        ("(abc){0,2}defg", ["defg"]),
+        ("a(b(cd)e)?fghij", ["fghij"]),
+        (r"\x41BCD", ["BCD"]),
+        (r"\u0041BCD", ["BCD"]),
+        (r"\N{LATIN CAPITAL LETTER A}BCD", ["BCD"]),
+        (r"a\012bcd", ["bcd"]),
+        (r"(ab)\1cde", ["cde"]),
+    ])
+    def test_groups_and_escape_operands_not_required(self, pattern, expected):
+        assert required_literals(pattern) == expected
+
+
+class TestTrigramIndex:
+    """Test building, querying and persistence"""
+
+    def test_candidates_narrow_files(self, tree):
+        index = TrigramIndex(str(tree), str(tree / ".aicoder" / "index"))
+        index.rebuild()
+        result = index.candidates("handle_event", _entries(tree))
+        assert sorted(result) == sorted([str(tree / "README.md"), str(tree / "src" / "a.py")])
+        assert index.hits == 1
+
+    def test_unbuilt_index_is_stale(self, tree):
+        index = TrigramIndex(str(tree), str(tree / ".aicoder" / "index"))
+        with patch.object(index, "refresh_async") as refresh:
+            assert index.candidates("handle_event", _entries(tree)) is None
+        refresh.assert_called_once()
+        assert index.stale_fallbacks == 1
+
+    def test_changed_file_is_stale_until_refresh(self, tree):
+        index = TrigramIndex(str(tree), str(tree / ".aicoder" / "index"))
+        index.rebuild()
+        target = tree / "src" / "b.py"
+        target.write_text("def handle_event_too():\n    pass\n")
+        os.utime(target, ns=(1, 1))
+        with patch.object(index, "refresh_async"):
+            assert index.candidates("handle_event", _entries(tree)) is None
+        assert index.refresh() == 1
+        assert str(target) in index.candidates("handle_event", _entries(tree))
+
+    def test_deleted_file(self, tree):
+        index = TrigramIndex(str(tree), str(tree / ".aicoder" / "index"))
+        index.rebuild()
+        (tree / "README.md").unlink()
+        index.refresh()
+        assert index.candidates("handle_event", _entries(tree)) == [str(tree / "src" / "a.py")]
+
+    def test_no_literals_falls_back(self, tree):
+        index = TrigramIndex(str(tree), str(tree / ".aicoder" / "index"))
+        index.rebuild()
+        assert index.candidates("a|b", _entries(tree)) is None
+        assert index.pattern_fallbacks == 1
+
+    def test_persisted_and_reloaded(self, tree):
+        index_dir = str(tree / ".aicoder" / "index")
+        TrigramIndex(str(tree), index_dir).rebuild()
+        reloaded = TrigramIndex(str(tree), index_dir)
+        assert reloaded.load() is True
+        result = reloaded.candidates("handle_event", _entries(tree))
+        assert len(result) == 2
+
+    def test_compaction_drops_dead_ids(self, tree, monkeypatch):
+        monkeypatch.setattr(trigram_index, "COMPACT_DEAD_RATIO", 0.0)
+        index = TrigramIndex(str(tree), str(tree / ".aicoder" / "index"))
+        index.rebuild()
+        target = tree / "src" / "a.py"
+        target.write_text("def handle_event(y):\n    return y\n")
+        os.utime(target, ns=(1, 1))
+        index.refresh()
+        assert index.status()["dead_ids"] == 0
+        assert str(target) in index.candidates("handle_event", _entries(tree))
+
+
+class TestGrepIntegration:
+    """Test that the grep tool narrows through the index"""
+
+    def test_grep_uses_index(self, tree, monkeypatch):
+        from aicoder.tools.internal import grep
+        monkeypatch.chdir(tree)
+        monkeypatch.setenv("AICODER_GREP_INDEX", "1")
+        monkeypatch.setattr(trigram_index, "_index", None)
+        grep.clear_cache()
+        trigram_index.get_index().rebuild()
+
+        with patch.object(Config, 'sandbox_disabled', return_value=True):
+            result = grep.execute({"text": "handle_event", "path": str(tree), "context": 0})
+
+        assert "(indexed grep)" in result["detailed"]
+        assert "Found 2 matches" in result["friendly"]
+        assert trigram_index.get_index().hits == 1
+        grep.clear_cache()
+        monkeypatch.setattr(trigram_index, "_index", None)
+
+    @pytest.mark.parametrize("pattern", [
+        "(foo)?barbaz",
+        "(abc)*defg",
+        r"\x41BCD",
+        r"\101BCD",
+        r"a\040bcd",
+        r"(ab)\1cde",
+    ])
+    def test_indexed_matches_builtin(self, tree, monkeypatch, pattern):
+        from aicoder.tools.internal import grep
+        (tree / "src" / "c.py").write_text("x = 'barbaz defg ABCD a bcd ababcde'\n")
+        monkeypatch.chdir(tree)
+        monkeypatch.setenv("AICODER_GREP_ENGINE", "python")
+        monkeypatch.setattr(trigram_index, "_index", None)
+        args = {"text": pattern, "path": str(tree), "context": 0}
+
+        def matches():
+            grep.clear_cache()
+            with patch.object(Config, 'sandbox_disabled', return_value=True):
+                return grep.execute(args)["detailed"].split("Matches:\n", 1)[1]
+
+        builtin = matches()
+        monkeypatch.setenv("AICODER_GREP_INDEX", "1")
+        trigram_index.get_index().rebuild()
+        assert builtin and matches() == builtin
+        grep.clear_cache()
+        monkeypatch.setattr(trigram_index, "_index", None)
+
+    def test_not_imported_while_disabled(self, tree):
+        code = (
+            "import sys\n"
+            "from aicoder.core.config import Config\n"
+            "from unittest.mock import patch\n"
+            "from aicoder.tools.internal import grep, write_file, edit_file\n"
+            "from aicoder.core.commands import index\n"
+            "with patch.object(Config, 'sandbox_disabled', return_value=True):\n"
+            f"    grep.execute({{'text': 'handle_event', 'path': {str(tree)!r}}})\n"
+            "assert 'aicoder.core.trigram_index' not in sys.modules\n"
+        )
+        env = {k: v for k, v in os.environ.items() if k != "AICODER_GREP_INDEX"}
+        subprocess.run([sys.executable, "-c", code], check=True, env=env)